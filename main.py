@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 import os
 
@@ -29,4 +30,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Frozen builds relaunch this executable for spawn workers; without this they would open the GUI again
+    multiprocessing.freeze_support()
     main()
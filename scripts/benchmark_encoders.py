@@ -0,0 +1,65 @@
+"""
+Encode throughput benchmark for the export encoder profiles.
+
+Encodes a synthetic 1080p test pattern with every CPU (x264) tuning profile
+at several thread counts, plus each usable hardware encoder, and prints
+frames per second so profiles can be compared on a given machine.
+
+Usage: python scripts/benchmark_encoders.py [seconds] [threads,threads,...]
+"""
+import os
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.encoders import CPU_PROFILES, encoder_registry
+
+FPS = 30
+SOURCE = "testsrc2=s=1920x1080:r={fps}:d={seconds}"
+
+
+def run_encode(ffmpeg_path, profile, seconds, threads=None):
+    cmd = [
+        ffmpeg_path, "-hide_banner", "-v", "error", "-y",
+        "-f", "lavfi", "-i", SOURCE.format(fps=FPS, seconds=seconds),
+    ]
+    cmd += profile.video_args(threads)
+    cmd += ["-pix_fmt", "yuv420p", "-f", "null", "-"]
+    started = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        return None
+    return seconds * FPS / elapsed
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    cpus = os.cpu_count() or 1
+    if len(sys.argv) > 2:
+        thread_counts = [int(t) for t in sys.argv[2].split(",")]
+    else:
+        thread_counts = sorted({1, 2, 4, cpus})
+    ffmpeg_path = encoder_registry.ffmpeg_path
+
+    print(f"ffmpeg: {ffmpeg_path}  source: {seconds:g}s 1080p{FPS}  cpus: {cpus}")
+    print(f"{'profile':<16}{'threads':>8}{'fps':>10}{'x realtime':>12}")
+    for profile in CPU_PROFILES.values():
+        for threads in thread_counts:
+            fps = run_encode(ffmpeg_path, profile, seconds, threads)
+            if fps is None:
+                print(f"{profile.name:<16}{threads:>8}{'failed':>10}")
+                continue
+            print(f"{profile.name:<16}{threads:>8}{fps:>10.1f}{fps / FPS:>12.2f}")
+    for profile in encoder_registry.available("export"):
+        fps = run_encode(ffmpeg_path, profile, seconds)
+        if fps is None:
+            print(f"{profile.name:<16}{'-':>8}{'failed':>10}")
+            continue
+        print(f"{profile.name:<16}{'-':>8}{fps:>10.1f}{fps / FPS:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Repaint benchmark for a 500-clip timeline track.
+
+Compares painting every clip directly (paint_clip) against blitting the
+cached clip layers (clip_layer_cache), cold and warm.
+
+Usage: python scripts/benchmark_timeline_paint.py [clip_count] [repeats]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from PyQt6.QtGui import QPainter, QPixmap
+from PyQt6.QtWidgets import QApplication
+
+from src.core.timeline.clip import Clip
+from src.ui.timeline.clip_widget import ClipLayerCache, paint_clip
+
+PIXELS_PER_SECOND = 50
+CLIP_TOP, CLIP_HEIGHT = 5, 80
+
+
+def build_clips(count: int):
+    clips = []
+    for i in range(count):
+        if i % 2:
+            clips.append(Clip("text_generated", f"subtitle line {i}", duration=1.2,
+                              start_time=i * 1.5, clip_type="text", text_content=f"line {i}"))
+        else:
+            clips.append(Clip(f"/media/clip_{i}.mp4", f"clip_{i}.mp4", duration=1.2, start_time=i * 1.5))
+    return clips
+
+
+def clip_rects(clips):
+    from PyQt6.QtCore import QRect
+    return [
+        QRect(int(c.start_time * PIXELS_PER_SECOND), CLIP_TOP,
+              max(int(c.length * PIXELS_PER_SECOND), 30), CLIP_HEIGHT)
+        for c in clips
+    ]
+
+
+def time_repaints(target: QPixmap, paint_once, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        painter = QPainter(target)
+        paint_once(painter)
+        painter.end()
+    return (time.perf_counter() - start) * 1000 / repeats
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    clips = build_clips(count)
+    rects = clip_rects(clips)
+    # Paint in viewport-sized strips so the target stays a realistic size
+    target = QPixmap(1920, 90)
+
+    def direct(painter):
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        for clip, rect in zip(clips, rects):
+            paint_clip(painter, rect.translated(-(rect.x() // 1920) * 1920, 0), clip, False)
+
+    cache = ClipLayerCache()
+
+    def cached(painter):
+        for clip, rect in zip(clips, rects):
+            cache.draw(painter, rect.translated(-(rect.x() // 1920) * 1920, 0), clip, False)
+
+    direct_ms = time_repaints(target, direct, repeats)
+    cold_ms = time_repaints(target, cached, 1)
+    warm_ms = time_repaints(target, cached, repeats)
+
+    print(f"clips: {count}, repeats: {repeats}")
+    print(f"direct paint:        {direct_ms:8.2f} ms/repaint")
+    print(f"cached (cold build): {cold_ms:8.2f} ms/repaint")
+    print(f"cached (warm blit):  {warm_ms:8.2f} ms/repaint")
+    print(f"layers: {len(cache)}, hits: {cache.hits}, misses: {cache.misses}")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
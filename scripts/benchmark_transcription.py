@@ -0,0 +1,88 @@
+"""
+Transcription speed benchmark for the local engines.
+
+Transcribes a sample audio/video file with every requested backend and
+model size and prints the real-time factor (processing seconds per second
+of audio; below 1.0 is faster than real time). Model loading is timed
+separately and the transcript cache is bypassed.
+
+Usage: python scripts/benchmark_transcription.py FILE [backend,backend,...] [model,model,...]
+       defaults: whisper,faster-whisper,mlx  tiny,base,small
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai.audio_loader import DecodedAudio
+from src.core.ai.model_host import hosted_faster_whisper, hosted_whisper, model_host
+from src.core.ai.transcription import BACKENDS, TranscriptionService
+
+
+def load_seconds(service, backend_name):
+    """Time the model load on the shared host (MLX and API engines load lazily)."""
+    if backend_name == "whisper":
+        key = hosted_whisper(service.model_name).key
+    elif backend_name == "faster-whisper":
+        key = hosted_faster_whisper(service.model_name, service.compute_type).key
+    else:
+        return 0.0
+    started = time.perf_counter()
+    model_host.load(key)
+    return time.perf_counter() - started
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    source = sys.argv[1]
+    backends = sys.argv[2].split(",") if len(sys.argv) > 2 else ["whisper", "faster-whisper", "mlx"]
+    models = sys.argv[3].split(",") if len(sys.argv) > 3 else ["tiny", "base", "small"]
+
+    service = TranscriptionService()
+    audio = DecodedAudio(source)
+    started = time.perf_counter()
+    duration = audio.duration
+    if not duration:
+        print(f"Could not decode {source} to 16 kHz PCM (is ffmpeg installed?)")
+        sys.exit(1)
+
+    decoded = time.perf_counter() - started
+    print(f"audio: {os.path.basename(source)}  {duration:.1f}s  decoded in {decoded:.1f}s  cpus: {os.cpu_count()}")
+    print(f"{'backend':<16}{'model':<10}{'load s':>8}{'run s':>9}{'RTF':>8}{'segments':>10}")
+    for backend_name in backends:
+        backend = BACKENDS.get(backend_name)
+        for model_name in models:
+            service.model_name = model_name
+            service.model = None
+            service.use_mlx = False
+            service.backend = backend_name
+            if backend is None or not backend.available(service):
+                print(f"{backend_name:<16}{model_name:<10}{'unavailable':>17}")
+                break
+            try:
+                loaded = load_seconds(service, backend_name)
+                if backend_name == "whisper":
+                    service.model = hosted_whisper(model_name)
+                started = time.perf_counter()
+                segments = [
+                    seg
+                    for batch in backend.iter_segments(service, audio, None)
+                    for seg in batch
+                ]
+                elapsed = time.perf_counter() - started
+            except Exception as e:
+                print(f"{backend_name:<16}{model_name:<10}{'failed':>17}  {e}")
+                continue
+            print(
+                f"{backend_name:<16}{model_name:<10}{loaded:>8.1f}{elapsed:>9.1f}"
+                f"{elapsed / duration:>8.3f}{len(segments):>10}"
+            )
+            model_host.unload(hosted_whisper(model_name).key)
+            model_host.unload(hosted_faster_whisper(model_name, service.compute_type).key)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Batch transcription of a folder (e.g. a downloaded channel).
+
+Runs every video/audio file under the given folders (or the given files)
+through TranscriptionService.transcribe_many() with one shared model and
+prints each file's real-time factor as it finishes, then the aggregate for
+the batch (wall-clock seconds per second of decoded audio; below 1.0 is
+faster than real time). Transcripts land in the transcript cache, so the
+editor opens these files without transcribing them again.
+
+Usage: python scripts/transcribe_folder.py PATH [PATH ...] [--language CODE]
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai.transcription import transcription_service
+
+MEDIA_EXTENSIONS = {".mp4", ".mov", ".mkv", ".avi", ".webm", ".mp3", ".wav", ".m4a"}
+
+
+def media_files(paths):
+    """Files from the arguments, folders expanded recursively, in name order."""
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            files.extend(
+                os.path.join(root, name)
+                for name in sorted(names)
+                if os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS
+            )
+    return files
+
+
+def main():
+    args = sys.argv[1:]
+    language = None
+    if "--language" in args:
+        index = args.index("--language")
+        language = args[index + 1] if index + 1 < len(args) else None
+        del args[index:index + 2]
+    files = media_files(args)
+    if not files:
+        print(__doc__)
+        sys.exit(1)
+
+    print(f"{len(files)} files  language: {language or 'auto'}  cpus: {os.cpu_count()}")
+    print(f"{'file':<40}{'audio s':>9}{'run s':>9}{'RTF':>8}{'segments':>10}")
+
+    def on_file(index, result):
+        name = os.path.basename(result.path)[:38]
+        if result.cached:
+            rtf = "cached"
+        elif result.rtf is None:
+            rtf = "n/a"
+        else:
+            rtf = f"{result.rtf:.3f}"
+        audio = "" if result.audio_seconds is None else f"{result.audio_seconds:.1f}"
+        print(f"{name:<40}{audio:>9}{result.elapsed:>9.1f}{rtf:>8}{len(result.segments):>10}")
+
+    batch = transcription_service.transcribe_many(files, language=language, on_file=on_file)
+    rtf = "n/a" if batch.rtf is None else f"{batch.rtf:.3f}"
+    print(
+        f"{'total':<40}{batch.audio_seconds:>9.1f}{batch.elapsed:>9.1f}{rtf:>8}"
+        f"{sum(len(f.segments) for f in batch.files):>10}"
+    )
+    print(f"{batch.cached} of {len(batch.files)} files came from the transcript cache")
+
+
+if __name__ == "__main__":
+    main()
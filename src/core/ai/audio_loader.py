@@ -0,0 +1,358 @@
+"""
+Audio Loader - decoded speech audio without temp files.
+
+In-process engines get 16 kHz mono int16 samples straight from ffmpeg's
+stdout (or memory-mapped from a WAV that is already in that format).
+Encoded files that must exist on disk, such as the MP3 uploaded to the
+OpenAI API, live in a size-capped LRU cache instead of the system temp
+dir.
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+from collections import Counter
+from typing import List, Optional, Union
+import numpy as np
+from ..logging_utils import get_logger
+from ..media_probe import get_ffmpeg_path
+from .vad import SAMPLE_RATE
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_BYTES = int(os.getenv("VIDEO_TOOL_AUDIO_CACHE_MB", "1024")) * 1024 * 1024
+DECODE_TIMEOUT = 300
+# One minute of samples; the decode buffer doubles from here
+_INITIAL_SAMPLES = SAMPLE_RATE * 60
+
+
+def source_key(path: str, kind: str) -> Optional[str]:
+    """Hash of a source file's identity (path, size, mtime) and what is derived from it."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    payload = [kind, os.path.realpath(path), stat.st_size, stat.st_mtime_ns]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def map_wav16(path: str) -> Optional[np.ndarray]:
+    """
+    Read-only memory map of the samples of a 16 kHz mono 16-bit PCM WAV,
+    or None for any other file.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+                return None
+            fmt_ok = False
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+                if chunk_id == b"fmt ":
+                    fmt = f.read(size)
+                    if len(fmt) < 16:
+                        return None
+                    audio_format, channels, rate = struct.unpack("<HHI", fmt[:8])
+                    bits = struct.unpack("<H", fmt[14:16])[0]
+                    fmt_ok = (audio_format, channels, rate, bits) == (1, 1, SAMPLE_RATE, 16)
+                elif chunk_id == b"data":
+                    if not fmt_ok:
+                        return None
+                    offset = f.tell()
+                    break
+                else:
+                    f.seek(size, os.SEEK_CUR)
+                # Chunks are word aligned
+                if size % 2:
+                    f.seek(1, os.SEEK_CUR)
+        available = os.path.getsize(path) - offset
+        # WAVs written to a pipe carry a placeholder data size
+        count = (available if size in (0, 0xFFFFFFFF) else min(size, available)) // 2
+    except (OSError, struct.error):
+        return None
+    if count <= 0:
+        return np.zeros(0, dtype="<i2")
+    return np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(count,))
+
+
+def decode_pcm16(path: str, ffmpeg_path: Optional[str] = None, timeout: float = DECODE_TIMEOUT,
+                 sample_rate: int = SAMPLE_RATE, filters: Optional[str] = None) -> Optional[np.ndarray]:
+    """
+    Mono int16 samples (16 kHz unless sample_rate says otherwise) of any
+    media file, optionally run through an ffmpeg audio filter chain, read
+    from an ffmpeg pipe into a growing numpy buffer. None if ffmpeg fails
+    or finds no audio.
+    """
+    cmd = [
+        ffmpeg_path or get_ffmpeg_path(), "-nostdin", "-v", "error",
+        "-i", path,
+        "-vn",
+        *(["-af", filters] if filters else []),
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-acodec", "pcm_s16le",
+        "-f", "s16le", "pipe:1",
+    ]
+    try:
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        logger.warning("Could not start ffmpeg to decode audio: %s", e)
+        return None
+
+    # stderr is drained on the side so a chatty ffmpeg never blocks on a full pipe
+    errors: List[bytes] = []
+    drain = threading.Thread(target=lambda: errors.append(proc.stderr.read()), daemon=True)
+    drain.start()
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    buffer = np.empty(_INITIAL_SAMPLES, dtype="<i2")
+    filled = 0
+    try:
+        with proc:
+            while True:
+                view = memoryview(buffer).cast("B")
+                if filled == len(view):
+                    grown = np.empty(len(buffer) * 2, dtype="<i2")
+                    grown[:len(buffer)] = buffer
+                    buffer = grown
+                    continue
+                read = proc.stdout.readinto(view[filled:])
+                if not read:
+                    break
+                filled += read
+    finally:
+        timer.cancel()
+        drain.join(timeout=5)
+
+    count = filled // 2
+    if proc.returncode != 0 or count == 0:
+        message = b"".join(errors).decode("utf-8", "replace").strip().splitlines()
+        logger.warning("Audio decode failed for %s: %s", path, message[-1] if message else f"exit {proc.returncode}")
+        return None
+    # Give back the unused half of the last doubling
+    return buffer[:count].copy() if len(buffer) > count * 5 // 4 else buffer[:count]
+
+
+def load_pcm16(path: str, ffmpeg_path: Optional[str] = None) -> Optional[np.ndarray]:
+    """Samples of a file: memory-mapped when it is already 16 kHz mono PCM, else decoded."""
+    pcm = map_wav16(path)
+    if pcm is not None:
+        return pcm
+    return decode_pcm16(path, ffmpeg_path)
+
+
+def pcm_to_float(pcm: np.ndarray) -> np.ndarray:
+    """float32 samples in [-1, 1], as Whisper-style engines take them."""
+    return pcm.astype(np.float32) / 32768.0
+
+
+class DecodedAudio:
+    """
+    The 16 kHz mono audio of one source file, decoded on first use and
+    shared by every engine that transcribes it.
+    """
+
+    def __init__(self, path: str, ffmpeg_path: Optional[str] = None):
+        self.path = path
+        self.ffmpeg_path = ffmpeg_path
+        self._pcm: Optional[np.ndarray] = None
+        self._loaded = False
+
+    @property
+    def pcm(self) -> Optional[np.ndarray]:
+        """int16 samples, or None when the file could not be decoded."""
+        if not self._loaded:
+            self._pcm = load_pcm16(self.path, self.ffmpeg_path)
+            self._loaded = True
+        return self._pcm
+
+    @property
+    def decoded(self) -> bool:
+        """Whether the samples have been loaded (successfully or not)."""
+        return self._loaded
+
+    @property
+    def duration(self) -> Optional[float]:
+        pcm = self.pcm
+        return None if pcm is None else len(pcm) / SAMPLE_RATE
+
+    def samples(self) -> Union[np.ndarray, str]:
+        """float32 samples for the engine, or the file path when it could not be decoded."""
+        pcm = self.pcm
+        return self.path if pcm is None else pcm_to_float(pcm)
+
+
+class AudioFileCache:
+    """
+    On-disk LRU of derived audio files (e.g. API upload encodes).
+
+    A hit is touched (mtime) so recently used files survive eviction; after
+    each store the oldest files are removed until the cache fits in
+    max_bytes. Files a caller is still reading can be pinned (get/store
+    with pin=True, released by unpin()) so eviction skips them.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.expanduser("~"), ".video_downloader", "cache", "audio"
+        )
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pins: Counter = Counter()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{ext}")
+
+    def get(self, key: Optional[str], ext: str, pin: bool = False) -> Optional[str]:
+        """Cached file path for key, or None. pin keeps it from eviction until unpin()."""
+        if not key:
+            return None
+        path = self._path(key, ext)
+        with self._lock:
+            try:
+                os.utime(path)
+            except OSError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if pin:
+                self._pins[path] += 1
+        return path
+
+    def store(self, key: Optional[str], ext: str, data: bytes, pin: bool = False) -> Optional[str]:
+        """
+        Write data into the cache under key, and return the cached path.
+        pin keeps it from eviction until unpin().
+        """
+        if not key or not data:
+            return None
+        path = self._path(key, ext)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if pin:
+            with self._lock:
+                self._pins[path] += 1
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not cache audio %s: %s", key, e)
+            if pin:
+                self.unpin(path)
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return None
+        self.evict(keep=path)
+        return path
+
+    def unpin(self, path: str):
+        """Release one pin taken by get() or store()."""
+        with self._lock:
+            self._pins[path] -= 1
+            if self._pins[path] <= 0:
+                del self._pins[path]
+
+    def encode(self, key: Optional[str], ext: str, source_path: str, args: List[str],
+               ffmpeg_path: Optional[str] = None, timeout: float = DECODE_TIMEOUT) -> Optional[str]:
+        """
+        Run ffmpeg on source_path with output args (which must name the
+        format with -f) into the cache, and return the cached path.
+        """
+        if not key:
+            return None
+        path = self._path(key, ext)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        cmd = [ffmpeg_path or get_ffmpeg_path(), "-nostdin", "-v", "error", "-y", "-i", source_path, *args, tmp_path]
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+            if result.returncode != 0 or os.path.getsize(tmp_path) == 0:
+                logger.warning("Audio encode failed for %s: %s", source_path, result.stderr.strip()[-300:])
+                return None
+            os.replace(tmp_path, path)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning("Audio encode failed for %s: %s", source_path, e)
+            return None
+        finally:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Optional[str] = None):
+        with self._lock:
+            try:
+                names = os.listdir(self.cache_dir)
+            except OSError:
+                return
+            entries = []
+            total = 0
+            for name in names:
+                path = os.path.join(self.cache_dir, name)
+                if name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                total += stat.st_size
+                # The new file and pinned ones count toward the cap but stay
+                if path != keep and path not in self._pins:
+                    entries.append((stat.st_mtime_ns, stat.st_size, path))
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def size(self) -> int:
+        try:
+            return sum(
+                os.path.getsize(os.path.join(self.cache_dir, name))
+                for name in os.listdir(self.cache_dir)
+            )
+        except OSError:
+            return 0
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def remove_legacy_temp_files() -> int:
+    """Delete the per-video WAV/MP3 files older versions left in the system temp dir."""
+    removed = 0
+    for pattern in ("whisper_audio_*.wav", "whisper_openai_*.mp3"):
+        for path in glob.glob(os.path.join(tempfile.gettempdir(), pattern)):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+    if removed:
+        logger.info("Removed %d leftover preprocessed audio files from the temp dir", removed)
+    return removed
+
+
+# Global instance
+audio_cache = AudioFileCache()
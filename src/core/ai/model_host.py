@@ -0,0 +1,216 @@
+"""
+Model Host - one resident copy of each heavyweight model (Whisper,
+EasyOCR readers) shared by every service.
+Models are loaded on first use, kept in least-recently-used order within
+a memory budget, and each runs its inference on its own worker thread so
+concurrent requests are serialized instead of racing on one model.
+"""
+import gc
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from ..logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+MB = 1024 * 1024
+# Resident memory of a loaded model (weights plus inference buffers), roughly
+WHISPER_MEMORY_MB = {"tiny": 200, "base": 350, "small": 1000, "medium": 2800, "large": 5500}
+EASYOCR_MEMORY_MB = 500
+
+
+def default_budget() -> int:
+    """Half of physical memory, at most 6 GB (4 GB when it cannot be read)."""
+    try:
+        physical = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return 4096 * MB
+    return min(6144 * MB, physical // 2)
+
+
+@dataclass
+class _HostedEntry:
+    key: str
+    loader: Callable[[], Any]
+    size_bytes: int
+    model: Any = None
+    worker: Optional[ThreadPoolExecutor] = None
+    pending: int = 0
+
+
+class HostedModel:
+    """
+    Stand-in for a hosted model: method calls run on the model's worker
+    thread (loading it first if needed), e.g. proxy.transcribe(...).
+    """
+
+    def __init__(self, host: "ModelHost", key: str):
+        self._host = host
+        self.key = key
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            return self._host.run(self.key, lambda model: getattr(model, name)(*args, **kwargs))
+        return call
+
+
+class ModelHost:
+    """
+    Registry of loadable models.
+
+    register() names a model and how to load it; nothing is loaded until a
+    request (run(), submit(), warm()) reaches it. Requests for one model
+    queue on that model's single worker thread, which also performs the
+    load. Before a load, idle models are evicted oldest-use first until the
+    new one fits in budget_bytes; a model that is busy or has requests
+    queued is never evicted, so the budget can be exceeded briefly rather
+    than failing a request.
+
+    fn passed to run()/submit() must not itself call run() on the same
+    model (it would wait on its own worker).
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None):
+        self.budget_bytes = budget_bytes or default_budget()
+        self._entries: "OrderedDict[str, _HostedEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def register(self, key: str, loader: Callable[[], Any], size_bytes: int) -> HostedModel:
+        """Make a model known (a no-op if key is already registered). Returns its proxy."""
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = _HostedEntry(key, loader, size_bytes)
+        return HostedModel(self, key)
+
+    def submit(self, key: str, fn: Optional[Callable[[Any], Any]] = None) -> Future:
+        """Queue fn(model) on the model's worker. fn=None only makes sure it is loaded."""
+        with self._lock:
+            entry = self._entries[key]
+            entry.pending += 1
+            self._entries.move_to_end(key)
+            if entry.worker is None:
+                entry.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"model-{key}")
+            worker = entry.worker
+        return worker.submit(self._call, entry, fn)
+
+    def run(self, key: str, fn: Callable[[Any], Any]) -> Any:
+        """submit() and wait for the result."""
+        return self.submit(key, fn).result()
+
+    def load(self, key: str):
+        """Load a model now (on its worker) and wait for it; raises the loader's error."""
+        self.submit(key).result()
+
+    def warm(self, key: str) -> Future:
+        """Start loading a model in the background."""
+        return self.submit(key)
+
+    def _call(self, entry: _HostedEntry, fn: Optional[Callable[[Any], Any]]):
+        try:
+            if entry.model is None:
+                self._make_room(entry)
+                logger.info("Loading model %s", entry.key)
+                model = entry.loader()
+                with self._lock:
+                    entry.model = model
+                    self.loads += 1
+            return fn(entry.model) if fn else None
+        finally:
+            with self._lock:
+                entry.pending -= 1
+
+    def _make_room(self, entry: _HostedEntry):
+        evicted = []
+        with self._lock:
+            used = sum(other.size_bytes for other in self._entries.values() if other.model is not None)
+            for other in list(self._entries.values()):  # Least recently used first
+                if used + entry.size_bytes <= self.budget_bytes:
+                    break
+                if other is entry or other.model is None or other.pending:
+                    continue
+                self._unload_locked(other)
+                used -= other.size_bytes
+                evicted.append(other.key)
+        if evicted:
+            logger.info("Evicted models %s to fit %s", ", ".join(evicted), entry.key)
+            gc.collect()
+
+    def _unload_locked(self, entry: _HostedEntry):
+        entry.model = None
+        if entry.worker is not None:
+            entry.worker.shutdown(wait=False)
+            entry.worker = None
+        self.evictions += 1
+
+    def unload(self, key: str) -> bool:
+        """Drop an idle model. False if it is not loaded or still in use."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.model is None or entry.pending:
+                return False
+            self._unload_locked(entry)
+        gc.collect()
+        return True
+
+    def resident(self) -> List[str]:
+        """Loaded models, least recently used first."""
+        with self._lock:
+            return [key for key, entry in self._entries.items() if entry.model is not None]
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values() if entry.model is not None)
+
+    def warm_for_task(self, task: str):
+        """Preload what a queue task type is about to need (best effort)."""
+        try:
+            if task == "transcribe":
+                from .transcription import transcription_service
+                transcription_service.warm()
+            elif task in ("ocr_extract", "remove_sub") and importlib.util.find_spec("easyocr"):
+                self.warm(hosted_easyocr(["ch_tra", "en"]).key)
+        except Exception as e:
+            logger.debug("Model warm-up for %s skipped: %s", task, e)
+
+
+# Global instance
+model_host = ModelHost()
+
+
+def hosted_whisper(model_name: str) -> HostedModel:
+    """openai-whisper model on the shared host."""
+    def load():
+        import whisper
+        return whisper.load_model(model_name)
+    size = WHISPER_MEMORY_MB.get(model_name.split(".")[0], 1500) * MB
+    return model_host.register(f"whisper:{model_name}", load, size)
+
+
+def hosted_faster_whisper(model_name: str, compute_type: str = "int8") -> HostedModel:
+    """faster-whisper (CTranslate2) model on the CPU, on the shared host."""
+    def load():
+        from faster_whisper import WhisperModel
+        return WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=os.cpu_count() or 1)
+    # int8 weights take about a quarter of the fp32 footprint
+    divisor = 4 if compute_type.startswith("int8") else 1
+    size = WHISPER_MEMORY_MB.get(model_name.split(".")[0], 1500) * MB // divisor
+    return model_host.register(f"faster-whisper:{model_name}:{compute_type}", load, size)
+
+
+def hosted_easyocr(lang_set: Sequence[str]) -> HostedModel:
+    """EasyOCR reader for a language set on the shared host."""
+    langs = list(lang_set)
+
+    def load():
+        import easyocr
+        return easyocr.Reader(langs, gpu=True, verbose=False)
+    return model_host.register(f"easyocr:{'+'.join(langs)}", load, EASYOCR_MEMORY_MB * MB)
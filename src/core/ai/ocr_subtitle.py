@@ -7,6 +7,7 @@ import cv2
 import os
 from typing import List, Dict, Any, Optional, Tuple
 from ..logging_utils import get_logger
+from .model_host import hosted_easyocr
 
 logger = get_logger(__name__)
 
@@ -14,18 +15,9 @@ logger = get_logger(__name__)
 class OCRSubtitleExtractor:
     """Extract subtitles from video frames using OCR."""
     
-    def __init__(self):
-        self._reader = None
-        self._lang_set = None
-    
     def _get_reader(self, lang_set: list):
-        """Get or create EasyOCR reader."""
-        if self._reader is None or self._lang_set != lang_set:
-            import easyocr
-            logger.info("Loading EasyOCR model for %s...", lang_set)
-            self._reader = easyocr.Reader(lang_set, gpu=True, verbose=False)
-            self._lang_set = lang_set
-        return self._reader
+        """EasyOCR reader for a language set, kept loaded on the shared model host."""
+        return hosted_easyocr(lang_set)
     
     def extract_subtitles(
         self, 
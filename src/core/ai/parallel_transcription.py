@@ -0,0 +1,188 @@
+"""
+Chunked Whisper transcription: speech is found with VAD, split into
+bounded chunks at silence and the chunks are transcribed in a process pool
+(each worker process holds its own model), then stitched back together on
+the source timeline.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from ..logging_utils import get_logger
+from .model_host import hosted_whisper
+from .vad import SAMPLE_RATE, SpeechChunk, detect_speech, frame_energies, plan_chunks, read_pcm16
+
+logger = get_logger(__name__)
+
+# Audio per chunk. Whisper decodes 30 s windows; a few windows per chunk
+# keeps its context across sentences while leaving enough chunks to share.
+CHUNK_SECONDS = 90.0
+# Below this much speech the pool start-up (and a model load per worker) costs more than it saves
+PARALLEL_MIN_SECONDS = 180.0
+MAX_WORKERS = 4
+
+# --- Worker process -----------------------------------------------------
+
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int):
+    global _worker_model
+    import torch
+    import whisper
+    torch.set_num_threads(max(1, threads))
+    _worker_model = whisper.load_model(model_name)
+
+
+def _transcribe_audio(model, audio: np.ndarray, options: Dict) -> List[Dict[str, Any]]:
+    result = model.transcribe(audio, **options)
+    return [
+        {"start": float(seg["start"]), "end": float(seg["end"]), "text": seg["text"].strip()}
+        for seg in result.get("segments", [])
+    ]
+
+
+def _worker_transcribe(audio: np.ndarray, options: Dict) -> List[Dict[str, Any]]:
+    return _transcribe_audio(_worker_model, audio, options)
+
+
+# --- Engine -------------------------------------------------------------
+
+
+def default_workers() -> int:
+    """Worker processes for this machine: one per two cores, at most MAX_WORKERS."""
+    return max(1, min(MAX_WORKERS, (os.cpu_count() or 1) // 2))
+
+
+def stitch(chunk: SpeechChunk, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Map chunk-local segments back to source time, dropping empty ones."""
+    stitched = []
+    for seg in segments:
+        text = seg.get("text", "").strip()
+        if not text:
+            continue
+        start = chunk.to_source(max(0.0, seg["start"]))
+        end = min(chunk.to_source(max(seg["start"], seg["end"]), is_end=True), chunk.end)
+        stitched.append({"start": round(start, 3), "end": round(max(start, end), 3), "text": text})
+    return stitched
+
+
+class ParallelTranscriber:
+    """
+    Runs local Whisper over the speech chunks of a 16 kHz WAV.
+
+    Short inputs (or workers=1) are transcribed in-process with the
+    caller's (or the shared host's) model; longer ones go to a pool of spawned worker processes
+    that is kept alive, with its models loaded, until the model name
+    changes or shutdown() is called. Either way silence is never decoded.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_seconds: float = CHUNK_SECONDS):
+        self.workers = workers
+        self.chunk_seconds = chunk_seconds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_key: Optional[Tuple[str, int]] = None
+        self._lock = threading.Lock()
+
+    def plan(self, pcm: np.ndarray) -> List[SpeechChunk]:
+        levels = frame_energies(pcm)
+        regions = detect_speech(pcm, levels)
+        chunks = plan_chunks(regions, self.chunk_seconds, levels)
+        speech = sum(chunk.duration for chunk in chunks)
+        logger.info(
+            "VAD: %.0fs of speech in %.0fs of audio, %d chunks",
+            speech, len(pcm) / SAMPLE_RATE, len(chunks),
+        )
+        return chunks
+
+    def transcribe(self, wav_path: str, model_name: str, options: Dict, model=None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Segments for a preprocessed WAV, or None when the file is not
+        16 kHz mono PCM (the caller then transcribes it whole).
+        """
+        chunks = self.iter_file(wav_path, model_name, options, model)
+        if chunks is None:
+            return None
+        segments: List[Dict[str, Any]] = []
+        for chunk_segments in chunks:
+            segments.extend(chunk_segments)
+        logger.info("Chunked transcription complete with %d segments", len(segments))
+        return segments
+
+    def iter_file(self, wav_path: str, model_name: str, options: Dict,
+                  model=None) -> Optional[Iterator[List[Dict[str, Any]]]]:
+        """iter_transcribe() over a preprocessed WAV, or None when it is not 16 kHz mono PCM."""
+        pcm = read_pcm16(wav_path)
+        if pcm is None:
+            return None
+        return self.iter_transcribe(pcm, model_name, options, model)
+
+    def iter_transcribe(self, pcm: np.ndarray, model_name: str, options: Dict,
+                        model=None) -> Iterator[List[Dict[str, Any]]]:
+        """Stitched segments of each chunk, in timeline order, as chunks finish."""
+        chunks = self.plan(pcm)
+        if not chunks:
+            return
+        workers = min(self.workers or default_workers(), len(chunks))
+        speech = sum(chunk.duration for chunk in chunks)
+
+        if workers <= 1 or speech < PARALLEL_MIN_SECONDS:
+            if model is None:
+                model = hosted_whisper(model_name)
+            for chunk in chunks:
+                yield stitch(chunk, _transcribe_audio(model, chunk.audio(pcm), options))
+            return
+
+        pool = self._get_pool(model_name, workers)
+        logger.info("Transcribing %d chunks on %d worker processes", len(chunks), workers)
+        # Submit as we go so only about two chunks of audio per worker are in flight
+        queued = iter(chunks)
+        pending = deque()
+
+        def submit():
+            chunk = next(queued, None)
+            if chunk is not None:
+                pending.append((chunk, pool.submit(_worker_transcribe, chunk.audio(pcm), options)))
+
+        for _ in range(workers * 2):
+            submit()
+        while pending:
+            chunk, future = pending.popleft()
+            submit()
+            yield stitch(chunk, future.result())
+
+    def _get_pool(self, model_name: str, workers: int) -> ProcessPoolExecutor:
+        key = (model_name, workers)
+        with self._lock:
+            if self._pool is None or self._pool_key != key:
+                self._shutdown_locked()
+                threads = max(1, (os.cpu_count() or 1) // workers)
+                # spawn: forking a process that has torch/Qt threads running is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(model_name, threads),
+                )
+                self._pool_key = key
+            return self._pool
+
+    def _shutdown_locked(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self._pool_key = None
+
+    def shutdown(self):
+        """Stop the worker processes (and free their models)."""
+        with self._lock:
+            self._shutdown_locked()
+
+
+# Global instance
+parallel_transcriber = ParallelTranscriber()
+atexit.register(parallel_transcriber.shutdown)
@@ -6,7 +6,11 @@ import cv2
 import numpy as np
 from typing import Tuple, Optional
 import os
+from ..encoders import encoder_registry
 from ..logging_utils import get_logger
+from ..media_probe import ffprobe_path_for, get_ffmpeg_path
+from ..render_supervisor import RenderCancelled, render_supervisor
+from .model_host import hosted_easyocr
 
 logger = get_logger(__name__)
 
@@ -21,88 +25,22 @@ class SubtitleRemoverService:
         self._gpu_encoder = None  # Cache GPU detection result
     
     def _detect_gpu(self) -> dict:
-        """Auto-detect GPU and return best encoder settings."""
+        """Best encoder settings for subtitle removal, from the shared encoder registry."""
         if self._gpu_encoder is not None:
             return self._gpu_encoder
-        
-        import subprocess
-        
-        # Check NVIDIA GPU
-        try:
-            result = subprocess.run(['nvidia-smi'], capture_output=True, timeout=5)
-            if result.returncode == 0:
-                # Check if h264_nvenc is available in ffmpeg
-                ffmpeg_check = subprocess.run(
-                    ['ffmpeg', '-encoders'], capture_output=True, text=True, timeout=5
-                )
-                if 'h264_nvenc' in ffmpeg_check.stdout:
-                    logger.info("NVIDIA GPU detected, using NVENC acceleration")
-                    self._gpu_encoder = {
-                        "encoder": "h264_nvenc",
-                        "preset": ["-preset", "p4"],
-                        # Use constrained quality with bitrate limit to avoid large files
-                        "extra": ["-cq", "28", "-maxrate", "2M", "-bufsize", "4M"],
-                    }
-                    return self._gpu_encoder
-        except:
-            pass
-        
-        # Check AMD GPU (Linux)
-        try:
-            ffmpeg_check = subprocess.run(
-                ['ffmpeg', '-encoders'], capture_output=True, text=True, timeout=5
-            )
-            if 'h264_amf' in ffmpeg_check.stdout:
-                logger.info("AMD GPU detected, using AMF acceleration")
-                self._gpu_encoder = {
-                    "encoder": "h264_amf",
-                    "preset": ["-quality", "speed"],
-                    "extra": [],
-                }
-                return self._gpu_encoder
-        except:
-            pass
-        
-        # Check Intel QuickSync
-        try:
-            ffmpeg_check = subprocess.run(
-                ['ffmpeg', '-encoders'], capture_output=True, text=True, timeout=5
-            )
-            if 'h264_qsv' in ffmpeg_check.stdout:
-                logger.info("Intel GPU detected, using QuickSync acceleration")
-                self._gpu_encoder = {
-                    "encoder": "h264_qsv",
-                    "preset": ["-preset", "fast"],
-                    "extra": [],
-                }
-                return self._gpu_encoder
-        except:
-            pass
-        
-        # Check Apple Silicon (M1/M2/M3) VideoToolbox
-        try:
-            import platform
-            if platform.system() == 'Darwin':  # macOS
-                ffmpeg_check = subprocess.run(
-                    ['ffmpeg', '-encoders'], capture_output=True, text=True, timeout=5
-                )
-                if 'h264_videotoolbox' in ffmpeg_check.stdout:
-                    logger.info("Apple platform detected, using VideoToolbox acceleration")
-                    self._gpu_encoder = {
-                        "encoder": "h264_videotoolbox",
-                        "preset": [],  # VideoToolbox has different options
-                        "extra": ["-q:v", "60"],  # Quality 1-100 (higher = better)
-                    }
-                    return self._gpu_encoder
-        except:
-            pass
-        
-        # Fallback to CPU
-        logger.info("No GPU acceleration found, using CPU encoding")
+
+        profile = encoder_registry.select("subtitle_removal")
+        if profile.hardware:
+            logger.info("Using %s hardware encoding (%s)", profile.name, profile.encoder)
+        else:
+            logger.info("No GPU acceleration found, using CPU encoding")
+        # Legacy split: the leading "-preset"/"-quality" pair, then everything else
+        args = list(profile.args)
+        preset = args[:2] if args and args[0] in ("-preset", "-quality") else []
         self._gpu_encoder = {
-            "encoder": "libx264",
-            "preset": ["-preset", "fast"],
-            "extra": ["-crf", "23"],
+            "encoder": profile.encoder,
+            "preset": preset,
+            "extra": args[len(preset):],
         }
         return self._gpu_encoder
     
@@ -135,7 +73,7 @@ class SubtitleRemoverService:
         
         for lang_set in [['ch_tra', 'en'], ['ch_sim', 'en']]:
             try:
-                reader = easyocr.Reader(lang_set, gpu=True, verbose=False)
+                reader = hosted_easyocr(lang_set)
                 
                 # Sample frames
                 sample_positions = [int(total_frames * (0.2 + 0.6 * i / (num_samples - 1))) for i in range(num_samples)]
@@ -338,9 +276,10 @@ class SubtitleRemoverService:
         """
         import subprocess
         
+        ffmpeg_path = get_ffmpeg_path()
         # Get video dimensions first
         probe_cmd = [
-            "ffprobe", "-v", "error",
+            ffprobe_path_for(ffmpeg_path), "-v", "error",
             "-select_streams", "v:0",
             "-show_entries", "stream=width,height",
             "-of", "csv=s=x:p=0",
@@ -401,28 +340,34 @@ class SubtitleRemoverService:
         
         # Build FFmpeg command with GPU acceleration
         cmd = [
-            "ffmpeg", "-y",
+            ffmpeg_path, "-y",
             "-i", input_path,
             "-vf", filter_complex,
             "-c:v", encoder,
         ]
         cmd.extend(gpu_settings["preset"])
         cmd.extend(gpu_settings["extra"])
+        # CPU encodes are capped to the thread budget they are accounted
+        # against: a share of it, so an export can run at the same time
+        threads = 2
+        if encoder == "libx264":
+            threads = render_supervisor.shared_budget()
+            cmd.extend(["-threads", str(threads)])
         cmd.extend(["-c:a", "copy", output_path])
         
         logger.info("Running FFmpeg subtitle removal (%s mode) with encoder %s", method, encoder)
         logger.debug("FFmpeg video filter: %s", filter_complex)
         
         try:
-            process = subprocess.Popen(
+            with render_supervisor.process(
                 cmd,
+                threads,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 universal_newlines=True
-            )
-            
-            # Wait for completion
-            stdout, stderr = process.communicate()
+            ) as process:
+                # Wait for completion
+                stdout, stderr = process.communicate()
             
             if process.returncode == 0:
                 logger.info("Subtitle-removed video saved: %s", output_path)
@@ -431,6 +376,9 @@ class SubtitleRemoverService:
                 logger.error("FFmpeg subtitle removal error: %s", stderr[-500:])
                 return False
                 
+        except RenderCancelled:
+            logger.info("Subtitle removal cancelled: %s", input_path)
+            return False
         except Exception as e:
             logger.error("Failed to run FFmpeg subtitle removal: %s", e)
             return False
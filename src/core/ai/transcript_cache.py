@@ -0,0 +1,196 @@
+"""
+Transcript Cache - persisted transcription results.
+Keyed by a fingerprint of the decoded audio plus the backend, model,
+language and options that produced them, so re-running auto-caption on
+the same audio (even from a re-downloaded or re-muxed file) is instant.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import wave
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when segment post-processing changes what a cached result should contain
+TRANSCRIPT_CACHE_VERSION = 1
+_READ_BLOCK = 1024 * 1024
+
+
+def pcm_fingerprint(path: str) -> Optional[str]:
+    """
+    sha256 of a file's audio. For WAV files only the format and the PCM
+    frames are hashed (headers and metadata are not); anything else is
+    hashed byte for byte. None if the file cannot be read.
+    """
+    digest = hashlib.sha256()
+    try:
+        try:
+            with wave.open(path, "rb") as wav:
+                digest.update(f"pcm:{wav.getframerate()}:{wav.getnchannels()}:{wav.getsampwidth()}".encode())
+                frames_per_block = max(1, _READ_BLOCK // (wav.getnchannels() * wav.getsampwidth()))
+                while True:
+                    frames = wav.readframes(frames_per_block)
+                    if not frames:
+                        break
+                    digest.update(frames)
+        except (wave.Error, EOFError):
+            digest = hashlib.sha256(b"file:")
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(_READ_BLOCK), b""):
+                    digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def samples_fingerprint(pcm, rate: int = 16000) -> str:
+    """
+    sha256 of mono 16-bit samples, equal to pcm_fingerprint() of a WAV
+    holding the same samples.
+    """
+    digest = hashlib.sha256(f"pcm:{rate}:1:2".encode())
+    samples = memoryview(pcm.astype("<i2", copy=False)).cast("B")
+    for first in range(0, len(samples), _READ_BLOCK):
+        digest.update(samples[first:first + _READ_BLOCK])
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    On-disk JSON transcripts, one file per key.
+
+    fingerprint() memoizes the audio hash per (path, size, mtime), so the
+    preprocessed WAV of a file is hashed once per session;
+    source_fingerprint() also persists it, so an unchanged source is not
+    even decoded again on a later cache hit.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.expanduser("~"), ".video_downloader", "cache", "transcripts"
+        )
+        self._fingerprints: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, path: str) -> Optional[str]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        file_key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._fingerprints.get(file_key)
+        if cached is None:
+            cached = pcm_fingerprint(path)
+            if cached is not None:
+                with self._lock:
+                    self._fingerprints[file_key] = cached
+        return cached
+
+    def source_fingerprint(self, path: str, decode: Callable[[], Any]) -> Optional[str]:
+        """
+        Fingerprint of a media file's decoded audio. decode() returns its
+        16 kHz mono int16 samples (or None when it cannot be decoded, and
+        the file bytes are hashed instead); it is only called when the
+        file has not been fingerprinted since it last changed.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        file_key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+        memo_key = ("source", *file_key)
+        with self._lock:
+            cached = self._fingerprints.get(memo_key)
+        if cached is not None:
+            return cached
+
+        memo_path = os.path.join(
+            self.cache_dir, "sources", hashlib.sha256(json.dumps(file_key).encode("utf-8")).hexdigest()
+        )
+        try:
+            with open(memo_path, "r", encoding="utf-8") as f:
+                cached = f.read().strip() or None
+        except OSError:
+            cached = None
+        if cached is None:
+            pcm = decode()
+            cached = pcm_fingerprint(path) if pcm is None else samples_fingerprint(pcm)
+            if cached is None:
+                return None
+            try:
+                os.makedirs(os.path.dirname(memo_path), exist_ok=True)
+                tmp_path = f"{memo_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(cached)
+                os.replace(tmp_path, memo_path)
+            except OSError as e:
+                logger.warning("Could not record audio fingerprint: %s", e)
+        with self._lock:
+            self._fingerprints[memo_key] = cached
+        return cached
+
+    @staticmethod
+    def key(fingerprint: Optional[str], backend: str, language: Optional[str], options: Dict) -> Optional[str]:
+        """Cache key for one transcription, or None without a fingerprint."""
+        if not fingerprint:
+            return None
+        payload = {
+            "version": TRANSCRIPT_CACHE_VERSION,
+            "audio": fingerprint,
+            "backend": backend,
+            "language": language or "auto",
+            "options": options,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def contains(self, key: Optional[str]) -> bool:
+        """Whether a transcript is stored for key (without counting a hit or miss)."""
+        return bool(key) and os.path.exists(self._path(key))
+
+    def get(self, key: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        if not key:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                segments = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if not isinstance(segments, list):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return segments
+
+    def put(self, key: Optional[str], segments: List[Dict[str, Any]]):
+        if not key:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(segments, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not cache transcript: %s", e)
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        with self._lock:
+            self._fingerprints.clear()
+
+
+# Global instance
+transcript_cache = TranscriptCache()
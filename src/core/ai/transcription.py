@@ -1,10 +1,224 @@
+import importlib.util
 import os
 import platform
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+import numpy as np
 from ..logging_utils import get_logger
+from .audio_loader import DecodedAudio, audio_cache, remove_legacy_temp_files, source_key
+from .model_host import hosted_faster_whisper, hosted_whisper, model_host
+from .parallel_transcription import parallel_transcriber
+from .transcript_cache import transcript_cache
+from .translation_engine import RetryPolicy
 
 logger = get_logger(__name__)
 
+MIN_TEXT_LENGTH = 2  # Minimum chars to be considered valid
+MIN_DURATION = 0.3  # Minimum seconds
+
+# Local engine: auto (MLX on Apple Silicon, else faster-whisper if installed, else whisper),
+# or one of mlx / faster-whisper / whisper
+DEFAULT_BACKEND = os.getenv("VIDEO_TOOL_TRANSCRIBE_BACKEND", "auto").lower()
+# faster-whisper (CTranslate2) weight type on CPU: int8, int8_float32, float32, ...
+DEFAULT_COMPUTE_TYPE = os.getenv("VIDEO_TOOL_TRANSCRIBE_COMPUTE", "int8")
+FASTER_WHISPER_BEAM_SIZE = 5
+# Segments per streamed faster-whisper batch
+FASTER_WHISPER_BATCH = 8
+
+
+class TranscriptionBackend:
+    """
+    One transcription engine. iter_segments() yields lists of segments in
+    timeline order; cache_options() names everything besides the audio and
+    language that changes the result (it is part of the transcript cache key).
+    """
+    name = ""
+    # When the engine produces nothing, try the next one in the chain
+    falls_back = False
+
+    def available(self, service: "TranscriptionService") -> bool:
+        return True
+
+    def cache_options(self, service: "TranscriptionService") -> Dict[str, Any]:
+        return {}
+
+    def warm(self, service: "TranscriptionService"):
+        """Start loading the engine's model in the background, if it has one."""
+
+    def prepare(self, service: "TranscriptionService", audio: DecodedAudio):
+        """Produce the engine's input ahead of time (transcribe_many prefetches it)."""
+        audio.pcm
+
+    def iter_segments(self, service: "TranscriptionService", audio: DecodedAudio,
+                      language: Optional[str]) -> Iterator[List[Dict[str, Any]]]:
+        raise NotImplementedError
+
+
+class OpenAIBackend(TranscriptionBackend):
+    """OpenAI Whisper API (cloud)."""
+    name = "openai"
+    falls_back = True
+
+    def available(self, service):
+        return bool(service._openai_api_key)
+
+    def cache_options(self, service):
+        return service._openai_options()
+
+    def prepare(self, service, audio):
+        service._preprocess_audio_for_openai(audio.path)
+
+    def iter_segments(self, service, audio, language):
+        # Preprocess to mp3 (smaller)
+        yield service._transcribe_openai(service._preprocess_audio_for_openai(audio.path), language)
+
+
+class MlxBackend(TranscriptionBackend):
+    """MLX Whisper (Apple Silicon)."""
+    name = "mlx"
+
+    def available(self, service):
+        return service._mlx_available()
+
+    def cache_options(self, service):
+        return service._mlx_options()
+
+    def iter_segments(self, service, audio, language):
+        yield service._transcribe_mlx(audio.samples(), language)
+
+
+class WhisperBackend(TranscriptionBackend):
+    """openai-whisper (PyTorch), on VAD chunks."""
+    name = "whisper"
+
+    def cache_options(self, service):
+        return {"model": service.model_name, "vad_chunks": service.chunked, "task": "transcribe", "fp16": False}
+
+    def warm(self, service):
+        if importlib.util.find_spec("whisper") is not None:
+            model_host.warm(hosted_whisper(service.model_name).key)
+
+    def iter_segments(self, service, audio, language):
+        options = {"task": "transcribe", "fp16": False}  # Disable fp16 to avoid NaN issues
+        if language:
+            options["language"] = language
+        yield from service._iter_local(audio, options)
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """
+    faster-whisper (CTranslate2) with int8-quantized weights: several times
+    faster than openai-whisper on CPU at near-identical accuracy. Uses its
+    own Silero VAD filter, and streams segments as they are decoded.
+    """
+    name = "faster-whisper"
+
+    def available(self, service):
+        return importlib.util.find_spec("faster_whisper") is not None
+
+    def cache_options(self, service):
+        return {
+            "model": service.model_name,
+            "compute_type": service.compute_type,
+            "beam_size": FASTER_WHISPER_BEAM_SIZE,
+            "vad_filter": True,
+        }
+
+    def warm(self, service):
+        model_host.warm(hosted_faster_whisper(service.model_name, service.compute_type).key)
+
+    def iter_segments(self, service, audio, language):
+        model = hosted_faster_whisper(service.model_name, service.compute_type)
+        samples = audio.samples()
+        segments: "queue.Queue" = queue.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def decode(whisper_model):
+            # Runs on the model's worker; segments are decoded lazily while iterating
+            try:
+                decoded, _info = whisper_model.transcribe(
+                    samples, language=language, beam_size=FASTER_WHISPER_BEAM_SIZE, vad_filter=True,
+                )
+                for seg in decoded:
+                    if stop.is_set():
+                        break
+                    segments.put({"start": seg.start, "end": seg.end, "text": seg.text.strip()})
+            finally:
+                segments.put(done)
+
+        logger.info("Running faster-whisper (%s, %s)", service.model_name, service.compute_type)
+        future = model_host.submit(model.key, decode)
+        batch = []
+        try:
+            while True:
+                seg = segments.get()
+                if seg is done:
+                    break
+                batch.append(seg)
+                if len(batch) >= FASTER_WHISPER_BATCH:
+                    yield batch
+                    batch = []
+            future.result()  # Raise decode errors
+            if batch:
+                yield batch
+        finally:
+            stop.set()
+
+
+BACKENDS: Dict[str, TranscriptionBackend] = {
+    backend.name: backend
+    for backend in (OpenAIBackend(), MlxBackend(), FasterWhisperBackend(), WhisperBackend())
+}
+# Local engines in "auto" preference order
+LOCAL_BACKENDS = ("mlx", "faster-whisper", "whisper")
+
+
+@dataclass
+class FileTranscript:
+    """One file's result from TranscriptionService.iter_transcribe_many()."""
+    path: str
+    segments: List[Dict[str, Any]] = field(default_factory=list)
+    # Decoded audio length; None when the file was never decoded (cache hit, API upload)
+    audio_seconds: Optional[float] = None
+    elapsed: float = 0.0
+    cached: bool = False
+
+    @property
+    def rtf(self) -> Optional[float]:
+        """Real-time factor: processing seconds per second of audio."""
+        if not self.audio_seconds:
+            return None
+        return self.elapsed / self.audio_seconds
+
+
+@dataclass
+class BatchTranscription:
+    """Results of TranscriptionService.transcribe_many(), in input order."""
+    files: List[FileTranscript] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def audio_seconds(self) -> float:
+        return sum(f.audio_seconds or 0.0 for f in self.files)
+
+    @property
+    def cached(self) -> int:
+        return sum(1 for f in self.files if f.cached)
+
+    @property
+    def rtf(self) -> Optional[float]:
+        """Wall-clock seconds of the whole batch per second of decoded audio."""
+        if not self.audio_seconds:
+            return None
+        return self.elapsed / self.audio_seconds
+
+
 class TranscriptionService:
     def __init__(self):
         self.model = None
@@ -15,6 +229,15 @@ class TranscriptionService:
         self.use_openai_api = False  # If True, use cloud API instead of local
         self._openai_api_key = None
 
+        # Local engine, see LOCAL_BACKENDS
+        self.backend = DEFAULT_BACKEND
+        self.compute_type = DEFAULT_COMPUTE_TYPE
+
+        # Local Whisper: transcribe VAD speech chunks (in a process pool for long inputs)
+        self.chunked = True
+        self.workers: Optional[int] = None  # None = one per two cores, capped
+        self._legacy_temp_checked = False
+
     def _is_apple_silicon(self) -> bool:
         """Check if running on Apple Silicon Mac."""
         return platform.system() == "Darwin" and platform.machine() == "arm64"
@@ -32,11 +255,19 @@ class TranscriptionService:
         else:
             logger.info("Whisper mode: Local")
 
+    def set_backend(self, name: str):
+        """Choose the local engine: auto, mlx, faster-whisper or whisper."""
+        name = (name or "auto").lower()
+        if name != "auto" and name not in LOCAL_BACKENDS:
+            raise ValueError(f"Unknown transcription backend: {name}")
+        self.backend = name
+        logger.info("Transcription backend: %s", name)
+
     def load_model(self):
         """Load Whisper model - prioritize MLX on Apple Silicon."""
         
         # Try MLX Whisper first on Apple Silicon
-        if self._is_apple_silicon():
+        if self._is_apple_silicon() and self.backend in ("auto", "mlx"):
             try:
                 import mlx_whisper
                 logger.info("Apple Silicon detected, using MLX Whisper for transcription")
@@ -49,106 +280,67 @@ class TranscriptionService:
                 logger.info("Falling back to standard Whisper")
         
         # Fallback to standard Whisper
+        self._load_whisper()
+
+    def _load_whisper(self):
+        """openai-whisper, loaded once on the shared model host."""
         import whisper
         logger.info("Loading Whisper model '%s' (first run may take a while)", self.model_name)
-        self.model = whisper.load_model(self.model_name)
+        self.model = hosted_whisper(self.model_name)
+        model_host.load(self.model.key)
         logger.info("Whisper model loaded successfully")
 
-    def _preprocess_audio(self, file_path: str) -> str:
-        """
-        Preprocess audio by converting to WAV format for local Whisper.
-        This fixes issues with certain audio codecs that cause NaN errors in Whisper.
-        """
-        import subprocess
-        import tempfile
-        import hashlib
-        
-        # Create cache key based on path + mtime + size (not just path)
-        st = os.stat(file_path)
-        cache_key = f"{file_path}:{st.st_mtime}:{st.st_size}"
-        file_hash = hashlib.md5(cache_key.encode()).hexdigest()[:8]
-        temp_wav = os.path.join(tempfile.gettempdir(), f"whisper_audio_{file_hash}.wav")
-        
-        # If already preprocessed with same file, return cached
-        if os.path.exists(temp_wav):
-            return temp_wav
-        
-        logger.info("Preprocessing audio for local Whisper")
-        
-        try:
-            # Convert to 16kHz mono WAV (optimal for Whisper)
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", file_path,
-                "-vn",  # No video
-                "-acodec", "pcm_s16le",  # 16-bit PCM
-                "-ar", "16000",  # 16kHz sample rate
-                "-ac", "1",  # Mono
-                temp_wav
-            ]
-            
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
-            
-            if os.path.exists(temp_wav) and os.path.getsize(temp_wav) > 1000:
-                logger.info("Audio preprocessed successfully")
-                return temp_wav
-            else:
-                logger.warning("Audio preprocessing failed, using original file")
-                return file_path
-                
-        except Exception as e:
-            logger.warning("FFmpeg preprocessing error: %s", e)
-            return file_path
-    
+    def warm(self):
+        """Start loading the local engine's model in the background (no-op in API mode)."""
+        if self.use_openai_api and self._openai_api_key:
+            return
+        self._local_backend().warm(self)
+
+    def _local_backend(self) -> TranscriptionBackend:
+        """The configured local engine, or the best available one for "auto"."""
+        if self.backend in LOCAL_BACKENDS:
+            backend = BACKENDS[self.backend]
+            if backend.available(self):
+                return backend
+            logger.warning("Transcription backend %s is not available; choosing automatically", self.backend)
+        for name in LOCAL_BACKENDS:
+            if BACKENDS[name].available(self):
+                return BACKENDS[name]
+        return BACKENDS["whisper"]
+
+    def _backend_chain(self) -> List[TranscriptionBackend]:
+        chain = []
+        if self.use_openai_api and BACKENDS["openai"].available(self):
+            chain.append(BACKENDS["openai"])
+        chain.append(self._local_backend())
+        return chain
+
     def _preprocess_audio_for_openai(self, file_path: str) -> str:
         """
         Preprocess audio to MP3 for OpenAI API (much smaller than WAV).
         OpenAI limit is 25MB - MP3 is ~10x smaller than WAV.
+        The encode is kept in the audio cache until it is evicted.
         """
-        import subprocess
-        import tempfile
-        import hashlib
-        
-        st = os.stat(file_path)
-        cache_key = f"openai:{file_path}:{st.st_mtime}:{st.st_size}"
-        file_hash = hashlib.md5(cache_key.encode()).hexdigest()[:8]
-        temp_mp3 = os.path.join(tempfile.gettempdir(), f"whisper_openai_{file_hash}.mp3")
-        
-        if os.path.exists(temp_mp3):
-            return temp_mp3
-        
+        key = source_key(file_path, "openai-mp3")
+        cached = audio_cache.get(key, ".mp3")
+        if cached:
+            return cached
+
         logger.info("Preprocessing audio for OpenAI API")
-        
-        try:
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", file_path,
-                "-vn",
-                "-acodec", "libmp3lame",
-                "-ar", "16000",
-                "-ac", "1",
-                "-b:a", "64k",  # Low bitrate for small file
-                temp_mp3
-            ]
-            
-            subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            
-            if os.path.exists(temp_mp3) and os.path.getsize(temp_mp3) > 1000:
-                size_mb = os.path.getsize(temp_mp3) / 1024 / 1024
-                logger.info("Audio preprocessed for OpenAI: %.1fMB", size_mb)
-                return temp_mp3
-            else:
-                logger.warning("MP3 preprocessing failed, using original file")
-                return file_path
-                
-        except Exception as e:
-            logger.warning("FFmpeg preprocessing error: %s", e)
-            return file_path
+        temp_mp3 = audio_cache.encode(key, ".mp3", file_path, [
+            "-vn",
+            "-acodec", "libmp3lame",
+            "-ar", "16000",
+            "-ac", "1",
+            "-b:a", "64k",  # Low bitrate for small file
+            "-f", "mp3",
+        ])
+        if temp_mp3 and os.path.getsize(temp_mp3) > 1000:
+            size_mb = os.path.getsize(temp_mp3) / 1024 / 1024
+            logger.info("Audio preprocessed for OpenAI: %.1fMB", size_mb)
+            return temp_mp3
+        logger.warning("MP3 preprocessing failed, using original file")
+        return file_path
 
     def transcribe(self, file_path: str, language: str = None) -> List[Dict[str, Any]]:
         """
@@ -159,57 +351,198 @@ class TranscriptionService:
             file_path: Path to audio/video file
             language: Language code (e.g. 'en', 'vi', 'zh'). None = auto-detect
         """
+        segments = []
+        for batch in self.iter_transcribe(file_path, language):
+            segments.extend(batch)
+        logger.info("Transcription complete with %d segments", len(segments))
+        return segments
+
+    def iter_transcribe(self, file_path: str, language: str = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Transcribe like transcribe(), yielding lists of segments in timeline
+        order as they are produced: chunk by chunk for local Whisper, in small
+        batches for faster-whisper, all at once for cached, MLX and OpenAI
+        results.
+        """
         if not os.path.exists(file_path):
             logger.error("File not found: %s", file_path)
-            return []
+            return
+        yield from self._iter_prepared(file_path, language, lambda: self._prepare(file_path))
 
-        if not self.model and not self.use_mlx:
-            self.load_model()
+    def _prepare(self, file_path: str, language: Optional[str] = None,
+                 prefetch: bool = False) -> Tuple[DecodedAudio, Optional[str]]:
+        """
+        The file's audio and fingerprint. With prefetch, also produce the
+        first engine's input, unless its transcript is already cached.
+        """
+        # 16 kHz mono samples, piped from ffmpeg on first use (a cache hit
+        # on an unchanged file needs no decode); they also identify the
+        # transcript cache entry for every backend
+        audio = DecodedAudio(file_path)
+        fingerprint = transcript_cache.source_fingerprint(file_path, lambda: audio.pcm)
+        if prefetch:
+            backend = self._backend_chain()[0]
+            if not transcript_cache.contains(
+                transcript_cache.key(fingerprint, backend.name, language, backend.cache_options(self))
+            ):
+                backend.prepare(self, audio)
+        return audio, fingerprint
 
+    def _iter_prepared(self, file_path: str, language: Optional[str],
+                       prepare: Callable[[], Tuple[DecodedAudio, Optional[str]]],
+                       stats: Optional[Dict[str, Any]] = None) -> Iterator[List[Dict[str, Any]]]:
         logger.info("Transcribing file: %s", file_path)
         
-        # Keep original for fallback
-        original_file = file_path
+        if not self._legacy_temp_checked:
+            self._legacy_temp_checked = True
+            remove_legacy_temp_files()
+
+        produced = False
         
         try:
-            # Use OpenAI API if enabled - preprocess to mp3 (smaller)
-            if self.use_openai_api and self._openai_api_key:
-                processed_mp3 = self._preprocess_audio_for_openai(original_file)
-                result = self._transcribe_openai(processed_mp3, language)
-                if result:
-                    return result
-                # Fallback to local - continue below
-                logger.warning("OpenAI Whisper failed, falling back to local Whisper")
-            
-            # Local Whisper - preprocess to WAV
-            processed_wav = self._preprocess_audio(original_file)
-            
-            # Use MLX Whisper if available
-            if self.use_mlx:
-                return self._transcribe_mlx(processed_wav, language)
-            
-            # Standard Whisper
-            logger.info("Running local Whisper transcription, this may take several minutes")
-            options = {"task": "transcribe", "fp16": False}  # Disable fp16 to avoid NaN issues
-            if language:
-                options["language"] = language
-            
-            result = self.model.transcribe(processed_wav, **options)
-            
-            segments = []
-            for seg in result.get("segments", []):
-                segments.append({
-                    "start": seg["start"],
-                    "end": seg["end"],
-                    "text": seg["text"].strip()
-                })
-            
-            logger.info("Transcription complete with %d segments", len(segments))
-            return segments
+            audio, fingerprint = prepare()
+            if stats is not None:
+                stats["audio"] = audio
+
+            # OpenAI API first if enabled, falling back to the local engine
+            for backend in self._backend_chain():
+                for batch in self._cached(
+                    fingerprint, backend.name, language, backend.cache_options(self),
+                    lambda: backend.iter_segments(self, audio, language), stats,
+                ):
+                    produced = True
+                    yield batch
+                if produced or not backend.falls_back:
+                    return
+                logger.warning("%s transcription failed, falling back to local engine", backend.name)
             
         except Exception as e:
             logger.error("Transcription error: %s", e)
-            return self._build_mock_segments(file_path)
+            if not produced:
+                yield self._build_mock_segments(file_path)
+
+    def transcribe_many(self, file_paths: Iterable[str], language: str = None,
+                        on_file: Optional[Callable[[int, FileTranscript], None]] = None) -> BatchTranscription:
+        """
+        Transcribe a batch of files (e.g. a downloaded channel) with one
+        shared model. on_file(index, result) is called as each file
+        finishes. Transcripts land in the transcript cache, where later
+        sessions pick them up without decoding the file again.
+        """
+        batch = BatchTranscription()
+        started = time.perf_counter()
+        for index, result in enumerate(self.iter_transcribe_many(file_paths, language)):
+            batch.files.append(result)
+            if on_file:
+                on_file(index, result)
+        batch.elapsed = time.perf_counter() - started
+        logger.info(
+            "Batch transcription: %d files (%d cached), %.0fs of audio in %.0fs, RTF %s",
+            len(batch.files), batch.cached, batch.audio_seconds, batch.elapsed,
+            "n/a" if batch.rtf is None else f"{batch.rtf:.3f}",
+        )
+        return batch
+
+    def iter_transcribe_many(self, file_paths: Iterable[str], language: str = None) -> Iterator[FileTranscript]:
+        """
+        FileTranscript per input path, in order. While the model works on
+        one file, the next file's audio is extracted on a prefetch thread.
+        """
+        paths = list(file_paths)
+        if not paths:
+            return
+        # Load the model once, up front; the host keeps it resident for the whole batch
+        self.warm()
+        prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-prefetch")
+
+        def prefetch(path):
+            if not os.path.exists(path):
+                return None
+            return prefetcher.submit(self._prepare, path, language, True)
+
+        try:
+            upcoming = prefetch(paths[0])
+            for index, path in enumerate(paths):
+                current = upcoming
+                upcoming = prefetch(paths[index + 1]) if index + 1 < len(paths) else None
+                result = FileTranscript(path)
+                if current is None:
+                    logger.error("File not found: %s", path)
+                    yield result
+                    continue
+
+                stats: Dict[str, Any] = {}
+                file_started = time.perf_counter()
+                for segments in self._iter_prepared(path, language, current.result, stats):
+                    result.segments.extend(segments)
+                result.elapsed = time.perf_counter() - file_started
+                result.cached = stats.get("cached", False)
+                audio = stats.get("audio")
+                if audio is not None and audio.decoded:
+                    result.audio_seconds = audio.duration
+                logger.info(
+                    "Transcribed %d/%d: %s (%d segments%s)", index + 1, len(paths), os.path.basename(path),
+                    len(result.segments),
+                    ", cached" if result.cached else "" if result.rtf is None else f", RTF {result.rtf:.3f}",
+                )
+                yield result
+        finally:
+            prefetcher.shutdown(wait=False, cancel_futures=True)
+
+    def _cached(self, fingerprint: Optional[str], backend: str, language: Optional[str],
+                options: Dict[str, Any], produce: Callable[[], Iterable[List[Dict[str, Any]]]],
+                stats: Optional[Dict[str, Any]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        The cached transcript as one batch, or the non-empty batches of
+        produce(), stored in the cache once they are complete.
+        """
+        key = transcript_cache.key(fingerprint, backend, language, options)
+        segments = transcript_cache.get(key)
+        if segments is not None:
+            logger.info("Transcript cache hit (%s, %d segments)", backend, len(segments))
+            if stats is not None:
+                stats["cached"] = True
+            if segments:
+                yield segments
+            return
+        segments = []
+        for batch in produce():
+            if batch:
+                segments.extend(batch)
+                yield batch
+        if segments:
+            transcript_cache.put(key, segments)
+
+    def _mlx_available(self) -> bool:
+        """Whether MLX Whisper can run here (decided on first use)."""
+        if not self.use_mlx:
+            if self.model or not self._is_apple_silicon() or importlib.util.find_spec("mlx_whisper") is None:
+                return False
+            self.load_model()
+        return self.use_mlx
+
+    def _iter_local(self, audio: DecodedAudio, options: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+        """Standard Whisper on the decoded audio."""
+        if not self.model:
+            self._load_whisper()
+
+        logger.info("Running local Whisper transcription, this may take several minutes")
+        if self.chunked and audio.pcm is not None:
+            # VAD-split chunks, in parallel worker processes for long inputs
+            parallel_transcriber.workers = self.workers
+            yield from parallel_transcriber.iter_transcribe(audio.pcm, self.model_name, options, self.model)
+            return
+
+        result = self.model.transcribe(audio.samples(), **options)
+        
+        segments = []
+        for seg in result.get("segments", []):
+            segments.append({
+                "start": seg["start"],
+                "end": seg["end"],
+                "text": seg["text"].strip()
+            })
+        yield segments
 
     def _build_mock_segments(self, file_path: str) -> List[Dict[str, Any]]:
         """
@@ -221,19 +554,18 @@ class TranscriptionService:
         logger.warning("Using mock transcription fallback for file: %s", file_path)
         return [{"start": 0.0, "end": 2.0, "text": fallback_text}]
 
-    def _transcribe_mlx(self, file_path: str, language: str = None) -> List[Dict[str, Any]]:
-        """Transcribe using MLX Whisper (Apple Silicon optimized)."""
+    def _transcribe_mlx(self, audio: Union[np.ndarray, str], language: str = None) -> List[Dict[str, Any]]:
+        """
+        Transcribe using MLX Whisper (Apple Silicon optimized). audio is
+        DecodedAudio.samples(): 16 kHz float32 samples, or the file path
+        when the source could not be decoded.
+        """
         import mlx_whisper
         
         logger.info("Transcribing with MLX Whisper")
         
-        # MLX Whisper model path format
-        model_path = f"mlx-community/whisper-{self.model_name}-mlx"
-        
-        options = {
-            "word_timestamps": True,  # Better segmentation
-            "condition_on_previous_text": True,  # Helps with context
-        }
+        options = self._mlx_options()
+        model_path = options.pop("model")
         if language:
             options["language"] = language
         else:
@@ -241,7 +573,7 @@ class TranscriptionService:
             options["language"] = None  # Let Whisper detect
         
         result = mlx_whisper.transcribe(
-            file_path,
+            audio,
             path_or_hf_repo=model_path,
             **options
         )
@@ -257,6 +589,24 @@ class TranscriptionService:
         logger.info("MLX transcription complete with %d segments", len(segments))
         return segments
     
+    def _mlx_options(self) -> Dict[str, Any]:
+        return {
+            # MLX Whisper model path format
+            "model": f"mlx-community/whisper-{self.model_name}-mlx",
+            "word_timestamps": True,  # Better segmentation
+            "condition_on_previous_text": True,  # Helps with context
+        }
+
+    @staticmethod
+    def _openai_options() -> Dict[str, Any]:
+        return {
+            "model": "whisper-1",
+            "response_format": "verbose_json",
+            "timestamp_granularities[]": "segment",
+            "temperature": 0,  # Deterministic output (integer, not string)
+            "prompt": "Transcribe spoken dialogue only. Ignore singing, lyrics, and background music."
+        }
+
     def _transcribe_openai(self, file_path: str, language: str = None) -> List[Dict[str, Any]]:
         """Transcribe using OpenAI Whisper API (cloud)."""
         import httpx
@@ -270,13 +620,7 @@ class TranscriptionService:
         }
         
         # Prepare form data
-        data = {
-            "model": "whisper-1",
-            "response_format": "verbose_json",
-            "timestamp_granularities[]": "segment",
-            "temperature": 0,  # Deterministic output (integer, not string)
-            "prompt": "Transcribe spoken dialogue only. Ignore singing, lyrics, and background music."
-        }
+        data = self._openai_options()
         if language:
             data["language"] = language
         
@@ -323,25 +667,42 @@ class TranscriptionService:
             logger.error("OpenAI Whisper request failed: %s", e)
             return []  # Return empty, caller will fallback to local
 
-    def transcribe_and_translate(self, file_path: str, target_language: str = "vi") -> List[Dict[str, Any]]:
+    def transcribe_and_translate(self, file_path: str, target_language: str = "vi",
+                                 retry: Optional[RetryPolicy] = None) -> List[Dict[str, Any]]:
         """
         Transcribe audio/video and translate to target language.
         
         Args:
             file_path: Path to audio/video file
             target_language: Target language code (vi, en, zh, ja, ko, etc.)
+            retry: Retry budget for rate-limited translation requests
+                (engine default if None); a request still rate limited
+                after it raises RateLimitError
             
         Returns:
             List of translated segments: {'start': float, 'end': float, 'text': str}
         """
+        translated_segments = []
+        for batch in self.iter_transcribe_and_translate(file_path, target_language, retry):
+            translated_segments.extend(batch)
+        logger.info(
+            "Translation complete with %d segments translated to %s",
+            len(translated_segments),
+            target_language,
+        )
+        return translated_segments
+
+    def iter_transcribe_and_translate(self, file_path: str, target_language: str = "vi",
+                                      retry: Optional[RetryPolicy] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Transcribe (auto-detect) and translate, pipelined: segments are packed
+        into token-budgeted batches for the provider and submitted to the
+        translation engine (which runs them under its adaptive concurrency
+        limit) while transcription continues, and translated batches are
+        yielded in timeline order as soon as they are ready.
+        """
         logger.debug("transcribe_and_translate called with target_language=%s", target_language)
         
-        # First transcribe in original language
-        segments = self.transcribe(file_path, language=None)  # Auto-detect
-        
-        if not segments:
-            return []
-        
         # NOTE: Removed special case for English (target_language == "en")
         # because it crashes on MLX mode (self.model is None)
         # Now we use translation_service for ALL languages including English
@@ -349,178 +710,100 @@ class TranscriptionService:
         # Use TranslationService for translation
         from .translation import translation_service
         
-        provider_name = translation_service.get_provider_name()
         logger.info(
-            "Translating %d segments to '%s' using %s",
-            len(segments),
+            "Transcribing and translating to '%s' using %s",
             target_language,
-            provider_name,
+            translation_service.get_provider_name(),
         )
         
+        stats = Counter()
+        batcher = translation_service.batcher()
+        pending = deque()  # (segments, translation future), in timeline order
+        
+        def submit(batch):
+            if batch:
+                texts = [seg["text"].strip() for seg in batch]
+                pending.append((batch, translation_service.submit_batch(texts, target_language, "auto", retry)))
+        
         try:
-            # Batch translation for speed - 20 segments per batch
-            BATCH_SIZE = 20
-            translated_segments = []
-            
-            # Filter out empty segments and track indices
-            valid_indices = []
-            valid_texts = []
-            empty_count = 0
-            whitespace_only = 0
-            too_short = 0
-            
-            MIN_TEXT_LENGTH = 2  # Minimum chars to be considered valid
-            MIN_DURATION = 0.3  # Minimum seconds
-            
-            for i, seg in enumerate(segments):
-                text = seg.get("text", "")
-                if not text:
-                    empty_count += 1
-                    continue
-                text = text.strip()
-                if not text:
-                    whitespace_only += 1
-                    continue
-                # Filter too-short segments
-                duration = seg.get("end", 0) - seg.get("start", 0)
-                if len(text) < MIN_TEXT_LENGTH or duration < MIN_DURATION:
-                    too_short += 1
-                    continue
-                valid_indices.append(i)
-                valid_texts.append(text)
-            
-            # Debug: show filtering stats
-            total = len(segments)
-            valid = len(valid_texts)
-            logger.info(
-                "Segment stats: %d total -> %d valid (%d empty, %d whitespace, %d too-short)",
-                total,
-                valid,
-                empty_count,
-                whitespace_only,
-                too_short,
-            )
-            
-            if valid_texts:
-                # Show sample of texts
-                logger.debug("Sample texts: %s", valid_texts[:3])
-            
-            logger.info(
-                "Processing %d non-empty segments in batches of %d",
-                len(valid_texts),
-                BATCH_SIZE,
-            )
-            
-            # Prepare all batches
-            batches = []
-            for batch_start in range(0, len(valid_texts), BATCH_SIZE):
-                batch_end = min(batch_start + BATCH_SIZE, len(valid_texts))
-                batch_texts = valid_texts[batch_start:batch_end]
-                batches.append((batch_start, batch_texts))
-            
-            total_batches = len(batches)
-            logger.info("Running %d translation batches in parallel (2 workers)", total_batches)
-            
-            # Parallel translation using ThreadPoolExecutor
-            from concurrent.futures import ThreadPoolExecutor, as_completed
-            import time
-            
-            def translate_batch_worker(args):
-                batch_idx, batch_texts = args
-                # Small delay to avoid rate limiting
-                time.sleep(0.5)
-                try:
-                    result = translation_service.translate_batch(
-                        batch_texts,
-                        target_lang=target_language,
-                        source_lang="auto"
-                    )
-                    return (batch_idx, result)
-                except Exception as e:
-                    logger.warning("Batch %d translation failed: %s", batch_idx, e)
-                    return (batch_idx, batch_texts)  # Return original on error
-            
-            # Run batches in parallel with 2 workers (safer for API limits)
-            all_translations = [None] * len(valid_texts)
-            completed = 0
-            
-            with ThreadPoolExecutor(max_workers=2) as executor:
-                futures = {executor.submit(translate_batch_worker, batch): batch for batch in batches}
-                
-                for future in as_completed(futures):
-                    batch_start, batch_results = future.result()
-                    
-                    # Store results at correct positions
-                    for i, result in enumerate(batch_results):
-                        if batch_start + i < len(all_translations):
-                            all_translations[batch_start + i] = result
-                    
-                    completed += 1
-                    logger.info("Completed %d/%d translation batches", completed, total_batches)
-            
-            # Rebuild segments with translations - ONLY include filtered segments
-            valid_set = set(valid_indices)
-            translation_map = dict(zip(valid_indices, all_translations))
-            
-            for i, seg in enumerate(segments):
-                # Skip segments that didn't pass filter
-                if i not in valid_set:
-                    continue
-                
-                original_text = seg["text"].strip()
-                translated_text = translation_map.get(i, original_text)
-                
-                final_text = translated_text.strip() if translated_text else original_text
-                
-                # Only add segments with non-empty text
-                if final_text and final_text.strip():
-                    translated_segments.append({
-                        "start": seg["start"],
-                        "end": seg["end"],
-                        "text": final_text
-                    })
-            
-            # Show sample translations
-            logger.info("Sample translations:")
-            for i in range(min(5, len(valid_texts))):
-                orig = valid_texts[i][:25]
-                trans = all_translations[i][:25] if i < len(all_translations) else "N/A"
-                logger.info("'%s...' -> '%s...'", orig, trans)
-            
-            logger.info(
-                "Translation complete with %d segments translated to %s",
-                len(translated_segments),
-                target_language,
-            )
-            return translated_segments
-            
-        except Exception as e:
-            logger.error("Translation pipeline error: %s", e)
-            return segments
+            for segments in self.iter_transcribe(file_path, language=None):  # Auto-detect
+                for seg in segments:
+                    reason = self._skip_reason(seg)
+                    stats[reason] += 1
+                    if reason == "valid":
+                        submit(batcher.add(seg, seg["text"].strip()))
+                while pending and pending[0][1].done():
+                    translated = self._translated_segments(*pending.popleft())
+                    if translated:
+                        yield translated
+            submit(batcher.flush())
+            while pending:
+                translated = self._translated_segments(*pending.popleft())
+                if translated:
+                    yield translated
+        finally:
+            # Stopped early (rate limit, closed stream): drop requests nobody will read
+            for _, translation in pending:
+                translation.cancel()
+        
+        # Debug: show filtering stats
+        logger.info(
+            "Segment stats: %d total -> %d valid (%d empty, %d whitespace, %d too-short)",
+            sum(stats.values()),
+            stats["valid"],
+            stats["empty"],
+            stats["whitespace"],
+            stats["too_short"],
+        )
 
-    def _transcribe_to_english(self, file_path: str) -> List[Dict[str, Any]]:
-        """Use Whisper's built-in translation to English."""
-        if not self.model:
-            self.load_model()
-            
-        logger.info("Translating to English with Whisper")
+    @staticmethod
+    def _skip_reason(seg: Dict[str, Any]) -> str:
+        """Why a segment is not worth translating, or "valid"."""
+        text = seg.get("text", "")
+        if not text:
+            return "empty"
+        text = text.strip()
+        if not text:
+            return "whitespace"
+        # Filter too-short segments
+        duration = seg.get("end", 0) - seg.get("start", 0)
+        if len(text) < MIN_TEXT_LENGTH or duration < MIN_DURATION:
+            return "too_short"
+        return "valid"
+
+    def _translated_segments(self, segments: List[Dict[str, Any]], translation: Future) -> List[Dict[str, Any]]:
+        """
+        One batch with its submitted translation; segments keep their
+        original text on failure. RateLimitError propagates so callers can
+        switch provider.
+        """
+        from .translation import RateLimitError
         
+        texts = [seg["text"].strip() for seg in segments]
         try:
-            result = self.model.transcribe(file_path, task="translate")
-            
-            segments = []
-            for seg in result.get("segments", []):
-                segments.append({
+            translations = translation.result()
+        except RateLimitError:
+            raise
+        except Exception as e:
+            logger.warning("Translation batch failed: %s", e)
+            translations = texts  # Return original on error
+        
+        translated_segments = []
+        for i, seg in enumerate(segments):
+            original_text = texts[i]
+            translated_text = translations[i] if i < len(translations) else None
+            final_text = translated_text.strip() if translated_text else original_text
+            
+            # Only add segments with non-empty text
+            if final_text:
+                translated_segments.append({
                     "start": seg["start"],
                     "end": seg["end"],
-                    "text": seg["text"].strip()
+                    "text": final_text
                 })
-            
-            return segments
-            
-        except Exception as e:
-            logger.error("Whisper English translation error: %s", e)
-            return []
+        if translated_segments:
+            logger.debug("'%s...' -> '%s...'", texts[0][:25], translated_segments[0]["text"][:25])
+        return translated_segments
 
 # Global instance
 transcription_service = TranscriptionService()
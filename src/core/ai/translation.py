@@ -2,24 +2,25 @@
 Translation Service with multiple provider support.
 Supports: Google Translate (free), Gemini Pro (API key required)
 """
+import asyncio
 import os
-from typing import Optional
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
 from abc import ABC, abstractmethod
 from ..logging_utils import get_logger
+from .translation_batching import ProviderLimits, TokenBatcher
+from .translation_engine import RateLimitError, RetryPolicy, translation_engine
+from .translation_memory import normalize_text, translation_memory
 
 logger = get_logger(__name__)
 
 
-class RateLimitError(Exception):
-    """Raised when API rate limit is exceeded."""
-    def __init__(self, provider: str, message: str = ""):
-        self.provider = provider
-        self.message = message or f"{provider} API rate limit exceeded"
-        super().__init__(self.message)
-
-
 class TranslationProvider(ABC):
     """Abstract base class for translation providers."""
+
+    # Request sizing and rate settings, see ProviderLimits
+    limits = ProviderLimits()
     
     @abstractmethod
     def translate(self, text: str, target_lang: str, source_lang: str = "auto") -> str:
@@ -34,6 +35,13 @@ class TranslationProvider(ABC):
 
 class GoogleTranslateProvider(TranslationProvider):
     """Free Google Translate via deep-translator with Chinese handling."""
+
+    # A batch is one joined request, kept under the 5000-char request cap
+    limits = ProviderLimits(
+        batch_tokens=1200, max_lines=50, output_ratio=1.0,
+        requests_per_minute=300, tokens_per_minute=200000,
+        initial_concurrency=2, max_concurrency=4,
+    )
     
     def get_name(self) -> str:
         return "Google Translate"
@@ -51,47 +59,130 @@ class GoogleTranslateProvider(TranslationProvider):
             return "zh-TW" if has_traditional else "zh-CN"
         return "auto"
     
+    def __init__(self):
+        # deep-translator validates languages on construction and keeps the
+        # query on the instance, so each thread reuses one per language pair
+        self._local = threading.local()
+
+    def _translator(self, source_lang: str, target_lang: str):
+        translators: Dict[Tuple[str, str], object] = getattr(self._local, "translators", None)
+        if translators is None:
+            translators = self._local.translators = {}
+        translator = translators.get((source_lang, target_lang))
+        if translator is None:
+            from deep_translator import GoogleTranslator
+            translator = translators[(source_lang, target_lang)] = GoogleTranslator(
+                source=source_lang, target=target_lang
+            )
+        return translator
+
+    @staticmethod
+    def _is_rate_limit(error: Exception) -> bool:
+        text = f"{type(error).__name__} {error}".lower()
+        return "toomanyrequests" in text or "too many requests" in text or "429" in text
+    
     def translate(self, text: str, target_lang: str, source_lang: str = "auto") -> str:
         if not text or not text.strip():
             return text
         
         try:
-            from deep_translator import GoogleTranslator
-            
-            # Auto-detect Chinese source
-            if source_lang == "auto":
-                source_lang = self._detect_chinese(text)
-            
-            translator = GoogleTranslator(source=source_lang, target=target_lang)
-            result = translator.translate(text)
-            
-            # If translation returned same text, try with explicit Chinese
-            if result == text and source_lang == "auto":
-                for src in ["zh-TW", "zh-CN"]:
-                    try:
-                        translator = GoogleTranslator(source=src, target=target_lang)
-                        result = translator.translate(text)
-                        if result and result != text:
-                            return result
-                    except:
-                        continue
-            
-            return result or text
-            
+            return self._translate_text(text, target_lang, source_lang)
         except Exception as e:
             logger.warning("Google Translate error: %s", e)
             return text
+
+    def _translate_text(self, text: str, target_lang: str, source_lang: str) -> str:
+        """One text through Google; a 429 raises RateLimitError, other errors propagate."""
+        # Auto-detect Chinese source
+        source = self._detect_chinese(text) if source_lang == "auto" else source_lang
+        try:
+            result = self._translator(source, target_lang).translate(text)
+        except Exception as e:
+            if self._is_rate_limit(e):
+                raise RateLimitError(self.get_name(), str(e))
+            raise
+        # If translation returned same text, try with explicit Chinese
+        if result == text and source == "auto":
+            result = self._retry_as_chinese(text, target_lang)
+        return result or text
+
+    def _retry_as_chinese(self, text: str, target_lang: str) -> str:
+        """Text Google left untranslated, tried as Traditional then Simplified Chinese."""
+        for src in ["zh-TW", "zh-CN"]:
+            try:
+                result = self._translator(src, target_lang).translate(text)
+            except Exception as e:
+                if self._is_rate_limit(e):
+                    raise RateLimitError(self.get_name(), str(e))
+                continue
+            if result and result != text:
+                return result
+        return text
     
     def translate_batch(self, texts: list, target_lang: str, source_lang: str = "auto") -> list:
-        """Batch translation for Google Translate - individual calls but with retry."""
+        """
+        Batch translation for Google Translate: single-line texts go out as
+        one newline-joined request, falling back to one call per line if the
+        lines do not come back one for one. A 429 raises RateLimitError so
+        the engine can back off and retry.
+        """
+        if not texts:
+            return []
+        if len(texts) == 1 or any("\n" in t for t in texts):
+            return self._translate_lines(texts, target_lang, source_lang)
+
+        joined = "\n".join(texts)
+        source = source_lang
+        if source_lang == "auto":
+            # One script for the whole batch, else let Google detect it
+            detected = {self._detect_chinese(t) for t in texts}
+            source = detected.pop() if len(detected) == 1 else "auto"
+        try:
+            result = self._translator(source, target_lang).translate(joined)
+        except Exception as e:
+            if self._is_rate_limit(e):
+                raise RateLimitError(self.get_name(), str(e))
+            logger.warning("Google Translate batch error: %s", e)
+            result = None
+        lines = result.split("\n") if result else []
+        if len(lines) == len(texts):
+            results = [line.strip() or text for line, text in zip(lines, texts)]
+            if source_lang == "auto":
+                # Lines left as they were get the same Chinese retry as translate()
+                results = [
+                    self._retry_as_chinese(text, target_lang)
+                    if line == text and self._detect_chinese(text) == "auto" else line
+                    for line, text in zip(results, texts)
+                ]
+            return results
+        logger.debug("Google batch returned %d lines for %d, translating one by one", len(lines), len(texts))
+        return self._translate_lines(texts, target_lang, source_lang)
+
+    def _translate_lines(self, texts: list, target_lang: str, source_lang: str) -> list:
         results = []
         for text in texts:
-            results.append(self.translate(text, target_lang, source_lang))
+            if not text or not text.strip():
+                results.append(text)
+                continue
+            try:
+                results.append(self._translate_text(text, target_lang, source_lang))
+            except RateLimitError:
+                raise
+            except Exception as e:
+                logger.warning("Google Translate error: %s", e)
+                results.append(text)
         return results
 
 
 class GeminiProProvider(TranslationProvider):
     """Gemini Pro translation via Google AI API."""
+
+    # gemini-2.0-flash: 1M context, 8K output; free-tier request rate
+    limits = ProviderLimits(
+        context_tokens=1048576, max_output_tokens=8192, batch_tokens=2000,
+        requests_per_minute=15, tokens_per_minute=1000000,
+        initial_concurrency=1, max_concurrency=4,
+    )
     
     def __init__(self, api_key: str = None):
         self.api_key = api_key or os.environ.get("GEMINI_API_KEY")
@@ -173,8 +264,7 @@ class GeminiProProvider(TranslationProvider):
 
 {numbered_texts}"""
             
-            # Estimate max tokens: ~2x input for translation + some buffer
-            max_tokens = min(4000, len(numbered_texts) * 3)
+            max_tokens = self.limits.output_tokens(texts)
             
             response = model.generate_content(
                 prompt,
@@ -217,6 +307,13 @@ class GeminiProProvider(TranslationProvider):
 
 class OpenAIProvider(TranslationProvider):
     """OpenAI GPT-5/GPT-5 mini translation provider."""
+
+    # GPT-5 family: 400K context, 128K output, reasoning before the answer
+    limits = ProviderLimits(
+        context_tokens=400000, max_output_tokens=128000, batch_tokens=1500,
+        reasoning_tokens=4000, requests_per_minute=500, tokens_per_minute=500000,
+        initial_concurrency=2, max_concurrency=8,
+    )
     
     def __init__(self, api_key: str = None, model: str = "gpt-5"):
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
@@ -349,8 +446,8 @@ class OpenAIProvider(TranslationProvider):
                 ]
             }
             
-            # Dynamic max_output_tokens based on batch size (not char count)
-            max_tokens = min(8000, 500 + 250 * len(texts))
+            # Reasoning headroom plus the estimated size of the translations
+            max_tokens = self.limits.output_tokens(normalized_texts)
             
             # Use Responses API with json_schema for exact array format
             response = client.responses.create(
@@ -442,6 +539,11 @@ class TranslationService:
             self.PROVIDER_GPT5_NANO: OpenAIProvider(model="gpt-5-nano"),
         }
         self.current_provider = self.PROVIDER_GOOGLE
+        # Persistent line translations; None sends every line to the provider
+        self.memory = translation_memory
+        self.deduplicated = 0  # Repeated lines within batches, sent once
+        # Plans, rate-limits and retries provider requests
+        self.engine = translation_engine
     
     def set_provider(self, provider: str):
         """Set active translation provider."""
@@ -467,19 +569,83 @@ class TranslationService:
     def translate(self, text: str, target_lang: str, source_lang: str = "auto") -> str:
         """Translate text using current provider."""
         provider = self.providers[self.current_provider]
-        return provider.translate(text, target_lang, source_lang)
+        key = normalize_text(text)
+        if not key or self.memory is None:
+            return provider.translate(text, target_lang, source_lang)
+        known = self.memory.lookup(self.current_provider, source_lang, target_lang, [key])
+        if key in known:
+            return known[key]
+        translated = provider.translate(key, target_lang, source_lang)
+        self._remember(self.current_provider, {key: translated}, target_lang, source_lang)
+        return translated
     
-    def translate_batch(self, texts: list, target_lang: str, source_lang: str = "auto") -> list:
-        """Translate multiple texts - uses batch API if provider supports it."""
-        provider = self.providers[self.current_provider]
-        
-        # Use batch method if available (Gemini Pro has it)
-        if hasattr(provider, 'translate_batch'):
-            return provider.translate_batch(texts, target_lang, source_lang)
-        
-        # Fallback to individual translation
-        return [provider.translate(t, target_lang, source_lang) for t in texts]
+    def translate_batch(self, texts: list, target_lang: str, source_lang: str = "auto",
+                        retry: Optional[RetryPolicy] = None) -> list:
+        """
+        Translate multiple texts - uses batch API if provider supports it.
+        Repeated lines are sent once, and lines already in the translation
+        memory are not sent at all. retry overrides the engine's retry
+        budget for rate-limited requests.
+        """
+        return self.submit_batch(texts, target_lang, source_lang, retry).result()
+
+    def submit_batch(self, texts: list, target_lang: str, source_lang: str = "auto",
+                     retry: Optional[RetryPolicy] = None) -> Future:
+        """
+        translate_batch() without waiting: a Future of the translations.
+        Batches submitted together share the provider's concurrency limit
+        on the translation engine.
+        """
+        return self.engine.submit(
+            self._translate_batch(self.current_provider, list(texts), target_lang, source_lang, retry)
+        )
+
+    async def _translate_batch(self, provider_key: str, texts: list, target_lang: str, source_lang: str,
+                               retry: Optional[RetryPolicy]) -> list:
+        """Runs on the engine's loop; memory reads and writes go to its executor."""
+        provider = self.providers[provider_key]
+        if self.memory is None:
+            return await self.engine.translate_async(
+                provider_key, provider, texts, target_lang, source_lang, retry
+            )
+
+        loop = asyncio.get_running_loop()
+        keys = [normalize_text(t) for t in texts]
+        unique = list(dict.fromkeys(k for k in keys if k))
+        repeats = sum(1 for k in keys if k) - len(unique)
+        self.deduplicated += repeats
+        known = await loop.run_in_executor(
+            None, self.memory.lookup, provider_key, source_lang, target_lang, unique
+        )
+        pending = [k for k in unique if k not in known]
+        if pending:
+            translated = dict(zip(pending, await self.engine.translate_async(
+                provider_key, provider, pending, target_lang, source_lang, retry
+            )))
+            await loop.run_in_executor(None, self._remember, provider_key, translated, target_lang, source_lang)
+            known.update(translated)
+        logger.info(
+            "Translated %d lines: %d sent, %d from memory, %d repeats (memory hit rate %.0f%%)",
+            len(texts), len(pending), len(unique) - len(pending), repeats,
+            self.memory.hit_rate * 100,
+        )
+        return [known.get(k, text) if k else text for text, k in zip(texts, keys)]
+
+    def limits(self) -> ProviderLimits:
+        """Request sizing and rate settings of the current provider."""
+        return getattr(self.providers[self.current_provider], "limits", ProviderLimits())
+
+    def batcher(self) -> TokenBatcher:
+        """Packs lines into request-sized batches for the current provider."""
+        limits = self.limits()
+        return TokenBatcher(limits.input_budget, limits.max_lines)
 
+    def _remember(self, provider_key: str, translated: dict, target_lang: str, source_lang: str):
+        # Providers hand back the source line when they fail, so unchanged lines are not stored
+        self.memory.store(provider_key, source_lang, target_lang, [
+            (key, text) for key, text in translated.items()
+            if isinstance(text, str) and text.strip() and normalize_text(text) != key
+        ])
 
 # Global instance
 translation_service = TranslationService()
@@ -0,0 +1,199 @@
+"""
+Translation batching - request sizing and adaptive concurrency for
+translation providers.
+
+Lines are packed into requests by estimated token count, up to a budget
+derived from each provider's context window and output limit, and
+requests run under an AIMD concurrency limit. The limit grows by one
+slot per window of healthy responses. It halves on a 429, and on
+latency well above the best observed per-token latency.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+from ..logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Numbering, quoting and separators around each line in a batch prompt
+LINE_OVERHEAD_TOKENS = 4
+# Instructions, JSON envelope and language names of one request
+PROMPT_OVERHEAD_TOKENS = 300
+# Closing JSON / list formatting of one response
+OUTPUT_OVERHEAD_TOKENS = 256
+
+
+def _is_cjk(char: str) -> bool:
+    code = ord(char)
+    return (
+        0x3040 <= code <= 0x30FF      # Kana
+        or 0x3400 <= code <= 0x9FFF   # CJK ideographs
+        or 0xAC00 <= code <= 0xD7AF   # Hangul
+        or 0xF900 <= code <= 0xFAFF   # Compatibility ideographs
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough BPE token count of one batch line: about one token per CJK
+    character and per four other characters, plus the per-line overhead.
+    """
+    if not text:
+        return LINE_OVERHEAD_TOKENS
+    cjk = sum(1 for char in text if _is_cjk(char))
+    return cjk + (len(text) - cjk + 3) // 4 + LINE_OVERHEAD_TOKENS
+
+
+@dataclass(frozen=True)
+class ProviderLimits:
+    """Request sizing and rate settings of one translation provider."""
+    context_tokens: int = 128000
+    max_output_tokens: int = 8192
+    # Target input size of one request: large enough to amortize the
+    # prompt, small enough that a failed or slow request costs little
+    batch_tokens: int = 2000
+    max_lines: int = 200
+    # Output tokens per input token (translations into Vietnamese run long)
+    output_ratio: float = 2.0
+    # Output the model spends before answering (reasoning models)
+    reasoning_tokens: int = 0
+    requests_per_minute: int = 60
+    tokens_per_minute: int = 100000
+    initial_concurrency: int = 2
+    max_concurrency: int = 4
+
+    @property
+    def input_budget(self) -> int:
+        """Input tokens one request may carry so its answer still fits."""
+        by_output = (self.max_output_tokens - self.reasoning_tokens - OUTPUT_OVERHEAD_TOKENS) / self.output_ratio
+        by_context = self.context_tokens - PROMPT_OVERHEAD_TOKENS - self.max_output_tokens
+        return max(LINE_OVERHEAD_TOKENS, int(min(self.batch_tokens, by_output, by_context)))
+
+    def output_tokens(self, texts: Sequence[str]) -> int:
+        """max_output_tokens for a request translating texts."""
+        estimate = sum(estimate_tokens(t) for t in texts) * self.output_ratio
+        return min(self.max_output_tokens, int(self.reasoning_tokens + OUTPUT_OVERHEAD_TOKENS + estimate))
+
+
+class TokenBatcher:
+    """
+    Packs items into batches of at most input_budget estimated tokens and
+    max_lines lines, in order. A line over the budget gets a batch of its own.
+    """
+
+    def __init__(self, input_budget: int, max_lines: int = 200):
+        self.input_budget = input_budget
+        self.max_lines = max_lines
+        self._items: List[Any] = []
+        self._tokens = 0
+
+    def add(self, item: Any, text: str) -> Optional[List[Any]]:
+        """Queue item; returns the previous batch when item does not fit in it."""
+        tokens = estimate_tokens(text)
+        full = None
+        if self._items and (self._tokens + tokens > self.input_budget or len(self._items) >= self.max_lines):
+            full = self.flush()
+        self._items.append(item)
+        self._tokens += tokens
+        return full
+
+    def flush(self) -> Optional[List[Any]]:
+        """The queued batch, or None when empty."""
+        if not self._items:
+            return None
+        items, self._items, self._tokens = self._items, [], 0
+        return items
+
+
+def plan_batches(texts: Sequence[str], limits: ProviderLimits) -> List[List[int]]:
+    """Indices of texts, grouped into request-sized batches."""
+    batcher = TokenBatcher(limits.input_budget, limits.max_lines)
+    batches = []
+    for index, text in enumerate(texts):
+        full = batcher.add(index, text)
+        if full:
+            batches.append(full)
+    last = batcher.flush()
+    if last:
+        batches.append(last)
+    return batches
+
+
+class AimdConcurrency:
+    """
+    Additive-increase / multiplicative-decrease limit on requests in flight.
+
+    Each healthy response adds 1/limit (one slot per window of responses).
+    A rate-limit response halves the limit and pauses new requests for a
+    cooldown that doubles while 429s keep coming. A response slower per
+    token than latency_factor times the best seen so far halves the limit
+    too, at most once per such response time.
+    """
+
+    def __init__(self, initial: int = 2, maximum: int = 4, minimum: int = 1,
+                 decrease: float = 0.5, latency_factor: float = 3.0,
+                 cooldown: float = 2.0, max_cooldown: float = 30.0):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._cooldown = cooldown
+        self._resume_at = 0.0
+        self._last_decrease = 0.0
+        self._best_latency: Optional[float] = None  # Seconds per token
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> Optional[float]:
+        """
+        Take a slot without blocking: 0.0 when taken, else the seconds left
+        in a rate-limit pause, or None when all slots are busy.
+        """
+        with self._lock:
+            wait = self._resume_at - time.monotonic()
+            if wait > 0:
+                return wait
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return 0.0
+            return None
+
+    def release(self, latency: Optional[float] = None, tokens: int = 1, rate_limited: bool = False):
+        """Free a slot and adapt the limit to how the request went."""
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            if rate_limited:
+                self.rate_limited += 1
+                self._decrease(now)
+                self._resume_at = max(self._resume_at, now + self._cooldown)
+                logger.info(
+                    "Rate limited: concurrency %.1f, pausing %.1fs", self.limit, self._cooldown
+                )
+                self._cooldown = min(self.max_cooldown, self._cooldown * 2)
+            elif latency is not None:
+                self._cooldown = self.base_cooldown
+                per_token = latency / max(1, tokens)
+                if self._best_latency is None or per_token < self._best_latency:
+                    self._best_latency = per_token
+                else:
+                    # Let the baseline drift up so one lucky response does not pin it
+                    self._best_latency *= 1.01
+                if (per_token > self._best_latency * self.latency_factor
+                        and now - self._last_decrease > latency):
+                    self._decrease(now)
+                else:
+                    self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+
+    def _decrease(self, now: float):
+        self.limit = max(float(self.minimum), self.limit * self.decrease)
+        self._last_decrease = now
+
+    def state(self) -> Tuple[float, int]:
+        with self._lock:
+            return self.limit, self.in_flight
@@ -0,0 +1,232 @@
+"""
+Translation Engine - rate-limited, concurrent provider requests.
+
+All translation requests are scheduled on one asyncio event loop running
+on a background thread. Per provider, a request waits for its share of
+two token buckets (requests per minute and tokens per minute) and for a
+slot under the adaptive concurrency limit. Rate-limited (429) requests
+are retried with jittered exponential backoff. The provider SDKs are
+blocking, so the request itself runs on a worker thread while the loop
+keeps scheduling the rest.
+"""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+from ..logging_utils import get_logger
+from .translation_batching import (
+    PROMPT_OVERHEAD_TOKENS,
+    AimdConcurrency,
+    ProviderLimits,
+    estimate_tokens,
+    plan_batches,
+)
+
+logger = get_logger(__name__)
+
+# Threads blocked on provider HTTP calls, across all providers
+EXECUTOR_THREADS = 16
+# Backoff before retry n (1-based) is uniform in [0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**n)]
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 30.0
+# A request still rate limited after this long is given up (a quota, not a burst)
+MAX_RETRY_SECONDS = 300.0
+# Budget for jobs a user is watching, who is offered another provider after it
+INTERACTIVE_RETRY_SECONDS = 20.0
+
+
+class RateLimitError(Exception):
+    """Raised when API rate limit is exceeded."""
+    def __init__(self, provider: str, message: str = ""):
+        self.provider = provider
+        self.message = message or f"{provider} API rate limit exceeded"
+        super().__init__(self.message)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Per-call retry settings: how long rate-limited requests keep retrying,
+    and an optional on_retry(provider, attempt, delay) called before each
+    retry (from the engine's loop thread).
+    """
+    max_seconds: float = MAX_RETRY_SECONDS
+    on_retry: Optional[Callable[[str, int, float], None]] = None
+
+
+class TokenBucket:
+    """
+    rate_per_minute units per minute, bursting up to capacity (one minute's
+    worth by default). reserve() takes units immediately, going into debt
+    when the bucket is short, and returns how long the caller must wait for
+    that debt to refill; reservations are served first come, first served.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = max(rate_per_minute, 1e-9) / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, float(rate_per_minute))
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+        self._level -= min(amount, self.capacity)
+        return 0.0 if self._level >= 0 else -self._level / self.rate
+
+
+class ProviderThrottle:
+    """Rate and concurrency limits of one provider, used from the engine's loop."""
+
+    def __init__(self, limits: ProviderLimits):
+        self.limits = limits
+        self.requests = TokenBucket(limits.requests_per_minute)
+        self.tokens = TokenBucket(limits.tokens_per_minute)
+        self.concurrency = AimdConcurrency(limits.initial_concurrency, limits.max_concurrency)
+        self._released: Optional[asyncio.Condition] = None
+
+    async def acquire(self):
+        if self._released is None:
+            self._released = asyncio.Condition()
+        async with self._released:
+            while True:
+                wait = self.concurrency.try_acquire()
+                if wait == 0.0:
+                    return
+                try:
+                    await asyncio.wait_for(self._released.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, latency: Optional[float] = None, tokens: int = 1, rate_limited: bool = False):
+        self.concurrency.release(latency, tokens, rate_limited)
+        if self._released is not None:
+            async with self._released:
+                self._released.notify_all()
+
+
+class TranslationEngine:
+    """
+    Translates through a provider with request planning, rate limiting and
+    retries. translate() is the blocking entry point for worker threads,
+    submit() hands a coroutine such as translate_async() to the engine's loop.
+    """
+
+    def __init__(self, threads: int = EXECUTOR_THREADS, retry_base: float = RETRY_BASE_SECONDS,
+                 retry_max: float = RETRY_MAX_SECONDS, max_retry_seconds: float = MAX_RETRY_SECONDS):
+        self.threads = threads
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.max_retry_seconds = max_retry_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._throttles: Dict[str, ProviderThrottle] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="translate")
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(self._executor)
+                threading.Thread(target=loop.run_forever, name="translation-engine", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def throttle(self, key: str, limits: ProviderLimits) -> ProviderThrottle:
+        """Limits state of one provider (key), created on first use."""
+        with self._lock:
+            throttle = self._throttles.get(key)
+            if throttle is None or throttle.limits != limits:
+                throttle = self._throttles[key] = ProviderThrottle(limits)
+            return throttle
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Run a coroutine on the engine's loop; a concurrent Future of its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def translate(self, key: str, provider, texts: List[str], target_lang: str, source_lang: str = "auto",
+                  retry: Optional[RetryPolicy] = None) -> list:
+        """Blocking translate_async(); must not be called from the engine's loop."""
+        return self.submit(self.translate_async(key, provider, texts, target_lang, source_lang, retry)).result()
+
+    async def translate_async(self, key: str, provider, texts: List[str], target_lang: str,
+                              source_lang: str = "auto", retry: Optional[RetryPolicy] = None) -> list:
+        """
+        Translations of texts, in order, sent as concurrent token-budgeted
+        requests. retry overrides the engine's retry budget for this call.
+        """
+        if not texts:
+            return []
+        limits = getattr(provider, "limits", ProviderLimits())
+        throttle = self.throttle(key, limits)
+        retry = retry or RetryPolicy(self.max_retry_seconds)
+        batches = [[texts[i] for i in batch] for batch in plan_batches(texts, limits)]
+        results = await asyncio.gather(*(
+            self._request(throttle, provider, batch, target_lang, source_lang, retry) for batch in batches
+        ))
+        return [text for result in results for text in result]
+
+    async def _request(self, throttle: ProviderThrottle, provider, texts: List[str],
+                       target_lang: str, source_lang: str, retry: RetryPolicy) -> list:
+        loop = asyncio.get_running_loop()
+        input_tokens = sum(estimate_tokens(t) for t in texts)
+        # Providers count prompt and answer against tokens per minute
+        budget = PROMPT_OVERHEAD_TOKENS + input_tokens * (1 + throttle.limits.output_ratio)
+        first_attempt = time.monotonic()
+        attempt = 0
+        while True:
+            wait = max(throttle.requests.reserve(1), throttle.tokens.reserve(budget))
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await throttle.acquire()
+            started = time.monotonic()
+            try:
+                self.requests += 1
+                result = await loop.run_in_executor(None, self._call, provider, texts, target_lang, source_lang)
+            except RateLimitError as e:
+                await throttle.release(rate_limited=True)
+                attempt += 1
+                if time.monotonic() - first_attempt > retry.max_seconds:
+                    logger.warning("%s still rate limited after %d retries, giving up", e.provider, attempt - 1)
+                    raise
+                self.retries += 1
+                # Full jitter keeps retries from many requests from arriving together
+                delay = random.uniform(0, min(self.retry_max, self.retry_base * 2 ** attempt))
+                logger.info("Rate limited, retry %d in %.1fs", attempt, delay)
+                if retry.on_retry is not None:
+                    retry.on_retry(e.provider, attempt, delay)
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                await throttle.release()
+                raise
+            await throttle.release(time.monotonic() - started, input_tokens)
+            return result
+
+    @staticmethod
+    def _call(provider, texts: List[str], target_lang: str, source_lang: str) -> list:
+        # Use batch method if available (Gemini Pro has it)
+        if hasattr(provider, "translate_batch"):
+            return provider.translate_batch(texts, target_lang, source_lang)
+        # Fallback to individual translation
+        return [provider.translate(t, target_lang, source_lang) for t in texts]
+
+    def shutdown(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+            executor, self._executor = self._executor, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global instance
+translation_engine = TranslationEngine()
@@ -0,0 +1,170 @@
+"""
+Translation Memory - persisted line translations.
+Subtitles repeat a lot (interjections, chorus lines, a channel's intro in
+every video), so each translated line is stored in SQLite keyed by
+provider, language pair and normalized text, and served from there the
+next time any batch contains it.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, Optional, Tuple
+from ..logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when normalization changes what a stored key means
+TRANSLATION_MEMORY_VERSION = 1
+# SQLite's default limit on bound parameters is 999
+_LOOKUP_CHUNK = 500
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Memory key of a subtitle line: NFC, whitespace collapsed, trimmed."""
+    if not text:
+        return ""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class TranslationMemory:
+    """
+    SQLite store of translations, safe to share between threads.
+
+    lookup() and store() work on whole batches; hits and misses count
+    looked-up lines for the session (the hits column counts reuse over
+    the store's lifetime).
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(
+            os.path.expanduser("~"), ".video_downloader", "cache", "translation_memory.sqlite3"
+        )
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None:
+            try:
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+                conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS translations (
+                        version INTEGER NOT NULL,
+                        provider TEXT NOT NULL,
+                        source_lang TEXT NOT NULL,
+                        target_lang TEXT NOT NULL,
+                        source_text TEXT NOT NULL,
+                        translation TEXT NOT NULL,
+                        hits INTEGER NOT NULL DEFAULT 0,
+                        created_at REAL NOT NULL,
+                        used_at REAL NOT NULL,
+                        PRIMARY KEY (version, provider, source_lang, target_lang, source_text)
+                    ) WITHOUT ROWID"""
+                )
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                logger.warning("Translation memory unavailable (%s): %s", self.db_path, e)
+                return None
+        return self._conn
+
+    def lookup(self, provider: str, source_lang: str, target_lang: str,
+               texts: Iterable[str]) -> Dict[str, str]:
+        """Stored translations of the given normalized texts, by text."""
+        keys = list(dict.fromkeys(t for t in texts if t))
+        if not keys:
+            return {}
+        found: Dict[str, str] = {}
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    for first in range(0, len(keys), _LOOKUP_CHUNK):
+                        chunk = keys[first:first + _LOOKUP_CHUNK]
+                        rows = conn.execute(
+                            "SELECT source_text, translation FROM translations"
+                            " WHERE version = ? AND provider = ? AND source_lang = ? AND target_lang = ?"
+                            f" AND source_text IN ({','.join('?' * len(chunk))})",
+                            (TRANSLATION_MEMORY_VERSION, provider, source_lang, target_lang, *chunk),
+                        )
+                        found.update(rows)
+                    if found:
+                        conn.executemany(
+                            "UPDATE translations SET hits = hits + 1, used_at = ?"
+                            " WHERE version = ? AND provider = ? AND source_lang = ? AND target_lang = ?"
+                            " AND source_text = ?",
+                            [(time.time(), TRANSLATION_MEMORY_VERSION, provider, source_lang, target_lang, text)
+                             for text in found],
+                        )
+                        conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning("Translation memory lookup failed: %s", e)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def store(self, provider: str, source_lang: str, target_lang: str,
+              pairs: Iterable[Tuple[str, str]]):
+        """Remember (normalized text, translation) pairs."""
+        now = time.time()
+        rows = [
+            (TRANSLATION_MEMORY_VERSION, provider, source_lang, target_lang, text, translation, now, now)
+            for text, translation in pairs
+            if text and translation
+        ]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO translations"
+                    " (version, provider, source_lang, target_lang, source_text, translation, hits, created_at, used_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Could not store translations: %s", e)
+
+    @property
+    def hit_rate(self) -> float:
+        looked_up = self.hits + self.misses
+        return self.hits / looked_up if looked_up else 0.0
+
+    def count(self) -> int:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return 0
+            return conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                conn.execute("DELETE FROM translations")
+                conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global instance
+translation_memory = TranslationMemory()
@@ -1,13 +1,106 @@
-import os
+"""
+TTS Service - edge-tts speech synthesis.
+
+Requests run on one asyncio event loop on a background thread. Clips are
+cached on disk by a hash of (text, voice, rate, pitch), so regenerating
+a voice-over only synthesizes the lines that changed. generate_voiceover()
+synthesizes subtitle segments concurrently and lays them out as one track
+aligned to their timestamps.
+"""
 import asyncio
-import tempfile
-from typing import Optional
+import functools
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import wave
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
 from ..logging_utils import get_logger
+from .audio_loader import AudioFileCache, decode_pcm16
 
 logger = get_logger(__name__)
 
+# edge-tts streams 24 kHz mono MP3; the voice-over track keeps that rate
+TTS_SAMPLE_RATE = 24000
+# Segments synthesized at once; the free service throttles larger bursts
+TTS_CONCURRENCY = int(os.getenv("VIDEO_TOOL_TTS_CONCURRENCY", "4"))
+DEFAULT_MAX_BYTES = int(os.getenv("VIDEO_TOOL_TTS_CACHE_MB", "512")) * 1024 * 1024
+# The voice catalogue changes a few times a year
+VOICE_LIST_TTL = 24 * 3600
+# A line is sped up at most this much to fit its slot (also the widest
+# factor a single atempo filter takes on older ffmpeg), then cut
+MAX_TEMPO = 2.0
+# Fade applied where a line is cut, so the cut does not click
+FADE_SECONDS = 0.02
+# Bump when what a cached clip contains changes
+TTS_CACHE_VERSION = 1
+
+
+def speech_key(text: str, voice: str, rate: str, pitch: str) -> str:
+    """Cache key of a synthesized clip."""
+    payload = [TTS_CACHE_VERSION, text, voice, rate, pitch]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def segment_slots(segments: Sequence[Dict[str, Any]], duration: Optional[float] = None) -> List[Tuple[float, float]]:
+    """
+    (start, slot end) of each segment, in input order. A line may run on
+    until the next line starts; the last one until duration (unbounded
+    when duration is not given).
+    """
+    starts = [float(seg.get("start", 0.0)) for seg in segments]
+    order = sorted(range(len(segments)), key=lambda i: starts[i])
+    slots: List[Tuple[float, float]] = [(0.0, 0.0)] * len(segments)
+    for position, index in enumerate(order):
+        start = starts[index]
+        if position + 1 < len(order):
+            end = starts[order[position + 1]]
+        elif duration is not None:
+            end = max(float(duration), start)
+        else:
+            end = float("inf")
+        slots[index] = (start, end)
+    return slots
+
+
+def fit_tempo(length: float, slot: float) -> float:
+    """atempo factor fitting length seconds of speech into slot seconds (1.0 when it fits)."""
+    if length <= slot or slot <= 0:
+        return 1.0
+    return min(MAX_TEMPO, length / slot)
+
+
+def _cut(pcm: np.ndarray, length: int) -> np.ndarray:
+    clip = pcm[:length].astype(np.float32)
+    fade = min(length, int(TTS_SAMPLE_RATE * FADE_SECONDS))
+    if fade:
+        clip[-fade:] *= np.linspace(1.0, 0.0, fade, dtype=np.float32)
+    return clip.astype(np.int16)
+
+
+@dataclass
+class VoiceoverTrack:
+    """Result of TTSService.generate_voiceover()."""
+    path: str
+    duration: float = 0.0
+    segments: int = 0
+    # Lines served from the clip cache
+    cached: int = 0
+    # Lines sped up to fit their slot
+    stretched: int = 0
+    # Lines still too long at MAX_TEMPO, cut at the end of their slot
+    truncated: int = 0
+    # Lines left silent because synthesis or decoding failed
+    failed: int = 0
+    elapsed: float = 0.0
+
+
 class TTSService:
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None, max_concurrency: int = TTS_CONCURRENCY):
         # Default voices for different languages
         self.voices = {
             "vi": "vi-VN-HoaiMyNeural",     # Vietnamese female
@@ -17,22 +110,50 @@ class TTSService:
             "zh": "zh-CN-XiaoxiaoNeural",   # Chinese female
         }
         self.default_voice = "vi-VN-HoaiMyNeural"  # Default to Vietnamese
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.expanduser("~"), ".video_downloader", "cache", "tts"
+        )
+        # Clips get their own directory, since the cache evicts anything in it
+        self.cache = AudioFileCache(os.path.join(self.cache_dir, "clips"), DEFAULT_MAX_BYTES)
+        self.max_concurrency = max(1, max_concurrency)
+        self.ffmpeg_path: Optional[str] = None
+        self._voice_list: Optional[list] = None
+        self._voice_list_at = 0.0
+        self._voices_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
 
     def set_voice(self, voice_name: str):
         """Set the voice to use for TTS."""
         self.default_voice = voice_name
 
+    def _run(self, coro):
+        """Run coro on the service's loop and wait for it; not for use from that loop."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="tts-loop", daemon=True).start()
+                self._loop = loop
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def shutdown(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+
     def generate_speech(self, text: str, output_path: str, voice: str = None, rate: str = "+0%", pitch: str = "+0Hz") -> str:
         """
         Generate speech from text using edge-tts.
-        
+
         Args:
             text: Text to convert to speech
             output_path: Path to save the audio file (mp3)
             voice: Voice name (e.g., "vi-VN-HoaiMyNeural")
             rate: Speech rate (e.g., "+10%" for faster, "-10%" for slower)
             pitch: Voice pitch (e.g., "+5Hz" for higher)
-            
+
         Returns:
             Path to the generated audio file
         """
@@ -40,40 +161,214 @@ class TTSService:
         output_dir = os.path.dirname(output_path)
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
-        
+
         logger.info("Generating speech for: '%s...' with voice: %s", text[:50], voice)
-        
-        # Run async function in sync context
-        asyncio.run(self._generate_async(text, output_path, voice, rate, pitch))
-        
-        logger.info("Speech generated: %s", output_path)
+
+        clip_path, cached = self._run(self._speech_file(text, voice, rate, pitch))
+        try:
+            shutil.copyfile(clip_path, output_path)
+        finally:
+            self.cache.unpin(clip_path)
+
+        logger.info("Speech %s: %s", "served from cache" if cached else "generated", output_path)
         return output_path
 
-    async def _generate_async(self, text: str, output_path: str, voice: str, rate: str, pitch: str):
-        """Async implementation using edge-tts."""
+    async def _speech_file(self, text: str, voice: str, rate: str, pitch: str) -> Tuple[str, bool]:
+        """
+        Cached clip of text, synthesizing it on a miss; and whether it was
+        cached. The clip comes back pinned: the caller unpins it when done.
+        """
+        loop = asyncio.get_running_loop()
+        key = speech_key(text, voice, rate, pitch)
+        # Cache writes and eviction scan the disk, so they stay off the loop
+        path = await loop.run_in_executor(None, functools.partial(self.cache.get, key, ".mp3", pin=True))
+        if path:
+            return path, True
+        data = await self._synthesize(text, voice, rate, pitch)
+        path = await loop.run_in_executor(None, functools.partial(self.cache.store, key, ".mp3", data, pin=True))
+        if path is None:
+            raise RuntimeError(f"Could not write speech clip to {self.cache.cache_dir}")
+        return path, False
+
+    async def _synthesize(self, text: str, voice: str, rate: str, pitch: str) -> bytes:
+        """MP3 of text, streamed from edge-tts into memory."""
         import edge_tts
-        
+
         communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch)
-        await communicate.save(output_path)
+        chunks = []
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                chunks.append(chunk["data"])
+        data = b"".join(chunks)
+        if not data:
+            raise RuntimeError(f"edge-tts returned no audio for voice {voice}")
+        return data
+
+    def generate_voiceover(self, segments: Sequence[Dict[str, Any]], output_path: str, voice: str = None,
+                           rate: str = "+0%", pitch: str = "+0Hz",
+                           duration: Optional[float] = None) -> VoiceoverTrack:
+        """
+        Speak subtitle segments (dicts with start, end and text) into one
+        mono WAV, each line placed at its start time.
+
+        Lines are synthesized concurrently (at most max_concurrency at a
+        time) through the clip cache. A line longer than its slot (see
+        segment_slots) is sped up with ffmpeg's atempo, up to MAX_TEMPO,
+        and cut at the end of the slot if it still does not fit. duration
+        pads the track to the length of the video.
+        """
+        started = time.monotonic()
+        voice = voice or self.default_voice
+        slots = segment_slots(segments, duration)
+        track = VoiceoverTrack(path=output_path, segments=len(segments))
+        logger.info("Generating voice-over of %d lines with voice: %s", len(segments), voice)
+
+        pinned: List[str] = []
+        try:
+            clips = self._run(self._voiceover_clips(segments, slots, voice, rate, pitch, track, pinned))
+            samples = self._mix(slots, clips, duration)
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            with wave.open(output_path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(TTS_SAMPLE_RATE)
+                wav.writeframes(samples.tobytes())
+        finally:
+            for path in pinned:
+                self.cache.unpin(path)
+
+        track.duration = len(samples) / TTS_SAMPLE_RATE
+        track.elapsed = time.monotonic() - started
+        logger.info(
+            "Voice-over written: %s (%.1fs, %d cached, %d stretched, %d cut, %d failed, %.1fs)",
+            output_path, track.duration, track.cached, track.stretched, track.truncated,
+            track.failed, track.elapsed,
+        )
+        return track
 
-    def get_available_voices(self, language: str = None) -> list:
+    @staticmethod
+    def _mix(slots: List[Tuple[float, float]], clips: List[Optional[np.ndarray]],
+             duration: Optional[float]) -> np.ndarray:
+        """Clips summed at their slot starts into one int16 track."""
+        length = max([duration or 0.0] + [
+            start + len(clip) / TTS_SAMPLE_RATE for (start, _), clip in zip(slots, clips) if clip is not None
+        ])
+        mix = np.zeros(int(round(length * TTS_SAMPLE_RATE)), dtype=np.int32)
+        for (start, _), clip in zip(slots, clips):
+            if clip is None:
+                continue
+            first = int(round(start * TTS_SAMPLE_RATE))
+            clip = clip[:max(0, len(mix) - first)]
+            mix[first:first + len(clip)] += clip
+        return np.clip(mix, -32768, 32767).astype("<i2")
+
+    async def _voiceover_clips(self, segments: Sequence[Dict[str, Any]], slots: List[Tuple[float, float]],
+                               voice: str, rate: str, pitch: str, track: VoiceoverTrack,
+                               pinned: List[str]) -> List[Optional[np.ndarray]]:
+        """Fitted samples per segment; every clip path used is appended to pinned."""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def clip(segment: Dict[str, Any], slot: Tuple[float, float]) -> Optional[np.ndarray]:
+            text = (segment.get("text") or "").strip()
+            if not text:
+                return None
+            async with semaphore:
+                try:
+                    path, cached = await self._speech_file(text, voice, rate, pitch)
+                except Exception as e:
+                    logger.warning("Speech synthesis failed for '%s...': %s", text[:30], e)
+                    track.failed += 1
+                    return None
+            pinned.append(path)
+            track.cached += cached
+            # ffmpeg runs block, so decoding happens on the loop's executor
+            pcm, tempo, cut = await loop.run_in_executor(None, self._fit_clip, path, slot[1] - slot[0])
+            if pcm is None:
+                track.failed += 1
+            track.stretched += tempo > 1.0
+            track.truncated += cut
+            return pcm
+
+        return await asyncio.gather(*(clip(seg, slot) for seg, slot in zip(segments, slots)))
+
+    def _fit_clip(self, path: str, slot: float) -> Tuple[Optional[np.ndarray], float, bool]:
+        """Samples of a clip fitted into slot seconds, the tempo applied, and whether it was cut."""
+        pcm = decode_pcm16(path, self.ffmpeg_path, sample_rate=TTS_SAMPLE_RATE)
+        if pcm is None:
+            return None, 1.0, False
+        tempo = fit_tempo(len(pcm) / TTS_SAMPLE_RATE, slot)
+        if tempo > 1.0:
+            stretched = decode_pcm16(path, self.ffmpeg_path, sample_rate=TTS_SAMPLE_RATE,
+                                     filters=f"atempo={tempo:.4f}")
+            if stretched is not None:
+                pcm = stretched
+            else:
+                tempo = 1.0
+        room = int(slot * TTS_SAMPLE_RATE) if slot != float("inf") else len(pcm)
+        if len(pcm) <= room:
+            return pcm, tempo, False
+        # atempo rounds a few samples either way; only a real overrun counts as a cut
+        cut = len(pcm) - room > TTS_SAMPLE_RATE * FADE_SECONDS
+        return (_cut(pcm, room) if room > 0 else pcm[:0]), tempo, cut
+
+    def get_available_voices(self, language: str = None, refresh: bool = False) -> list:
         """
         Get list of available voices.
-        
+
+        The list is kept in memory and on disk for VOICE_LIST_TTL; when it
+        cannot be refreshed, the last one fetched is used.
+
         Args:
             language: Filter by language code (e.g., "vi", "en", "zh")
-            
+            refresh: Fetch the list even if the cached one is fresh
+
         Returns:
             List of voice dictionaries
         """
-        async def _get_voices():
-            import edge_tts
-            voices = await edge_tts.list_voices()
-            if language:
-                voices = [v for v in voices if v["Locale"].startswith(language)]
+        voices = self._voice_catalogue(refresh)
+        if language:
+            return [v for v in voices if v["Locale"].startswith(language)]
+        return list(voices)
+
+    def _voice_catalogue(self, refresh: bool) -> list:
+        path = os.path.join(self.cache_dir, "voices.json")
+        with self._voices_lock:
+            now = time.time()
+            if not refresh and self._voice_list is not None and now - self._voice_list_at < VOICE_LIST_TTL:
+                return self._voice_list
+            if self._voice_list is None:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        stored = json.load(f)
+                    self._voice_list, self._voice_list_at = stored["voices"], float(stored["fetched_at"])
+                except (OSError, ValueError, KeyError, TypeError):
+                    pass
+                if not refresh and self._voice_list is not None and now - self._voice_list_at < VOICE_LIST_TTL:
+                    return self._voice_list
+            try:
+                voices = self._run(self._list_voices())
+            except Exception as e:
+                if self._voice_list is None:
+                    raise
+                logger.warning("Could not refresh the voice list, using the cached one: %s", e)
+                return self._voice_list
+            self._voice_list, self._voice_list_at = voices, now
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"fetched_at": now, "voices": voices}, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning("Could not save the voice list: %s", e)
             return voices
-        
-        return asyncio.run(_get_voices())
+
+    async def _list_voices(self) -> list:
+        import edge_tts
+        return await edge_tts.list_voices()
 
     def get_voice_for_language(self, lang_code: str) -> str:
         """Get default voice for a language code."""
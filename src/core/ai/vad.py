@@ -0,0 +1,168 @@
+"""
+Voice activity detection on 16 kHz mono PCM, and chunk planning for
+parallel transcription.
+"""
+import wave
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+
+# Speech is this many dB above the noise floor (10th percentile frame energy)...
+SPEECH_MARGIN_DB = 12.0
+# ...and never quieter than this, so a near-silent track is not all "speech"
+MIN_SPEECH_DBFS = -50.0
+MIN_SPEECH_SECONDS = 0.25
+# Pauses shorter than this stay inside a speech region
+MIN_SILENCE_SECONDS = 0.4
+# Context kept around each region so word onsets/endings are not clipped
+REGION_PAD_SECONDS = 0.2
+
+
+def read_pcm16(path: str) -> Optional[np.ndarray]:
+    """int16 samples of a 16 kHz mono 16-bit WAV, or None for any other file."""
+    try:
+        with wave.open(path, "rb") as wav:
+            if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) != (SAMPLE_RATE, 1, 2):
+                return None
+            return np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+    except (OSError, EOFError, wave.Error):
+        return None
+
+
+def frame_energies(pcm: np.ndarray, frame_seconds: float = FRAME_SECONDS) -> np.ndarray:
+    """Per-frame RMS level in dBFS."""
+    frame = int(SAMPLE_RATE * frame_seconds)
+    count = len(pcm) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    levels = np.empty(count, dtype=np.float32)
+    # Blocks of ~1 minute keep the float copy small on hour-long tracks
+    block = max(1, int(60 / frame_seconds))
+    for first in range(0, count, block):
+        last = min(count, first + block)
+        frames = pcm[first * frame:last * frame].astype(np.float32).reshape(last - first, frame) / 32768.0
+        levels[first:last] = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(levels + 1e-10)
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """[start, end) index runs where mask is True."""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+
+
+def detect_speech(
+    pcm: np.ndarray,
+    levels: Optional[np.ndarray] = None,
+    frame_seconds: float = FRAME_SECONDS,
+) -> List[Tuple[float, float]]:
+    """
+    (start, end) seconds of speech regions. Energy based: frames well above
+    the track's own noise floor count as speech, short pauses are bridged,
+    blips are dropped and each region is padded a little.
+    """
+    if levels is None:
+        levels = frame_energies(pcm, frame_seconds)
+    if len(levels) == 0:
+        return []
+    threshold = max(float(np.percentile(levels, 10)) + SPEECH_MARGIN_DB, MIN_SPEECH_DBFS)
+    active = levels > threshold
+
+    # Bridge short pauses
+    min_silence = int(round(MIN_SILENCE_SECONDS / frame_seconds))
+    for start, end in _runs(~active):
+        if start > 0 and end < len(active) and end - start < min_silence:
+            active[start:end] = True
+
+    total = len(pcm) / SAMPLE_RATE
+    min_speech = int(round(MIN_SPEECH_SECONDS / frame_seconds))
+    regions: List[Tuple[float, float]] = []
+    for start, end in _runs(active):
+        if end - start < min_speech:
+            continue
+        region_start = max(0.0, start * frame_seconds - REGION_PAD_SECONDS)
+        region_end = min(total, end * frame_seconds + REGION_PAD_SECONDS)
+        if regions and region_start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], region_end)
+        else:
+            regions.append((region_start, region_end))
+    return regions
+
+
+@dataclass
+class SpeechChunk:
+    """
+    Speech regions transcribed together. The chunk's audio is the regions
+    back to back (silence between them removed); to_source() maps a time in
+    that audio back to the original track.
+    """
+    index: int
+    pieces: List[Tuple[float, float]] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return sum(end - start for start, end in self.pieces)
+
+    @property
+    def end(self) -> float:
+        return self.pieces[-1][1] if self.pieces else 0.0
+
+    def audio(self, pcm: np.ndarray) -> np.ndarray:
+        """float32 samples in [-1, 1], as Whisper takes them."""
+        slices = [pcm[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] for start, end in self.pieces]
+        return np.concatenate(slices).astype(np.float32) / 32768.0 if slices else np.zeros(0, np.float32)
+
+    def to_source(self, local: float, is_end: bool = False) -> float:
+        """Source time of a chunk-local time. Ends on a joint stay in the earlier piece."""
+        offset = 0.0
+        for start, end in self.pieces:
+            length = end - start
+            if local < offset + length or (is_end and local <= offset + length):
+                return start + max(0.0, local - offset)
+            offset += length
+        return self.end
+
+
+def _quietest_cut(levels: np.ndarray, start: float, end: float, frame_seconds: float) -> float:
+    """Quietest frame in the last third of [start, end), as a cut time."""
+    first = int((start + (end - start) * 2 / 3) / frame_seconds)
+    last = int(end / frame_seconds)
+    if last - first < 2 or last > len(levels):
+        return end
+    return (first + int(np.argmin(levels[first:last]))) * frame_seconds
+
+
+def plan_chunks(
+    regions: List[Tuple[float, float]],
+    max_seconds: float,
+    levels: Optional[np.ndarray] = None,
+    frame_seconds: float = FRAME_SECONDS,
+) -> List[SpeechChunk]:
+    """
+    Group speech regions into chunks of at most max_seconds of audio.
+    Regions longer than that are split at their quietest point (or hard cut
+    when no levels are given).
+    """
+    chunks: List[SpeechChunk] = []
+    current = SpeechChunk(0)
+    for start, end in regions:
+        while end - start > max_seconds:
+            cut = start + max_seconds
+            if levels is not None:
+                cut = _quietest_cut(levels, start, cut, frame_seconds)
+            if current.pieces:
+                chunks.append(current)
+            chunks.append(SpeechChunk(len(chunks), [(start, cut)]))
+            current = SpeechChunk(len(chunks))
+            start = cut
+        if current.pieces and current.duration + (end - start) > max_seconds:
+            chunks.append(current)
+            current = SpeechChunk(len(chunks))
+        current.pieces.append((start, end))
+    if current.pieces:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,248 @@
+import json
+import os
+import platform
+import shutil
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from .logging_utils import get_logger
+from .media_probe import get_ffmpeg_path
+
+logger = get_logger(__name__)
+
+PROBE_TIMEOUT = 10
+# Tiny lavfi source used to check that a listed hardware encoder really opens
+_TEST_SOURCE = "color=c=black:s=256x256:r=30:d=0.1"
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    """
+    One way of encoding H.264 video: an ffmpeg encoder plus its rate-control
+    and speed arguments. Hardware profiles report how many encodes the
+    device comfortably runs at once (max_sessions); CPU profiles leave that
+    to the thread budget instead.
+    """
+    name: str
+    encoder: str
+    args: Tuple[str, ...] = ()
+    hardware: bool = False
+    max_sessions: Optional[int] = None
+    threads: Optional[int] = None  # fixed x264 thread count, None = caller decides
+
+    def video_args(self, threads: Optional[int] = None) -> List[str]:
+        """`-c:v ...` arguments, with a thread cap for CPU encoders."""
+        return ["-c:v", self.encoder, *self.args] + self.thread_args(threads)
+
+    def thread_args(self, threads: Optional[int] = None) -> List[str]:
+        if self.hardware:
+            return []
+        threads = self.threads or threads
+        return ["-threads", str(threads)] if threads else []
+
+
+# CPU (libx264) tuning profiles, fastest first. x264-fast is the historical default.
+CPU_PROFILES: Dict[str, EncoderProfile] = {
+    profile.name: profile
+    for profile in (
+        EncoderProfile("x264-ultrafast", "libx264", ("-preset", "ultrafast", "-crf", "23")),
+        EncoderProfile("x264-veryfast", "libx264", ("-preset", "veryfast", "-crf", "23")),
+        EncoderProfile("x264-fast", "libx264", ("-preset", "fast", "-crf", "23")),
+        EncoderProfile("x264-medium", "libx264", ("-preset", "medium", "-crf", "23")),
+    )
+}
+DEFAULT_CPU_PROFILE = CPU_PROFILES["x264-fast"]
+
+# Hardware encoders in preference order, with arguments per job type.
+# Subtitle removal keeps its bitrate-capped settings so outputs stay small.
+HARDWARE_ENCODERS: List[Tuple[str, str, int, Dict[str, Tuple[str, ...]]]] = [
+    ("nvenc", "h264_nvenc", 3, {
+        "export": ("-preset", "p4", "-rc", "vbr", "-cq", "23", "-b:v", "0"),
+        "subtitle_removal": ("-preset", "p4", "-cq", "28", "-maxrate", "2M", "-bufsize", "4M"),
+    }),
+    ("amf", "h264_amf", 2, {
+        "export": ("-quality", "balanced", "-rc", "cqp", "-qp_i", "23", "-qp_p", "23"),
+        "subtitle_removal": ("-quality", "speed"),
+    }),
+    ("qsv", "h264_qsv", 2, {
+        "export": ("-preset", "medium", "-global_quality", "23"),
+        "subtitle_removal": ("-preset", "fast"),
+    }),
+    ("videotoolbox", "h264_videotoolbox", 2, {
+        "export": ("-q:v", "65"),
+        "subtitle_removal": ("-q:v", "60"),
+    }),
+]
+
+
+def _hardware_candidates() -> List[Tuple[str, str, int, Dict[str, Tuple[str, ...]]]]:
+    is_mac = platform.system() == "Darwin"
+    return [entry for entry in HARDWARE_ENCODERS if (entry[0] == "videotoolbox") == is_mac]
+
+
+def _parse_encoders(output: str) -> List[str]:
+    """Encoder names from `ffmpeg -encoders` (lines like ' V....D libx264  ...')."""
+    names = []
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] in "VAS" and parts[1] != "=":
+            names.append(parts[1])
+    return names
+
+
+def _parse_hwaccels(output: str) -> List[str]:
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    if lines and lines[0].lower().startswith("hardware acceleration"):
+        lines = lines[1:]
+    return lines
+
+
+class EncoderRegistry:
+    """
+    Encoder/decoder capabilities of the resolved ffmpeg, probed once.
+
+    Capabilities (usable hardware encoders and hwaccel decoders) are
+    persisted keyed by the binary's resolved path and mtime, so a new or
+    upgraded ffmpeg is re-probed and everything else reuses the stored
+    result. Listed hardware encoders are verified with a tiny test encode,
+    since builds routinely list NVENC/QSV on hosts without the device.
+    select() applies the encoder policy for a job.
+    """
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, cache_path: Optional[str] = None):
+        self._ffmpeg_path = ffmpeg_path
+        self.cache_path = cache_path or os.path.join(
+            os.path.expanduser("~"), ".video_downloader", "cache", "encoders.json"
+        )
+        self._capabilities: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self.probes = 0
+
+    @property
+    def ffmpeg_path(self) -> str:
+        if self._ffmpeg_path is None:
+            self._ffmpeg_path = get_ffmpeg_path()
+        return self._ffmpeg_path
+
+    def _binary_key(self) -> Optional[str]:
+        path = self.ffmpeg_path
+        resolved = path if os.path.dirname(path) else shutil.which(path)
+        if not resolved:
+            return None
+        try:
+            resolved = os.path.realpath(resolved)
+            return f"{resolved}:{os.stat(resolved).st_mtime_ns}"
+        except OSError:
+            return None
+
+    def capabilities(self) -> Dict:
+        """{"encoders": [...], "hwaccels": [...]} for the current ffmpeg binary."""
+        with self._lock:
+            if self._capabilities is not None:
+                return self._capabilities
+            key = self._binary_key()
+            if key is None:
+                logger.info("FFmpeg not found; hardware encoding unavailable")
+                self._capabilities = {"encoders": [], "hwaccels": []}
+                return self._capabilities
+
+            stored = self._load()
+            capabilities = stored.get(key)
+            if capabilities is None:
+                capabilities = self._probe()
+                stored = {k: v for k, v in stored.items() if not k.startswith(key.rsplit(":", 1)[0] + ":")}
+                stored[key] = capabilities
+                self._save(stored)
+            self._capabilities = capabilities
+            logger.info("Hardware encoders available: %s", ", ".join(capabilities["encoders"]) or "none")
+            return capabilities
+
+    def _run(self, args: List[str]) -> Optional[subprocess.CompletedProcess]:
+        try:
+            return subprocess.run(
+                [self.ffmpeg_path, "-hide_banner"] + args,
+                capture_output=True, text=True, timeout=PROBE_TIMEOUT,
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug("FFmpeg capability probe failed: %s", e)
+            return None
+
+    def _probe(self) -> Dict:
+        self.probes += 1
+        result = self._run(["-encoders"])
+        listed = set(_parse_encoders(result.stdout)) if result else set()
+        result = self._run(["-hwaccels"])
+        hwaccels = _parse_hwaccels(result.stdout) if result else []
+
+        encoders = []
+        for _, encoder, _, _ in _hardware_candidates():
+            if encoder in listed and self._test_encode(encoder):
+                encoders.append(encoder)
+        return {"encoders": encoders, "hwaccels": hwaccels}
+
+    def _test_encode(self, encoder: str) -> bool:
+        result = self._run([
+            "-v", "error", "-f", "lavfi", "-i", _TEST_SOURCE,
+            "-frames:v", "1", "-c:v", encoder, "-pix_fmt", "yuv420p", "-f", "null", "-",
+        ])
+        ok = result is not None and result.returncode == 0
+        if not ok:
+            logger.info("%s is listed by ffmpeg but failed a test encode", encoder)
+        return ok
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, data: Dict):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning("Could not persist encoder capabilities: %s", e)
+
+    def available(self, job: str = "export") -> List[EncoderProfile]:
+        """Usable hardware profiles for a job, in preference order."""
+        usable = set(self.capabilities()["encoders"])
+        return [
+            EncoderProfile(name, encoder, job_args.get(job, job_args["export"]), True, sessions)
+            for name, encoder, sessions, job_args in _hardware_candidates()
+            if encoder in usable
+        ]
+
+    def select(self, job: str = "export", preference: Optional[str] = "auto") -> EncoderProfile:
+        """
+        Encoder profile for a job. preference is "auto" (best hardware
+        encoder, else the default CPU profile), "cpu", a CPU profile name
+        such as "x264-veryfast", or a hardware name such as "nvenc".
+        Unavailable hardware falls back to the CPU default.
+        """
+        preference = (preference or "auto").lower()
+        if preference == "cpu":
+            return DEFAULT_CPU_PROFILE
+        if preference in CPU_PROFILES:
+            return CPU_PROFILES[preference]
+
+        hardware = self.available(job)
+        if preference != "auto":
+            hardware = [profile for profile in hardware if preference in (profile.name, profile.encoder)]
+            if not hardware:
+                logger.warning("Encoder %s is not available; using %s", preference, DEFAULT_CPU_PROFILE.name)
+        return hardware[0] if hardware else DEFAULT_CPU_PROFILE
+
+    def clear(self):
+        """Forget the in-memory result (the next call re-reads the persisted one)."""
+        with self._lock:
+            self._capabilities = None
+
+
+# Global instance
+encoder_registry = EncoderRegistry()
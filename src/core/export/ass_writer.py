@@ -0,0 +1,234 @@
+import os
+import tempfile
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, Optional, Sequence, TextIO, Tuple
+from .segments import as_float
+
+# Burned-in font size for the player's default point size (24 -> 56)
+PLAYER_FONT_SCALE = 56 / 24
+# Normalized events kept between writes for incremental regeneration
+EVENT_CACHE_SIZE = 50000
+# Subtitle keys that shape an event (see AssSubtitleWriter._event)
+_EVENT_FIELDS = (
+    "start_time", "duration", "text_content",
+    "font_name", "font_size", "font_color", "bold", "alignment", "margin_v",
+)
+_MISSING = object()
+
+_STYLE_FORMAT = (
+    "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+    "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
+    "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding"
+)
+_EVENT_FORMAT = "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"
+
+
+def to_centiseconds(seconds) -> int:
+    """Seconds to integer centiseconds, rounded to nearest (truncation drifts)."""
+    return max(0, int(round(as_float(seconds, 0.0) * 100)))
+
+
+def format_ass_time(centiseconds: int) -> str:
+    """Integer centiseconds to ASS time H:MM:SS.CC."""
+    hours, rest = divmod(max(0, centiseconds), 360000)
+    minutes, rest = divmod(rest, 6000)
+    secs, cs = divmod(rest, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{cs:02d}"
+
+
+def ass_color(value: str, alpha: int = 0) -> str:
+    """'#RRGGBB' to ASS &HAABBGGRR (white if unparseable)."""
+    value = (value or "").lstrip("#")
+    try:
+        int(value, 16)
+    except ValueError:
+        value = ""
+    if len(value) != 6:
+        value = "FFFFFF"
+    red, green, blue = value[0:2], value[2:4], value[4:6]
+    return f"&H{alpha:02X}{blue}{green}{red}".upper()
+
+
+def escape_ass_text(text: str) -> str:
+    text = text.replace("\\", "/").replace("{", "\\{").replace("}", "\\}")
+    return text.replace("\n", "\\N")
+
+
+@dataclass(frozen=True)
+class AssStyle:
+    """One row of the [V4+ Styles] table. Defaults match the player preview."""
+    fontname: str = "Arial"
+    fontsize: int = 56
+    primary: str = "&H00FFFFFF"
+    outline_colour: str = "&H00000000"
+    back: str = "&H80000000"
+    bold: bool = True
+    outline: int = 3
+    shadow: int = 2
+    alignment: int = 2
+    margin_v: int = 40
+
+    @classmethod
+    def from_subtitle(cls, sub: Dict) -> "AssStyle":
+        """Per-line style from optional subtitle keys (font_name, font_size, font_color, ...)."""
+        overrides = {}
+        if sub.get("font_name"):
+            overrides["fontname"] = str(sub["font_name"]).replace(",", " ")
+        if sub.get("font_size"):
+            overrides["fontsize"] = max(1, round(as_float(sub["font_size"], 24.0) * PLAYER_FONT_SCALE))
+        if sub.get("font_color"):
+            overrides["primary"] = ass_color(sub["font_color"])
+        if "bold" in sub:
+            overrides["bold"] = bool(sub["bold"])
+        if "alignment" in sub:
+            overrides["alignment"] = int(sub["alignment"])
+        if "margin_v" in sub:
+            overrides["margin_v"] = int(sub["margin_v"])
+        return replace(cls(), **overrides)
+
+    def line(self, name: str) -> str:
+        bold = 1 if self.bold else 0
+        return (
+            f"Style: {name},{self.fontname},{self.fontsize},{self.primary},&H000000FF,"
+            f"{self.outline_colour},{self.back},{bold},0,0,0,100,100,0,0,1,{self.outline},"
+            f"{self.shadow},{self.alignment},20,20,{self.margin_v},1"
+        )
+
+
+# (start cs, end cs, style, escaped text)
+AssEvent = Tuple[int, int, AssStyle, str]
+
+
+class AssSubtitleWriter:
+    """
+    Writes ASS subtitle files for burn-in.
+
+    Events are normalized into integer-centisecond tuples, sorted (skipped
+    when the input is already in order, as timeline tracks are), merged
+    when an event repeats the previous one's text and style and touches or
+    overlaps it, and written to the file one Dialogue line at a time as
+    they are produced. Styles are deduplicated into a table ("Default",
+    "S1", ...), collected in a first pass since the table precedes the
+    events.
+
+    Normalized events are remembered between writes, keyed by the
+    subtitle fields that shape them, so regenerating a long track after a
+    few edits only normalizes the changed subtitles (counted in
+    `normalized`). Up to EVENT_CACHE_SIZE events are kept; past that only
+    those of the latest write are.
+    """
+
+    def __init__(self):
+        self._memo: Dict[Tuple, Optional[AssEvent]] = {}
+        self.normalized = 0
+
+    def _remembered(self, sub: Dict, memo: Dict[Tuple, Optional[AssEvent]]) -> Optional[AssEvent]:
+        """_event(sub) through memo (this write) and the events kept from earlier writes."""
+        key = tuple(sub.get(name, _MISSING) for name in _EVENT_FIELDS)
+        try:
+            return memo[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # An unhashable field value: nothing to remember it by
+            return self._event(sub)
+        event = self._memo.get(key, _MISSING)
+        if event is _MISSING:
+            event = self._event(sub)
+            self.normalized += 1
+        memo[key] = event
+        return event
+
+    @staticmethod
+    def _event(sub: Dict) -> Optional[AssEvent]:
+        text = (sub.get("text_content") or "").strip()
+        if not text:
+            return None
+        start = to_centiseconds(sub.get("start_time", 0))
+        end = to_centiseconds(as_float(sub.get("start_time", 0), 0.0) + as_float(sub.get("duration", 2), 2.0))
+        return start, max(end, start + 1), AssStyle.from_subtitle(sub), escape_ass_text(text)
+
+    def events(self, subtitles: Sequence[Dict],
+               memo: Optional[Dict[Tuple, Optional[AssEvent]]] = None) -> Iterator[AssEvent]:
+        """Sorted, merged events for subtitle dicts (start_time, duration, text_content)."""
+        memo = {} if memo is None else memo
+        previous = -1
+        in_order = True
+        for sub in subtitles:
+            event = self._remembered(sub, memo)
+            if event is None:
+                continue
+            if event[0] < previous:
+                in_order = False
+                break
+            previous = event[0]
+        events = (event for event in (self._remembered(sub, memo) for sub in subtitles) if event is not None)
+        if not in_order:
+            events = iter(sorted(events, key=lambda event: (event[0], event[1])))
+        return self._merge(events)
+
+    @staticmethod
+    def _merge(events: Iterable[AssEvent]) -> Iterator[AssEvent]:
+        current = None
+        for event in events:
+            if current and event[2] == current[2] and event[3] == current[3] and event[0] <= current[1]:
+                current = (current[0], max(current[1], event[1]), current[2], current[3])
+                continue
+            if current:
+                yield current
+            current = event
+        if current:
+            yield current
+
+    def write(self, f: TextIO, subtitles: Iterable[Dict], video_width: int, video_height: int) -> int:
+        """Write a complete ASS document to f. Returns the number of events written."""
+        if not isinstance(subtitles, Sequence):
+            subtitles = list(subtitles)
+        memo: Dict[Tuple, Optional[AssEvent]] = {}
+        styles: Dict[AssStyle, str] = {AssStyle(): "Default"}
+        for sub in subtitles:
+            event = self._remembered(sub, memo)
+            if event is not None and event[2] not in styles:
+                styles[event[2]] = f"S{len(styles)}"
+
+        f.write(
+            "[Script Info]\n"
+            "ScriptType: v4.00+\n"
+            f"PlayResX: {video_width}\n"
+            f"PlayResY: {video_height}\n"
+            "WrapStyle: 0\n"
+            "\n[V4+ Styles]\n"
+            f"{_STYLE_FORMAT}\n"
+        )
+        f.writelines(f"{style.line(name)}\n" for style, name in styles.items())
+        f.write(f"\n[Events]\n{_EVENT_FORMAT}\n")
+        count = 0
+        for start, end, style, text in self.events(subtitles, memo):
+            f.write(f"Dialogue: 0,{format_ass_time(start)},{format_ass_time(end)},{styles[style]},,0,0,0,,{text}\n")
+            count += 1
+        if len(self._memo) + len(memo) <= EVENT_CACHE_SIZE:
+            memo = {**self._memo, **memo}
+        self._memo = memo
+        return count
+
+    def write_file(self, subtitles: Iterable[Dict], video_width: int, video_height: int,
+                   path: Optional[str] = None) -> Optional[str]:
+        """
+        Write to path (or a new temp .ass file). Returns the path, or None
+        when there is nothing to burn in.
+        """
+        if path is None:
+            ass_fd, path = tempfile.mkstemp(suffix=".ass", prefix="subtitles_", text=True)
+            f = os.fdopen(ass_fd, "w", encoding="utf-8")
+        else:
+            f = open(path, "w", encoding="utf-8")
+        with f:
+            count = self.write(f, subtitles, video_width, video_height)
+        if count == 0:
+            os.remove(path)
+            return None
+        return path
+
+
+# Global instance
+ass_writer = AssSubtitleWriter()
@@ -0,0 +1,149 @@
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+_TIME_RE = re.compile(r"^(\d+):(\d{2}):(\d{2}(?:\.\d+)?)$")
+
+
+def parse_ffmpeg_time(value: str) -> Optional[float]:
+    """Parse an ffmpeg HH:MM:SS.micro timestamp into seconds."""
+    match = _TIME_RE.match((value or "").strip())
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def _parse_number(value: str, suffix: str = "") -> Optional[float]:
+    value = (value or "").strip()
+    if suffix and value.endswith(suffix):
+        value = value[: -len(suffix)]
+    try:
+        return float(value)
+    except ValueError:
+        # "N/A" while ffmpeg is still warming up
+        return None
+
+
+class FFmpegProgressParser:
+    """
+    Incremental parser for ffmpeg's `-progress` key=value stream.
+
+    Lines are fed one at a time; every `progress=continue|end` line closes
+    a block and feed() returns a stats snapshot for it. Percent and ETA
+    are computed against the expected output duration when it is known.
+    """
+
+    def __init__(self, total_duration: float = 0.0, clock=time.monotonic):
+        self.total_duration = max(0.0, float(total_duration or 0.0))
+        self._clock = clock
+        self._started = clock()
+        self._block: Dict[str, str] = {}
+        self.last_stats: Optional[Dict] = None
+
+    def feed(self, line: str) -> Optional[Dict]:
+        line = line.strip()
+        if not line or "=" not in line:
+            return None
+        key, value = line.split("=", 1)
+        key, value = key.strip(), value.strip()
+        if key != "progress":
+            self._block[key] = value
+            return None
+
+        block, self._block = self._block, {}
+        self.last_stats = self._build_stats(block, finished=(value == "end"))
+        return self.last_stats
+
+    def _out_time(self, block: Dict[str, str]) -> Optional[float]:
+        # out_time_us is authoritative; out_time_ms is also microseconds in ffmpeg
+        for key in ("out_time_us", "out_time_ms"):
+            micros = _parse_number(block.get(key, ""))
+            if micros is not None and micros >= 0:
+                return micros / 1_000_000
+        return parse_ffmpeg_time(block.get("out_time", ""))
+
+    def _build_stats(self, block: Dict[str, str], finished: bool) -> Dict:
+        elapsed = max(0.0, self._clock() - self._started)
+        out_time = self._out_time(block)
+        if out_time is None and self.last_stats:
+            out_time = self.last_stats["out_time"]
+        out_time = out_time or 0.0
+
+        speed = _parse_number(block.get("speed", ""), "x")
+        if not speed and out_time > 0 and elapsed > 0:
+            speed = out_time / elapsed
+
+        percent = None
+        eta = None
+        if finished:
+            percent = 100.0
+            eta = 0.0
+        elif self.total_duration > 0:
+            percent = min(99.9, 100.0 * out_time / self.total_duration)
+            remaining = max(0.0, self.total_duration - out_time)
+            if speed:
+                eta = remaining / speed
+
+        frame = _parse_number(block.get("frame", ""))
+        return {
+            "frame": int(frame) if frame is not None else None,
+            "fps": _parse_number(block.get("fps", "")),
+            "bitrate_kbps": _parse_number(block.get("bitrate", ""), "kbits/s"),
+            "total_size": _parse_number(block.get("total_size", "")),
+            "out_time": out_time,
+            "total_duration": self.total_duration,
+            "speed": speed,
+            "percent": percent,
+            "eta_seconds": eta,
+            "elapsed_seconds": elapsed,
+            "finished": finished,
+        }
+
+
+class ProgressAggregator:
+    """
+    Combine progress from several concurrent ffmpeg jobs into one snapshot.
+    Throughput (fps, speed) is summed across jobs; percent and ETA use the
+    summed encoded time against the overall expected duration.
+    """
+
+    def __init__(self, total_duration: float, clock=time.monotonic):
+        self.total_duration = max(0.0, float(total_duration or 0.0))
+        self._clock = clock
+        self._started = clock()
+        self._jobs: Dict[object, Dict] = {}
+        self._lock = threading.Lock()
+
+    def update(self, job_id, stats: Dict) -> Dict:
+        with self._lock:
+            self._jobs[job_id] = stats
+            jobs = list(self._jobs.values())
+        active = [s for s in jobs if not s.get("finished")]
+        out_time = sum(s.get("out_time") or 0.0 for s in jobs)
+        fps = sum(s.get("fps") or 0.0 for s in active) or None
+        speed = sum(s.get("speed") or 0.0 for s in active) or None
+
+        percent = None
+        eta = None
+        if self.total_duration > 0:
+            out_time = min(out_time, self.total_duration)
+            percent = min(99.9, 100.0 * out_time / self.total_duration)
+            if speed:
+                eta = (self.total_duration - out_time) / speed
+        return {
+            "frame": sum(s.get("frame") or 0 for s in jobs),
+            "fps": fps,
+            "bitrate_kbps": None,
+            "total_size": sum(s.get("total_size") or 0.0 for s in jobs),
+            "out_time": out_time,
+            "total_duration": self.total_duration,
+            "speed": speed,
+            "percent": percent,
+            "eta_seconds": eta,
+            "elapsed_seconds": max(0.0, self._clock() - self._started),
+            "finished": False,
+            "jobs": len(jobs),
+            "active_jobs": len(active),
+        }
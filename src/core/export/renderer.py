@@ -1,50 +1,106 @@
 import subprocess
 import os
-import sys
+import shutil
 import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
 from typing import List, Dict, Optional, Tuple
 from PyQt6.QtCore import QObject, pyqtSignal
+from ..encoders import DEFAULT_CPU_PROFILE, EncoderProfile, encoder_registry
 from ..logging_utils import get_logger
+from ..media_probe import ffprobe_path_for, get_ffmpeg_path, media_probe_cache
+from ..render_supervisor import RenderCancelled, render_supervisor
+from .ass_writer import ass_writer, format_ass_time, to_centiseconds
+from .progress import FFmpegProgressParser, ProgressAggregator
+from .segment_cache import segment_cache, segment_key
+from .segments import (
+    SegmentPiece,
+    TimelineSegment,
+    as_float,
+    clip_range,
+    plan_segments,
+    plan_stable_segments,
+    subtitles_in_range,
+    write_concat_file,
+)
+from .smart_render import RenderUnit, SmartRenderPlanner, x264_stream_args
+from .sticker_raster import StickerLayer, layers_in_range, sticker_raster_cache
 
 logger = get_logger(__name__)
 
 
-def get_ffmpeg_path() -> str:
-    """Get path to FFmpeg binary - bundled or system."""
-    # Check for bundled FFmpeg first
-    if getattr(sys, 'frozen', False):
-        # Running as PyInstaller bundle
-        base_path = sys._MEIPASS
-    else:
-        # Running as script
-        base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-    
-    # Check bundled locations
-    bundled_paths = [
-        os.path.join(base_path, 'bin', 'ffmpeg'),
-        os.path.join(base_path, 'bin', 'ffmpeg.exe'),
-        os.path.join(base_path, 'ffmpeg'),
-        os.path.join(base_path, 'ffmpeg.exe'),
-    ]
-    
-    for path in bundled_paths:
-        if os.path.exists(path):
-            logger.info("Using bundled FFmpeg: %s", path)
-            return path
-    
-    # Fall back to system FFmpeg
-    logger.info("Using system FFmpeg")
-    return "ffmpeg"
+@dataclass
+class RenderContext:
+    """Everything about an export that is decided once, before any ffmpeg runs."""
+    pieces: List[SegmentPiece]
+    width: int
+    height: int
+    size_arg: Optional[str]  # "-s" value, None to keep source size
+    fps_arg: Optional[str]  # "-r" value, None to keep source rate
+    speed: float
+    first_path: str
+    sticker_layers: List[StickerLayer] = field(default_factory=list)
+    subtitles: List[Dict] = field(default_factory=list)
+    audio_files: List[str] = field(default_factory=list)
+    piece_audio: List[bool] = field(default_factory=list)  # per piece: source has an audio stream
+    temp_files: List[str] = field(default_factory=list)
+    encoder: EncoderProfile = DEFAULT_CPU_PROFILE
+    pending_segments: List[Tuple[str, str]] = field(default_factory=list)  # (part path, cache key) to store
+    reused_duration: float = 0.0  # concat seconds served from the segment cache
+
+    @property
+    def has_source_audio(self) -> bool:
+        return any(self.piece_audio)
+
+    @property
+    def mixed_source_audio(self) -> bool:
+        """Some clips have audio and some don't, so [0:a] of the concat is unusable."""
+        return self.has_source_audio and not all(self.piece_audio)
+
+    @property
+    def wants_speed(self) -> bool:
+        return abs(self.speed - 1.0) > 1e-6
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self.audio_files) or self.has_source_audio
+
+
+@dataclass
+class ExportVariant:
+    """One output of a batch render, resolved against the shared timeline."""
+    output_path: str
+    width: int
+    height: int
+    size_arg: Optional[str]  # scale target, None to keep the source size
+    fps_arg: Optional[str]
+    subtitles: List[Dict]
+    encoder: EncoderProfile
+    sticker_layers: List[StickerLayer] = field(default_factory=list)
 
 
 class RenderEngine(QObject):
     progress_updated = pyqtSignal(int) # 0-100
+    render_stats = pyqtSignal(dict) # out_time, fps, speed, bitrate_kbps, eta_seconds, ...
     render_finished = pyqtSignal(bool, str) # Success, Message
 
+    STDERR_TAIL_LINES = 50
+    # Chunked (segment-parallel) export
+    CHUNKED_MIN_DURATION = 120.0  # seconds of output before auto mode splits
+    MIN_CHUNK_SECONDS = 10.0
+    THREADS_PER_CHUNK_WORKER = 4
+    # Segment length when encoded segments are cached for re-exports
+    SEGMENT_CACHE_SECONDS = 20.0
+
     def __init__(self):
         super().__init__()
         self.output_path = ""
         self.ffmpeg_path = get_ffmpeg_path()
+        self.segment_cache = segment_cache
+        self.supervisor = render_supervisor
+        self._job_id: Optional[str] = None
         self.settings = {
             "resolution": "1920x1080",
             "fps": 30,
@@ -60,8 +116,93 @@ class RenderEngine(QObject):
         stickers: List of sticker data to overlay (content, x, y, scale, rotation)
         subtitles: List of subtitle clips (start_time, duration, text_content)
         audio_tracks: List of audio clips to mix (path, start_time, duration)
+
+        settings["parallel_export"] selects chunked rendering: True forces it,
+        False disables it, unset picks it for long timelines on multi-core hosts.
+        settings["smart_render"] (default off) stream-copies clips that need no
+        pixel changes and whose H.264 stream the encoder can match, and only
+        re-encodes the rest.
+        settings["segment_cache"] (default off) keeps the segments of chunked
+        and smart renders on disk so re-exports only re-encode segments whose
+        sources, edits, subtitles, stickers or encoder settings changed. It
+        does not turn chunking on by itself.
+        settings["encoder"] picks the video encoder: "cpu" (default, libx264
+        preset fast at CRF 23), "auto" (hardware when available), or a profile
+        name such as "x264-veryfast" or "nvenc".
+        settings["threads"] caps encoder threads and settings["timeout"]
+        (seconds) cancels a render that runs too long.
         """
         self.output_path = output_path
+        self._set_render_inputs(settings, stickers, subtitles, audio_tracks)
+        logger.info("Starting render to %s with settings %s", output_path, self.settings)
+
+        if not timeline_clips:
+            self.render_finished.emit(False, "No clips to render.")
+            return
+
+        total_duration = self._estimate_output_duration(timeline_clips)
+        self._start_render_thread(
+            f"export {os.path.basename(output_path)}", self._render_planned,
+            (timeline_clips, output_path, total_duration),
+        )
+
+    def _render_planned(self, timeline_clips: List[Dict], output_path: str, total_duration: float):
+        """
+        Prepare the render, pick the smart, chunked or single-process path
+        and run it. Runs on the render thread, since preparing and planning
+        may probe every source and the hardware encoders.
+        """
+        ctx = None
+        try:
+            ctx = self._prepare_render(timeline_clips, output_path)
+            units = self._plan_smart_render(ctx)
+            segments = None if units else self._plan_chunks(ctx, total_duration)
+        except Exception as e:
+            if ctx is not None:
+                self._remove_files(ctx.temp_files)
+            self.render_finished.emit(False, f"Failed to build FFmpeg command: {e}")
+            return
+
+        if units:
+            self._render_smart(ctx, units, output_path, total_duration)
+        elif segments:
+            self._render_chunked(ctx, segments, output_path, total_duration)
+        else:
+            self._render_single(ctx, output_path, total_duration)
+
+    def _start_render_thread(self, label: str, target, args):
+        """Run a render under its own supervised job (cancel/pause/timeout)."""
+        job_id = self.supervisor.start_job(label, timeout=self.settings.get("timeout"))
+        self._job_id = job_id
+
+        def run():
+            try:
+                target(*args)
+            finally:
+                self.supervisor.finish_job(job_id)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def cancel_render(self) -> bool:
+        """Stop the running render's ffmpeg processes; render_finished reports the cancel."""
+        return self.supervisor.cancel(self._job_id)
+
+    def pause_render(self) -> bool:
+        return self.supervisor.pause(self._job_id)
+
+    def resume_render(self) -> bool:
+        return self.supervisor.resume(self._job_id)
+
+    def _thread_limit(self, encoder: EncoderProfile) -> int:
+        """Encoder threads one full-timeline ffmpeg run is accounted (and capped) at."""
+        if encoder.hardware:
+            return 2
+        if self.supervisor.threads_in_use:
+            # Another job is encoding: take a share rather than wait for the whole machine
+            return self.supervisor.shared_budget(self.settings.get("threads"))
+        return self.supervisor.thread_budget(self.settings.get("threads"))
+
+    def _set_render_inputs(self, settings: Dict, stickers: List[Dict], subtitles: List[Dict], audio_tracks: List[Dict]):
         # Playback rate is a preview-only UI concern; never bake it into export settings.
         safe_settings = dict(settings or {})
         safe_settings.pop("playback_rate", None)
@@ -70,8 +211,7 @@ class RenderEngine(QObject):
         self.stickers = stickers or []
         self.subtitles = subtitles or []
         self.audio_tracks = audio_tracks or []
-        
-        logger.info("Starting render to %s with settings %s", output_path, self.settings)
+
         if self.stickers:
             logger.info("Rendering %s stickers", len(self.stickers))
         if self.subtitles:
@@ -79,116 +219,624 @@ class RenderEngine(QObject):
         if self.audio_tracks:
             logger.info("Mixing %s audio tracks (TTS/voiceover)", len(self.audio_tracks))
 
+    # --- Single-process render -----------------------------------------
+
+    def _render_single(self, ctx: "RenderContext", output_path: str, total_duration: float):
+        concat_file = None
+        try:
+            cmd, concat_file = self._command_for_context(ctx, output_path)
+            parser = FFmpegProgressParser(total_duration)
+            last_percent = [-1]
+
+            def on_line(line):
+                stats = parser.feed(line)
+                if stats is not None:
+                    self._report_stats(stats, last_percent)
+
+            returncode, stderr_tail = self._run_ffmpeg(cmd, on_line, self._thread_limit(ctx.encoder))
+            if returncode == 0 and os.path.exists(output_path):
+                self.progress_updated.emit(100)
+                self.render_finished.emit(True, "Render completed successfully!")
+            else:
+                self.render_finished.emit(False, self._ffmpeg_error(stderr_tail))
+        except Exception as e:
+            logger.exception("Render failed")
+            self.render_finished.emit(False, f"Render failed: {e}")
+        finally:
+            self._remove_files([concat_file] + ctx.temp_files)
+
+    # --- Batch (variant) render ------------------------------------------
+
+    def render_variants(self, timeline_clips: List[Dict], variants: List[Dict], settings: Dict, stickers: List[Dict] = None, subtitles: List[Dict] = None, audio_tracks: List[Dict] = None):
+        """
+        Render one timeline to several outputs in a single ffmpeg run.
+        variants: List of output dicts (output_path, and optionally resolution,
+        fps, subtitles, encoder) overriding settings/subtitles per output.
+
+        Sources are decoded and filtered once; the video is split and each
+        branch scaled, subtitled and encoded for its output, so N variants
+        cost one decode instead of N. render_finished fires once for the batch.
+        """
+        self._set_render_inputs(settings, stickers, subtitles, audio_tracks)
         if not timeline_clips:
             self.render_finished.emit(False, "No clips to render.")
             return
+        if not variants:
+            self.render_finished.emit(False, "No export variants given.")
+            return
+        self.output_path = variants[0].get("output_path", "")
+        logger.info("Starting batch render of %s variants with settings %s", len(variants), self.settings)
+
+        total_duration = self._estimate_output_duration(timeline_clips)
+        self._start_render_thread(
+            f"batch export ({len(variants)} variants)", self._render_batch, (timeline_clips, variants, total_duration)
+        )
 
+    def _render_batch(self, timeline_clips: List[Dict], variants: List[Dict], total_duration: float):
+        """Prepare and run a batch render on the render thread (see _render_planned)."""
+        ctx = None
         try:
-            cmd, concat_file, temp_files = self._build_ffmpeg_command(timeline_clips, output_path)
+            ctx = self._prepare_render(timeline_clips, self.output_path)
+            resolved = [self._resolve_variant(ctx, variant) for variant in variants]
         except Exception as e:
+            if ctx is not None:
+                self._remove_files(ctx.temp_files)
             self.render_finished.emit(False, f"Failed to build FFmpeg command: {e}")
             return
+        self._render_variants(ctx, resolved, total_duration)
 
-        import threading
-        import time
+    def _resolve_variant(self, ctx: "RenderContext", variant: Dict) -> "ExportVariant":
+        output_path = variant.get("output_path")
+        if not output_path:
+            raise ValueError("Export variant without output_path")
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        width, height, size_arg = ctx.width, ctx.height, ctx.size_arg
+        if "resolution" in variant:
+            width, height, size_arg = self._resolve_geometry(variant["resolution"], ctx.first_path)
+        fps_arg = self._resolve_fps(variant["fps"]) if "fps" in variant else ctx.fps_arg
+        encoder = ctx.encoder
+        if variant.get("encoder"):
+            encoder = encoder_registry.select("export", variant["encoder"])
+        subs = variant.get("subtitles")
+        resolved = ExportVariant(
+            output_path=output_path,
+            width=width,
+            height=height,
+            size_arg=size_arg,
+            fps_arg=fps_arg,
+            subtitles=list(ctx.subtitles if subs is None else subs),
+            encoder=encoder,
+        )
 
-        def run_render():
+        # Sticker positions depend on the output frame
+        stickers_list = getattr(self, "stickers", [])
+        if (width, height) == (ctx.width, ctx.height):
+            resolved.sticker_layers = list(ctx.sticker_layers)
+        elif stickers_list:
             try:
-                # Start ffmpeg process
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                )
+                resolved.sticker_layers = sticker_raster_cache.build_layers(stickers_list, width, height)
+            except Exception as e:
+                logger.warning("Error creating sticker images: %s", e)
+        return resolved
 
-                # Simple progress simulation while ffmpeg runs
-                progress = 0
-                while True:
-                    if process.poll() is not None:
-                        break
-                    progress = min(progress + 2, 95)
-                    self.progress_updated.emit(progress)
-                    time.sleep(0.1)
-
-                stdout, stderr = process.communicate()
-                if process.returncode == 0 and os.path.exists(output_path):
-                    self.progress_updated.emit(100)
-                    self.render_finished.emit(True, "Render completed successfully!")
-                else:
-                    msg = "FFmpeg failed."
-                    if stderr:
-                        msg = f"FFmpeg error: {stderr.splitlines()[-1]}"
-                    self.render_finished.emit(False, msg)
-            finally:
-                try:
-                    if concat_file and os.path.exists(concat_file):
-                        os.remove(concat_file)
-                except Exception:
-                    pass
-                for temp_path in temp_files:
-                    try:
-                        if temp_path and os.path.exists(temp_path):
-                            os.remove(temp_path)
-                    except Exception:
-                        pass
-
-        threading.Thread(target=run_render, daemon=True).start()
+    def _render_variants(self, ctx: "RenderContext", variants: List["ExportVariant"], total_duration: float):
+        concat_file = None
+        try:
+            concat_file = write_concat_file(ctx.pieces)
+            cmd = self._compose_variant_command(ctx, concat_file, variants)
+            logger.debug("FFmpeg batch command: %s", " ".join(cmd))
+            parser = FFmpegProgressParser(total_duration)
+            last_percent = [-1]
 
-    def _build_ffmpeg_command(self, clips: List[Dict], output_path: str) -> Tuple[List[str], Optional[str], List[str]]:
+            def on_line(line):
+                stats = parser.feed(line)
+                if stats is not None:
+                    self._report_stats(stats, last_percent)
+
+            returncode, stderr_tail = self._run_ffmpeg(cmd, on_line, self._thread_limit(ctx.encoder))
+            missing = [v.output_path for v in variants if not os.path.exists(v.output_path)]
+            if returncode == 0 and not missing:
+                self.progress_updated.emit(100)
+                self.render_finished.emit(True, f"Rendered {len(variants)} variants successfully!")
+            else:
+                self.render_finished.emit(False, self._ffmpeg_error(stderr_tail))
+        except Exception as e:
+            logger.exception("Batch render failed")
+            self.render_finished.emit(False, f"Render failed: {e}")
+        finally:
+            self._remove_files([concat_file] + ctx.temp_files)
+
+    def _compose_variant_command(self, ctx: "RenderContext", concat_path: str, variants: List["ExportVariant"]) -> List[str]:
         """
-        Build a simple FFmpeg concat command from a list of clips.
-        Each clip dict must contain: path.
+        One ffmpeg command with an output per variant. The decoded, re-timed
+        timeline is split once; each branch gets its own scale, subtitle
+        burn-in and sticker overlays, then its own encoder and -r. The
+        audio graph is built once and split for every output.
         """
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        cmd = [self.ffmpeg_path, "-y", "-f", "concat", "-safe", "0", "-i", concat_path]
+        input_count = 1
+        variant_layers = []
+        for variant in variants:
+            indices = []
+            for layer in variant.sticker_layers:
+                cmd.extend(["-i", layer.path])
+                indices.append(input_count)
+                input_count += 1
+            variant_layers.append(indices)
+        audio_base_index = input_count
+        for audio_path in ctx.audio_files:
+            cmd.extend(["-i", audio_path])
+        input_count += len(ctx.audio_files)
 
-        def as_float(value, default: float = 0.0) -> float:
-            try:
-                return float(value)
-            except (TypeError, ValueError):
-                return default
+        filter_parts = []
+        source_audio_label = ""
+        if ctx.has_source_audio:
+            source_audio_label = "[0:a]"
+            if ctx.mixed_source_audio and all(p.length is not None for p in ctx.pieces):
+                source_audio_label = self._source_audio_graph(ctx, cmd, filter_parts, input_count)
 
-        ordered_clips = sorted(
-            clips,
-            key=lambda item: as_float(item.get("start", 0.0), 0.0),
+        # Decode once, then one branch per variant
+        branches = [f"[vb{i}]" for i in range(len(variants))]
+        filter_parts.append(f"[0:v]split={len(variants)}{''.join(branches)}")
+
+        video_labels = []
+        for i, variant in enumerate(variants):
+            chain = []
+            if variant.size_arg:
+                chain.append(f"scale={variant.width}:{variant.height}")
+            if variant.subtitles:
+                subtitle_file = self._create_ass_subtitle_file(variant.subtitles, variant.width, variant.height)
+                if subtitle_file:
+                    ctx.temp_files.append(subtitle_file)
+                    escaped_path = subtitle_file.replace("\\", "/").replace(":", "\\:").replace("'", "\\'")
+                    chain.append(f"subtitles='{escaped_path}'")
+            # Same order as a single render: subtitles before the speed change
+            if ctx.wants_speed:
+                chain.append(f"setpts=PTS/{ctx.speed:g}")
+            label = branches[i]
+            if chain:
+                filter_parts.append(f"{label}{','.join(chain)}[vs{i}]")
+                label = f"[vs{i}]"
+            for j, (layer, index) in enumerate(zip(variant.sticker_layers, variant_layers[i])):
+                overlay = f"overlay={layer.x}:{layer.y}"
+                enable = self._overlay_enable(layer, 0.0, ctx.speed)
+                if enable:
+                    overlay += f":enable='{enable}'"
+                out_label = f"[vo{i}_{j}]"
+                filter_parts.append(f"{label}[{index}:v]{overlay}{out_label}")
+                label = out_label
+            video_labels.append(label)
+
+        audio_labels = []
+        if ctx.has_audio:
+            audio_label = self._audio_mix_graph(ctx, filter_parts, source_audio_label, audio_base_index, len(ctx.audio_files))
+            if audio_label and len(variants) > 1:
+                audio_labels = [f"[ab{i}]" for i in range(len(variants))]
+                filter_parts.append(f"{audio_label}asplit={len(variants)}{''.join(audio_labels)}")
+            else:
+                audio_labels = [audio_label or "0:a?"] * len(variants)
+
+        cmd.extend(["-filter_complex", ";".join(filter_parts)])
+        for i, variant in enumerate(variants):
+            cmd.extend(["-map", video_labels[i]])
+            if audio_labels:
+                cmd.extend(["-map", audio_labels[i], "-c:a", "aac", "-b:a", "192k"])
+            else:
+                cmd.append("-an")
+            if variant.fps_arg:
+                cmd.extend(["-r", variant.fps_arg])
+            cmd.extend(variant.encoder.video_args(self.settings.get("threads")))
+            cmd.extend(["-pix_fmt", "yuv420p"])
+            if variant.output_path.lower().endswith((".mp4", ".mov", ".m4a")):
+                cmd.extend(["-movflags", "+faststart"])
+            cmd.append(variant.output_path)
+        return cmd
+
+    # --- Chunked render ------------------------------------------------
+
+    def _use_chunked_render(self, total_duration: float) -> bool:
+        mode = self.settings.get("parallel_export")
+        if mode is not None:
+            return bool(mode)
+        return total_duration >= self.CHUNKED_MIN_DURATION and (os.cpu_count() or 1) >= 4
+
+    def _chunk_worker_layout(self, segment_count: int, encoder: Optional[EncoderProfile] = None) -> Tuple[int, int]:
+        """
+        (parallel workers, encoder threads per worker) sized from CPU count,
+        or from the device's session limit for hardware encoders.
+        """
+        cpus = self.supervisor.capacity
+        if encoder is not None and encoder.hardware:
+            workers = max(1, min(segment_count, encoder.max_sessions or 1))
+            return workers, 1
+        workers = max(1, min(segment_count, cpus // self.THREADS_PER_CHUNK_WORKER or 1))
+        threads = max(1, cpus // workers)
+        return workers, threads
+
+    def _plan_chunks(self, ctx: "RenderContext", total_duration: float) -> Optional[List[TimelineSegment]]:
+        """Segments for a chunked render, or None to render in a single process."""
+        if not self._use_chunked_render(total_duration):
+            return None
+        # Split clips are cut on the output frame grid, in source seconds
+        frame_seconds = ctx.speed / self._chunk_fps(ctx)
+        if self._use_segment_cache():
+            # Fixed-size, content-defined cuts so unchanged segments keep their keys
+            target = max(self.MIN_CHUNK_SECONDS, self.SEGMENT_CACHE_SECONDS)
+            segments = plan_stable_segments(ctx.pieces, target, frame_seconds)
+            if not segments or len(segments) < 2:
+                return None
+            return segments
+        cpus = self.supervisor.capacity
+        max_workers = max(1, cpus // self.THREADS_PER_CHUNK_WORKER)
+        concat_duration = total_duration * ctx.speed
+        # Two chunks per worker smooths out uneven encode cost across the timeline
+        target = max(self.MIN_CHUNK_SECONDS, concat_duration / (max_workers * 2))
+        segments = plan_segments(ctx.pieces, target, frame_seconds)
+        if not segments or len(segments) < 2:
+            return None
+        return segments
+
+    def _build_chunked_jobs(self, ctx: "RenderContext", segments: List[TimelineSegment], output_path: str, work_dir: str):
+        """
+        Commands for a chunked render: one video-only encode per segment,
+        one audio render for the whole timeline, and a stream-copy join.
+        Groups of whole clips go through a concat list like a single-process
+        render. Parts of a split clip seek into the source instead and stop
+        after their exact frame count at a fixed rate, so the seams neither
+        repeat nor drop frames. Returns (chunk_jobs, audio_job, join_cmd);
+        jobs are (cmd, output) pairs.
+        """
+        _, threads = self._chunk_worker_layout(len(segments), ctx.encoder)
+        fps = self._chunk_fps(ctx)
+        split_ctx = replace(ctx, fps_arg=ctx.fps_arg or f"{fps:g}")
+        chunk_jobs = []
+        part_paths = []
+        for segment in segments:
+            ranges = [(piece.path, piece.in_point, piece.out_point) for piece in segment.pieces]
+            segment_ctx = split_ctx if segment.split else ctx
+            key = self._segment_key(segment_ctx, ranges, segment.start, segment.end, ".mp4", seek=segment.split)
+            cached_path = self.segment_cache.get(key, ".mp4")
+            if cached_path:
+                part_paths.append(cached_path)
+                ctx.reused_duration += segment.duration
+                continue
+
+            concat_path = None
+            input_args = None
+            video_args = ctx.encoder.thread_args(threads)
+            if segment.split:
+                piece = segment.pieces[0]
+                input_args = ["-ss", f"{piece.in_point:.6f}", "-t", f"{piece.length:.6f}", "-i", piece.path]
+                frames = max(1, round(segment.duration / ctx.speed * fps))
+                video_args = video_args + ["-frames:v", str(frames)]
+            else:
+                concat_path = write_concat_file(segment.pieces, work_dir)
+            subtitle_file = None
+            local_subs = subtitles_in_range(ctx.subtitles, segment.start, segment.end)
+            if local_subs:
+                subtitle_file = self._create_ass_subtitle_file(local_subs, ctx.width, ctx.height)
+                if subtitle_file:
+                    ctx.temp_files.append(subtitle_file)
+            chunk_path = os.path.join(work_dir, f"chunk_{segment.index:04d}.mp4")
+            cmd = self._compose_command(
+                segment_ctx, concat_path, chunk_path, subtitle_file,
+                audio=False, extra_video_args=video_args, input_args=input_args,
+                time_range=(segment.start, segment.end),
+            )
+            chunk_jobs.append((cmd, chunk_path))
+            part_paths.append(chunk_path)
+            if key:
+                ctx.pending_segments.append((chunk_path, key))
+
+        audio_job = self._audio_job(ctx, work_dir)
+        join_cmd = self._join_command(part_paths, audio_job, output_path, work_dir)
+        return chunk_jobs, audio_job, join_cmd
+
+    def _render_chunked(self, ctx: "RenderContext", segments: List[TimelineSegment], output_path: str, total_duration: float):
+        work_dir = tempfile.mkdtemp(prefix="export_chunks_")
+        try:
+            chunk_jobs, audio_job, join_cmd = self._build_chunked_jobs(ctx, segments, output_path, work_dir)
+            self._run_parallel_render(ctx, chunk_jobs, audio_job, join_cmd, output_path, total_duration)
+        except Exception as e:
+            logger.exception("Chunked render failed")
+            self.render_finished.emit(False, f"Render failed: {e}")
+        finally:
+            self._remove_files(ctx.temp_files)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    # --- Smart render ----------------------------------------------------
+
+    @property
+    def ffprobe_path(self) -> str:
+        return ffprobe_path_for(self.ffmpeg_path)
+
+    def _plan_smart_render(self, ctx: "RenderContext") -> Optional[List[RenderUnit]]:
+        """Copy/encode units for a smart render, or None to encode everything."""
+        if not self.settings.get("smart_render", False):
+            return None
+        ffprobe = self.ffprobe_path
+        planner = SmartRenderPlanner(
+            probe=lambda path: media_probe_cache.get(path, ffprobe),
+            keyframes=lambda path, start, end: media_probe_cache.keyframes(path, start, end, ffprobe),
         )
+        return planner.plan(ctx)
 
-        # Create concat list file with per-clip trim directives.
-        concat_fd, concat_path = tempfile.mkstemp(suffix=".txt", prefix="concat_", text=True)
-        written_count = 0
-        with os.fdopen(concat_fd, "w") as f:
-            for clip in ordered_clips:
-                path = clip.get("path")
-                if not path:
-                    continue
-                if not os.path.exists(path):
-                    logger.warning("Skipping missing clip path: %s", path)
+    def _build_smart_jobs(self, ctx: "RenderContext", units: List[RenderUnit], output_path: str, work_dir: str):
+        """
+        Commands for a smart render: stream copies for untouched GOP ranges,
+        encodes (at the copied streams' size, rate, profile and level) for
+        everything else, one audio render and a stream-copy join. Parts are
+        MPEG-TS so each carries its own parameter sets across the join.
+        """
+        _, threads = self._chunk_worker_layout(len(units), ctx.encoder)
+        copied = next(unit for unit in units if unit.kind == "copy")
+        copied_video = (media_probe_cache.get(copied.path, self.ffprobe_path) or {}).get("video")
+        video_args = ctx.encoder.thread_args(threads) + x264_stream_args(copied_video)
+        # Encoded parts must match the copied streams exactly
+        encode_ctx = replace(
+            ctx,
+            size_arg=f"{ctx.width}x{ctx.height}",
+            fps_arg=ctx.fps_arg or f"{self._source_fps(ctx):g}",
+        )
+        unit_jobs = []
+        part_paths = []
+        for i, unit in enumerate(units):
+            part_path = os.path.join(work_dir, f"part_{i:04d}.ts")
+            input_args = ["-ss", f"{unit.in_point:.6f}", "-t", f"{unit.duration:.6f}", "-i", unit.path]
+            if unit.kind == "copy":
+                cmd = [self.ffmpeg_path, "-y"] + input_args + ["-map", "0:v:0", "-c", "copy", "-an", part_path]
+            else:
+                key = self._segment_key(
+                    encode_ctx, [(unit.path, unit.in_point, unit.out_point)], unit.start, unit.end, ".ts", seek=True
+                )
+                cached_path = self.segment_cache.get(key, ".ts")
+                if cached_path:
+                    part_paths.append(cached_path)
+                    ctx.reused_duration += unit.duration
                     continue
+                if key:
+                    ctx.pending_segments.append((part_path, key))
+                subtitle_file = None
+                local_subs = subtitles_in_range(ctx.subtitles, unit.start, unit.end)
+                if local_subs:
+                    subtitle_file = self._create_ass_subtitle_file(local_subs, ctx.width, ctx.height)
+                    if subtitle_file:
+                        ctx.temp_files.append(subtitle_file)
+                cmd = self._compose_command(
+                    encode_ctx, None, part_path, subtitle_file,
+                    audio=False, extra_video_args=video_args, input_args=input_args,
+                    time_range=(unit.start, unit.end),
+                )
+            unit_jobs.append((cmd, part_path))
+            part_paths.append(part_path)
+
+        audio_job = self._audio_job(ctx, work_dir)
+        join_cmd = self._join_command(part_paths, audio_job, output_path, work_dir)
+        return unit_jobs, audio_job, join_cmd
+
+    def _use_segment_cache(self) -> bool:
+        return bool(self.settings.get("segment_cache", False))
+
+    def _segment_key(
+        self,
+        ctx: "RenderContext",
+        ranges: List[Tuple[str, float, Optional[float]]],
+        start: float,
+        end: float,
+        ext: str,
+        seek: bool = False,
+    ) -> Optional[str]:
+        """
+        Cache key of a video part covering timeline [start, end), or None when
+        caching is off. seek marks parts read by seeking into the source.
+        """
+        if not self._use_segment_cache():
+            return None
+        # Sticker windows clamped to the part, so only what is visible in it counts
+        stickers = [
+            (
+                layer.path, layer.x, layer.y,
+                max(0.0, layer.start - start),
+                None if layer.end is None or layer.end >= end else layer.end - start,
+            )
+            for layer in layers_in_range(ctx.sticker_layers, start, end)
+        ]
+        return segment_key(ranges, {
+            "size": ctx.size_arg,
+            "fps": ctx.fps_arg,
+            "frame": (ctx.width, ctx.height),
+            "speed": round(ctx.speed, 6),
+            "subtitles": subtitles_in_range(ctx.subtitles, start, end),
+            "stickers": stickers,
+            "encoder": [ctx.encoder.encoder, *ctx.encoder.args],
+            "container": ext,
+            "input": "seek" if seek else "concat",
+        })
+
+    def _source_fps(self, ctx: "RenderContext") -> float:
+        video = media_probe_cache.video_info(ctx.first_path, self.ffprobe_path) or {}
+        return video.get("fps") or 30.0
+
+    def _chunk_fps(self, ctx: "RenderContext") -> float:
+        """Output frame rate of a chunked render: the export rate, else the source's."""
+        if ctx.fps_arg:
+            try:
+                return float(ctx.fps_arg)
+            except ValueError:
+                pass
+        return self._source_fps(ctx)
+
+    def _render_smart(self, ctx: "RenderContext", units: List[RenderUnit], output_path: str, total_duration: float):
+        work_dir = tempfile.mkdtemp(prefix="export_smart_")
+        try:
+            unit_jobs, audio_job, join_cmd = self._build_smart_jobs(ctx, units, output_path, work_dir)
+            self._run_parallel_render(ctx, unit_jobs, audio_job, join_cmd, output_path, total_duration)
+        except Exception as e:
+            logger.exception("Smart render failed")
+            self.render_finished.emit(False, f"Render failed: {e}")
+        finally:
+            self._remove_files(ctx.temp_files)
+            shutil.rmtree(work_dir, ignore_errors=True)
 
-                in_point = max(0.0, as_float(clip.get("in_point", 0.0), 0.0))
-                duration = as_float(clip.get("duration", 0.0), 0.0)
-                out_point_raw = clip.get("out_point", None)
-                out_point = None
-                if out_point_raw not in (None, "", 0, 0.0):
-                    out_point = as_float(out_point_raw, 0.0)
-                elif duration > 0.0:
-                    out_point = in_point + duration
-
-                # FFmpeg concat demuxer format - escape single quotes
-                escaped_path = path.replace("'", "'\\''")
+    # --- Parallel job runner ---------------------------------------------
+
+    def _audio_job(self, ctx: "RenderContext", work_dir: str):
+        """Whole-timeline audio render (source, voiceover mix, tempo), or None without audio."""
+        if not ctx.has_audio:
+            return None
+        concat_path = write_concat_file(ctx.pieces, work_dir)
+        audio_path = os.path.join(work_dir, "audio.m4a")
+        return self._compose_command(ctx, concat_path, audio_path, video=False), audio_path
+
+    def _join_command(self, part_paths: List[str], audio_job, output_path: str, work_dir: str) -> List[str]:
+        """Stream-copy join of rendered video parts, muxing the shared audio render."""
+        list_path = os.path.join(work_dir, "parts.txt")
+        with open(list_path, "w") as f:
+            for part_path in part_paths:
+                escaped_path = part_path.replace("'", "'\\''")
                 f.write(f"file '{escaped_path}'\n")
-                if in_point > 0.0:
-                    f.write(f"inpoint {in_point:.6f}\n")
-                if out_point is not None and out_point > in_point:
-                    f.write(f"outpoint {out_point:.6f}\n")
-                written_count += 1
 
-        if written_count == 0:
-            raise ValueError("No valid clip files to render.")
+        join_cmd = [self.ffmpeg_path, "-y", "-f", "concat", "-safe", "0", "-i", list_path]
+        if audio_job:
+            join_cmd.extend(["-i", audio_job[1], "-map", "0:v", "-map", "1:a"])
+        else:
+            join_cmd.extend(["-map", "0:v"])
+        join_cmd.extend(["-c", "copy", "-movflags", "+faststart", output_path])
+        return join_cmd
+
+    def _run_parallel_render(
+        self,
+        ctx: "RenderContext",
+        video_jobs,
+        audio_job,
+        join_cmd: List[str],
+        output_path: str,
+        total_duration: float,
+    ):
+        """
+        Run video part jobs on a worker pool (plus the audio job alongside),
+        then join. Emits progress, stats and render_finished.
+        """
+        workers, threads = self._chunk_worker_layout(len(video_jobs), ctx.encoder)
+        logger.info("Parallel render: %s parts on %s workers x %s threads", len(video_jobs), workers, threads)
 
-        resolution = self.settings.get("resolution", "1920x1080")
-        fps_setting = self.settings.get("fps", 30)
+        aggregator = ProgressAggregator(total_duration)
+        last_percent = [-1]
+        if ctx.reused_duration:
+            logger.info("Segment cache: reusing %.1fs of encoded video", ctx.reused_duration)
+            aggregator.update("reused", {"out_time": ctx.reused_duration / ctx.speed, "finished": True})
+
+        def run_job(job_id, cmd):
+            parser = FFmpegProgressParser()
+
+            def on_line(line):
+                stats = parser.feed(line)
+                # Audio covers the whole timeline; only video parts count toward progress
+                if stats is not None and job_id != "audio":
+                    self._report_stats(aggregator.update(job_id, stats), last_percent)
+
+            job_threads = threads if job_id != "audio" and not ctx.encoder.hardware else 1
+            return self._run_ffmpeg(cmd, on_line, job_threads)
+
+        error = None
+        with ThreadPoolExecutor(max_workers=workers + (1 if audio_job else 0)) as pool:
+            futures = [pool.submit(run_job, i, cmd) for i, (cmd, _) in enumerate(video_jobs)]
+            if audio_job:
+                futures.append(pool.submit(run_job, "audio", audio_job[0]))
+            for future in as_completed(futures):
+                returncode, stderr_tail = future.result()
+                if returncode != 0:
+                    # The output is lost anyway: stop the other parts instead
+                    # of letting them encode to completion
+                    error = self._ffmpeg_error(stderr_tail)
+                    for other in futures:
+                        other.cancel()
+                    self.supervisor.cancel(self._job_id)
+                    break
+
+        if error is not None:
+            self.render_finished.emit(False, error)
+            return
+
+        returncode, stderr_tail = self._run_ffmpeg(join_cmd, lambda line: None)
+        if returncode == 0 and os.path.exists(output_path):
+            for part_path, key in ctx.pending_segments:
+                self.segment_cache.put(key, part_path)
+            self.progress_updated.emit(100)
+            self.render_finished.emit(True, "Render completed successfully!")
+        else:
+            self.render_finished.emit(False, self._ffmpeg_error(stderr_tail))
+
+    # --- ffmpeg process helpers ------------------------------------------
+
+    def _run_ffmpeg(self, cmd: List[str], on_progress_line, threads: int = 1) -> Tuple[int, deque]:
+        """
+        Run ffmpeg under the render's supervised job, passing each
+        machine-readable progress line to on_progress_line. threads is what
+        the process is accounted against the machine's encoder budget.
+        Returns (returncode, stderr tail).
+        """
+        # Machine-readable progress on stdout; stderr only carries logs
+        progress_cmd = [cmd[0], "-progress", "pipe:1", "-nostats"] + cmd[1:]
+        stderr_tail = deque(maxlen=self.STDERR_TAIL_LINES)
+        try:
+            with self.supervisor.process(
+                progress_cmd,
+                threads,
+                self._job_id,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors="replace",
+            ) as process:
+                # Drain stderr continuously so a chatty ffmpeg never blocks on a full pipe
+                stderr_thread = threading.Thread(
+                    target=self._drain_stream, args=(process.stderr, stderr_tail), daemon=True
+                )
+                stderr_thread.start()
+                for line in process.stdout:
+                    on_progress_line(line)
+                process.wait()
+                stderr_thread.join(timeout=5)
+        except RenderCancelled:
+            return -1, stderr_tail
+        return process.returncode, stderr_tail
+
+    def _report_stats(self, stats: Dict, last_percent: List[int]):
+        self.render_stats.emit(stats)
+        percent = stats["percent"]
+        if percent is not None and not stats["finished"]:
+            percent = int(percent)
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                self.progress_updated.emit(percent)
+
+    def _ffmpeg_error(self, stderr_tail) -> str:
+        if self.supervisor.is_cancelled(self._job_id):
+            return "Render cancelled."
+        if stderr_tail:
+            return f"FFmpeg error: {stderr_tail[-1]}"
+        return "FFmpeg failed."
+
+    @staticmethod
+    def _remove_files(paths):
+        for temp_path in paths:
+            try:
+                if temp_path and os.path.exists(temp_path):
+                    os.remove(temp_path)
+            except Exception:
+                pass
+
+    @staticmethod
+    def _drain_stream(stream, tail: deque):
+        """Read a pipe to EOF, keeping only the last non-empty lines."""
+        for line in stream:
+            line = line.rstrip()
+            if line:
+                tail.append(line)
+
+    def _export_speed(self) -> float:
         speed_setting = self.settings.get("speed", self.settings.get("export_speed", 1.0))
         try:
             speed = float(speed_setting)
@@ -196,339 +844,357 @@ class RenderEngine(QObject):
             speed = 1.0
         if speed <= 0:
             speed = 1.0
+        return speed
 
-        def get_source_resolution(video_path: str) -> Optional[Tuple[int, int]]:
-            try:
-                import cv2  # type: ignore
-            except Exception:
-                return None
+    def _estimate_output_duration(self, clips: List[Dict]) -> float:
+        """
+        Expected output length in seconds (trimmed clip lengths over export speed).
+        Clips without a known length contribute nothing, so progress is a lower bound.
+        """
+        total = 0.0
+        for clip in clips:
+            path = clip.get("path")
+            if not path or not os.path.exists(path):
+                continue
+            in_point, out_point = clip_range(clip)
+            if out_point is not None and out_point > in_point:
+                total += out_point - in_point
+        return total / self._export_speed()
 
-            cap = cv2.VideoCapture(video_path)
-            try:
-                if not cap.isOpened():
-                    return None
-                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
-                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
-                if width > 0 and height > 0:
-                    return width, height
-                return None
-            finally:
-                cap.release()
+    # --- Command building ------------------------------------------------
+
+    def _build_ffmpeg_command(self, clips: List[Dict], output_path: str) -> Tuple[List[str], Optional[str], List[str]]:
+        """
+        Build a simple FFmpeg concat command from a list of clips.
+        Each clip dict must contain: path.
+        """
+        ctx = self._prepare_render(clips, output_path)
+        cmd, concat_path = self._command_for_context(ctx, output_path)
+        return cmd, concat_path, ctx.temp_files
 
-        def source_has_audio(video_path: str) -> bool:
-            if not video_path:
-                return False
+    def _command_for_context(self, ctx: "RenderContext", output_path: str) -> Tuple[List[str], str]:
+        """Single-process command for the whole timeline. Returns (cmd, concat_path)."""
+        concat_path = write_concat_file(ctx.pieces)
+
+        subtitle_file = None
+        if ctx.subtitles:
             try:
-                probe = subprocess.run(
-                    [self.ffmpeg_path, "-hide_banner", "-i", video_path],
-                    capture_output=True,
-                    text=True,
-                )
-                stderr = (probe.stderr or "") + (probe.stdout or "")
-                return "Audio:" in stderr
-            except Exception:
-                return False
+                # Create ASS subtitle file
+                subtitle_file = self._create_ass_subtitle_file(ctx.subtitles, ctx.width, ctx.height)
+                if subtitle_file:
+                    ctx.temp_files.append(subtitle_file)
+                    logger.info("Created subtitle file: %s", subtitle_file)
+            except Exception as e:
+                logger.warning("Error creating subtitles: %s", e)
+
+        threads = self.settings.get("threads")
+        cmd = self._compose_command(
+            ctx, concat_path, output_path, subtitle_file,
+            extra_video_args=ctx.encoder.thread_args(threads) if threads else None,
+        )
+        logger.debug("FFmpeg command: %s", " ".join(cmd))
+        return cmd, concat_path
 
-        # Parse resolution for sticker/subtitle positioning. If "original", detect from first clip.
-        res_w, res_h = 1920, 1080
-        first_path = ""
+    def _prepare_render(self, clips: List[Dict], output_path: str) -> "RenderContext":
+        """
+        Resolve clip ranges, output geometry, stickers and audio inputs.
+        Raises ValueError when no clip file exists.
+        """
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        ordered_clips = sorted(
+            clips,
+            key=lambda item: as_float(item.get("start", 0.0), 0.0),
+        )
+
+        pieces = []
         for clip in ordered_clips:
-            p = clip.get("path")
-            if p and os.path.exists(p):
-                first_path = p
-                break
+            path = clip.get("path")
+            if not path:
+                continue
+            if not os.path.exists(path):
+                logger.warning("Skipping missing clip path: %s", path)
+                continue
+            in_point, out_point = clip_range(clip)
+            pieces.append(SegmentPiece(clip, in_point, out_point))
 
-        if isinstance(resolution, str) and resolution.lower() == "original":
-            detected = get_source_resolution(first_path) if first_path else None
-            if detected:
-                res_w, res_h = detected
-        else:
-            try:
-                res_w, res_h = map(int, str(resolution).split("x"))
-            except Exception:
-                res_w, res_h = 1920, 1080
+        if not pieces:
+            raise ValueError("No valid clip files to render.")
+
+        first_path = pieces[0].path
+        ffprobe = self.ffprobe_path
+        res_w, res_h, size_arg = self._resolve_geometry(self.settings.get("resolution", "1920x1080"), first_path)
+        fps_arg = self._resolve_fps(self.settings.get("fps", 30))
 
-        # Create sticker images and prepare overlay data
-        sticker_inputs = []  # Additional input files for stickers
-        sticker_overlays = []  # (abs_x, abs_y) per sticker input
-        temp_sticker_files = []
-        
+        ctx = RenderContext(
+            pieces=pieces,
+            width=res_w,
+            height=res_h,
+            size_arg=size_arg,
+            fps_arg=fps_arg,
+            speed=self._export_speed(),
+            first_path=first_path,
+            subtitles=list(getattr(self, "subtitles", []) or []),
+            encoder=encoder_registry.select("export", self.settings.get("encoder", "cpu")),
+        )
+        logger.info("Video encoder: %s (%s)", ctx.encoder.name, ctx.encoder.encoder)
+
+        # Rasterize stickers (cached by content) into time-windowed overlay layers
         stickers_list = getattr(self, "stickers", [])
         if stickers_list:
             try:
-                from PIL import Image, ImageDraw, ImageFont
-                import platform
-                
-                for idx, sticker in enumerate(stickers_list):
-                    content = sticker.get("content", "")
-                    if not content:
-                        continue
-                    
-                    # Position relative to center - convert to absolute coords
-                    x = sticker.get("x", 0)
-                    y = sticker.get("y", 0)
-                    scale = sticker.get("scale", 1.0)
-                    
-                    # Create PNG image with emoji
-                    img_size = int(200 * scale)
-                    img = Image.new("RGBA", (img_size, img_size), (0, 0, 0, 0))
-                    draw = ImageDraw.Draw(img)
-                    
-                    # Try to load emoji font
-                    font_size = int(100 * scale)
-                    try:
-                        if platform.system() == "Darwin":  # macOS
-                            font = ImageFont.truetype("/System/Library/Fonts/Apple Color Emoji.ttc", font_size)
-                        else:
-                            font = ImageFont.truetype("/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf", font_size)
-                    except:
-                        font = ImageFont.load_default()
-                    
-                    # Draw emoji centered
-                    draw.text((img_size//2, img_size//2), content, font=font, anchor="mm")
-                    
-                    # Save temporary PNG
-                    sticker_fd, sticker_path = tempfile.mkstemp(suffix=f"_sticker_{idx}.png", prefix="export_")
-                    os.close(sticker_fd)
-                    img.save(sticker_path, "PNG")
-                    temp_sticker_files.append(sticker_path)
-                    
-                    # Calculate absolute position
-                    abs_x = int(res_w / 2 + x - img_size / 2)
-                    abs_y = int(res_h / 2 + y - img_size / 2)
-                    
-                    # Add input and overlay data
-                    sticker_inputs.append(sticker_path)
-                    sticker_overlays.append((abs_x, abs_y))
-                        
+                ctx.sticker_layers = sticker_raster_cache.build_layers(stickers_list, res_w, res_h)
             except ImportError as e:
                 logger.warning("Pillow not available for sticker export: %s", e)
             except Exception as e:
                 logger.warning("Error creating sticker images: %s", e)
-        
-        # Store temp files for cleanup
-        temp_files = list(temp_sticker_files)
-
-        cmd = [
-            self.ffmpeg_path,
-            "-y",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            concat_path,
-        ]
 
-        # Add sticker image inputs
-        for sticker_path in sticker_inputs:
-            cmd.extend(["-i", sticker_path])
-        
+        # Build audio mixing if we have TTS/audio tracks
+        for audio in getattr(self, "audio_tracks", []) or []:
+            audio_path = audio.get("path", "")
+            if audio_path and os.path.exists(audio_path):
+                ctx.audio_files.append(audio_path)
+        if ctx.audio_files:
+            logger.info("Audio mix inputs: %s track(s)", len(ctx.audio_files))
+
+        # Every clip is checked: a silent clip mid-timeline must not shift later audio
+        ctx.piece_audio = [media_probe_cache.has_audio(piece.path, ffprobe) for piece in ctx.pieces]
+        return ctx
+
+    def _resolve_geometry(self, resolution, first_path: str) -> Tuple[int, int, Optional[str]]:
+        """
+        (width, height, "-s" value) for a resolution setting. "original"
+        keeps the first clip's size (no scaling) and reports it for
+        sticker/subtitle positioning.
+        """
+        if isinstance(resolution, str) and resolution.lower() == "original":
+            video = media_probe_cache.video_info(first_path, self.ffprobe_path)
+            if video and video["width"] > 0 and video["height"] > 0:
+                return video["width"], video["height"], None
+            return 1920, 1080, None
+        try:
+            res_w, res_h = map(int, str(resolution).split("x"))
+        except Exception:
+            res_w, res_h = 1920, 1080
+        return res_w, res_h, str(resolution)
+
+    @staticmethod
+    def _resolve_fps(fps_setting) -> Optional[str]:
+        """"-r" value for an fps setting, None for "original"."""
+        if isinstance(fps_setting, str) and fps_setting.lower() == "original":
+            return None
+        try:
+            fps_value = float(fps_setting)
+        except Exception:
+            return "30"
+        return str(fps_value) if fps_value > 0 else None
+
+    @staticmethod
+    def _overlay_enable(layer: StickerLayer, offset: float, speed: float) -> Optional[str]:
+        """
+        Timeline expression gating a layer's overlay in a part that starts at
+        offset (output time, so speed applies), or None if always visible.
+        """
+        start = max(0.0, layer.start - offset) / speed
+        if layer.end is None:
+            return f"gte(t,{start:.3f})" if start > 0.0 else None
+        end = max(0.0, layer.end - offset) / speed
+        return f"between(t,{start:.3f},{end:.3f})"
+
+    @staticmethod
+    def _source_audio_graph(ctx: "RenderContext", cmd: List[str], filter_parts: List[str], first_index: int) -> str:
+        """
+        Rebuild the source audio from per-clip inputs, padding clips without
+        an audio stream with silence so later clips stay in sync.
+        Appends inputs to cmd and filters to filter_parts; returns the label.
+        """
+        labels = []
+        input_index = first_index
+        for i, (piece, has_audio) in enumerate(zip(ctx.pieces, ctx.piece_audio)):
+            label = f"[sa{i}]"
+            if has_audio:
+                cmd.extend(["-ss", f"{piece.in_point:.6f}", "-t", f"{piece.length:.6f}", "-i", piece.path])
+                filter_parts.append(
+                    f"[{input_index}:a]aresample=48000,aformat=channel_layouts=stereo{label}"
+                )
+                input_index += 1
+            else:
+                filter_parts.append(
+                    f"anullsrc=r=48000:cl=stereo,atrim=duration={piece.length:.6f}{label}"
+                )
+            labels.append(label)
+        filter_parts.append(f"{''.join(labels)}concat=n={len(labels)}:v=0:a=1[srca]")
+        return "[srca]"
+
+    @staticmethod
+    def _audio_mix_graph(
+        ctx: "RenderContext",
+        filter_parts: List[str],
+        source_audio_label: str,
+        audio_base_index: int,
+        audio_count: int,
+    ) -> str:
+        """
+        Mix source audio with the voiceover inputs at audio_base_index and
+        apply export speed. Returns the output label, or "" to map [0:a]
+        as-is.
+        """
+        audio_base_label = ""
+        if audio_count:
+            mix_labels = []
+            if source_audio_label:
+                filter_parts.append(f"{source_audio_label}volume=0.5[orig]")
+                mix_labels.append("[orig]")
+            mix_labels.extend(f"[{audio_base_index + i}:a]" for i in range(audio_count))
+
+            if len(mix_labels) == 1:
+                filter_parts.append(f"{mix_labels[0]}anull[aout]")
+            else:
+                filter_parts.append(
+                    f"{''.join(mix_labels)}amix=inputs={len(mix_labels)}:duration=longest[aout]"
+                )
+            audio_base_label = "[aout]"
+        elif source_audio_label and (ctx.wants_speed or source_audio_label != "[0:a]"):
+            audio_base_label = source_audio_label
+
+        if ctx.wants_speed and audio_base_label:
+            filter_parts.append(f"{audio_base_label}atempo={ctx.speed:g}[aout_speed]")
+            return "[aout_speed]"
+        return audio_base_label
+
+    def _compose_command(
+        self,
+        ctx: "RenderContext",
+        concat_path: str,
+        output_path: str,
+        subtitle_file: Optional[str] = None,
+        video: bool = True,
+        audio: bool = True,
+        extra_video_args: Optional[List[str]] = None,
+        input_args: Optional[List[str]] = None,
+        time_range: Optional[Tuple[float, float]] = None,
+    ) -> List[str]:
+        """
+        Assemble an ffmpeg command over a concat list. video/audio select
+        which streams are produced, so the same graph serves full renders,
+        video-only chunks and the shared audio render. input_args replaces
+        the concat input (e.g. an accurately seeked single source).
+        time_range is the (start, end) timeline span the input covers, used
+        to pick and re-time sticker overlays; None means the whole timeline.
+        """
+        cmd = [self.ffmpeg_path, "-y"]
+        if input_args:
+            cmd.extend(input_args)
+        else:
+            cmd.extend(["-f", "concat", "-safe", "0", "-i", concat_path])
+
+        range_start, range_end = time_range or (0.0, None)
+        sticker_layers = layers_in_range(ctx.sticker_layers, range_start, range_end) if video else []
+        audio_input_files = ctx.audio_files if audio else []
+
+        # Add sticker layer inputs, then audio inputs
+        for layer in sticker_layers:
+            cmd.extend(["-i", layer.path])
+        for audio_path in audio_input_files:
+            cmd.extend(["-i", audio_path])
+
+        # Per-clip source audio inputs, only needed when some clips are silent
+        source_audio_label = ""
+        source_audio_filters = []
+        if audio and ctx.has_source_audio:
+            source_audio_label = "[0:a]"
+            if ctx.mixed_source_audio and all(p.length is not None for p in ctx.pieces):
+                first_index = 1 + len(sticker_layers) + len(audio_input_files)
+                source_audio_label = self._source_audio_graph(ctx, cmd, source_audio_filters, first_index)
+
         # Build video filter chain
         video_filters = []
-        
-        # Add subtitles filter if we have subtitles
-        subtitles_list = getattr(self, "subtitles", [])
-        subtitle_file = None
-        if subtitles_list:
-            try:
-                # Create ASS subtitle file
-                subtitle_file = self._create_ass_subtitle_file(subtitles_list, res_w, res_h)
-                if subtitle_file:
-                    # Escape path for FFmpeg filter
-                    escaped_path = subtitle_file.replace("\\", "/").replace(":", "\\:").replace("'", "\\'")
-                    video_filters.append(f"subtitles='{escaped_path}'")
-                    logger.info("Created subtitle file: %s", subtitle_file)
-            except Exception as e:
-                logger.warning("Error creating subtitles: %s", e)
-        if subtitle_file:
-            temp_files.append(subtitle_file)
+        if video:
+            if ctx.fps_arg:
+                cmd.extend(["-r", ctx.fps_arg])
+            if ctx.size_arg:
+                cmd.extend(["-s", ctx.size_arg])
 
-        # Export speed (video) - apply after subtitle burn-in so subtitle timing scales with speed.
-        if abs(speed - 1.0) > 1e-6:
-            video_filters.append(f"setpts=PTS/{speed:g}")
-        
-        # Build audio mixing if we have TTS/audio tracks
-        audio_tracks_list = getattr(self, "audio_tracks", [])
-        audio_inputs = []
-        audio_input_files = []
-        
-        if audio_tracks_list:
-            # Add each audio file as input
-            for audio in audio_tracks_list:
-                audio_path = audio.get("path", "")
-                if audio_path and os.path.exists(audio_path):
-                    audio_input_files.append(audio_path)
-                    audio_inputs.extend(["-i", audio_path])
-            
-            if audio_input_files:
-                logger.info("Audio mix inputs: %s track(s)", len(audio_input_files))
-
-        # Add audio inputs after sticker inputs
-        cmd.extend(audio_inputs)
-
-        if not (isinstance(fps_setting, str) and fps_setting.lower() == "original"):
-            try:
-                fps_value = float(fps_setting)
-                if fps_value > 0:
-                    cmd.extend(["-r", str(fps_value)])
-            except Exception:
-                cmd.extend(["-r", "30"])
-        if not (isinstance(resolution, str) and resolution.lower() == "original"):
-            cmd.extend(["-s", str(resolution)])
-        
-        # Build filter_complex if needed
-        needs_filter_complex = bool(video_filters or sticker_inputs or audio_input_files)
-        if needs_filter_complex:
-            filter_parts = []
-
-            # Video chain
-            video_map_label = "0:v"
+            # Add subtitles filter if we have subtitles
+            if subtitle_file:
+                # Escape path for FFmpeg filter
+                escaped_path = subtitle_file.replace("\\", "/").replace(":", "\\:").replace("'", "\\'")
+                video_filters.append(f"subtitles='{escaped_path}'")
+
+            # Export speed (video) - apply after subtitle burn-in so subtitle timing scales with speed.
+            if ctx.wants_speed:
+                video_filters.append(f"setpts=PTS/{ctx.speed:g}")
+
+        filter_parts = []
+
+        # Video chain
+        video_map_label = "0:v"
+        if video:
             video_graph_label = "[0:v]"
             if video_filters:
                 filter_parts.append(f"[0:v]{','.join(video_filters)}[v0]")
                 video_graph_label = "[v0]"
                 video_map_label = "[v0]"
 
-            if sticker_inputs:
+            if sticker_layers:
                 base_index = 1
                 prev_label = video_graph_label
-                for i, (abs_x, abs_y) in enumerate(sticker_overlays):
+                for i, layer in enumerate(sticker_layers):
                     sticker_label = f"[{base_index + i}:v]"
                     out_label = f"[v{i + 1}]"
-                    filter_parts.append(f"{prev_label}{sticker_label}overlay={abs_x}:{abs_y}{out_label}")
+                    overlay = f"overlay={layer.x}:{layer.y}"
+                    enable = self._overlay_enable(layer, range_start, ctx.speed)
+                    if enable:
+                        overlay += f":enable='{enable}'"
+                    filter_parts.append(f"{prev_label}{sticker_label}{overlay}{out_label}")
                     prev_label = out_label
-                video_graph_label = prev_label
                 video_map_label = prev_label
 
-            # Audio chain
-            audio_output_label = ""
-            has_source_audio = source_has_audio(first_path)
-            wants_audio_speed = abs(speed - 1.0) > 1e-6
-            audio_base_label = ""
-
-            if audio_input_files:
-                audio_base_index = 1 + len(sticker_inputs)
-                mix_labels = []
-                if has_source_audio:
-                    filter_parts.append("[0:a]volume=0.5[orig]")
-                    mix_labels.append("[orig]")
-                mix_labels.extend(
-                    f"[{audio_base_index + i}:a]" for i in range(len(audio_input_files))
-                )
-
-                if len(mix_labels) == 1:
-                    filter_parts.append(f"{mix_labels[0]}anull[aout]")
-                    audio_base_label = "[aout]"
-                else:
-                    filter_parts.append(
-                        f"{''.join(mix_labels)}amix=inputs={len(mix_labels)}:duration=longest[aout]"
-                    )
-                    audio_base_label = "[aout]"
-            elif wants_audio_speed and has_source_audio:
-                audio_base_label = "[0:a]"
-
-            if wants_audio_speed and audio_base_label:
-                filter_parts.append(f"{audio_base_label}atempo={speed:g}[aout_speed]")
-                audio_output_label = "[aout_speed]"
-            else:
-                audio_output_label = audio_base_label
+        # Audio chain
+        audio_output_label = ""
+        if audio:
+            filter_parts.extend(source_audio_filters)
+            audio_output_label = self._audio_mix_graph(
+                ctx, filter_parts, source_audio_label, 1 + len(sticker_layers), len(audio_input_files)
+            )
 
+        if filter_parts:
             cmd.extend(["-filter_complex", ";".join(filter_parts)])
 
-            # Map outputs
+        # Map outputs
+        if video:
             cmd.extend(["-map", video_map_label])
-            if audio_output_label:
-                cmd.extend(["-map", audio_output_label])
-            else:
-                cmd.extend(["-map", "0:a?"])
-
+        if audio:
+            cmd.extend(["-map", audio_output_label or "0:a?"])
             cmd.extend(["-c:a", "aac", "-b:a", "192k"])
         else:
-            cmd.extend(["-map", "0:v", "-map", "0:a?"])
-            cmd.extend(["-c:a", "aac", "-b:a", "192k"])
-        
-        cmd.extend([
-            "-c:v",
-            "libx264",
-            "-preset",
-            "fast",
-            "-crf",
-            "23",
-            "-pix_fmt",
-            "yuv420p",
-            "-movflags",
-            "+faststart",
-            output_path,
-        ])
-        
-        logger.debug("FFmpeg command: %s", " ".join(cmd))
+            cmd.append("-an")
+
+        if video:
+            cmd.extend(ctx.encoder.video_args())
+            cmd.extend(extra_video_args or [])
+            cmd.extend(["-pix_fmt", "yuv420p"])
+        else:
+            cmd.append("-vn")
 
-        return cmd, concat_path, temp_files
+        if output_path.lower().endswith((".mp4", ".mov", ".m4a")):
+            cmd.extend(["-movflags", "+faststart"])
+        cmd.append(output_path)
+        return cmd
 
     def _create_ass_subtitle_file(self, subtitles: List[Dict], video_width: int, video_height: int) -> Optional[str]:
         """
         Create an ASS subtitle file from subtitle clips.
-        Returns path to the created file.
+        Returns path to the created file, or None if there is nothing to burn in.
         """
         if not subtitles:
             return None
-        
-        # ASS header with styling (matching player preview style)
-        # Font size 56, white text, black outline (3px), centered at bottom
-        ass_header = f"""[Script Info]
-ScriptType: v4.00+
-PlayResX: {video_width}
-PlayResY: {video_height}
-WrapStyle: 0
-
-[V4+ Styles]
-Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
-Style: Default,Arial,56,&H00FFFFFF,&H000000FF,&H00000000,&H80000000,1,0,0,0,100,100,0,0,1,3,2,2,20,20,40,1
-
-[Events]
-Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
-"""
-        
-        events = []
-        for sub in subtitles:
-            start_time = sub.get("start_time", 0)
-            duration = sub.get("duration", 2)
-            text = sub.get("text_content", "").strip()
-            
-            if not text:
-                continue
-            
-            end_time = start_time + duration
-            
-            # Convert to ASS time format: H:MM:SS.CC
-            start_str = self._format_ass_time(start_time)
-            end_str = self._format_ass_time(end_time)
-            
-            # Escape special characters in ASS
-            text = text.replace("\\", "/").replace("{", "\\{").replace("}", "\\}")
-            text = text.replace("\n", "\\N")
-            
-            events.append(f"Dialogue: 0,{start_str},{end_str},Default,,0,0,0,,{text}")
-        
-        if not events:
-            return None
-        
-        # Write ASS file
-        ass_fd, ass_path = tempfile.mkstemp(suffix=".ass", prefix="subtitles_", text=True)
-        with os.fdopen(ass_fd, "w", encoding="utf-8") as f:
-            f.write(ass_header)
-            f.write("\n".join(events))
-        
-        return ass_path
-    
+        return ass_writer.write_file(subtitles, video_width, video_height)
+
     def _format_ass_time(self, seconds: float) -> str:
         """Convert seconds to ASS time format H:MM:SS.CC"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        centisecs = int((seconds * 100) % 100)
-        return f"{hours}:{minutes:02d}:{secs:02d}.{centisecs:02d}"
+        return format_ass_time(to_centiseconds(seconds))
 
 # Global instance
 render_engine = RenderEngine()
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Dict, List, Optional, Tuple
+from ..logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the segment command graph changes in a way the key does not capture
+SEGMENT_CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = int(os.getenv("VIDEO_TOOL_SEGMENT_CACHE_MB", "512")) * 1024 ** 2
+
+
+def source_fingerprint(path: str) -> Optional[Tuple[str, int, int]]:
+    """(absolute path, size, mtime_ns) of a source file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+def segment_key(ranges: List[Tuple[str, float, Optional[float]]], render: Dict) -> Optional[str]:
+    """
+    Content hash of one encoded segment.
+
+    ranges are the (source path, in, out) slices the segment covers; render
+    holds everything else that shapes its pixels and bitstream (geometry,
+    rate, speed, subtitle events and sticker layers in segment-local time,
+    encoder settings, container). Returns None when a source is missing.
+    """
+    sources = []
+    for path, in_point, out_point in ranges:
+        fingerprint = source_fingerprint(path)
+        if fingerprint is None:
+            return None
+        sources.append([*fingerprint, round(in_point, 6), None if out_point is None else round(out_point, 6)])
+    payload = {"version": SEGMENT_CACHE_VERSION, "sources": sources, "render": render}
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SegmentCache:
+    """
+    On-disk LRU of encoded export segments, keyed by segment_key().
+
+    A hit is touched (mtime) so recently reused segments survive eviction;
+    after each store the oldest files are removed until the cache fits in
+    max_bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.expanduser("~"), ".video_downloader", "cache", "segments"
+        )
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{ext}")
+
+    def get(self, key: Optional[str], ext: str) -> Optional[str]:
+        """Cached segment path for key, or None."""
+        if not key:
+            return None
+        path = self._path(key, ext)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key: Optional[str], source_path: str) -> Optional[str]:
+        """Copy a freshly encoded segment into the cache and enforce the size cap."""
+        if not key or not os.path.exists(source_path):
+            return None
+        ext = os.path.splitext(source_path)[1]
+        path = self._path(key, ext)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not cache segment %s: %s", source_path, e)
+            return None
+        self.evict()
+        return path
+
+    def evict(self):
+        with self._lock:
+            try:
+                names = os.listdir(self.cache_dir)
+            except OSError:
+                return
+            entries = []
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def size(self) -> int:
+        try:
+            return sum(
+                os.path.getsize(os.path.join(self.cache_dir, name))
+                for name in os.listdir(self.cache_dir)
+            )
+        except OSError:
+            return 0
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+# Global instance
+segment_cache = SegmentCache()
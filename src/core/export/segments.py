@@ -0,0 +1,239 @@
+import hashlib
+import math
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Source seconds per output frame (30 fps at normal speed) used to place split points
+DEFAULT_FRAME_SECONDS = 1.0 / 30.0
+# Shortest part a split may leave at the end of a clip
+MIN_SPLIT_SECONDS = 2.0
+_EPSILON = 1e-6
+
+
+def as_float(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def clip_range(clip: Dict) -> Tuple[float, Optional[float]]:
+    """
+    Source (in_point, out_point) for an export clip dict.
+    out_point is None when neither out_point nor duration is known.
+    """
+    in_point = max(0.0, as_float(clip.get("in_point", 0.0), 0.0))
+    duration = as_float(clip.get("duration", 0.0), 0.0)
+    out_point_raw = clip.get("out_point", None)
+    out_point = None
+    if out_point_raw not in (None, "", 0, 0.0):
+        out_point = as_float(out_point_raw, 0.0)
+    elif duration > 0.0:
+        out_point = in_point + duration
+    return in_point, out_point
+
+
+@dataclass
+class SegmentPiece:
+    """A trimmed slice of one source clip."""
+    clip: Dict
+    in_point: float
+    out_point: Optional[float]
+
+    @property
+    def path(self) -> str:
+        return self.clip.get("path", "")
+
+    @property
+    def length(self) -> Optional[float]:
+        if self.out_point is None:
+            return None
+        return max(0.0, self.out_point - self.in_point)
+
+
+@dataclass
+class TimelineSegment:
+    """
+    A contiguous range of the concatenated timeline, rendered as one unit.
+    start/duration are in concat (pre-speed) seconds. A split segment is one
+    part of a clip that was cut by the planner: it is rendered by seeking
+    into the source, since a concat list inpoint is only exact on keyframes.
+    """
+    index: int
+    start: float
+    duration: float
+    pieces: List[SegmentPiece] = field(default_factory=list)
+    split: bool = False
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+def write_concat_file(pieces: List[SegmentPiece], directory: Optional[str] = None) -> str:
+    """Write an ffmpeg concat demuxer list with per-piece trim directives."""
+    concat_fd, concat_path = tempfile.mkstemp(suffix=".txt", prefix="concat_", text=True, dir=directory)
+    with os.fdopen(concat_fd, "w") as f:
+        for piece in pieces:
+            # FFmpeg concat demuxer format - escape single quotes
+            escaped_path = piece.path.replace("'", "'\\''")
+            f.write(f"file '{escaped_path}'\n")
+            if piece.in_point > 0.0:
+                f.write(f"inpoint {piece.in_point:.6f}\n")
+            if piece.out_point is not None and piece.out_point > piece.in_point:
+                f.write(f"outpoint {piece.out_point:.6f}\n")
+    return concat_path
+
+
+def _frame_cut(in_point: float, offset: float, frame_seconds: float) -> float:
+    """Source time nearest offset that lies a whole number of frames after in_point."""
+    frames = round((offset - in_point) / frame_seconds)
+    return round(in_point + frames * frame_seconds, 6)
+
+
+def _split_segments(segments: List[TimelineSegment], piece: SegmentPiece, cuts: List[float], start: float) -> float:
+    """Append one split segment per part of piece between cuts; returns the timeline end."""
+    bounds = [piece.in_point] + cuts + [piece.out_point]
+    for first, last in zip(bounds, bounds[1:]):
+        if last - first > _EPSILON:
+            segments.append(TimelineSegment(
+                len(segments), start, last - first, [SegmentPiece(piece.clip, first, last)], split=True
+            ))
+            start += last - first
+    return start
+
+
+def plan_segments(
+    pieces: List[SegmentPiece],
+    target_seconds: float,
+    frame_seconds: float = DEFAULT_FRAME_SECONDS,
+) -> Optional[List[TimelineSegment]]:
+    """
+    Split the concatenated timeline into segments of roughly target_seconds.
+    Short clips are grouped and only cut at clip boundaries. A clip longer
+    than a segment is split into segments of its own, cut a whole number of
+    output frames (frame_seconds of source time each) after its in_point,
+    so the parts add up frame for frame. Returns None if any piece has an
+    unknown length.
+    """
+    if any(piece.length is None for piece in pieces):
+        return None
+    target_seconds = max(target_seconds, frame_seconds)
+    # Avoid a tiny tail segment by letting a segment overrun by this much
+    slack = target_seconds * 0.25
+
+    segments: List[TimelineSegment] = []
+    current: List[SegmentPiece] = []
+    current_start = 0.0
+    current_len = 0.0
+
+    def flush():
+        nonlocal current, current_start, current_len
+        if current:
+            segments.append(TimelineSegment(len(segments), current_start, current_len, current))
+            current_start += current_len
+        current = []
+        current_len = 0.0
+
+    for piece in pieces:
+        length = piece.length
+        if length > target_seconds + slack:
+            flush()
+            parts = max(2, round(length / target_seconds))
+            cuts = [
+                _frame_cut(piece.in_point, piece.in_point + length * k / parts, frame_seconds)
+                for k in range(1, parts)
+            ]
+            current_start = _split_segments(segments, piece, cuts, current_start)
+            continue
+        if current and current_len + length > target_seconds + slack:
+            flush()
+        current.append(piece)
+        current_len += length
+        if current_len >= target_seconds - _EPSILON:
+            flush()
+    flush()
+    return segments
+
+
+def _boundary_after(piece: SegmentPiece) -> bool:
+    """Deterministic coin flip from the piece itself, for content-defined cuts."""
+    ident = f"{piece.path}|{piece.in_point:.3f}|{piece.out_point:.3f}"
+    return hashlib.sha1(ident.encode("utf-8")).digest()[0] & 1 == 0
+
+
+def plan_stable_segments(
+    pieces: List[SegmentPiece],
+    target_seconds: float,
+    frame_seconds: float = DEFAULT_FRAME_SECONDS,
+) -> Optional[List[TimelineSegment]]:
+    """
+    Split the timeline so that cut points depend on the clips themselves,
+    not on everything before them, keeping segments cacheable across edits.
+
+    Clips longer than target_seconds are cut on a fixed grid of source times
+    (snapped to whole output frames from the clip's in_point) and become
+    split segments of their own. Shorter clips are grouped: a group may
+    end after a clip once it holds target/2 seconds, and does so where the
+    clip's content hash says so (or at 2 x target). Editing one clip
+    therefore only changes the segments around it. Returns None if any
+    piece has an unknown length.
+    """
+    if any(piece.length is None for piece in pieces):
+        return None
+    target_seconds = max(target_seconds, frame_seconds)
+
+    segments: List[TimelineSegment] = []
+    current: List[SegmentPiece] = []
+    current_start = 0.0
+    current_len = 0.0
+
+    def flush():
+        nonlocal current, current_start, current_len
+        if current:
+            segments.append(TimelineSegment(len(segments), current_start, current_len, current))
+            current_start += current_len
+        current = []
+        current_len = 0.0
+
+    for piece in pieces:
+        if piece.length > target_seconds + _EPSILON:
+            flush()
+            cuts = []
+            grid = (math.floor((piece.in_point + _EPSILON) / target_seconds) + 1) * target_seconds
+            # A short tail is folded into the last part
+            while piece.out_point - grid >= MIN_SPLIT_SECONDS:
+                cut = _frame_cut(piece.in_point, grid, frame_seconds)
+                if cut - (cuts[-1] if cuts else piece.in_point) > _EPSILON:
+                    cuts.append(cut)
+                grid += target_seconds
+            current_start = _split_segments(segments, piece, cuts, current_start)
+            continue
+
+        current.append(piece)
+        current_len += piece.length
+        if current_len >= 2 * target_seconds - _EPSILON:
+            flush()
+        elif current_len >= target_seconds / 2 and _boundary_after(piece):
+            flush()
+    flush()
+    return segments
+
+
+def subtitles_in_range(subtitles: List[Dict], start: float, end: float) -> List[Dict]:
+    """Subtitle events overlapping [start, end), clipped and shifted to segment-local time."""
+    local = []
+    for sub in subtitles:
+        sub_start = as_float(sub.get("start_time", 0), 0.0)
+        sub_end = sub_start + as_float(sub.get("duration", 2), 2.0)
+        if sub_end <= start or sub_start >= end:
+            continue
+        clipped_start = max(sub_start, start)
+        clipped_end = min(sub_end, end)
+        shifted = dict(sub)
+        shifted["start_time"] = clipped_start - start
+        shifted["duration"] = clipped_end - clipped_start
+        local.append(shifted)
+    return local
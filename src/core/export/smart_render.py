@@ -0,0 +1,163 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from ..logging_utils import get_logger
+from .segments import subtitles_in_range
+from .sticker_raster import layers_in_range
+
+logger = get_logger(__name__)
+
+_EPSILON = 1e-3
+# Streams a copy can share with our libx264 yuv420p encodes
+_COPYABLE_CODECS = {"h264"}
+_COPYABLE_PIX_FMTS = {"yuv420p"}
+# ffprobe profile names and the libx264 -profile:v that reproduces them
+_X264_PROFILES = {"Constrained Baseline": "baseline", "Baseline": "baseline", "Main": "main", "High": "high"}
+
+
+def stream_format(video: Optional[Dict]) -> Optional[Tuple[str, str, int, str]]:
+    """(codec, profile, level, pix_fmt) of a stream libx264 can reproduce, else None."""
+    if not video or video.get("codec") not in _COPYABLE_CODECS:
+        return None
+    if video.get("pix_fmt") not in _COPYABLE_PIX_FMTS or video.get("profile") not in _X264_PROFILES:
+        return None
+    level = video.get("level") or 0
+    if level <= 0:
+        return None
+    return video["codec"], video["profile"], level, video["pix_fmt"]
+
+
+def x264_stream_args(video: Optional[Dict]) -> List[str]:
+    """libx264 options pinning an encode to a copied stream's profile and level."""
+    fmt = stream_format(video)
+    if fmt is None:
+        return []
+    _, profile, level, _ = fmt
+    return ["-profile:v", _X264_PROFILES[profile], "-level:v", f"{level / 10:.1f}"]
+
+
+@dataclass
+class RenderUnit:
+    """
+    One slice of the output video: either stream-copied from the source
+    ("copy") or re-encoded ("encode"). start is in concat (timeline) seconds.
+    """
+    kind: str
+    path: str
+    in_point: float
+    out_point: float
+    start: float
+    reason: str = ""
+
+    @property
+    def duration(self) -> float:
+        return self.out_point - self.in_point
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+class SmartRenderPlanner:
+    """
+    Decide which parts of a timeline can be stream-copied.
+
+    A clip qualifies when nothing changes its pixels (no subtitles or
+    stickers in range, no speed change) and its H.264 stream already
+    matches the output size and frame rate. Copied and encoded parts end
+    up in one stream, so all copied clips must share a codec, profile,
+    level and pix_fmt that libx264 can be pinned to; hardware encoders
+    cannot be, and disable copying. Qualifying clips are copied between
+    their first and last keyframe inside the trim; only the partial GOPs
+    at the cut points, and every modified clip, are re-encoded.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[str], Optional[Dict]],
+        keyframes: Callable[[str, float, float], List[float]],
+        min_copy_seconds: float = 1.0,
+    ):
+        self.probe = probe
+        self.keyframes = keyframes
+        self.min_copy_seconds = min_copy_seconds
+
+    def output_format(self, ctx) -> Optional[Dict]:
+        """Output width/height/fps the copied streams must match."""
+        fps = None
+        if ctx.fps_arg:
+            fps = float(ctx.fps_arg)
+        else:
+            info = self.probe(ctx.first_path)
+            video = (info or {}).get("video")
+            if video:
+                fps = video["fps"]
+        if not fps:
+            return None
+        # "stream" is fixed by the first copyable clip
+        return {"width": ctx.width, "height": ctx.height, "fps": fps, "stream": None}
+
+    def modification(self, piece, start: float, ctx, output: Dict) -> Optional[str]:
+        """Why a piece must be re-encoded, or None if it can be copied."""
+        if subtitles_in_range(ctx.subtitles, start, start + piece.length):
+            return "subtitles"
+        if layers_in_range(ctx.sticker_layers, start, start + piece.length):
+            return "stickers"
+        info = self.probe(piece.path)
+        video = (info or {}).get("video")
+        if not video:
+            return "unprobed"
+        fmt = stream_format(video)
+        if fmt is None:
+            return "codec"
+        if (video["width"], video["height"]) != (output["width"], output["height"]):
+            return "scale"
+        if abs(video["fps"] - output["fps"]) > 0.01:
+            return "fps"
+        if output["stream"] is not None and fmt != output["stream"]:
+            return "stream"
+        output["stream"] = fmt
+        return None
+
+    def plan(self, ctx) -> Optional[List[RenderUnit]]:
+        """
+        Render units covering the whole timeline in order, or None when
+        nothing can be copied (callers then fall back to a full encode).
+        """
+        if ctx.wants_speed or ctx.encoder.encoder != "libx264":
+            return None
+        if any(piece.length is None for piece in ctx.pieces):
+            return None
+        output = self.output_format(ctx)
+        if output is None:
+            return None
+
+        units: List[RenderUnit] = []
+        start = 0.0
+        for piece in ctx.pieces:
+            in_point, out_point = piece.in_point, piece.out_point
+            reason = self.modification(piece, start, ctx, output)
+            if reason is None:
+                keyframes = self.keyframes(piece.path, in_point, out_point)
+                first = bisect_left(keyframes, in_point - _EPSILON)
+                last = bisect_right(keyframes, out_point + _EPSILON) - 1
+                if first <= last and keyframes[last] - keyframes[first] >= self.min_copy_seconds:
+                    copy_in, copy_out = keyframes[first], keyframes[last]
+                    # Snap to the trim when the keyframe is within rounding distance
+                    copy_in = in_point if copy_in - in_point < _EPSILON else copy_in
+                    if copy_in > in_point:
+                        units.append(RenderUnit("encode", piece.path, in_point, copy_in, start, "head"))
+                    units.append(RenderUnit("copy", piece.path, copy_in, copy_out, start + copy_in - in_point))
+                    if out_point - copy_out > _EPSILON:
+                        units.append(RenderUnit("encode", piece.path, copy_out, out_point, start + copy_out - in_point, "tail"))
+                    start += piece.length
+                    continue
+                reason = "keyframes"
+            units.append(RenderUnit("encode", piece.path, in_point, out_point, start, reason))
+            start += piece.length
+
+        if not any(unit.kind == "copy" for unit in units):
+            return None
+        copied = sum(unit.duration for unit in units if unit.kind == "copy")
+        logger.info("Smart render: copying %.1fs of %.1fs", copied, start)
+        return units
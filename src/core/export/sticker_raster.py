@@ -0,0 +1,213 @@
+import hashlib
+import os
+import platform
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Base raster size at scale 1.0 (matches the player canvas sticker size)
+STICKER_BASE_SIZE = 200
+STICKER_FONT_RATIO = 0.5
+DEFAULT_MAX_BYTES = int(os.getenv("VIDEO_TOOL_STICKER_CACHE_MB", "64")) * 1024 ** 2
+
+
+def emoji_font_path() -> str:
+    if platform.system() == "Darwin":  # macOS
+        return "/System/Library/Fonts/Apple Color Emoji.ttc"
+    return "/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf"
+
+
+@dataclass
+class StickerLayer:
+    """
+    A pre-rendered RGBA image overlaid at (x, y) between start and end
+    (timeline seconds; end None means until the end of the video).
+    """
+    path: str
+    x: int
+    y: int
+    start: float = 0.0
+    end: Optional[float] = None
+
+    def overlaps(self, start: float, end: Optional[float]) -> bool:
+        if end is not None and self.start >= end:
+            return False
+        return self.end is None or self.end > start
+
+
+def layers_in_range(layers: List[StickerLayer], start: float, end: Optional[float]) -> List[StickerLayer]:
+    return [layer for layer in layers if layer.overlaps(start, end)]
+
+
+class StickerRasterCache:
+    """
+    Content-addressed sticker rasters on disk.
+
+    A sticker's PNG is keyed by content, scale and font, so repeated exports
+    (and repeated stickers in one export) rasterize each distinct sticker
+    once. Fonts are loaded once per size. Stickers that share a time window
+    are pre-composited into a single layer so ffmpeg runs one overlay per
+    window instead of one per sticker.
+
+    Files used are touched (mtime); after each build_layers() the oldest
+    files outside that export are removed until the cache fits in
+    max_bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, font_path: Optional[str] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.expanduser("~"), ".video_downloader", "cache", "stickers"
+        )
+        self.font_path = font_path or emoji_font_path()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._fonts: Dict[int, object] = {}
+        self._images: Dict[str, object] = {}
+        self.rasterized = 0
+
+    def _font(self, font_size: int):
+        font = self._fonts.get(font_size)
+        if font is None:
+            from PIL import ImageFont
+            try:
+                font = ImageFont.truetype(self.font_path, font_size)
+            except Exception:
+                font = ImageFont.load_default()
+            self._fonts[font_size] = font
+        return font
+
+    def _cached_file(self, kind: str, key_parts) -> Tuple[str, str]:
+        digest = hashlib.sha1(repr(key_parts).encode("utf-8")).hexdigest()
+        return digest, os.path.join(self.cache_dir, f"{kind}_{digest}.png")
+
+    def raster(self, content: str, scale: float):
+        """(PIL image, png path) for one sticker, rendered at most once."""
+        scale = round(float(scale or 1.0), 4)
+        digest, path = self._cached_file("sticker", (content, scale, self.font_path))
+        image = self._images.get(digest)
+        if image is not None:
+            if not self._touch(path):
+                # Evicted from disk since it was loaded
+                self._save(image, path)
+            return image, path
+
+        from PIL import Image, ImageDraw
+        if self._touch(path):
+            image = Image.open(path).convert("RGBA")
+        else:
+            img_size = int(STICKER_BASE_SIZE * scale)
+            image = Image.new("RGBA", (img_size, img_size), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(image)
+            font = self._font(int(STICKER_BASE_SIZE * STICKER_FONT_RATIO * scale))
+            # Draw emoji centered
+            draw.text((img_size // 2, img_size // 2), content, font=font, anchor="mm")
+            self._save(image, path)
+            self.rasterized += 1
+        self._images[digest] = image
+        return image, path
+
+    def _save(self, image, path: str):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        image.save(tmp_path, "PNG")
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """Mark a cached file as recently used; False if it is not on disk."""
+        try:
+            os.utime(path)
+        except OSError:
+            return False
+        return True
+
+    def evict(self, keep: Iterable[str] = ()):
+        """Remove the oldest files, other than keep, until the cache fits in max_bytes."""
+        keep = set(keep)
+        with self._lock:
+            try:
+                names = os.listdir(self.cache_dir)
+            except OSError:
+                return
+            entries = []
+            total = 0
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                total += stat.st_size
+                if path not in keep:
+                    entries.append((stat.st_mtime_ns, stat.st_size, path))
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def build_layers(self, stickers: List[Dict], video_width: int, video_height: int) -> List[StickerLayer]:
+        """
+        Overlay layers for an export. Positions are relative to the frame
+        center, as on the player canvas.
+        """
+        groups: Dict[Tuple[float, Optional[float]], List[Tuple[object, int, int, str]]] = {}
+        for sticker in stickers:
+            content = sticker.get("content", "")
+            if not content:
+                continue
+            image, path = self.raster(content, sticker.get("scale", 1.0))
+            abs_x = int(video_width / 2 + sticker.get("x", 0) - image.width / 2)
+            abs_y = int(video_height / 2 + sticker.get("y", 0) - image.height / 2)
+            groups.setdefault(self._window(sticker), []).append((image, abs_x, abs_y, path))
+
+        layers = []
+        for (start, end), members in sorted(groups.items(), key=lambda item: item[0][0]):
+            if len(members) == 1:
+                _, abs_x, abs_y, path = members[0]
+                layers.append(StickerLayer(path, abs_x, abs_y, start, end))
+            else:
+                path, abs_x, abs_y = self._composite(members)
+                layers.append(StickerLayer(path, abs_x, abs_y, start, end))
+        # The files this export overlays stay, whatever the cap
+        self.evict(keep=[layer.path for layer in layers])
+        return layers
+
+    @staticmethod
+    def _window(sticker: Dict) -> Tuple[float, Optional[float]]:
+        start = sticker.get("start_time")
+        duration = sticker.get("duration")
+        if start is None or not duration:
+            return 0.0, None
+        start = max(0.0, float(start))
+        return start, start + float(duration)
+
+    def _composite(self, members) -> Tuple[str, int, int]:
+        """Paste stickers sharing a window onto one layer covering their bounding box."""
+        left = min(x for _, x, _, _ in members)
+        top = min(y for _, _, y, _ in members)
+        right = max(x + image.width for image, x, _, _ in members)
+        bottom = max(y + image.height for image, _, y, _ in members)
+
+        key = tuple((path, x - left, y - top) for _, x, y, path in members)
+        _, path = self._cached_file("layer", key)
+        if not self._touch(path):
+            from PIL import Image
+            layer = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+            for image, x, y, _ in members:
+                layer.alpha_composite(image, (x - left, y - top))
+            self._save(layer, path)
+        return path, left, top
+
+
+# Global instance
+sticker_raster_cache = StickerRasterCache()
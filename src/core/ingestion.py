@@ -5,6 +5,7 @@ import hashlib
 import shutil
 from typing import Dict, Optional
 from .logging_utils import get_logger
+from .media_probe import media_probe_cache, summarize_probe
 
 logger = get_logger(__name__)
 
@@ -29,6 +30,8 @@ class MediaIngestion:
         try:
             result = subprocess.run(cmd, capture_output=True, text=True, check=True)
             data = json.loads(result.stdout)
+            # Share stream facts with export so it never re-probes this file
+            media_probe_cache.put(file_path, summarize_probe(data))
             return self._parse_metadata(data, file_path)
         except subprocess.CalledProcessError as e:
             logger.warning("Error probing file %s: %s", file_path, e)
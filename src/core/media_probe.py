@@ -0,0 +1,236 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_ffmpeg_path() -> str:
+    """Get path to FFmpeg binary - bundled or system."""
+    # Check for bundled FFmpeg first
+    if getattr(sys, 'frozen', False):
+        # Running as PyInstaller bundle
+        base_path = sys._MEIPASS
+    else:
+        # Running as script
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
+    # Check bundled locations
+    bundled_paths = [
+        os.path.join(base_path, 'bin', 'ffmpeg'),
+        os.path.join(base_path, 'bin', 'ffmpeg.exe'),
+        os.path.join(base_path, 'ffmpeg'),
+        os.path.join(base_path, 'ffmpeg.exe'),
+    ]
+    
+    for path in bundled_paths:
+        if os.path.exists(path):
+            logger.info("Using bundled FFmpeg: %s", path)
+            return path
+    
+    # Fall back to system FFmpeg
+    logger.info("Using system FFmpeg")
+    return "ffmpeg"
+
+
+def ffprobe_path_for(ffmpeg_path: str) -> str:
+    """ffprobe next to the given ffmpeg binary (bundled builds), else the system one."""
+    directory, name = os.path.split(ffmpeg_path or "")
+    if directory:
+        candidate = os.path.join(directory, name.replace("ffmpeg", "ffprobe"))
+        if os.path.exists(candidate):
+            return candidate
+    return "ffprobe"
+
+
+def _parse_rate(rate: str) -> float:
+    try:
+        num, den = map(float, str(rate).split("/"))
+        return num / den if den else 0.0
+    except ValueError:
+        return 0.0
+
+
+def summarize_probe(data: Dict) -> Dict:
+    """
+    Reduce raw `ffprobe -show_format -show_streams` JSON to the stream facts
+    export planning needs.
+    """
+    format_info = data.get("format", {}) or {}
+    streams = data.get("streams", []) or []
+    video_stream = next((s for s in streams if s.get("codec_type") == "video"), None)
+    try:
+        duration = float(format_info.get("duration", 0) or 0)
+    except (TypeError, ValueError):
+        duration = 0.0
+
+    video = None
+    if video_stream:
+        video = {
+            "codec": video_stream.get("codec_name", ""),
+            "profile": video_stream.get("profile", ""),
+            "level": int(video_stream.get("level", 0) or 0),
+            "width": int(video_stream.get("width", 0) or 0),
+            "height": int(video_stream.get("height", 0) or 0),
+            "fps": _parse_rate(video_stream.get("r_frame_rate", "0/0")),
+            "pix_fmt": video_stream.get("pix_fmt", ""),
+        }
+    return {
+        "duration": duration,
+        "video": video,
+        "has_audio": any(s.get("codec_type") == "audio" for s in streams),
+    }
+
+
+def probe_media(file_path: str, ffprobe_path: str = "ffprobe") -> Optional[Dict]:
+    """Probe a file's streams with ffprobe. Returns None if it cannot be read."""
+    cmd = [
+        ffprobe_path,
+        "-v", "error",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        file_path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        return summarize_probe(json.loads(result.stdout or "{}"))
+    except (OSError, subprocess.CalledProcessError, json.JSONDecodeError) as e:
+        logger.debug("Probe failed for %s: %s", file_path, e)
+        return None
+
+
+def probe_keyframes(file_path: str, start: float, end: float, ffprobe_path: str = "ffprobe") -> List[float]:
+    """
+    Video keyframe timestamps within [start, end] from packet flags
+    (no decoding, so this is cheap even for long sources).
+    """
+    cmd = [
+        ffprobe_path,
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-read_intervals", f"{max(0.0, start):.6f}%{end:.6f}",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        file_path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.debug("Keyframe probe failed for %s: %s", file_path, e)
+        return []
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) < 2 or "K" not in parts[1]:
+            continue
+        try:
+            pts = float(parts[0])
+        except ValueError:
+            continue
+        if start - 1e-6 <= pts <= end + 1e-6:
+            keyframes.append(pts)
+    return sorted(keyframes)
+
+
+class MediaProbeCache:
+    """
+    Process-wide memo of probe results, shared by ingestion and export.
+
+    Entries are keyed by normalized path and validated against the file's
+    size and mtime on every lookup, so edited or replaced media is re-probed
+    while unchanged media never spawns another ffprobe. Ingestion seeds the
+    cache with the probe it already ran at import; anything else is probed
+    lazily on first use.
+    """
+
+    def __init__(self, ffprobe_path: str = "ffprobe"):
+        self.ffprobe_path = ffprobe_path
+        self._entries: Dict[str, Tuple[Tuple[int, int], Optional[Dict]]] = {}
+        self._keyframes: Dict[Tuple[str, float, float], Tuple[Tuple[int, int], List[float]]] = {}
+        self._lock = threading.Lock()
+        self.probes = 0
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return os.path.normcase(os.path.abspath(file_path))
+
+    @staticmethod
+    def _signature(file_path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def put(self, file_path: str, info: Dict):
+        """Record a probe result (e.g. from ingestion) for the file as it is now."""
+        signature = self._signature(file_path)
+        if signature is None or info is None:
+            return
+        with self._lock:
+            self._entries[self._key(file_path)] = (signature, info)
+
+    def get(self, file_path: str, ffprobe_path: Optional[str] = None) -> Optional[Dict]:
+        """Stream facts for file_path, probing only on a miss or a changed file."""
+        if not file_path:
+            return None
+        signature = self._signature(file_path)
+        if signature is None:
+            return None
+        key = self._key(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        info = probe_media(file_path, ffprobe_path or self.ffprobe_path)
+        self.probes += 1
+        # Unreadable files are remembered too, until they change on disk
+        with self._lock:
+            self._entries[key] = (signature, info)
+        return info
+
+    def keyframes(self, file_path: str, start: float, end: float, ffprobe_path: Optional[str] = None) -> List[float]:
+        """Keyframe times within [start, end], memoized per range."""
+        signature = self._signature(file_path)
+        if signature is None:
+            return []
+        key = (self._key(file_path), round(start, 3), round(end, 3))
+        with self._lock:
+            entry = self._keyframes.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        keyframes = probe_keyframes(file_path, start, end, ffprobe_path or self.ffprobe_path)
+        self.probes += 1
+        with self._lock:
+            self._keyframes[key] = (signature, keyframes)
+        return keyframes
+
+    def has_audio(self, file_path: str, ffprobe_path: Optional[str] = None) -> bool:
+        return bool((self.get(file_path, ffprobe_path) or {}).get("has_audio"))
+
+    def video_info(self, file_path: str, ffprobe_path: Optional[str] = None) -> Optional[Dict]:
+        return (self.get(file_path, ffprobe_path) or {}).get("video")
+
+    def invalidate(self, file_path: str):
+        key = self._key(file_path)
+        with self._lock:
+            self._entries.pop(key, None)
+            for range_key in [k for k in self._keyframes if k[0] == key]:
+                del self._keyframes[range_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keyframes.clear()
+
+
+# Global instance
+media_probe_cache = MediaProbeCache()
@@ -0,0 +1,370 @@
+"""
+Project persistence - fast save/load of timeline projects.
+
+A project is stored as a directory bundle (``*.vproj``)::
+
+    project.json        manifest: project settings, track order, file hashes
+    tracks/<id>.json    one file per track (clips or stickers)
+    stickers.json       canvas stickers placed on the player
+    media_pool.json     media pool assets
+
+Saves are incremental: every payload is hashed and only files whose content
+changed since the last save (or load) of the same bundle are rewritten.
+Loading is split so the timeline can be shown before the media pool has
+been hydrated.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .logging_utils import get_logger
+from .timeline.clip import Clip
+from .timeline.sticker import StickerClip
+from .timeline.track import MagneticTrack, StickerTrack, Track
+
+logger = get_logger(__name__)
+
+PROJECT_EXTENSION = ".vproj"
+FORMAT_VERSION = 1
+
+MANIFEST_FILE = "project.json"
+MEDIA_POOL_FILE = "media_pool.json"
+STICKERS_FILE = "stickers.json"
+TRACKS_DIR = "tracks"
+
+_TRACK_KINDS = {
+    "track": Track,
+    "magnetic": MagneticTrack,
+    "sticker": StickerTrack,
+}
+
+
+def _track_kind(track: Track) -> str:
+    if isinstance(track, StickerTrack):
+        return "sticker"
+    if isinstance(track, MagneticTrack):
+        return "magnetic"
+    return "track"
+
+
+def _dumps(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), check_circular=False).encode("utf-8")
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def serialize_track(track: Track) -> Dict:
+    """Serialize the contents (clips/stickers) of a track."""
+    payload = {"clips": [clip.to_dict() for clip in track.clips]}
+    if isinstance(track, StickerTrack):
+        payload["stickers"] = [sticker.to_dict() for sticker in track.stickers]
+    return payload
+
+
+def build_track(entry: Dict, payload: Dict) -> Track:
+    """Rebuild a track from its manifest entry and payload."""
+    track_cls = _TRACK_KINDS.get(entry.get("kind"), Track)
+    if track_cls is Track:
+        track = Track(entry.get("name", "Track"), is_audio=bool(entry.get("is_audio", False)))
+    else:
+        track = track_cls(entry.get("name", "Track"))
+    track.id = entry.get("id", track.id)
+    track.is_muted = bool(entry.get("is_muted", False))
+    track.is_locked = bool(entry.get("is_locked", False))
+    track.is_hidden = bool(entry.get("is_hidden", False))
+    # Assign directly: add_clip() would re-position clips and respects locks.
+    track.clips = [Clip.from_dict(data) for data in payload.get("clips", [])]
+    if isinstance(track, StickerTrack):
+        track.stickers = [StickerClip.from_dict(data) for data in payload.get("stickers", [])]
+    return track
+
+
+@dataclass
+class SaveResult:
+    """Outcome of a (delta) save."""
+    path: str
+    written: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    duration_ms: float = 0.0
+
+
+@dataclass
+class ProjectDocument:
+    """Timeline part of a loaded project. Media pool is hydrated separately."""
+    path: str
+    project: Dict
+    tracks: List[Track]
+    stickers: List[StickerClip]
+    asset_count: int = 0
+
+
+class ProjectStore:
+    """
+    Reads and writes project bundles.
+    Remembers the hash of every file it wrote/read per bundle so repeated
+    saves (and autosaves) only rewrite what changed.
+    """
+
+    def __init__(self, autosave_dir: Optional[str] = None):
+        self.autosave_dir = autosave_dir or os.path.join(
+            os.path.expanduser("~"), ".video_downloader", "autosave"
+        )
+        self.current_path: Optional[str] = None
+        self._file_hashes: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._autosave_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def normalize_path(path: str) -> str:
+        if not path.endswith(PROJECT_EXTENSION):
+            path = f"{path}{PROJECT_EXTENSION}"
+        return os.path.abspath(path)
+
+    def save(
+        self,
+        path: str,
+        tracks: List[Track],
+        project: Optional[Dict] = None,
+        assets: Optional[List[Dict]] = None,
+        stickers: Optional[List[StickerClip]] = None,
+        remember: bool = True,
+    ) -> SaveResult:
+        """
+        Save a project bundle, rewriting only files whose content changed.
+        remember=True makes this bundle the current project.
+        """
+        start = time.perf_counter()
+        path = self.normalize_path(path)
+        result = SaveResult(path=path)
+
+        with self._lock:
+            os.makedirs(os.path.join(path, TRACKS_DIR), exist_ok=True)
+            known = self._file_hashes.setdefault(path, {})
+
+            def put(rel_path: str, payload) -> str:
+                data = _dumps(payload)
+                digest = _digest(data)
+                abs_path = os.path.join(path, rel_path)
+                if known.get(rel_path) == digest and os.path.exists(abs_path):
+                    result.skipped.append(rel_path)
+                else:
+                    _write_atomic(abs_path, data)
+                    known[rel_path] = digest
+                    result.written.append(rel_path)
+                return digest
+
+            track_entries = []
+            for track in tracks:
+                rel_path = f"{TRACKS_DIR}/{track.id}.json"
+                digest = put(rel_path, serialize_track(track))
+                track_entries.append({
+                    "id": track.id,
+                    "name": track.name,
+                    "kind": _track_kind(track),
+                    "is_audio": track.is_audio,
+                    "is_muted": getattr(track, "is_muted", False),
+                    "is_locked": track.is_locked,
+                    "is_hidden": track.is_hidden,
+                    "file": rel_path,
+                    "hash": digest,
+                })
+
+            asset_list = list(assets or [])
+            media_digest = put(MEDIA_POOL_FILE, {"assets": asset_list})
+            sticker_digest = put(STICKERS_FILE, {"stickers": [s.to_dict() for s in (stickers or [])]})
+
+            # Drop files of tracks that no longer exist
+            live_files = {entry["file"] for entry in track_entries}
+            for rel_path in list(known):
+                if rel_path.startswith(f"{TRACKS_DIR}/") and rel_path not in live_files:
+                    try:
+                        os.remove(os.path.join(path, rel_path))
+                    except OSError:
+                        pass
+                    known.pop(rel_path, None)
+                    result.removed.append(rel_path)
+
+            manifest = {
+                "format_version": FORMAT_VERSION,
+                "saved_at": time.time(),
+                "project": self._plain_project(project),
+                "tracks": track_entries,
+                "media_pool": {"file": MEDIA_POOL_FILE, "hash": media_digest, "count": len(asset_list)},
+                "stickers": {"file": STICKERS_FILE, "hash": sticker_digest},
+            }
+            _write_atomic(os.path.join(path, MANIFEST_FILE), _dumps(manifest))
+
+        if remember:
+            self.current_path = path
+
+        result.duration_ms = (time.perf_counter() - start) * 1000.0
+        logger.info(
+            "Saved project %s in %.1fms (%d written, %d unchanged)",
+            path,
+            result.duration_ms,
+            len(result.written),
+            len(result.skipped),
+        )
+        return result
+
+    def load(self, path: str) -> ProjectDocument:
+        """
+        Load the timeline part of a project (manifest, tracks, stickers).
+        Call hydrate_media_pool() afterwards to load assets.
+        """
+        path = self.normalize_path(path)
+        with open(os.path.join(path, MANIFEST_FILE), "rb") as f:
+            manifest = json.loads(f.read())
+
+        version = manifest.get("format_version", 0)
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Project format {version} is newer than supported ({FORMAT_VERSION})")
+
+        known: Dict[str, str] = {}
+        tracks = []
+        for entry in manifest.get("tracks", []):
+            rel_path = entry.get("file") or f"{TRACKS_DIR}/{entry.get('id')}.json"
+            payload = self._read_payload(path, rel_path, known)
+            tracks.append(build_track(entry, payload))
+
+        sticker_info = manifest.get("stickers", {})
+        sticker_payload = self._read_payload(path, sticker_info.get("file", STICKERS_FILE), known)
+        stickers = [StickerClip.from_dict(data) for data in sticker_payload.get("stickers", [])]
+
+        media_info = manifest.get("media_pool", {})
+        if media_info.get("hash"):
+            known[media_info.get("file", MEDIA_POOL_FILE)] = media_info["hash"]
+
+        with self._lock:
+            self._file_hashes[path] = known
+        self.current_path = path
+
+        return ProjectDocument(
+            path=path,
+            project=manifest.get("project", {}),
+            tracks=tracks,
+            stickers=stickers,
+            asset_count=int(media_info.get("count", 0)),
+        )
+
+    def load_media_pool(self, path: str) -> List[Dict]:
+        """Read media pool assets, flagging those whose file has gone missing."""
+        path = self.normalize_path(path)
+        media_path = os.path.join(path, MEDIA_POOL_FILE)
+        if not os.path.exists(media_path):
+            return []
+        with open(media_path, "rb") as f:
+            assets = json.loads(f.read()).get("assets", [])
+        for asset in assets:
+            target = asset.get("target_url")
+            if target and not os.path.exists(target):
+                asset["status"] = "missing"
+        return assets
+
+    def hydrate_media_pool(
+        self,
+        path: str,
+        on_assets: Callable[[List[Dict]], None],
+        background: bool = True,
+    ) -> Optional[threading.Thread]:
+        """
+        Load media pool assets and hand them to on_assets.
+        By default runs in a background thread so the timeline can be shown
+        immediately; returns the thread (or None when run inline).
+        """
+        def run():
+            try:
+                assets = self.load_media_pool(path)
+            except (OSError, ValueError) as e:
+                logger.warning("Failed to hydrate media pool for %s: %s", path, e)
+                return
+            on_assets(assets)
+
+        if not background:
+            run()
+            return None
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def autosave_path(self, project_name: str) -> str:
+        digest = hashlib.md5((self.current_path or project_name).encode()).hexdigest()[:12]
+        return os.path.join(self.autosave_dir, f"autosave_{digest}{PROJECT_EXTENSION}")
+
+    def autosave(
+        self,
+        tracks: List[Track],
+        project: Optional[Dict] = None,
+        assets: Optional[List[Dict]] = None,
+        stickers: Optional[List[StickerClip]] = None,
+    ) -> SaveResult:
+        """Delta-save into the autosave area without touching current_path."""
+        name = (project or {}).get("name", "Untitled Project")
+        return self.save(self.autosave_path(name), tracks, project, assets, stickers, remember=False)
+
+    def autosave_in_background(
+        self,
+        tracks: List[Track],
+        project: Optional[Dict] = None,
+        assets: Optional[List[Dict]] = None,
+        stickers: Optional[List[StickerClip]] = None,
+    ) -> Optional[threading.Thread]:
+        """
+        Run autosave() in a background thread so serializing and hashing a
+        large project does not stall the caller. Returns the thread, or None
+        (skipping this round) while the previous autosave is still running.
+        """
+        if self._autosave_thread is not None and self._autosave_thread.is_alive():
+            return None
+        tracks = list(tracks)
+        project = dict(project or {})
+        assets = list(assets or [])
+        stickers = list(stickers or [])
+
+        def run():
+            try:
+                self.autosave(tracks, project, assets, stickers)
+            except OSError as e:
+                logger.warning("Autosave failed: %s", e)
+
+        thread = threading.Thread(target=run, daemon=True)
+        self._autosave_thread = thread
+        thread.start()
+        return thread
+
+    def _read_payload(self, path: str, rel_path: str, known: Dict[str, str]) -> Dict:
+        abs_path = os.path.join(path, rel_path)
+        if not os.path.exists(abs_path):
+            logger.warning("Project file missing: %s", abs_path)
+            return {}
+        with open(abs_path, "rb") as f:
+            data = f.read()
+        known[rel_path] = _digest(data)
+        return json.loads(data)
+
+    @staticmethod
+    def _plain_project(project: Optional[Dict]) -> Dict:
+        plain = dict(project or {})
+        resolution = plain.get("resolution")
+        if isinstance(resolution, tuple):
+            plain["resolution"] = list(resolution)
+        return plain
+
+
+# Global instance
+project_store = ProjectStore()
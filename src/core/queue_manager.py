@@ -9,6 +9,7 @@ from typing import Optional, List, Dict, Callable, Any
 from enum import Enum
 from PyQt6.QtCore import QObject, QThread, pyqtSignal, QMutex, QWaitCondition
 from .logging_utils import get_logger
+from .render_supervisor import render_supervisor
 
 logger = get_logger(__name__)
 
@@ -132,17 +133,24 @@ class QueueWorker(QThread):
                 task.progress = progress
                 self.task_progress.emit(task.id, progress)
             
-            # Run the handler
-            handler(task.data, progress_callback)
+            # Run the handler as a supervised job: ffmpeg it starts shares the
+            # machine's encoder thread budget and can be cancelled/paused by task id
+            with render_supervisor.job(task.title or task.task_type.value, job_id=task.id,
+                                       nice=self.queue_manager.TASK_NICE):
+                handler(task.data, progress_callback)
             
+            if task.status == TaskStatus.CANCELLED:
+                self.task_failed.emit(task.id, task.error or "Cancelled")
+                return
             task.status = TaskStatus.COMPLETED
             task.progress = 100
             self.task_completed.emit(task.id)
             
         except Exception as e:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
-            self.task_failed.emit(task.id, str(e))
+            if task.status != TaskStatus.CANCELLED:
+                task.status = TaskStatus.FAILED
+                task.error = str(e)
+            self.task_failed.emit(task.id, task.error or str(e))
 
 
 class QueueManager(QObject):
@@ -153,6 +161,9 @@ class QueueManager(QObject):
     task_updated = pyqtSignal(object)  # QueueTask
     task_removed = pyqtSignal(str)  # task_id
     queue_cleared = pyqtSignal()
+
+    # Background tasks run below interactive exports
+    TASK_NICE = 10
     
     def __init__(self, max_workers: int = 1):
         super().__init__()
@@ -163,6 +174,9 @@ class QueueManager(QObject):
         self._handlers: Dict[TaskType, Callable] = {}
         self._is_paused = False
         self._workers_started = False
+        # Preload the models a task type needs when its first task is queued
+        self.warm_models = True
+        self._warmed_types = set()
     
     def _start_workers(self):
         """Start worker threads."""
@@ -211,7 +225,16 @@ class QueueManager(QObject):
         
         self.task_added.emit(task)
         logger.info("Task added: [%s] %s", task.task_type.value, task.title)
+        self._warm_models(task_type)
         return task
+
+    def _warm_models(self, task_type: TaskType):
+        if not self.warm_models or task_type in self._warmed_types:
+            return
+        self._warmed_types.add(task_type)
+        if task_type in (TaskType.TRANSCRIBE, TaskType.OCR_EXTRACT, TaskType.REMOVE_SUB):
+            from .ai.model_host import model_host
+            model_host.warm_for_task(task_type.value)
     
     def get_next_pending_task(self) -> Optional[QueueTask]:
         """Get the next pending task from the queue."""
@@ -235,12 +258,18 @@ class QueueManager(QObject):
         return self._tasks.copy()
     
     def cancel_task(self, task_id: str) -> bool:
-        """Cancel a pending task."""
+        """Cancel a pending task, or stop a running one's ffmpeg processes."""
         task = self.get_task(task_id)
         if task and task.status == TaskStatus.PENDING:
             task.status = TaskStatus.CANCELLED
             self.task_updated.emit(task)
             return True
+        if task and task.status == TaskStatus.RUNNING:
+            task.status = TaskStatus.CANCELLED
+            task.error = "Cancelled"
+            render_supervisor.cancel(task_id)
+            self.task_updated.emit(task)
+            return True
         return False
     
     def remove_task(self, task_id: str):
@@ -259,18 +288,25 @@ class QueueManager(QObject):
         self.queue_cleared.emit()
     
     def pause_queue(self):
-        """Pause all workers."""
+        """Pause all workers and suspend running tasks' ffmpeg processes."""
         self._ensure_workers_started()
         self._is_paused = True
         for worker in self._workers:
             worker.pause()
+        for task in self._running_tasks():
+            render_supervisor.pause(task.id)
     
     def resume_queue(self):
-        """Resume all workers."""
+        """Resume all workers and running tasks."""
         self._ensure_workers_started()
         self._is_paused = False
+        for task in self._running_tasks():
+            render_supervisor.resume(task.id)
         for worker in self._workers:
             worker.resume()
+
+    def _running_tasks(self) -> List[QueueTask]:
+        return [t for t in self._tasks if t.status == TaskStatus.RUNNING]
     
     def is_paused(self) -> bool:
         return self._is_paused
@@ -0,0 +1,287 @@
+"""
+Render Supervisor - tracks every ffmpeg process the app starts.
+Jobs (an export, a queued subtitle removal, ...) own their processes, so
+they can be cancelled, paused or timed out as a unit, and all of them draw
+encoder threads from one machine-wide budget.
+"""
+import os
+import signal
+import subprocess
+import threading
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds a terminated process gets to exit before it is killed
+TERMINATE_GRACE = 5.0
+
+
+class RenderCancelled(RuntimeError):
+    """Raised when a process is requested for a job that was cancelled."""
+
+
+@dataclass
+class SupervisedJob:
+    id: str
+    label: str
+    nice: int = 0
+    processes: List[subprocess.Popen] = field(default_factory=list)
+    threads_held: int = 0
+    cancelled: bool = False
+    paused: bool = False
+    timer: Optional[threading.Timer] = None
+
+
+class RenderSupervisor:
+    """
+    Registry of render jobs and their ffmpeg processes.
+
+    process() is the only way render code should start ffmpeg: it blocks
+    until the requested encoder threads fit in the budget (capacity, by
+    default the CPU count), starts the process at the job's niceness and
+    releases the threads when the process exits. Jobs can be cancelled
+    (terminate, then kill), paused and resumed (SIGSTOP/SIGCONT where the
+    platform has them) and given a timeout that cancels them.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, default_nice: int = 5):
+        self.capacity = max(1, capacity or os.cpu_count() or 1)
+        self.default_nice = default_nice
+        self._jobs: Dict[str, SupervisedJob] = {}
+        self._threads_in_use = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    # --- Jobs -----------------------------------------------------------
+
+    def start_job(self, label: str, job_id: Optional[str] = None, nice: Optional[int] = None,
+                  timeout: Optional[float] = None) -> str:
+        job_id = job_id or uuid.uuid4().hex[:8]
+        job = SupervisedJob(job_id, label, self.default_nice if nice is None else nice)
+        if timeout:
+            job.timer = threading.Timer(timeout, self._on_timeout, args=(job_id,))
+            job.timer.daemon = True
+            job.timer.start()
+        with self._cond:
+            self._jobs[job_id] = job
+        logger.debug("Render job %s started: %s", job_id, label)
+        return job_id
+
+    def finish_job(self, job_id: str):
+        with self._cond:
+            job = self._jobs.pop(job_id, None)
+        if job and job.timer:
+            job.timer.cancel()
+
+    @contextmanager
+    def job(self, label: str, job_id: Optional[str] = None, nice: Optional[int] = None,
+            timeout: Optional[float] = None):
+        """Run a block as a job; processes started in it without a job id join it."""
+        job_id = self.start_job(label, job_id, nice, timeout)
+        previous = getattr(self._local, "job_id", None)
+        self._local.job_id = job_id
+        try:
+            yield job_id
+        finally:
+            self._local.job_id = previous
+            self.finish_job(job_id)
+
+    def current_job_id(self) -> Optional[str]:
+        return getattr(self._local, "job_id", None)
+
+    def is_cancelled(self, job_id: Optional[str]) -> bool:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return bool(job and job.cancelled)
+
+    def active_jobs(self) -> List[Dict]:
+        with self._cond:
+            return [
+                {
+                    "id": job.id,
+                    "label": job.label,
+                    "processes": len(job.processes),
+                    "threads": job.threads_held,
+                    "paused": job.paused,
+                    "cancelled": job.cancelled,
+                }
+                for job in self._jobs.values()
+            ]
+
+    @property
+    def threads_in_use(self) -> int:
+        with self._cond:
+            return self._threads_in_use
+
+    def thread_budget(self, requested: Optional[int] = None) -> int:
+        """Threads a single process may ask for (never more than capacity)."""
+        return max(1, min(requested or self.capacity, self.capacity))
+
+    def shared_budget(self, requested: Optional[int] = None, share: int = 2) -> int:
+        """
+        Threads for a process that runs alongside other jobs: its
+        thread_budget() split share ways (at least 1), so concurrent jobs
+        fit in the capacity together instead of queueing behind each other.
+        """
+        return max(1, self.thread_budget(requested) // share)
+
+    # --- Processes ------------------------------------------------------
+
+    @contextmanager
+    def process(self, cmd: List[str], threads: int = 1, job_id: Optional[str] = None, **popen_kwargs):
+        """
+        Start cmd under a job once `threads` encoder threads are free.
+        Yields the Popen; on exit waits for it and returns its threads.
+        Raises RenderCancelled if the job is (or gets) cancelled first.
+        """
+        job_id = job_id or self.current_job_id()
+        own_job = job_id is None
+        if own_job:
+            job_id = self.start_job(os.path.basename(cmd[0]))
+        threads = self.thread_budget(threads)
+        process = None
+        terminated = False
+        try:
+            self._acquire(job_id, threads)
+            try:
+                process = self._spawn(job_id, cmd, popen_kwargs)
+            except Exception:
+                self._release(job_id, None, threads)
+                raise
+            try:
+                yield process
+            except BaseException:
+                terminated = True
+                self._terminate(process)
+                raise
+        finally:
+            if process is not None:
+                stopping = terminated or self.is_cancelled(job_id)
+                try:
+                    process.wait(timeout=TERMINATE_GRACE if stopping else None)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+                self._release(job_id, process, threads)
+            if own_job:
+                self.finish_job(job_id)
+
+    def _acquire(self, job_id: str, threads: int):
+        with self._cond:
+            waited = False
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job.cancelled:
+                    raise RenderCancelled(f"Render job {job_id} was cancelled")
+                if not job.paused and self._threads_in_use + threads <= self.capacity:
+                    break
+                if not waited:
+                    logger.info("Job %s waiting for %s encoder threads (%s/%s in use)",
+                                job_id, threads, self._threads_in_use, self.capacity)
+                    waited = True
+                self._cond.wait(0.5)
+            self._threads_in_use += threads
+            job.threads_held += threads
+
+    def _release(self, job_id: str, process: Optional[subprocess.Popen], threads: int):
+        with self._cond:
+            self._threads_in_use -= threads
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.threads_held -= threads
+                if process is not None and process in job.processes:
+                    job.processes.remove(process)
+            self._cond.notify_all()
+
+    def _spawn(self, job_id: str, cmd: List[str], popen_kwargs: Dict) -> subprocess.Popen:
+        with self._cond:
+            job = self._jobs[job_id]
+            nice = job.nice
+        if nice > 0 and os.name == "nt":
+            popen_kwargs.setdefault("creationflags", getattr(subprocess, "BELOW_NORMAL_PRIORITY_CLASS", 0))
+        process = subprocess.Popen(cmd, **popen_kwargs)
+        if nice > 0 and hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, process.pid, nice)
+            except OSError as e:
+                logger.debug("Could not renice ffmpeg %s: %s", process.pid, e)
+
+        with self._cond:
+            job.processes.append(process)
+            cancelled = job.cancelled
+        if cancelled:
+            # Cancelled between acquiring threads and starting
+            self._terminate(process)
+        return process
+
+    # --- Control --------------------------------------------------------
+
+    def cancel(self, job_id: Optional[str]) -> bool:
+        """Stop every process of a job and refuse new ones. False if the job is unknown."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            job.cancelled = True
+            processes = list(job.processes)
+            self._cond.notify_all()
+        logger.info("Cancelling render job %s (%s)", job_id, job.label)
+        for process in processes:
+            self._terminate(process)
+        return True
+
+    def pause(self, job_id: Optional[str]) -> bool:
+        return self._set_paused(job_id, True)
+
+    def resume(self, job_id: Optional[str]) -> bool:
+        return self._set_paused(job_id, False)
+
+    def _set_paused(self, job_id: Optional[str], paused: bool) -> bool:
+        sig = getattr(signal, "SIGSTOP" if paused else "SIGCONT", None)
+        if sig is None:
+            # Marking the job paused here would hold _acquire forever
+            logger.warning("Pausing running ffmpeg is not supported on this platform")
+            return False
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.cancelled:
+                return False
+            job.paused = paused
+            processes = list(job.processes)
+            self._cond.notify_all()
+        for process in processes:
+            self._signal(process, sig)
+        return True
+
+    def _on_timeout(self, job_id: str):
+        logger.warning("Render job %s timed out", job_id)
+        self.cancel(job_id)
+
+    def _terminate(self, process: subprocess.Popen):
+        if process.poll() is not None:
+            return
+        cont = getattr(signal, "SIGCONT", None)
+        if cont is not None:
+            # A stopped process cannot act on SIGTERM
+            self._signal(process, cont)
+        try:
+            process.terminate()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _signal(process: subprocess.Popen, sig):
+        if process.poll() is not None:
+            return
+        try:
+            process.send_signal(sig)
+        except OSError as e:
+            logger.debug("Could not signal process %s: %s", process.pid, e)
+
+
+# Global instance
+render_supervisor = RenderSupervisor()
@@ -19,6 +19,7 @@ class ShortcutManager:
             "cut": Shortcut("cut", "Cut Clip", "C"),
             "delete": Shortcut("delete", "Delete", "Delete"),
             "save": Shortcut("save", "Save Project", "Ctrl+S"),
+            "open": Shortcut("open", "Open Project", "Ctrl+O"),
             "import": Shortcut("import", "Import Media", "Ctrl+I"),
         }
         self.load_shortcuts()
@@ -1,15 +1,29 @@
-from typing import Dict, List
+import os
+from contextlib import contextmanager
+from typing import Dict, List, Optional
 from PyQt6.QtCore import QObject, pyqtSignal
 
 
+def normalize_media_path(file_path: str) -> str:
+    """Normalize a local path for index lookups (no filesystem access)."""
+    return os.path.normcase(os.path.abspath(os.path.expanduser(file_path)))
+
+
 class StateManager(QObject):
     """
     Simple QObject-based state holder. Avoids custom __new__ to prevent
     recursion/stack issues with QObject construction.
+
+    The media pool keeps secondary indexes (target_url, normalized path)
+    so lookups stay O(1) regardless of how many assets a session
+    accumulates.
     """
 
     # Signals
     media_imported = pyqtSignal(dict)  # Emits the new asset object
+    media_batch_imported = pyqtSignal(list)  # Emits a list of new assets (batched import)
+    media_removed = pyqtSignal(dict)  # Emits the removed asset object
+    media_cleared = pyqtSignal(list)  # Emits every asset dropped by clear_assets()
 
     def __init__(self):
         super().__init__()
@@ -26,19 +40,112 @@ class StateManager(QObject):
             },
         }
 
+        # Secondary indexes: key -> asset id
+        self._by_target_url: Dict[str, str] = {}
+        self._by_path: Dict[str, str] = {}
+        self._indexed_assets = self.state["media_pool"]["assets"]
+
+        self._batch_depth = 0
+        self._pending_imports: List[Dict] = []
+
+    # --- Indexing -------------------------------------------------------
+
+    def _index_asset(self, asset: Dict):
+        asset_id = asset["id"]
+        target_url = asset.get("target_url")
+        if target_url:
+            self._by_target_url[target_url] = asset_id
+            self._by_path[normalize_media_path(target_url)] = asset_id
+
+    def _unindex_asset(self, asset: Dict):
+        asset_id = asset["id"]
+
+        def drop(index: Dict[str, str], key: Optional[str]):
+            if key and index.get(key) == asset_id:
+                del index[key]
+
+        target_url = asset.get("target_url")
+        if target_url:
+            drop(self._by_target_url, target_url)
+            drop(self._by_path, normalize_media_path(target_url))
+
+    def rebuild_indexes(self):
+        """Rebuild all media pool indexes from the assets dict."""
+        assets = self.state["media_pool"]["assets"]
+        self._by_target_url.clear()
+        self._by_path.clear()
+        for asset in assets.values():
+            self._index_asset(asset)
+        self._indexed_assets = assets
+
+    def _assets(self) -> Dict[str, Dict]:
+        assets = self.state["media_pool"]["assets"]
+        if assets is not self._indexed_assets:
+            # The assets dict was replaced wholesale (e.g. tests, project load)
+            self.rebuild_indexes()
+        return assets
+
+    def _lookup(self, index: Dict[str, str], key: Optional[str]) -> Optional[Dict]:
+        if not key:
+            return None
+        assets = self._assets()
+        asset_id = index.get(key)
+        if asset_id is None:
+            return None
+        asset = assets.get(asset_id)
+        if asset is None:
+            # Asset was removed behind our back; drop the stale key
+            index.pop(key, None)
+        return asset
+
+    # --- Batching -------------------------------------------------------
+
+    @contextmanager
+    def batch_updates(self):
+        """
+        Group many add_asset() calls into a single media_batch_imported signal.
+        Nested batches are flushed when the outermost one exits.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._pending_imports:
+                imported, self._pending_imports = self._pending_imports, []
+                self.media_batch_imported.emit(imported)
+
+    # --- Media pool API -------------------------------------------------
+
     def add_asset(self, asset: Dict):
         """
         Add an asset to the media pool and notify listeners.
+        Inside batch_updates() the notification is deferred and batched.
         """
+        assets = self._assets()
         asset_id = asset["id"]
-        self.state["media_pool"]["assets"][asset_id] = asset
-        self.media_imported.emit(asset)
+        previous = assets.get(asset_id)
+        if previous is not None:
+            self._unindex_asset(previous)
+        assets[asset_id] = asset
+        self._index_asset(asset)
+
+        if self._batch_depth:
+            self._pending_imports.append(asset)
+        else:
+            self.media_imported.emit(asset)
+
+    def add_assets(self, assets: List[Dict]):
+        """Add many assets with a single batched notification."""
+        with self.batch_updates():
+            for asset in assets:
+                self.add_asset(asset)
 
     def get_assets(self) -> List[Dict]:
-        return list(self.state["media_pool"]["assets"].values())
+        return list(self._assets().values())
 
     def get_asset(self, asset_id: str) -> Dict:
-        return self.state["media_pool"]["assets"].get(asset_id)
+        return self._assets().get(asset_id)
 
     def find_asset_by_path(self, file_path: str) -> Dict:
         """
@@ -47,17 +154,30 @@ class StateManager(QObject):
         """
         if not file_path:
             return None
-        for asset in self.state["media_pool"]["assets"].values():
-            if asset.get("target_url") == file_path:
-                return asset
-        return None
+        asset = self._lookup(self._by_target_url, file_path)
+        if asset is not None:
+            return asset
+        normalized = normalize_media_path(file_path)
+        return self._lookup(self._by_path, normalize_media_path(file_path))
+
+    def clear_assets(self):
+        """Empty the media pool (e.g. before another project is opened)."""
+        assets = self._assets()
+        removed = list(assets.values())
+        assets.clear()
+        self.rebuild_indexes()
+        if removed:
+            self.media_cleared.emit(removed)
 
     def remove_asset(self, asset_id: str):
         """
         Remove an asset from the media pool if it exists.
         """
-        if asset_id in self.state["media_pool"]["assets"]:
-            del self.state["media_pool"]["assets"][asset_id]
+        assets = self._assets()
+        asset = assets.pop(asset_id, None)
+        if asset is not None:
+            self._unindex_asset(asset)
+            self.media_removed.emit(asset)
 
 
 # Global instance
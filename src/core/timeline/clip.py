@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 import uuid
 from typing import Optional
 
@@ -56,3 +56,19 @@ class Clip:
     def length(self) -> float:
         """Effective length of the clip on timeline (out - in)."""
         return self.out_point - self.in_point
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for serialization."""
+        return {name: getattr(self, name) for name in _CLIP_FIELD_NAMES}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Clip":
+        """Create from dictionary, ignoring unknown keys from newer formats."""
+        known = {key: value for key, value in data.items() if key in _CLIP_FIELD_NAMES}
+        known.setdefault("asset_id", "")
+        known.setdefault("name", "Clip")
+        known.setdefault("duration", 0.0)
+        return cls(**known)
+
+
+_CLIP_FIELD_NAMES = tuple(f.name for f in fields(Clip))
@@ -0,0 +1,59 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Optional
+from .clip import Clip
+
+
+class ClipIntervalIndex:
+    """
+    Start-sorted index over a track's clips for viewport queries.
+    Lookups cost O(log n + k) where k is the number of clips in range,
+    so timeline painting scales with visible clips, not track size.
+    """
+
+    def __init__(self, clips: Iterable[Clip] = ()):
+        self.rebuild(clips)
+
+    def rebuild(self, clips: Iterable[Clip]):
+        # Tracks keep clips sorted already, so this sort is effectively linear
+        self._clips: List[Clip] = sorted(clips, key=lambda c: c.start_time)
+        self._starts: List[float] = [c.start_time for c in self._clips]
+        self.max_length = 0.0
+        self.end_time = 0.0
+        for clip in self._clips:
+            length = clip.length
+            if length > self.max_length:
+                self.max_length = length
+            end = clip.start_time + length
+            if end > self.end_time:
+                self.end_time = end
+
+    def __len__(self) -> int:
+        return len(self._clips)
+
+    @property
+    def clips(self) -> List[Clip]:
+        return self._clips
+
+    def query(self, start: float, end: float, min_length: float = 0.0) -> List[Clip]:
+        """
+        Clips intersecting [start, end) in timeline seconds, in start order.
+        min_length widens each clip to at least that many seconds, matching
+        the minimum width used when drawing very short clips.
+        """
+        reach = max(self.max_length, min_length)
+        lo = bisect_left(self._starts, start - reach)
+        hi = bisect_left(self._starts, end)
+        return [
+            clip for clip in self._clips[lo:hi]
+            if clip.start_time + max(clip.length, min_length) > start
+        ]
+
+    def clip_at(self, time_seconds: float, min_length: float = 0.0) -> Optional[Clip]:
+        """Topmost (last drawn) clip covering time_seconds, or None."""
+        reach = max(self.max_length, min_length)
+        lo = bisect_left(self._starts, time_seconds - reach)
+        hi = bisect_right(self._starts, time_seconds)
+        for clip in reversed(self._clips[lo:hi]):
+            if time_seconds < clip.start_time + max(clip.length, min_length):
+                return clip
+        return None
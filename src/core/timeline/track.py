@@ -9,6 +9,7 @@ class Track:
     Manages a list of clips.
     """
     def __init__(self, name: str = "Track", is_audio: bool = False):
+        self.id = str(uuid.uuid4())
         self.name = name
         self.is_audio = is_audio
         self.clips: List[Clip] = []
@@ -108,13 +108,17 @@ class TranscriptionWorker(QThread):
         try:
             from src.core.ai.transcription import transcription_service
             from src.core.ai.translation import RateLimitError
+            from src.core.ai.translation_engine import INTERACTIVE_RETRY_SECONDS, RetryPolicy
             
             if self.translate_to:
                 self.progress.emit(f"🎯 Đang transcribe và dịch sang {self.translate_to}...")
+                # Short retry budget: the user is offered another provider once it runs out
+                retry = RetryPolicy(INTERACTIVE_RETRY_SECONDS, on_retry=self._on_retry)
                 try:
                     segments = transcription_service.transcribe_and_translate(
                         self.file_path, 
-                        target_language=self.translate_to
+                        target_language=self.translate_to,
+                        retry=retry,
                     )
                 except RateLimitError as e:
                     self.rate_limit.emit(e.provider)
@@ -131,6 +135,9 @@ class TranscriptionWorker(QThread):
         except Exception as e:
             self.error.emit(str(e))
 
+    def _on_retry(self, provider: str, attempt: int, delay: float):
+        self.progress.emit(f"⏳ {provider} đang giới hạn tốc độ, thử lại lần {attempt} sau {delay:.0f}s...")
+
 
 class TTSWorker(QThread):
     """Worker thread for TTS to avoid blocking UI."""
@@ -2,6 +2,7 @@ from PyQt6.QtWidgets import (
     QDialog,
     QVBoxLayout,
     QHBoxLayout,
+    QCheckBox,
     QLabel,
     QLineEdit,
     QPushButton,
@@ -23,6 +24,7 @@ class ExportDialog(QDialog):
         
         # Connect signals
         render_engine.progress_updated.connect(self.update_progress)
+        render_engine.render_stats.connect(self.update_stats)
         render_engine.render_finished.connect(self.on_render_finished)
 
     def setup_ui(self):
@@ -72,8 +74,30 @@ class ExportDialog(QDialog):
         self.speed_combo.addItem("2.0x", 2.0)
         self.speed_combo.setCurrentIndex(2)  # 1.0x
         settings_layout.addWidget(self.speed_combo)
+
+        # Encoder: libx264 unless the user opts into hardware encoding
+        settings_layout.addWidget(QLabel("Encoder:"))
+        self.encoder_combo = BoundedComboBox()
+        self.encoder_combo.addItem("CPU (x264)", "cpu")
+        self.encoder_combo.addItem("Hardware (if available)", "auto")
+        settings_layout.addWidget(self.encoder_combo)
         
         layout.addLayout(settings_layout)
+
+        # Segment cache (opt-in): keeps encoded chunks of long exports for re-exports
+        cache_layout = QHBoxLayout()
+        self.cache_check = QCheckBox("Reuse unchanged segments on re-export")
+        self.cache_check.setToolTip("Keeps encoded segments of long exports on disk so the next export only re-encodes what changed.")
+        cache_layout.addWidget(self.cache_check)
+        cache_layout.addStretch()
+        self.cache_label = QLabel()
+        self.cache_label.setStyleSheet("color: #71717a; font-size: 11px;")
+        cache_layout.addWidget(self.cache_label)
+        self.clear_cache_btn = QPushButton("Clear Cache")
+        self.clear_cache_btn.clicked.connect(self.clear_segment_cache)
+        cache_layout.addWidget(self.clear_cache_btn)
+        layout.addLayout(cache_layout)
+        self.update_cache_size()
         
         # Progress Section
         self.progress_container = QWidget()
@@ -121,7 +145,7 @@ class ExportDialog(QDialog):
         btn_layout.addStretch()
         
         self.cancel_btn = QPushButton("Cancel")
-        self.cancel_btn.clicked.connect(self.reject)
+        self.cancel_btn.clicked.connect(self.on_cancel)
         btn_layout.addWidget(self.cancel_btn)
         
         self.export_btn = QPushButton("Export")
@@ -193,6 +217,9 @@ class ExportDialog(QDialog):
                             "scale": transform.get("scale", 1.0),
                             "rotation": transform.get("rotation", 0),
                             "opacity": transform.get("opacity", 1.0),
+                            # Optional timing; stickers without it span the whole video
+                            "start_time": sticker_item.sticker_data.get("start_time"),
+                            "duration": sticker_item.sticker_data.get("duration"),
                         })
         except Exception as e:
             print(f"Error collecting stickers: {e}")
@@ -213,6 +240,7 @@ class ExportDialog(QDialog):
                                         "start_time": clip.start_time,
                                         "duration": clip.length,
                                         "text_content": clip.text_content or clip.name,
+                                        "font_color": getattr(clip, "font_color", "#FFFFFF"),
                                     })
                             print(f"Collected {len(subtitles_data)} subtitles for burning")
                             break
@@ -251,10 +279,13 @@ class ExportDialog(QDialog):
             "resolution": resolution,
             "fps": "original" if self.fps_combo.currentText().startswith("Original") else int(self.fps_combo.currentText()),
             "speed": float(self.speed_combo.currentData() or 1.0),
+            "encoder": self.encoder_combo.currentData() or "cpu",
+            "segment_cache": self.cache_check.isChecked(),
         }
         
         # UI State - show loading
         self.export_btn.setEnabled(False)
+        self.clear_cache_btn.setEnabled(False)
         self.cancel_btn.setText("Cancel Export")
         self.progress_container.show()
         self.progress_bar.setValue(0)
@@ -262,29 +293,52 @@ class ExportDialog(QDialog):
         self.status_label.setStyleSheet("color: #fbbf24; font-size: 13px; font-weight: bold;")
         self.time_label.setText("⏳ Video encoding in progress. Do not close this window.")
         
-        # Store start time for duration estimate
-        import time
-        self._export_start_time = time.time()
-        
         # Start Render (with stickers, subtitles, and audio tracks)
         render_engine.render_timeline(timeline_clips, output_path, settings, stickers_data, subtitles_data, audio_tracks_data)
 
+    def on_cancel(self):
+        """Cancel the running export, or close the dialog when idle."""
+        if not self.export_btn.isEnabled() and render_engine.cancel_render():
+            self.status_label.setText("⏹ Cancelling export...")
+            return
+        self.reject()
+
+    def update_cache_size(self):
+        cache = render_engine.segment_cache
+        used_mb = cache.size() / (1024 * 1024)
+        limit_mb = cache.max_bytes / (1024 * 1024)
+        self.cache_label.setText(f"Cache: {used_mb:.0f} / {limit_mb:.0f} MB")
+
+    def clear_segment_cache(self):
+        render_engine.segment_cache.clear()
+        self.update_cache_size()
+
     def update_progress(self, value):
         self.progress_bar.setValue(value)
-        
-        # Update time estimate
-        import time
-        if hasattr(self, '_export_start_time') and value > 0:
-            elapsed = time.time() - self._export_start_time
-            if value < 100:
-                estimated_total = elapsed / (value / 100)
-                remaining = estimated_total - elapsed
-                mins = int(remaining // 60)
-                secs = int(remaining % 60)
-                self.time_label.setText(f"⏳ Estimated time remaining: {mins}m {secs}s")
+
+    def update_stats(self, stats):
+        """Show ETA and throughput reported by ffmpeg's progress stream."""
+        if stats.get("finished"):
+            return
+        parts = []
+        eta = stats.get("eta_seconds")
+        if eta is not None:
+            mins = int(eta // 60)
+            secs = int(eta % 60)
+            parts.append(f"⏳ Estimated time remaining: {mins}m {secs}s")
+        if stats.get("fps"):
+            parts.append(f"{stats['fps']:.0f} fps")
+        if stats.get("speed"):
+            parts.append(f"{stats['speed']:.2f}x")
+        if stats.get("bitrate_kbps"):
+            parts.append(f"{stats['bitrate_kbps']:.0f} kbit/s")
+        if parts:
+            self.time_label.setText(" · ".join(parts))
 
     def on_render_finished(self, success, message):
         self.export_btn.setEnabled(True)
+        self.clear_cache_btn.setEnabled(True)
+        self.update_cache_size()
         self.cancel_btn.setText("Close")
         if success:
             self.status_label.setText("✅ Export completed successfully!")
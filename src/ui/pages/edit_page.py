@@ -1,7 +1,13 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QSplitter, QTabWidget, QLabel, QFrame, QToolButton, QButtonGroup, QHBoxLayout
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QSplitter, QTabWidget, QLabel, QFrame, QToolButton, QButtonGroup, QHBoxLayout, QFileDialog, QMessageBox
+from PyQt6.QtCore import Qt, QSize, QTimer, pyqtSignal
+from PyQt6.QtGui import QKeySequence, QShortcut
 import qtawesome as qta
 
+from src.core.logging_utils import get_logger
+from src.core.project import project_store, PROJECT_EXTENSION
+from src.core.settings.shortcuts import shortcut_manager
+from src.core.state import state_manager
+
 from ..panels.media_pool import MediaPool
 from ..panels.player import Player
 from ..panels.inspector import Inspector
@@ -9,10 +15,19 @@ from ..panels.timeline import Timeline
 from ..panels.effects import Effects
 from ..panels.text_panel import TextPanel
 
+logger = get_logger(__name__)
+
 class EditPage(QWidget):
+    AUTOSAVE_INTERVAL_MS = 60_000
+
+    # Emitted from the media pool hydration thread (project path, assets);
+    # delivered on the UI thread.
+    assets_hydrated = pyqtSignal(str, list)
+
     def __init__(self):
         super().__init__()
         self.setup_ui()
+        self.setup_project_persistence()
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -100,6 +115,75 @@ class EditPage(QWidget):
         if hasattr(self.inspector, "aspect_ratio_changed"):
             self.inspector.aspect_ratio_changed.connect(self.player.set_aspect_ratio)
 
+    def setup_project_persistence(self):
+        """Bind save/open shortcuts and start the delta autosave timer."""
+        QShortcut(QKeySequence(shortcut_manager.get_shortcut("save")), self, activated=self.save_project)
+        QShortcut(QKeySequence(shortcut_manager.get_shortcut("open")), self, activated=self.open_project)
+        self.assets_hydrated.connect(self._on_assets_hydrated)
+
+        self._autosave_timer = QTimer(self)
+        self._autosave_timer.setInterval(self.AUTOSAVE_INTERVAL_MS)
+        self._autosave_timer.timeout.connect(self.autosave_project)
+        self._autosave_timer.start()
+
+    def _project_snapshot(self) -> dict:
+        timeline_widget = self.timeline.timeline_widget
+        return {
+            "tracks": timeline_widget.tracks,
+            "project": dict(state_manager.state["project"]),
+            "assets": state_manager.get_assets(),
+            "stickers": self.player.get_sticker_clips(),
+        }
+
+    def save_project(self, path: str = None):
+        path = path or project_store.current_path
+        if not path:
+            path, _ = QFileDialog.getSaveFileName(
+                self, "Save Project", "", f"Video Project (*{PROJECT_EXTENSION})"
+            )
+            if not path:
+                return None
+        try:
+            return project_store.save(path, **self._project_snapshot())
+        except OSError as e:
+            QMessageBox.critical(self, "Save Project", f"Failed to save project:\n{e}")
+            return None
+
+    def autosave_project(self):
+        timeline_widget = self.timeline.timeline_widget
+        if not any(track.clips for track in timeline_widget.tracks):
+            return
+        # Serializing and writing happen off the UI thread
+        project_store.autosave_in_background(**self._project_snapshot())
+
+    def open_project(self, path: str = None):
+        if not path:
+            path = QFileDialog.getExistingDirectory(self, "Open Project")
+            if not path:
+                return
+        try:
+            document = project_store.load(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Open Project", f"Failed to open project:\n{e}")
+            return
+
+        # Timeline first - assets hydrate in the background afterwards,
+        # into a pool emptied of the previous project's media
+        state_manager.clear_assets()
+        state_manager.state["project"].update(document.project)
+        self.timeline.timeline_widget.load_tracks(document.tracks)
+        self.player.load_stickers(document.stickers)
+        self.timeline._update_player_subtitles()
+        project_store.hydrate_media_pool(
+            document.path, lambda assets: self.assets_hydrated.emit(document.path, assets)
+        )
+
+    def _on_assets_hydrated(self, path: str, assets: list):
+        if path != project_store.current_path:
+            # A project opened since then owns the pool now
+            return
+        state_manager.add_assets([a for a in assets if state_manager.get_asset(a["id"]) is None])
+
     def on_timeline_seek(self, time_seconds: float, clip):
         self.player.seek_to_timeline_time(time_seconds, clip)
 
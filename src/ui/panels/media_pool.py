@@ -10,6 +10,7 @@ from urllib.parse import urlparse
 from src.core.state import state_manager
 from src.core.api.stock_api import stock_api
 from src.ui.threads import IngestionThread, StockDownloadThread
+from src.ui.timeline.clip_widget import release_waveform
 
 
 class AssetItemWidget(QWidget):
@@ -139,6 +140,9 @@ class MediaPool(QWidget):
         
         # Connect to State Manager (Keep original connection)
         state_manager.media_imported.connect(self.on_asset_imported)
+        state_manager.media_batch_imported.connect(self.on_assets_imported)
+        state_manager.media_removed.connect(self.on_asset_removed)
+        state_manager.media_cleared.connect(self.on_assets_cleared)
         self.stock_download_thread = None
 
     def setup_ui(self):
@@ -281,21 +285,38 @@ class MediaPool(QWidget):
             
     def import_media(self, file_paths):
         # Skip files already in the media pool to prevent duplicates
-        existing_paths = {a["target_url"] for a in state_manager.get_assets()}
-        new_files = [p for p in file_paths if p not in existing_paths]
+        new_files = [p for p in file_paths if state_manager.find_asset_by_path(p) is None]
         if not new_files:
             return
 
         # Start Ingestion Thread
         self.thread = IngestionThread(new_files)
-        self.thread.asset_processed.connect(self.handle_processed_asset)
+        self.thread.assets_processed.connect(self.handle_processed_assets)
         self.thread.start()
         
-    def handle_processed_asset(self, asset):
-        # Add to State Manager
-        state_manager.add_asset(asset)
+    def handle_processed_assets(self, assets):
+        # Add to State Manager: one media_batch_imported for the whole import
+        state_manager.add_assets(assets)
         
     def on_asset_imported(self, asset):
+        self._add_asset_item(asset)
+
+        # Re-apply filter
+        self.filter_assets()
+
+    def on_assets_imported(self, assets):
+        """Batched import: add all rows with repaints suspended, filter once."""
+        self.asset_list.setUpdatesEnabled(False)
+        try:
+            for asset in assets:
+                self._add_asset_item(asset)
+        finally:
+            self.asset_list.setUpdatesEnabled(True)
+        self.filter_assets()
+
+    def _add_asset_item(self, asset):
+        if asset["id"] in self.items_by_id:
+            return
         # Update UI
         item = QListWidgetItem(asset["name"])
         item.setData(Qt.ItemDataRole.UserRole, asset["id"])
@@ -320,9 +341,6 @@ class MediaPool(QWidget):
         self.asset_list.setItemWidget(item, widget)
         self.items_by_id[asset["id"]] = item
 
-        # Re-apply filter
-        self.filter_assets()
-
     def filter_assets(self):
         search_text = self.search_input.text().lower()
         
@@ -339,13 +357,24 @@ class MediaPool(QWidget):
 
     def remove_asset(self, asset_id: str):
         """
-        Remove asset from state and list view.
+        Remove asset from state; the list view follows through media_removed.
         """
         state_manager.remove_asset(asset_id)
-        item = self.items_by_id.pop(asset_id, None)
+
+    def on_asset_removed(self, asset):
+        """Drop the asset's row (and its thumbnail icon) and its shared waveform pixmap."""
+        item = self.items_by_id.pop(asset["id"], None)
         if item:
             row = self.asset_list.row(item)
             self.asset_list.takeItem(row)
+        release_waveform((asset.get("metadata") or {}).get("waveformPath"))
+
+    def on_assets_cleared(self, assets):
+        """The whole pool was emptied: drop every row at once."""
+        self.asset_list.clear()
+        self.items_by_id.clear()
+        for asset in assets:
+            release_waveform((asset.get("metadata") or {}).get("waveformPath"))
 
     def search_stock(self):
         query = self.stock_search_input.text().strip()
@@ -382,6 +382,14 @@ class StickerItem(QGraphicsObject):
         self.prepareGeometryChange()
         self.update()
 
+    def set_rotation(self, degrees: float):
+        self._rotation = degrees
+        self.update()
+
+    def set_opacity(self, opacity: float):
+        self._opacity = max(0.0, min(1.0, opacity))
+        self.update()
+
     def get_transform_data(self) -> dict:
         """Return current transform data for saving."""
         pos = self.pos()
@@ -608,6 +616,38 @@ class Player(QFrame):
         
         return sticker_item
 
+    def get_sticker_clips(self) -> list:
+        """Snapshot canvas stickers as StickerClip objects (for project save)."""
+        clips = []
+        for sticker_item in self.stickers:
+            transform = sticker_item.get_transform_data()
+            clips.append(StickerClip(
+                id=str(sticker_item.sticker_id),
+                name=sticker_item.sticker_data.get("name", "Sticker"),
+                sticker_type=sticker_item.sticker_type,
+                content=sticker_item.content,
+                position_x=transform["position_x"],
+                position_y=transform["position_y"],
+                scale=transform["scale"],
+                rotation=transform["rotation"],
+                opacity=transform["opacity"],
+            ))
+        return clips
+
+    def load_stickers(self, sticker_clips: list):
+        """Replace canvas stickers with saved StickerClip objects."""
+        for sticker_item in list(self.stickers):
+            self.remove_sticker(sticker_item)
+        for sticker in sticker_clips:
+            sticker_item = self.add_sticker(
+                {"id": sticker.id, "name": sticker.name, "content": sticker.content, "type": sticker.sticker_type},
+                sticker.position_x,
+                sticker.position_y,
+            )
+            sticker_item.set_scale(sticker.scale)
+            sticker_item.set_rotation(sticker.rotation)
+            sticker_item.set_opacity(sticker.opacity)
+
     def remove_sticker(self, sticker_item):
         """Remove a sticker from the canvas."""
         if sticker_item in self.stickers:
@@ -151,7 +151,7 @@ class QueueTaskWidget(QFrame):
             self.progress_bar.hide()
         
         # Cancel button visibility
-        if self.task.status in [TaskStatus.PENDING]:
+        if self.task.status in [TaskStatus.PENDING, TaskStatus.RUNNING]:
             self.cancel_btn.show()
         else:
             self.cancel_btn.hide()
@@ -1,9 +1,14 @@
 import os
 from PyQt6.QtWidgets import QFrame, QVBoxLayout, QLabel, QHBoxLayout, QPushButton, QWidget, QMessageBox
-from PyQt6.QtCore import Qt, pyqtSlot
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot
 from src.ui.timeline.timeline_widget import TimelineWidget
 
 class Timeline(QFrame):
+    # Transcribed segments, emitted from the queue worker as they are produced
+    transcription_batch = pyqtSignal(list)
+    # Emitted from the queue worker before a run streams its first batch
+    transcription_started = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.setObjectName("panel")
@@ -14,6 +19,9 @@ class Timeline(QFrame):
         self._transcription_worker = None
         self._tts_worker = None
         self._progress_dialog = None
+        self._streaming_subtitles = False
+        self.transcription_batch.connect(self._on_transcription_batch)
+        self.transcription_started.connect(self._on_transcription_started)
         
         # Header
         header_container = QWidget()
@@ -129,6 +137,7 @@ class Timeline(QFrame):
                 "video_path": video_path,
                 "language": language,
                 "translate_to": translate_to,
+                "duration": clip.duration,
                 "timeline_ref": self,
             }
         )
@@ -176,34 +185,71 @@ class Timeline(QFrame):
         if getattr(self, '_transcription_handler_registered', False):
             return
         self._transcription_handler_registered = True
+        # A failed or cancelled run never reaches the completion slot
+        queue_manager.task_updated.connect(self._on_queue_task_updated)
         
         def handle_transcription(data, progress_callback):
             from src.core.ai.transcription import transcription_service
+            from src.core.ai.translation import RateLimitError
+            from src.core.ai.translation_engine import INTERACTIVE_RETRY_SECONDS, RetryPolicy
+            from PyQt6.QtCore import QMetaObject, Qt, Q_ARG
             
             video_path = data["video_path"]
             language = data.get("language")
             translate_to = data.get("translate_to")
             timeline_ref = data.get("timeline_ref")
             
+            duration = data.get("duration") or 0
+            
             progress_callback(10)
             
             # Run transcription - use different method based on translate_to
             if translate_to:
-                segments = transcription_service.transcribe_and_translate(
+                # Short retry budget: the user is offered another provider once it runs out
+                retry = RetryPolicy(
+                    INTERACTIVE_RETRY_SECONDS,
+                    on_retry=lambda provider, attempt, delay: print(
+                        f"⏳ {provider} rate limited, retry {attempt} in {delay:.0f}s..."
+                    ),
+                )
+                stream = transcription_service.iter_transcribe_and_translate(
                     video_path,
-                    target_language=translate_to
+                    target_language=translate_to,
+                    retry=retry,
                 )
             else:
-                segments = transcription_service.transcribe(
+                stream = transcription_service.iter_transcribe(
                     video_path,
                     language=language
                 )
             
+            # Fill the subtitle track batch by batch while the rest is processed
+            if timeline_ref:
+                timeline_ref.transcription_started.emit()
+            segments = []
+            try:
+                for batch in stream:
+                    segments.extend(batch)
+                    if timeline_ref:
+                        timeline_ref.transcription_batch.emit(batch)
+                    if duration > 0:
+                        progress_callback(min(90, 10 + int(80 * batch[-1]["end"] / duration)))
+            except RateLimitError as e:
+                if not timeline_ref:
+                    raise
+                # Let the user decide on a fallback provider
+                QMetaObject.invokeMethod(
+                    timeline_ref,
+                    "_on_rate_limit",
+                    Qt.ConnectionType.QueuedConnection,
+                    Q_ARG(str, e.provider)
+                )
+                return
+            
             progress_callback(90)
             
             # Callback to timeline
             if timeline_ref:
-                from PyQt6.QtCore import QMetaObject, Qt
                 # Store segments in timeline for callback
                 timeline_ref._transcription_segments = segments
                 QMetaObject.invokeMethod(
@@ -307,16 +353,44 @@ class Timeline(QFrame):
         print(f"❌ OCR error: {error}")
         QMessageBox.critical(self, "OCR Error", f"Lỗi khi trích xuất subtitle:\n{error}")
     
+    @pyqtSlot()
+    def _on_transcription_started(self):
+        """Make the next streamed batch replace the subtitle track."""
+        self._streaming_subtitles = False
+
+    def _on_queue_task_updated(self, task):
+        """Stop streaming into the subtitle track when a transcription task fails."""
+        from src.core.queue_manager import TaskType, TaskStatus
+        if task.task_type == TaskType.TRANSCRIBE and task.status in (TaskStatus.FAILED, TaskStatus.CANCELLED):
+            self._streaming_subtitles = False
+
+    @pyqtSlot(list)
+    def _on_transcription_batch(self, segments: list):
+        """Add a batch of streamed transcription segments to the subtitle track."""
+        track = self.timeline_widget.main_track
+        if not segments or not track.clips:
+            return
+        clip = track.clips[0]
+        if self._streaming_subtitles:
+            self.timeline_widget.append_subtitle_segments(segments, start_offset=clip.start_time)
+        else:
+            # First batch of a run replaces the previous subtitle track
+            self._streaming_subtitles = True
+            self.timeline_widget.add_subtitle_track(segments, start_offset=clip.start_time)
+        self._update_player_subtitles()
+
     @pyqtSlot()
     def _on_queue_transcription_complete(self):
         """Called when queue transcription completes."""
         segments = getattr(self, '_transcription_segments', [])
+        streamed = self._streaming_subtitles
+        self._streaming_subtitles = False
         
         print(f"✅ Transcription complete! Found {len(segments)} subtitle segments.")
         
         if segments:
             track = self.timeline_widget.main_track
-            if track.clips:
+            if track.clips and not streamed:
                 clip = track.clips[0]
                 self.timeline_widget.add_subtitle_track(segments, start_offset=clip.start_time)
             
@@ -457,6 +531,7 @@ class Timeline(QFrame):
         if self._progress_dialog:
             self._progress_dialog.close()
     
+    @pyqtSlot(str)
     def _on_rate_limit(self, provider: str):
         """Handle rate limit error - ask user if they want to fallback to Google Translate."""
         if self._progress_dialog:
@@ -515,7 +590,12 @@ class Timeline(QFrame):
                 if dialog.should_sync_subtitles():
                     self._sync_text_to_subtitles(text)
                 
-                self.start_tts(text, voice)
+                # One line per subtitle: speak each line at its subtitle's time
+                segments = self._subtitle_segments(text)
+                if segments:
+                    self.start_voiceover(segments, voice)
+                else:
+                    self.start_tts(text, voice)
     
     def _get_subtitle_text_from_timeline(self) -> str:
         """Get all subtitle text from timeline's subtitle track."""
@@ -531,6 +611,29 @@ class Timeline(QFrame):
         
         return "\n".join(subtitle_texts) if subtitle_texts else ""
     
+    def _subtitle_segments(self, text: str) -> list:
+        """Subtitle timings with the lines of text, relative to the video clip.
+        
+        Empty when there is no subtitle track or the lines no longer match
+        its clips one for one.
+        """
+        track = self.timeline_widget.main_track
+        subtitles = next((t for t in self.timeline_widget.tracks if t.name == "Subtitles"), None)
+        if not track.clips or subtitles is None or not subtitles.clips:
+            return []
+        lines = text.strip().split('\n')
+        if len(lines) != len(subtitles.clips):
+            return []
+        offset = track.clips[0].start_time
+        return [
+            {
+                "start": clip.start_time - offset,
+                "end": clip.start_time - offset + clip.duration,
+                "text": line.strip(),
+            }
+            for clip, line in zip(subtitles.clips, lines)
+        ]
+    
     def _sync_text_to_subtitles(self, edited_text: str):
         """Sync edited text from TTS dialog back to subtitle clips on timeline.
         
@@ -598,6 +701,41 @@ class Timeline(QFrame):
             f"💡 Theo dõi tiến trình trong Queue panel (nút 📋 trên header)"
         )
     
+    def start_voiceover(self, segments: list, voice: str):
+        """Speak subtitle segments into one voice-over as long as the video, via the queue."""
+        from src.core.queue_manager import queue_manager, TaskType
+        import tempfile
+        import time
+        
+        clip = self.timeline_widget.main_track.clips[0]
+        output_path = os.path.join(tempfile.gettempdir(), f"voiceover_{int(time.time())}.wav")
+        
+        if not hasattr(self, '_tts_handler_registered'):
+            self._register_tts_handler()
+            self._tts_handler_registered = True
+        
+        queue_manager.add_task(
+            TaskType.TRANSLATE,  # Reuse TRANSLATE type for TTS
+            f"Voice-over: {len(segments)} lines",
+            {
+                "segments": segments,
+                "voice": voice,
+                "output_path": output_path,
+                "duration": clip.duration,
+                "start_time": clip.start_time,
+                "timeline_ref": self
+            }
+        )
+        
+        QMessageBox.information(
+            self, 
+            "Queue", 
+            f"✅ Đã thêm vào queue!\n\n"
+            f"📋 Task: Voice-over ({len(segments)} câu subtitle)\n"
+            f"🔊 Voice: {voice}\n\n"
+            f"💡 Theo dõi tiến trình trong Queue panel (nút 📋 trên header)"
+        )
+    
     def _register_tts_handler(self):
         """Register TTS handler with queue manager."""
         from src.core.queue_manager import queue_manager, TaskType
@@ -605,27 +743,37 @@ class Timeline(QFrame):
         def handle_tts(data: dict, progress_callback):
             from src.core.ai.tts import tts_service
             
-            text = data["text"]
             voice = data["voice"]
             output_path = data["output_path"]
+            segments = data.get("segments")
             
             progress_callback(20)
             
-            # Generate TTS
-            tts_service.generate_speech(text, output_path, voice=voice)
-            
-            progress_callback(80)
-            
-            # Get duration
-            try:
-                from mutagen.mp3 import MP3
-                audio = MP3(output_path)
-                duration = audio.info.length
-            except:
-                words = len(text.split())
-                duration = max(1.0, words * 0.4)
-            
-            progress_callback(100)
+            if segments:
+                # Subtitle lines, each placed at its start time in one WAV
+                voiceover = tts_service.generate_voiceover(
+                    segments, output_path, voice=voice, duration=data.get("duration")
+                )
+                duration = voiceover.duration
+                text = " ".join(seg["text"] for seg in segments)
+                progress_callback(100)
+            else:
+                text = data["text"]
+                # Generate TTS
+                tts_service.generate_speech(text, output_path, voice=voice)
+                
+                progress_callback(80)
+                
+                # Get duration
+                try:
+                    from mutagen.mp3 import MP3
+                    audio = MP3(output_path)
+                    duration = audio.info.length
+                except:
+                    words = len(text.split())
+                    duration = max(1.0, words * 0.4)
+                
+                progress_callback(100)
             
             # Callback to add clip to timeline
             timeline_ref = data.get("timeline_ref")
@@ -635,7 +783,8 @@ class Timeline(QFrame):
                 timeline_ref._tts_result = {
                     "output_path": output_path,
                     "duration": duration,
-                    "text": text
+                    "text": text,
+                    "start_time": data.get("start_time", 0.0)
                 }
                 QMetaObject.invokeMethod(
                     timeline_ref, 
@@ -675,6 +824,7 @@ class Timeline(QFrame):
             asset_id=output_path,
             name=f"🎤 {text[:20]}..." if len(text) > 20 else f"🎤 {text}",
             duration=duration,
+            start_time=result.get("start_time", 0.0),
             waveform_path=None
         )
         audio_track.clips.append(clip)
@@ -152,7 +152,8 @@ class DownloaderThread(QThread):
         self.finished.emit(success, self.filename)
 
 class IngestionThread(QThread):
-    asset_processed = pyqtSignal(dict)
+    # Every probed asset of the import at once, so the pool adds them in one batch
+    assets_processed = pyqtSignal(list)
     finished = pyqtSignal()
     
     def __init__(self, file_paths):
@@ -162,10 +163,13 @@ class IngestionThread(QThread):
         self.ingestion = MediaIngestion()
 
     def run(self):
+        assets = []
         for file_path in self.file_paths:
             asset = self.ingestion.probe_file(file_path)
             if asset:
-                self.asset_processed.emit(asset)
+                assets.append(asset)
+        if assets:
+            self.assets_processed.emit(assets)
         self.finished.emit()
 
 
@@ -1,102 +1,224 @@
+from collections import OrderedDict
 from PyQt6.QtWidgets import QFrame, QLabel, QHBoxLayout, QWidget
 from PyQt6.QtCore import Qt, QMimeData, pyqtSignal, QRect
 from PyQt6.QtGui import QDrag, QPainter, QPixmap, QColor, QPen, QBrush, QFont
 
+_waveform_cache = {}
+_clip_font = None
+
+
+def _get_clip_font() -> QFont:
+    # Built once; QFont needs a running QGuiApplication
+    global _clip_font
+    if _clip_font is None:
+        # Set explicit font to prevent Qt font size errors
+        _clip_font = QFont("Inter", 10)
+    return _clip_font
+
+
+def load_waveform(waveform_path):
+    """Load (and share) the waveform pixmap for a clip."""
+    if not waveform_path:
+        return None
+    cached = _waveform_cache.get(waveform_path)
+    if cached is None:
+        cached = QPixmap(waveform_path)
+        _waveform_cache[waveform_path] = cached
+    return cached
+
+
+def release_waveform(waveform_path):
+    """Drop a shared waveform pixmap (e.g. once its asset leaves the media pool)."""
+    if waveform_path:
+        _waveform_cache.pop(waveform_path, None)
+
+
+def clip_kind(clip) -> str:
+    """Visual category of a clip: "text", "audio" or "video"."""
+    clip_type = getattr(clip, 'clip_type', None)
+    if clip_type == "text" or getattr(clip, 'text_content', None):
+        return "text"
+    if getattr(clip, 'is_audio', False) or clip.asset_id.endswith(('.mp3', '.wav')):
+        return "audio"
+    return "video"
+
+
+def paint_clip(painter: QPainter, rect: QRect, clip, selected: bool = False, waveform_pixmap=None, exposed: QRect = None):
+    """
+    Draw a clip into rect. Shared by ClipWidget and the virtualized
+    track canvas so both render identically.
+    exposed limits the film-strip loop to the part actually being painted.
+    """
+    kind = clip_kind(clip)
+    is_audio = kind == "audio"
+
+    # Determine Colors based on Type
+    if kind == "text":
+        bg_color = QColor("#3d2f14")  # Dark Yellow/Orange
+        border_color = QColor("#fbbf24")  # Bright Yellow
+        accent_color = QColor("#f59e0b")
+    elif is_audio:
+        bg_color = QColor("#1e3a2f") # Dark Green
+        border_color = QColor("#10B981") # Bright Green
+        accent_color = QColor("#059669")
+    else:
+        bg_color = QColor("#2b3a4f") # Dark Blue
+        border_color = QColor("#58a6ff") # Bright Blue
+        accent_color = QColor("#1f6feb")
+
+    if selected:
+        bg_color = bg_color.lighter(130)
+        border_color = QColor("#FFFFFF")
+
+    # Draw Background
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QBrush(bg_color))
+    painter.drawRoundedRect(rect, 4, 4)
+
+    # Draw "Film Strip" holes for Video
+    if not is_audio:
+        painter.setBrush(QBrush(QColor(0, 0, 0, 50)))
+        first, last = 0, rect.width()
+        if exposed is not None:
+            first = max(0, (exposed.left() - rect.x()) // 15 * 15)
+            last = min(rect.width(), exposed.right() - rect.x() + 1)
+        bottom_y = rect.y() + rect.height() - 6
+        for x in range(first, last, 15):
+            # Top and bottom holes
+            painter.drawRect(rect.x() + x + 2, rect.y() + 2, 8, 4)
+            painter.drawRect(rect.x() + x + 2, bottom_y, 8, 4)
+
+    # Draw Waveform for Audio
+    if is_audio and waveform_pixmap:
+        target_rect = rect.adjusted(2, 10, -2, -10)
+        painter.setOpacity(0.8)
+        painter.drawPixmap(target_rect, waveform_pixmap)
+        painter.setOpacity(1.0)
+
+    # Draw Border
+    painter.setBrush(Qt.BrushStyle.NoBrush)
+    pen = QPen(border_color)
+    pen.setWidth(2 if selected else 1)
+    painter.setPen(pen)
+    painter.drawRoundedRect(rect, 4, 4)
+
+    # Draw Text
+    painter.setPen(QColor("#FFFFFF"))
+    painter.setFont(_get_clip_font())
+    text_rect = rect.adjusted(10, 0, -10, 0)
+    painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, clip.name)
+
+
+class ClipLayerCache:
+    """
+    LRU of pre-rendered clip pixmaps so a repaint is a single blit.
+    Keyed by everything that changes the picture: size (which encodes
+    zoom), selection state, clip type, label, waveform and device pixel
+    ratio. A changed key simply misses; stale layers age out of the LRU.
+    """
+    MAX_LAYER_WIDTH = 4096  # px; wider clips are painted directly
+    DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._layers = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def layer_key(clip, width: int, height: int, selected: bool, device_pixel_ratio: float = 1.0):
+        return (
+            clip_kind(clip),
+            width,
+            height,
+            bool(selected),
+            clip.name,
+            clip.waveform_path,
+            device_pixel_ratio,
+        )
+
+    def get_layer(self, clip, width: int, height: int, selected: bool, device_pixel_ratio: float = 1.0):
+        """Return the cached layer pixmap, rendering it on a miss. None if too wide."""
+        if width <= 0 or height <= 0 or width > self.MAX_LAYER_WIDTH:
+            return None
+        key = self.layer_key(clip, width, height, selected, device_pixel_ratio)
+        layer = self._layers.get(key)
+        if layer is not None:
+            self._layers.move_to_end(key)
+            self.hits += 1
+            return layer
+
+        self.misses += 1
+        layer = QPixmap(int(width * device_pixel_ratio), int(height * device_pixel_ratio))
+        layer.setDevicePixelRatio(device_pixel_ratio)
+        layer.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(layer)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        paint_clip(painter, QRect(0, 0, width, height), clip, selected, load_waveform(clip.waveform_path))
+        painter.end()
+
+        self._layers[key] = layer
+        self._bytes += self._layer_bytes(layer)
+        while self._bytes > self.budget_bytes and len(self._layers) > 1:
+            _, evicted = self._layers.popitem(last=False)
+            self._bytes -= self._layer_bytes(evicted)
+        return layer
+
+    def draw(self, painter: QPainter, rect: QRect, clip, selected: bool = False, exposed: QRect = None):
+        """Blit the clip layer into rect (falls back to direct painting for huge clips)."""
+        dpr = painter.device().devicePixelRatioF() if painter.device() else 1.0
+        layer = self.get_layer(clip, rect.width(), rect.height(), selected, dpr)
+        if layer is None:
+            painter.save()
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            paint_clip(painter, rect, clip, selected, load_waveform(clip.waveform_path), exposed)
+            painter.restore()
+            return
+        painter.drawPixmap(rect.topLeft(), layer)
+
+    def clear(self):
+        self._layers.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._layers)
+
+    @staticmethod
+    def _layer_bytes(layer: QPixmap) -> int:
+        return layer.width() * layer.height() * 4
+
+
+# Shared by all clip widgets and track canvases
+clip_layer_cache = ClipLayerCache()
+
+
 class ClipWidget(QFrame):
     """
     Visual representation of a Clip on the timeline.
+    Tracks paint clips directly (see TrackCanvas); this widget remains for
+    standalone use of a single clip.
     """
     clicked = pyqtSignal(object) # Emits self (ClipWidget)
     clicked_at = pyqtSignal(object, float) # Emits self and local x position
-    _waveform_cache = {}
+    _waveform_cache = _waveform_cache
 
     def __init__(self, clip, parent=None):
         super().__init__(parent)
         self.clip = clip
         self.is_selected = False
-        self.waveform_pixmap = None
-        
+        self.waveform_pixmap = load_waveform(self.clip.waveform_path)
+
         self.setObjectName("clip_widget")
         # No stylesheet here, we use paintEvent for full control
-        
-        # Load waveform if exists
-        if self.clip.waveform_path:
-            cached = self._waveform_cache.get(self.clip.waveform_path)
-            if cached is None:
-                cached = QPixmap(self.clip.waveform_path)
-                self._waveform_cache[self.clip.waveform_path] = cached
-            self.waveform_pixmap = cached
-            
-        # We don't use layout for labels anymore, we draw them
-        
+
     def set_selected(self, selected: bool):
         self.is_selected = selected
         self.update() # Trigger repaint
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        rect = self.rect()
-        
-        # Determine Colors based on Type
-        clip_type = getattr(self.clip, 'clip_type', None)
-        is_text = clip_type == "text" or getattr(self.clip, 'text_content', None)
-        is_audio = getattr(self.clip, 'is_audio', False) or self.clip.asset_id.endswith(('.mp3', '.wav'))
-        
-        if is_text:
-            bg_color = QColor("#3d2f14")  # Dark Yellow/Orange
-            border_color = QColor("#fbbf24")  # Bright Yellow
-            accent_color = QColor("#f59e0b")
-        elif is_audio:
-            bg_color = QColor("#1e3a2f") # Dark Green
-            border_color = QColor("#10B981") # Bright Green
-            accent_color = QColor("#059669")
-        else:
-            bg_color = QColor("#2b3a4f") # Dark Blue
-            border_color = QColor("#58a6ff") # Bright Blue
-            accent_color = QColor("#1f6feb")
-            
-        if self.is_selected:
-            bg_color = bg_color.lighter(130)
-            border_color = QColor("#FFFFFF")
-            
-        # Draw Background
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.setBrush(QBrush(bg_color))
-        painter.drawRoundedRect(rect, 4, 4)
-        
-        # Draw "Film Strip" holes for Video
-        if not is_audio:
-            painter.setBrush(QBrush(QColor(0, 0, 0, 50)))
-            # Top holes
-            for x in range(0, rect.width(), 15):
-                painter.drawRect(x + 2, 2, 8, 4)
-            # Bottom holes
-            for x in range(0, rect.width(), 15):
-                painter.drawRect(x + 2, rect.height() - 6, 8, 4)
-        
-        # Draw Waveform for Audio
-        if is_audio and self.waveform_pixmap:
-            target_rect = rect.adjusted(2, 10, -2, -10)
-            painter.setOpacity(0.8)
-            painter.drawPixmap(target_rect, self.waveform_pixmap)
-            painter.setOpacity(1.0)
-            
-        # Draw Border
-        painter.setBrush(Qt.BrushStyle.NoBrush)
-        pen = QPen(border_color)
-        pen.setWidth(2 if self.is_selected else 1)
-        painter.setPen(pen)
-        painter.drawRoundedRect(rect, 4, 4)
-        
-        # Draw Text
-        painter.setPen(QColor("#FFFFFF"))
-        # Set explicit font to prevent Qt font size errors
-        font = QFont("Inter", 10)
-        painter.setFont(font)
-        text_rect = rect.adjusted(10, 0, -10, 0)
-        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, self.clip.name)
+        clip_layer_cache.draw(painter, self.rect(), self.clip, self.is_selected, event.rect())
 
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -105,6 +105,7 @@ class TimelineWidget(QFrame):
         # Data
         self.main_track = MagneticTrack("Main Track")
         self.tracks = [self.main_track]
+        self._track_widgets = []
         
         self.setup_ui()
 
@@ -184,6 +185,7 @@ class TimelineWidget(QFrame):
                 widget.pixels_per_second = self.pixels_per_second
                 widget.refresh()
             self.tracks_layout.addWidget(widget)
+        self._track_widgets = [self.tracks_layout.itemAt(i).widget() for i in range(self.tracks_layout.count())]
 
         # Update container size for proper scrolling
         self._update_timeline_width()
@@ -196,6 +198,9 @@ class TimelineWidget(QFrame):
         print(f"Timeline refreshed: {len(self.tracks)} tracks")
 
     def on_clip_selected(self, clip):
+        clip_id = clip.id if clip is not None else None
+        for widget in self._track_widgets:
+            widget.set_selected_clip(clip_id)
         self.clip_selected.emit(clip)
 
     def on_playhead_seek(self, time_seconds: float):
@@ -290,9 +295,18 @@ class TimelineWidget(QFrame):
         """
         # Remove existing subtitle tracks first
         self.tracks = [t for t in self.tracks if t.name != "Subtitles"]
-        
-        subtitle_track = Track("Subtitles")
-        self.tracks.append(subtitle_track)
+        self.tracks.append(Track("Subtitles"))
+        self.append_subtitle_segments(segments, start_offset)
+
+    def append_subtitle_segments(self, segments, start_offset=0.0):
+        """
+        Add clips to the end of the subtitle track (created if missing),
+        for transcripts that arrive in batches.
+        """
+        subtitle_track = next((t for t in self.tracks if t.name == "Subtitles"), None)
+        if subtitle_track is None:
+            subtitle_track = Track("Subtitles")
+            self.tracks.append(subtitle_track)
         
         for seg in segments:
             start = seg["start"]
@@ -313,6 +327,22 @@ class TimelineWidget(QFrame):
         self.refresh_tracks()
         self.playhead.raise_()
     
+    def load_tracks(self, tracks):
+        """
+        Replace all tracks (e.g. after opening a project).
+        The first magnetic track becomes the main track.
+        """
+        main_track = next((t for t in tracks if isinstance(t, MagneticTrack)), None)
+        if main_track is None:
+            main_track = MagneticTrack("Main Track")
+            tracks = [main_track] + list(tracks)
+        self.main_track = main_track
+        self.tracks = list(tracks)
+        history_manager.undo_stack.clear()
+        history_manager.redo_stack.clear()
+        self.refresh_tracks()
+        self.playhead.raise_()
+
     def set_zoom(self, value):
         # Value 1-100
         # Map to pixels_per_second 5 - 100
@@ -320,8 +350,12 @@ class TimelineWidget(QFrame):
         self.pixels_per_second = max(5, self.zoom_value)
         self.ruler.pixels_per_second = self.pixels_per_second
         self.ruler.update()
-        self.refresh_tracks()
-        self.playhead.raise_()
+        # Zoom only rescales: track canvases repaint their visible clips,
+        # no clip widgets are rebuilt.
+        for widget in self._track_widgets:
+            widget.set_pixels_per_second(self.pixels_per_second)
+        self._update_timeline_width()
+        self.set_playhead_time(self.playhead_time)
 
     def set_playhead_time(self, time_seconds: float):
         """
@@ -346,12 +380,7 @@ class TimelineWidget(QFrame):
         # Base width so empty timelines still look reasonable
         min_width = 120 + int(60 * self.pixels_per_second)  # 60s default
 
-        max_end = 0.0
-        for track in self.tracks:
-            for clip in track.clips:
-                end_time = clip.start_time + clip.length
-                if end_time > max_end:
-                    max_end = end_time
+        max_end = max((widget.end_time for widget in self._track_widgets), default=0.0)
 
         if max_end > 0:
             min_width = 120 + int(max_end * self.pixels_per_second) + 200
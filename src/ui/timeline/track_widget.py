@@ -1,13 +1,114 @@
-from PyQt6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QWidget, QPushButton
-from PyQt6.QtCore import Qt, QSize, pyqtSignal
-from PyQt6.QtGui import QIcon
-from .clip_widget import ClipWidget
+from PyQt6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QWidget, QPushButton, QApplication
+from PyQt6.QtCore import Qt, QSize, pyqtSignal, QRect, QMimeData
+from PyQt6.QtGui import QIcon, QPainter, QColor, QDrag
+from .clip_widget import clip_layer_cache
 from src.core.timeline.track import Track
+from src.core.timeline.interval_index import ClipIntervalIndex
+
+CLIP_MIN_WIDTH = 30  # px, very short clips are still clickable
+CLIP_TOP = 5
+CLIP_HEIGHT = 80
+
+
+class TrackCanvas(QWidget):
+    """
+    Virtualized clip area of a track.
+    Paints only the clips intersecting the exposed region (looked up through
+    an interval index) instead of keeping one child widget per clip, so
+    zoom, scroll and refresh cost scale with visible clips.
+    """
+    clip_clicked = pyqtSignal(object, float)  # Clip, timeline time at click
+
+    def __init__(self, track: Track, pixels_per_second=20, parent=None):
+        super().__init__(parent)
+        self.track = track
+        self.pixels_per_second = pixels_per_second
+        self.selected_clip_id = None
+        self.index = ClipIntervalIndex()
+        self._press_clip = None
+        self._press_pos = None
+        self.setObjectName("track_content")
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+    def rebuild_index(self):
+        self.index.rebuild(self.track.clips)
+
+    def set_pixels_per_second(self, pixels_per_second):
+        # The index is in seconds, so zoom needs no rebuild - just a repaint
+        self.pixels_per_second = max(1, pixels_per_second)
+        self.update()
+
+    def set_selected_clip(self, clip_id):
+        if clip_id != self.selected_clip_id:
+            self.selected_clip_id = clip_id
+            self.update()
+
+    def clip_rect(self, clip) -> QRect:
+        x_pos = int(clip.start_time * self.pixels_per_second)
+        width = max(CLIP_MIN_WIDTH, int(clip.length * self.pixels_per_second))
+        return QRect(x_pos, CLIP_TOP, width, CLIP_HEIGHT)
+
+    def visible_clips(self, rect: QRect = None):
+        rect = rect if rect is not None else self.visibleRegion().boundingRect()
+        pps = self.pixels_per_second
+        return self.index.query(rect.left() / pps, (rect.right() + 1) / pps, CLIP_MIN_WIDTH / pps)
+
+    def clip_at(self, x: float):
+        pps = self.pixels_per_second
+        return self.index.clip_at(x / pps, CLIP_MIN_WIDTH / pps)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        exposed = event.rect()
+        painter.fillRect(exposed, QColor("#121212"))
+        if self.track.is_hidden:
+            return
+        for clip in self.visible_clips(exposed):
+            clip_layer_cache.draw(
+                painter,
+                self.clip_rect(clip),
+                clip,
+                clip.id == self.selected_clip_id,
+                exposed,
+            )
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton or self.track.is_hidden:
+            super().mousePressEvent(event)
+            return
+        x = event.position().x()
+        clip = self.clip_at(x)
+        self._press_clip = clip
+        self._press_pos = event.position()
+        if clip is None:
+            super().mousePressEvent(event)
+            return
+        rect = self.clip_rect(clip)
+        ratio = max(0.0, min(1.0, (x - rect.x()) / max(1, rect.width())))
+        self.clip_clicked.emit(clip, clip.start_time + clip.length * ratio)
+        event.accept()
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() != Qt.MouseButton.LeftButton or self._press_clip is None:
+            return
+        if (event.position() - self._press_pos).manhattanLength() < QApplication.startDragDistance():
+            return
+        drag = QDrag(self)
+        mime = QMimeData()
+        mime.setText(str(self._press_clip.asset_id)) # Pass ID
+        drag.setMimeData(mime)
+        self._press_clip = None
+        drag.exec(Qt.DropAction.MoveAction)
+
+    def mouseReleaseEvent(self, event):
+        self._press_clip = None
+        super().mouseReleaseEvent(event)
+
 
 class TrackWidget(QFrame):
     """
     Visual representation of a Track.
-    Contains ClipWidgets.
+    Clips are painted by a virtualized TrackCanvas.
     """
     clip_selected = pyqtSignal(object) # Emits Clip object
     playhead_seek = pyqtSignal(float) # Emits timeline time in seconds
@@ -65,12 +166,10 @@ class TrackWidget(QFrame):
         
         self.layout.addWidget(header)
         
-        # Track Content Area - Use absolute positioning for clips!
-        self.content_area = QWidget()
-        self.content_area.setObjectName("track_content")
-        self.content_area.setStyleSheet("background-color: #121212;")
-        # NO layout manager - we'll use absolute positioning
-        
+        # Track Content Area - clips are painted, not child widgets
+        self.content_area = TrackCanvas(track, pixels_per_second)
+        self.content_area.clip_clicked.connect(self.on_clip_clicked)
+
         self.layout.addWidget(self.content_area)
 
         self.hidden_label = QLabel("Hidden", self.content_area)
@@ -106,52 +205,28 @@ class TrackWidget(QFrame):
         return btn
 
     def refresh(self):
+        """Re-read the track's clips (after edits) and repaint."""
         self.update_state_ui()
+        self.content_area.rebuild_index()
+        self.set_pixels_per_second(self.pixels_per_second)
 
-        if self.track.is_hidden:
-            self.content_area.setVisible(True)
-        else:
-            self.content_area.setVisible(True)
+    def set_pixels_per_second(self, pixels_per_second):
+        """Apply a zoom level without touching the clip index."""
+        self.pixels_per_second = pixels_per_second
+        max_end_time = self.content_area.index.end_time
 
-        # Clear existing clips (delete child widgets of content_area)
-        for child in self.content_area.findChildren(ClipWidget):
-            child.setParent(None)
-            child.deleteLater()
-        
-        # Sort clips by start_time
-        sorted_clips = sorted(self.track.clips, key=lambda c: c.start_time)
-        
-        # Calculate max end time for content area width
-        max_end_time = 0.0
-        for clip in sorted_clips:
-            end_time = clip.start_time + clip.length
-            if end_time > max_end_time:
-                max_end_time = end_time
-        
         # Set content area minimum width
         min_width = max(500, int(max_end_time * self.pixels_per_second) + 100)
         self.content_area.setMinimumWidth(min_width)
+        self.hidden_label.setVisible(self.track.is_hidden)
+        self.content_area.set_pixels_per_second(self.pixels_per_second)
 
-        if self.track.is_hidden:
-            self.hidden_label.show()
-            return
-        self.hidden_label.hide()
-        
-        # Position clips using ABSOLUTE POSITIONING (not layout!)
-        for clip in sorted_clips:
-            widget = ClipWidget(clip)
-            widget.setParent(self.content_area)
-            
-            # Calculate position and size
-            x_pos = int(clip.start_time * self.pixels_per_second)
-            width = max(30, int(clip.length * self.pixels_per_second))  # Min width 30px
-            
-            # Move clip to correct position (absolute positioning)
-            widget.move(x_pos, 5)  # 5px top padding
-            widget.setFixedSize(width, 80)
-            widget.clicked.connect(self.on_clip_clicked)
-            widget.clicked_at.connect(self.on_clip_clicked_at)
-            widget.show()
+    @property
+    def end_time(self) -> float:
+        return self.content_area.index.end_time
+
+    def set_selected_clip(self, clip_id):
+        self.content_area.set_selected_clip(clip_id)
 
     def update_state_ui(self):
         muted = getattr(self.track, "is_muted", False)
@@ -182,11 +257,6 @@ class TrackWidget(QFrame):
         self.track.is_hidden = checked
         self.refresh()
 
-    def on_clip_clicked(self, clip_widget):
-        self.clip_selected.emit(clip_widget.clip)
-
-    def on_clip_clicked_at(self, clip_widget, local_x: float):
-        width = max(1, clip_widget.width())
-        ratio = max(0.0, min(1.0, local_x / width))
-        time_seconds = clip_widget.clip.start_time + (clip_widget.clip.length * ratio)
+    def on_clip_clicked(self, clip, time_seconds: float):
+        self.clip_selected.emit(clip)
         self.playhead_seek.emit(time_seconds)
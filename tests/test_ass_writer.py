@@ -0,0 +1,127 @@
+import io
+import os
+import sys
+import unittest
+from typing import Iterator
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.export.ass_writer import (
+    AssSubtitleWriter,
+    ass_color,
+    format_ass_time,
+    to_centiseconds,
+)
+
+
+def _sub(start, duration, text, **extra):
+    return {"start_time": start, "duration": duration, "text_content": text, **extra}
+
+
+def _render(writer, subtitles, width=1080, height=1920):
+    f = io.StringIO()
+    writer.write(f, subtitles, width, height)
+    return f.getvalue()
+
+
+def _dialogues(document):
+    return [line for line in document.splitlines() if line.startswith("Dialogue:")]
+
+
+class TestAssTime(unittest.TestCase):
+    def test_centiseconds_round_instead_of_truncating(self):
+        # 0.29 * 100 is 28.999... in floating point
+        self.assertEqual(to_centiseconds(0.29), 29)
+        self.assertEqual(to_centiseconds(1.005), 100)
+        self.assertEqual(to_centiseconds(-1), 0)
+        self.assertEqual(to_centiseconds("bad"), 0)
+
+    def test_format(self):
+        self.assertEqual(format_ass_time(0), "0:00:00.00")
+        self.assertEqual(format_ass_time(to_centiseconds(3725.29)), "1:02:05.29")
+
+    def test_color(self):
+        self.assertEqual(ass_color("#FF8000"), "&H000080FF")
+        self.assertEqual(ass_color("not a color"), "&H00FFFFFF")
+
+
+class TestAssSubtitleWriter(unittest.TestCase):
+    def test_default_document_matches_player_style(self):
+        document = _render(AssSubtitleWriter(), [_sub(1.0, 2.0, "Hello {world}\nbye")])
+        self.assertIn("PlayResX: 1080\nPlayResY: 1920\n", document)
+        self.assertIn(
+            "Style: Default,Arial,56,&H00FFFFFF,&H000000FF,&H00000000,&H80000000,"
+            "1,0,0,0,100,100,0,0,1,3,2,2,20,20,40,1\n",
+            document,
+        )
+        self.assertEqual(
+            _dialogues(document),
+            ["Dialogue: 0,0:00:01.00,0:00:03.00,Default,,0,0,0,,Hello \\{world\\}\\Nbye"],
+        )
+
+    def test_events_sorted_and_empty_skipped(self):
+        writer = AssSubtitleWriter()
+        events = writer.events([_sub(5, 1, "b"), _sub(1, 1, "a"), _sub(2, 1, "  ")])
+        self.assertEqual([(start, text) for start, _, _, text in events], [(100, "a"), (500, "b")])
+
+    def test_adjacent_duplicates_merge(self):
+        writer = AssSubtitleWriter()
+        events = writer.events([
+            _sub(0, 1, "same"), _sub(1, 1, "same"), _sub(1.5, 1, "same"),
+            _sub(3, 1, "same"),  # gap: stays separate
+            _sub(4, 1, "same", font_color="#FF0000"),  # different style
+        ])
+        self.assertEqual([(start, end) for start, end, _, _ in events], [(0, 250), (300, 400), (400, 500)])
+
+    def test_style_table_is_deduplicated(self):
+        document = _render(AssSubtitleWriter(), [
+            _sub(0, 1, "a", font_color="#FF0000"),
+            _sub(1, 1, "b", font_color="#FF0000"),
+            _sub(2, 1, "c", font_size=12),
+            _sub(3, 1, "d"),
+        ])
+        styles = [line for line in document.splitlines() if line.startswith("Style:")]
+        self.assertEqual(len(styles), 3)
+        self.assertTrue(styles[1].startswith("Style: S1,Arial,56,&H000000FF,"))
+        self.assertTrue(styles[2].startswith("Style: S2,Arial,28,"))
+        self.assertEqual([line.split(",")[3] for line in _dialogues(document)], ["S1", "S1", "S2", "Default"])
+
+    def test_events_are_streamed(self):
+        writer = AssSubtitleWriter()
+        events = writer.events([_sub(i, 0.5, f"line {i}") for i in range(1000)])
+        self.assertIsInstance(events, Iterator)
+        self.assertEqual(next(events)[3], "line 0")
+
+    def test_one_shot_input_is_written_whole(self):
+        subtitles = [_sub(1, 1, "b", font_color="#FF0000"), _sub(0, 1, "a")]
+        document = _render(AssSubtitleWriter(), (sub for sub in subtitles))
+        self.assertEqual([line.split(",")[3] for line in _dialogues(document)], ["Default", "S1"])
+
+    def test_rewrite_after_edits_only_normalizes_changed_subtitles(self):
+        writer = AssSubtitleWriter()
+        subtitles = [_sub(i, 0.5, f"line {i}", font_color="#FF0000" if i % 2 else None) for i in range(500)]
+        _render(writer, subtitles)
+        self.assertEqual(writer.normalized, 500)
+
+        subtitles[10] = dict(subtitles[10], text_content="edited")
+        subtitles[20] = dict(subtitles[20], font_size=30)
+        subtitles.append(_sub(600, 1, "new"))
+        document = _render(writer, subtitles)
+        self.assertEqual(writer.normalized, 503)
+        # Same document as a cold write
+        self.assertEqual(document, _render(AssSubtitleWriter(), subtitles))
+
+    def test_write_file(self):
+        writer = AssSubtitleWriter()
+        self.assertIsNone(writer.write_file([_sub(0, 1, "")], 640, 360))
+        path = writer.write_file([_sub(0, 1, "hi")], 640, 360)
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(len(_dialogues(f.read())), 1)
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,6 +9,7 @@ from PyQt6.QtWidgets import QApplication
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.core.api.stock_api import stock_api
+from src.core.state import state_manager
 from src.ui.panels.media_pool import MediaPool
 
 # Create App instance for UI tests
@@ -33,5 +34,16 @@ class TestAssetManagement(unittest.TestCase):
         pool.search_stock()
         self.assertEqual(pool.stock_list.count(), 5)
 
+    def test_media_pool_follows_removed_assets(self):
+        pool = MediaPool()
+        asset = {"id": "removed-1", "name": "clip.mp4", "target_url": "/tmp/removed_clip.mp4", "metadata": {}}
+        state_manager.add_asset(asset)
+        self.assertIn("removed-1", pool.items_by_id)
+        rows = pool.asset_list.count()
+
+        state_manager.remove_asset("removed-1")
+        self.assertNotIn("removed-1", pool.items_by_id)
+        self.assertEqual(pool.asset_list.count(), rows - 1)
+
 if __name__ == '__main__':
     unittest.main()
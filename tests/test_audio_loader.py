@@ -0,0 +1,166 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+import wave
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai.audio_loader import AudioFileCache, DecodedAudio, decode_pcm16, map_wav16, source_key
+from src.core.ai.transcript_cache import TranscriptCache, pcm_fingerprint, samples_fingerprint
+from src.core.ai.vad import read_pcm16
+
+# ffmpeg stand-in: streams a known int16 ramp to stdout in uneven pieces, or
+# writes a few bytes to the output file named last on the command line
+FAKE_FFMPEG = """#!{python}
+import sys
+args = sys.argv[1:]
+if "pipe:1" in args:
+    samples = bytearray()
+    for i in range({count}):
+        samples += (i % 30000).to_bytes(2, "little", signed=True)
+    out = sys.stdout.buffer
+    for first in range(0, len(samples), 70001):
+        out.write(samples[first:first + 70001])
+else:
+    with open(args[-1], "wb") as f:
+        f.write(b"x" * {size})
+sys.exit({code})
+"""
+
+
+def _write_wav(path, pcm, rate=16000):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.astype("<i2").tobytes())
+    return path
+
+
+class TestAudioLoader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _fake_ffmpeg(self, count=0, size=0, code=0):
+        path = os.path.join(self.temp_dir, f"ffmpeg_{count}_{size}_{code}")
+        with open(path, "w") as f:
+            f.write(FAKE_FFMPEG.format(python=sys.executable, count=count, size=size, code=code))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+        return path
+
+    def test_wav_is_memory_mapped(self):
+        pcm = (np.arange(16000 * 3) % 2000 - 1000).astype(np.int16)
+        path = _write_wav(os.path.join(self.temp_dir, "a.wav"), pcm)
+        mapped = map_wav16(path)
+        self.assertIsInstance(mapped, np.memmap)
+        np.testing.assert_array_equal(mapped, read_pcm16(path))
+        self.assertEqual(DecodedAudio(path).duration, 3.0)
+
+        self.assertIsNone(map_wav16(_write_wav(os.path.join(self.temp_dir, "b.wav"), pcm, rate=8000)))
+        other = os.path.join(self.temp_dir, "c.mp3")
+        with open(other, "wb") as f:
+            f.write(b"ID3 not a wav")
+        self.assertIsNone(map_wav16(other))
+
+    def test_wav_with_extra_chunks_and_pipe_header(self):
+        pcm = np.arange(1000, dtype=np.int16)
+        fmt = (1).to_bytes(2, "little") + (1).to_bytes(2, "little") + (16000).to_bytes(4, "little")
+        fmt += (32000).to_bytes(4, "little") + (2).to_bytes(2, "little") + (16).to_bytes(2, "little")
+        body = b"WAVE" + b"fmt " + len(fmt).to_bytes(4, "little") + fmt
+        body += b"LIST" + (3).to_bytes(4, "little") + b"abc\x00"  # odd size, padded
+        body += b"data" + (0xFFFFFFFF).to_bytes(4, "little") + pcm.tobytes()
+        path = os.path.join(self.temp_dir, "piped.wav")
+        with open(path, "wb") as f:
+            f.write(b"RIFF" + (0xFFFFFFFF).to_bytes(4, "little") + body)
+        np.testing.assert_array_equal(map_wav16(path), pcm)
+
+    def test_decode_streams_into_growing_buffer(self):
+        count = 16000 * 60 * 2 + 12345  # past two doublings of the initial buffer
+        pcm = decode_pcm16("input.mp4", self._fake_ffmpeg(count=count))
+        self.assertEqual(len(pcm), count)
+        np.testing.assert_array_equal(pcm[:5], [0, 1, 2, 3, 4])
+        self.assertEqual(int(pcm[30001]), 1)
+
+    def test_decode_failures(self):
+        self.assertIsNone(decode_pcm16("input.mp4", self._fake_ffmpeg(count=10, code=1)))
+        self.assertIsNone(decode_pcm16("input.mp4", self._fake_ffmpeg(count=0)))
+        self.assertIsNone(decode_pcm16("input.mp4", os.path.join(self.temp_dir, "no-ffmpeg")))
+        audio = DecodedAudio(os.path.join(self.temp_dir, "missing.mp4"), os.path.join(self.temp_dir, "no-ffmpeg"))
+        self.assertIsNone(audio.pcm)
+        self.assertEqual(audio.samples(), audio.path)
+
+    def test_file_cache_encodes_and_evicts_oldest(self):
+        cache = AudioFileCache(os.path.join(self.temp_dir, "cache"), max_bytes=2500)
+        ffmpeg = self._fake_ffmpeg(size=1000)
+        sources = []
+        for name in ("a", "b", "c"):
+            source = os.path.join(self.temp_dir, f"{name}.mp4")
+            with open(source, "wb") as f:
+                f.write(name.encode())
+            sources.append(source_key(source, "mp3"))
+
+        first = cache.encode(sources[0], ".mp3", "a.mp4", ["-f", "mp3"], ffmpeg)
+        self.assertEqual(os.path.getsize(first), 1000)
+        cache.encode(sources[1], ".mp3", "b.mp4", ["-f", "mp3"], ffmpeg)
+        os.utime(first, ns=(1, 1))
+        cache.get(sources[1], ".mp3")
+        cache.encode(sources[2], ".mp3", "c.mp4", ["-f", "mp3"], ffmpeg)
+
+        self.assertIsNone(cache.get(sources[0], ".mp3"))
+        self.assertIsNotNone(cache.get(sources[2], ".mp3"))
+        self.assertEqual(cache.size(), 2000)
+        self.assertIsNone(cache.encode(sources[0], ".mp3", "a.mp4", ["-f", "mp3"], self._fake_ffmpeg(size=10, code=1)))
+        self.assertEqual(sorted(os.listdir(cache.cache_dir)), sorted(f"{key}.mp3" for key in sources[1:]))
+
+    def test_pinned_files_survive_eviction(self):
+        cache = AudioFileCache(os.path.join(self.temp_dir, "cache"), max_bytes=150)
+        first = cache.store("a", ".mp3", b"a" * 100, pin=True)
+        second = cache.store("b", ".mp3", b"b" * 100)
+        self.assertTrue(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+
+        # Pins nest: the file goes only once every pin is released
+        self.assertEqual(cache.get("a", ".mp3", pin=True), first)
+        cache.unpin(first)
+        cache.store("c", ".mp3", b"c" * 100)
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+        cache.unpin(first)
+        cache.store("d", ".mp3", b"d" * 100)
+        self.assertFalse(os.path.exists(first))
+
+    def test_source_fingerprint_is_persisted(self):
+        pcm = (np.arange(8000) % 500).astype(np.int16)
+        wav = _write_wav(os.path.join(self.temp_dir, "clip.wav"), pcm)
+        self.assertEqual(samples_fingerprint(map_wav16(wav)), pcm_fingerprint(wav))
+
+        video = os.path.join(self.temp_dir, "clip.mp4")
+        with open(video, "wb") as f:
+            f.write(b"container bytes")
+        decodes = []
+
+        def decode():
+            decodes.append(1)
+            return pcm
+
+        cache_dir = os.path.join(self.temp_dir, "transcripts")
+        first = TranscriptCache(cache_dir).source_fingerprint(video, decode)
+        self.assertEqual(first, pcm_fingerprint(wav))
+        self.assertEqual(TranscriptCache(cache_dir).source_fingerprint(video, decode), first)
+        self.assertEqual(len(decodes), 1)
+
+        # Undecodable files fall back to hashing their bytes
+        other = TranscriptCache(os.path.join(self.temp_dir, "other")).source_fingerprint(video, lambda: None)
+        self.assertEqual(other, pcm_fingerprint(video))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.encoders import CPU_PROFILES, DEFAULT_CPU_PROFILE, EncoderRegistry, _parse_encoders
+
+# Lists NVENC and QSV, but only NVENC passes the test encode
+FAKE_FFMPEG = """#!/bin/sh
+echo "$@" >> "$(dirname "$0")/calls.log"
+case "$*" in
+  *-encoders*)
+    echo "Encoders:"
+    echo " V..... = Video"
+    echo " ------"
+    echo " V....D libx264              libx264 H.264 / AVC"
+    echo " V....D h264_nvenc           NVIDIA NVENC H.264 encoder"
+    echo " V....D h264_qsv             H.264 (Intel Quick Sync Video acceleration)"
+    ;;
+  *-hwaccels*)
+    echo "Hardware acceleration methods:"
+    echo "cuda"
+    echo "vaapi"
+    ;;
+  *h264_qsv*) exit 1 ;;
+esac
+exit 0
+"""
+
+
+class TestEncoderRegistry(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.ffmpeg = os.path.join(self.temp_dir, "ffmpeg")
+        with open(self.ffmpeg, "w") as f:
+            f.write(FAKE_FFMPEG)
+        os.chmod(self.ffmpeg, os.stat(self.ffmpeg).st_mode | stat.S_IEXEC)
+        self.cache_path = os.path.join(self.temp_dir, "encoders.json")
+        self.platform = mock.patch("src.core.encoders.platform.system", return_value="Linux")
+        self.platform.start()
+
+    def tearDown(self):
+        self.platform.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _registry(self):
+        return EncoderRegistry(ffmpeg_path=self.ffmpeg, cache_path=self.cache_path)
+
+    def _calls(self):
+        with open(os.path.join(self.temp_dir, "calls.log")) as f:
+            return f.read().splitlines()
+
+    def test_parse_encoders_skips_legend(self):
+        output = " V..... = Video\n ------\n V....D libx264 x264\n A....D aac AAC\n"
+        self.assertEqual(_parse_encoders(output), ["libx264", "aac"])
+
+    def test_listed_encoders_are_verified_by_test_encode(self):
+        caps = self._registry().capabilities()
+        self.assertEqual(caps["encoders"], ["h264_nvenc"])
+        self.assertEqual(caps["hwaccels"], ["cuda", "vaapi"])
+
+    def test_capabilities_persist_per_binary(self):
+        self._registry().capabilities()
+        calls = len(self._calls())
+        registry = self._registry()
+        self.assertEqual(registry.capabilities()["encoders"], ["h264_nvenc"])
+        self.assertEqual(registry.probes, 0)
+        self.assertEqual(len(self._calls()), calls)
+
+        # A replaced binary (new mtime) is probed again
+        st = os.stat(self.ffmpeg)
+        os.utime(self.ffmpeg, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        registry = self._registry()
+        registry.capabilities()
+        self.assertEqual(registry.probes, 1)
+
+    def test_policy_selection(self):
+        registry = self._registry()
+        export = registry.select("export")
+        self.assertEqual(export.encoder, "h264_nvenc")
+        self.assertEqual(export.max_sessions, 3)
+        self.assertEqual(export.thread_args(8), [])
+        removal = registry.select("subtitle_removal", "nvenc")
+        self.assertIn("-maxrate", removal.args)
+        self.assertIs(registry.select("export", "cpu"), DEFAULT_CPU_PROFILE)
+        self.assertIs(registry.select("export", "x264-veryfast"), CPU_PROFILES["x264-veryfast"])
+        # Unusable hardware falls back to the CPU default
+        self.assertIs(registry.select("export", "qsv"), DEFAULT_CPU_PROFILE)
+
+    def test_missing_binary_uses_cpu(self):
+        registry = EncoderRegistry(ffmpeg_path=os.path.join(self.temp_dir, "nope", "ffmpeg"),
+                                   cache_path=self.cache_path)
+        self.assertIs(registry.select("export"), DEFAULT_CPU_PROFILE)
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_cpu_profile_args(self):
+        self.assertEqual(
+            DEFAULT_CPU_PROFILE.video_args(4),
+            ["-c:v", "libx264", "-preset", "fast", "-crf", "23", "-threads", "4"],
+        )
+
+
+class TestExportEncoder(unittest.TestCase):
+    def setUp(self):
+        from src.core.export.renderer import RenderEngine
+        self.engine = RenderEngine()
+        self.engine.stickers, self.engine.subtitles, self.engine.audio_tracks = [], [], []
+        self.registry = EncoderRegistry(ffmpeg_path="/nonexistent/ffmpeg", cache_path="/nonexistent/encoders.json")
+        patcher = mock.patch("src.core.export.renderer.encoder_registry", self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        self.clips = [{"path": os.path.join(self.temp_dir, "clip.mp4"), "duration": 4.0}]
+        open(self.clips[0]["path"], "wb").close()
+        self.output = os.path.join(self.temp_dir, "out.mp4")
+
+    def test_default_is_libx264_without_probing(self):
+        ctx = self.engine._prepare_render(self.clips, self.output)
+        self.assertEqual(ctx.encoder, DEFAULT_CPU_PROFILE)
+        self.assertIsNone(self.registry._capabilities)
+
+    def test_encoder_is_selected_on_the_render_thread(self):
+        threads, finished = [], []
+        select = self.registry.select
+        self.registry.select = lambda *args: threads.append(threading.current_thread()) or select(*args)
+        self.engine.render_finished.connect(lambda ok, msg: finished.append(ok))
+        self.engine.ffmpeg_path = "/nonexistent/ffmpeg"
+        self.engine.render_timeline(self.clips, self.output, {"encoder": "auto"})
+        deadline = time.time() + 5
+        while not finished and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+
+class TestSubtitleRemoverEncoder(unittest.TestCase):
+    def test_legacy_settings_come_from_registry(self):
+        from src.core.ai.subtitle_remover import SubtitleRemoverService
+        registry = EncoderRegistry(ffmpeg_path="/nonexistent/ffmpeg", cache_path="/nonexistent/encoders.json")
+        with mock.patch("src.core.ai.subtitle_remover.encoder_registry", registry):
+            settings = SubtitleRemoverService()._detect_gpu()
+        self.assertEqual(settings, {"encoder": "libx264", "preset": ["-preset", "fast"], "extra": ["-crf", "23"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
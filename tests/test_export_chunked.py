@@ -0,0 +1,186 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import types
+import unittest
+from PyQt6.QtCore import QCoreApplication
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.encoders import DEFAULT_CPU_PROFILE
+from src.core.export.renderer import RenderEngine
+from src.core.render_supervisor import RenderSupervisor
+from src.core.export.segments import SegmentPiece, plan_segments, subtitles_in_range
+
+FAKE_FFMPEG = """#!{python}
+import sys
+output = sys.argv[-1]
+sys.stdout.write("out_time_us=1000000\\nspeed=4x\\nprogress=continue\\n")
+open(output, "wb").close()
+with open(output + ".args", "w") as f:
+    f.write(" ".join(sys.argv[1:]))
+sys.stdout.write("progress=end\\n")
+"""
+
+
+def piece(path, in_point, out_point):
+    return SegmentPiece({"path": path}, in_point, out_point)
+
+
+class TestPlanSegments(unittest.TestCase):
+    def test_short_clips_are_grouped_at_clip_boundaries(self):
+        pieces = [piece(f"{i}.mp4", 0.0, 4.0) for i in range(10)]
+        segments = plan_segments(pieces, target_seconds=12.0)
+        self.assertEqual([len(s.pieces) for s in segments], [3, 3, 3, 1])
+        self.assertEqual([s.start for s in segments], [0.0, 12.0, 24.0, 36.0])
+        self.assertAlmostEqual(sum(s.duration for s in segments), 40.0)
+
+    def test_long_clip_is_split_on_whole_frames(self):
+        segments = plan_segments([piece("long.mp4", 1.01, 61.0)], target_seconds=20.0, frame_seconds=1 / 25)
+        self.assertEqual(len(segments), 3)
+        self.assertTrue(all(s.split for s in segments))
+        cuts = [s.pieces[0].in_point for s in segments]
+        self.assertEqual(cuts[0], 1.01)
+        for cut in cuts[1:]:
+            self.assertAlmostEqual((cut - 1.01) * 25, round((cut - 1.01) * 25), places=4)
+        self.assertEqual([s.pieces[0].out_point for s in segments[:-1]], cuts[1:])
+        self.assertEqual(segments[-1].pieces[-1].out_point, 61.0)
+        self.assertAlmostEqual(sum(s.duration for s in segments), 59.99)
+
+    def test_unknown_length_disables_planning(self):
+        self.assertIsNone(plan_segments([piece("a.mp4", 0.0, None)], target_seconds=10.0))
+
+    def test_subtitles_are_clipped_and_shifted(self):
+        subs = [{"start_time": 9.0, "duration": 2.0, "text_content": "a"},
+                {"start_time": 30.0, "duration": 1.0, "text_content": "b"}]
+        local = subtitles_in_range(subs, 10.0, 20.0)
+        self.assertEqual(len(local), 1)
+        self.assertAlmostEqual(local[0]["start_time"], 0.0)
+        self.assertAlmostEqual(local[0]["duration"], 1.0)
+
+
+class TestChunkedRender(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        if not QCoreApplication.instance():
+            self.app = QCoreApplication(sys.argv)
+        self.engine = RenderEngine()
+        self.engine.ffmpeg_path = os.path.join(self.temp_dir, "ffmpeg")
+        with open(self.engine.ffmpeg_path, "w") as f:
+            f.write(FAKE_FFMPEG.format(python=sys.executable))
+        os.chmod(self.engine.ffmpeg_path, os.stat(self.engine.ffmpeg_path).st_mode | stat.S_IEXEC)
+        self.engine.settings.update({"resolution": "1280x720", "fps": 30, "speed": 1.0, "parallel_export": True, "encoder": "cpu",
+                                     "segment_cache": False})
+        self.engine.stickers, self.engine.subtitles, self.engine.audio_tracks = [], [], []
+
+        self.clips = []
+        for i in range(4):
+            path = os.path.join(self.temp_dir, f"clip{i}.mp4")
+            open(path, "wb").close()
+            self.clips.append({"path": path, "start": i * 30.0, "duration": 30.0})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_chunk_jobs_share_encoder_settings_and_join_by_copy(self):
+        self.engine.subtitles = [{"start_time": 45.0, "duration": 2.0, "text_content": "hello"}]
+        tts = os.path.join(self.temp_dir, "tts.mp3")
+        open(tts, "wb").close()
+        self.engine.audio_tracks = [{"path": tts}]
+        ctx = self.engine._prepare_render(self.clips, os.path.join(self.temp_dir, "out.mp4"))
+        segments = plan_segments(ctx.pieces, target_seconds=30.0)
+
+        work_dir = os.path.join(self.temp_dir, "work")
+        os.makedirs(work_dir)
+        chunk_jobs, audio_job, join_cmd = self.engine._build_chunked_jobs(
+            ctx, segments, os.path.join(self.temp_dir, "out.mp4"), work_dir
+        )
+
+        self.assertEqual(len(chunk_jobs), 4)
+        for cmd, _ in chunk_jobs:
+            self.assertIn("-an", cmd)
+            self.assertIn("-threads", cmd)
+            self.assertEqual(cmd[cmd.index("-c:v") + 1], "libx264")
+            self.assertNotIn(tts, cmd)
+        # Only the chunk covering 45s burns the subtitle
+        self.assertEqual([any("subtitles=" in arg for arg in cmd) for cmd, _ in chunk_jobs],
+                         [False, True, False, False])
+        self.assertIn("-vn", audio_job[0])
+        self.assertIn(tts, audio_job[0])
+        self.assertEqual(join_cmd[join_cmd.index("-c") + 1], "copy")
+        self.assertIn(audio_job[1], join_cmd)
+
+    def test_split_clip_chunks_seek_to_contiguous_frames(self):
+        self.engine.settings["speed"] = 1.5
+        clip = {"path": self.clips[0]["path"], "start": 0.0, "in_point": 0.5, "duration": 95.0}
+        ctx = self.engine._prepare_render([clip], os.path.join(self.temp_dir, "out.mp4"))
+        segments = plan_segments(ctx.pieces, target_seconds=20.0, frame_seconds=ctx.speed / 30)
+        work_dir = os.path.join(self.temp_dir, "work")
+        os.makedirs(work_dir)
+        chunk_jobs, _, _ = self.engine._build_chunked_jobs(ctx, segments, os.path.join(self.temp_dir, "out.mp4"), work_dir)
+
+        self.assertEqual(len(chunk_jobs), 5)
+        seeks, frames = [], []
+        for cmd, _ in chunk_jobs:
+            self.assertNotIn("concat", cmd)
+            self.assertEqual(float(cmd[cmd.index("-r") + 1]), 30.0)
+            seeks.append(float(cmd[cmd.index("-ss") + 1]))
+            frames.append(int(cmd[cmd.index("-frames:v") + 1]))
+        # 95s of source at 1.5x is 1900 output frames, with each chunk
+        # starting on the frame after the previous chunk's last one
+        self.assertEqual(sum(frames), 1900)
+        self.assertEqual(seeks[0], 0.5)
+        for i in range(1, len(seeks)):
+            self.assertAlmostEqual(seeks[i], seeks[i - 1] + frames[i - 1] * 1.5 / 30, places=5)
+
+    @unittest.skipIf(sys.platform.startswith("win"), "uses a shebang script as ffmpeg")
+    def test_chunked_render_runs_end_to_end(self):
+        self.engine.MIN_CHUNK_SECONDS = 30.0
+        output_path = os.path.join(self.temp_dir, "out.mp4")
+        progress, finished = [], []
+        self.engine.progress_updated.connect(progress.append)
+        self.engine.render_finished.connect(lambda ok, msg: finished.append((ok, msg)))
+
+        self.engine.render_timeline(self.clips, output_path, {})
+        deadline = time.time() + 10
+        while not finished and time.time() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.02)
+
+        self.assertEqual(finished, [(True, "Render completed successfully!")])
+        self.assertEqual(progress[-1], 100)
+        with open(output_path + ".args") as f:
+            self.assertIn("-c copy", f.read())
+
+    @unittest.skipIf(sys.platform.startswith("win"), "uses shebang scripts as ffmpeg")
+    def test_failed_chunk_stops_its_siblings(self):
+        scripts = {
+            "fail": "import sys\nsys.stderr.write('boom\\n')\nsys.exit(1)\n",
+            "slow": "import time\ntime.sleep(30)\n",
+        }
+        for name, body in scripts.items():
+            path = os.path.join(self.temp_dir, name)
+            with open(path, "w") as f:
+                f.write(f"#!{sys.executable}\n{body}")
+            os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        jobs = [([os.path.join(self.temp_dir, name)], None) for name in ("slow", "fail", "slow")]
+        self.engine.supervisor = RenderSupervisor(capacity=12)
+        self.engine._job_id = self.engine.supervisor.start_job("test")
+        ctx = types.SimpleNamespace(encoder=DEFAULT_CPU_PROFILE, reused_duration=0.0, speed=1.0,
+                                    pending_segments=[])
+        finished = []
+        self.engine.render_finished.connect(lambda ok, msg: finished.append((ok, msg)))
+
+        started = time.monotonic()
+        self.engine._run_parallel_render(ctx, jobs, None, [], os.path.join(self.temp_dir, "out.mp4"), 90.0)
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(finished, [(False, "FFmpeg error: boom")])
+        self.assertEqual(self.engine.supervisor.threads_in_use, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
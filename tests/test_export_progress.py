@@ -0,0 +1,127 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import unittest
+from PyQt6.QtCore import QCoreApplication
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.export.progress import FFmpegProgressParser, parse_ffmpeg_time
+from src.core.export.renderer import render_engine
+
+PROGRESS_BLOCK = """frame=250
+fps=50.00
+stream_0_0_q=28.0
+bitrate=1024.5kbits/s
+total_size=1280000
+out_time_us=5000000
+out_time_ms=5000000
+out_time=00:00:05.000000
+dup_frames=0
+drop_frames=0
+speed=2.5x
+progress=continue
+"""
+
+FAKE_FFMPEG = """#!{python}
+import sys, time
+output = sys.argv[-1]
+sys.stderr.write("ffmpeg version fake\\n" * 2000)
+for i in range(1, 5):
+    sys.stdout.write("frame=%d\\nfps=30\\nbitrate=800.0kbits/s\\nout_time_us=%d\\nspeed=2x\\nprogress=continue\\n" % (i * 30, i * 1000000))
+    sys.stdout.flush()
+    time.sleep(0.02)
+open(output, "wb").close()
+sys.stdout.write("out_time_us=4000000\\nspeed=2x\\nprogress=end\\n")
+"""
+
+
+class TestFFmpegProgressParser(unittest.TestCase):
+    def test_block_is_emitted_on_progress_line(self):
+        clock = iter([0.0, 2.0]).__next__
+        parser = FFmpegProgressParser(total_duration=20.0, clock=clock)
+        results = [parser.feed(line) for line in PROGRESS_BLOCK.splitlines()]
+        self.assertTrue(all(r is None for r in results[:-1]))
+
+        stats = results[-1]
+        self.assertEqual(stats["frame"], 250)
+        self.assertAlmostEqual(stats["fps"], 50.0)
+        self.assertAlmostEqual(stats["bitrate_kbps"], 1024.5)
+        self.assertAlmostEqual(stats["out_time"], 5.0)
+        self.assertAlmostEqual(stats["percent"], 25.0)
+        self.assertAlmostEqual(stats["speed"], 2.5)
+        self.assertAlmostEqual(stats["eta_seconds"], 6.0)
+        self.assertFalse(stats["finished"])
+
+    def test_na_values_fall_back_to_measured_speed(self):
+        clock = iter([0.0, 4.0]).__next__
+        parser = FFmpegProgressParser(total_duration=10.0, clock=clock)
+        for line in ("bitrate=N/A", "out_time=00:00:02.000000", "speed=N/A", "progress=continue"):
+            stats = parser.feed(line)
+        self.assertIsNone(stats["bitrate_kbps"])
+        self.assertAlmostEqual(stats["speed"], 0.5)
+        self.assertAlmostEqual(stats["eta_seconds"], 16.0)
+
+    def test_end_block_finishes(self):
+        parser = FFmpegProgressParser()
+        stats = parser.feed("progress=end")
+        self.assertTrue(stats["finished"])
+        self.assertEqual(stats["percent"], 100.0)
+
+    def test_parse_ffmpeg_time(self):
+        self.assertAlmostEqual(parse_ffmpeg_time("01:02:03.500000"), 3723.5)
+        self.assertIsNone(parse_ffmpeg_time("N/A"))
+
+
+class TestRenderProgressReporting(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        if not QCoreApplication.instance():
+            self.app = QCoreApplication(sys.argv)
+        self.fake_ffmpeg = os.path.join(self.temp_dir, "ffmpeg")
+        with open(self.fake_ffmpeg, "w") as f:
+            f.write(FAKE_FFMPEG.format(python=sys.executable))
+        os.chmod(self.fake_ffmpeg, os.stat(self.fake_ffmpeg).st_mode | stat.S_IEXEC)
+        self.clip = os.path.join(self.temp_dir, "a.mp4")
+        open(self.clip, "wb").close()
+        self._saved_ffmpeg = render_engine.ffmpeg_path
+        render_engine.ffmpeg_path = self.fake_ffmpeg
+
+    def tearDown(self):
+        render_engine.ffmpeg_path = self._saved_ffmpeg
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @unittest.skipIf(sys.platform.startswith("win"), "uses a shebang script as ffmpeg")
+    def test_progress_follows_ffmpeg_output(self):
+        progress, stats, finished = [], [], []
+        render_engine.progress_updated.connect(progress.append)
+        render_engine.render_stats.connect(stats.append)
+        on_finished = lambda ok, msg: finished.append((ok, msg))
+        render_engine.render_finished.connect(on_finished)
+        try:
+            render_engine.render_timeline(
+                [{"path": self.clip, "start": 0.0, "duration": 4.0}],
+                os.path.join(self.temp_dir, "out.mp4"),
+                {"resolution": "1280x720", "fps": 30, "speed": 1.0},
+            )
+            deadline = time.time() + 10
+            while not finished and time.time() < deadline:
+                QCoreApplication.processEvents()
+                time.sleep(0.02)
+        finally:
+            render_engine.progress_updated.disconnect(progress.append)
+            render_engine.render_stats.disconnect(stats.append)
+            render_engine.render_finished.disconnect(on_finished)
+
+        self.assertEqual(finished, [(True, "Render completed successfully!")])
+        self.assertEqual(progress, [25, 50, 75, 99, 100])
+        self.assertAlmostEqual(stats[0]["bitrate_kbps"], 800.0)
+        self.assertTrue(stats[-1]["finished"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import unittest
+from PyQt6.QtCore import QCoreApplication
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.export.renderer import RenderEngine
+
+# Writes every output (each follows "+faststart" in our commands)
+FAKE_FFMPEG = """#!{python}
+import sys
+args = sys.argv[1:]
+for i, arg in enumerate(args[:-1]):
+    if arg == "+faststart":
+        open(args[i + 1], "wb").close()
+sys.stdout.write("out_time_us=1000000\\nprogress=end\\n")
+"""
+
+
+class TestVariantExport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        if not QCoreApplication.instance():
+            self.app = QCoreApplication(sys.argv)
+        self.engine = RenderEngine()
+        self.engine.ffmpeg_path = os.path.join(self.temp_dir, "ffmpeg")
+        with open(self.engine.ffmpeg_path, "w") as f:
+            f.write(FAKE_FFMPEG.format(python=sys.executable))
+        os.chmod(self.engine.ffmpeg_path, os.stat(self.engine.ffmpeg_path).st_mode | stat.S_IEXEC)
+        self.engine.settings.update({"resolution": "1920x1080", "fps": 30, "speed": 1.0, "encoder": "cpu"})
+        self.engine.stickers, self.engine.audio_tracks = [], []
+        self.engine.subtitles = [{"start_time": 0.0, "duration": 2.0, "text_content": "hello"}]
+
+        self.clip = os.path.join(self.temp_dir, "clip.mp4")
+        open(self.clip, "wb").close()
+        self.clips = [{"path": self.clip, "start": 0.0, "duration": 10.0}]
+        self.variants = [
+            {"output_path": os.path.join(self.temp_dir, "en_1080.mp4")},
+            {"output_path": os.path.join(self.temp_dir, "en_720.mp4"), "resolution": "1280x720"},
+            {"output_path": os.path.join(self.temp_dir, "vi_720.mp4"), "resolution": "1280x720",
+             "subtitles": [{"start_time": 0.0, "duration": 2.0, "text_content": "xin chao"}]},
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_one_decode_feeds_every_output(self):
+        ctx = self.engine._prepare_render(self.clips, self.variants[0]["output_path"])
+        resolved = [self.engine._resolve_variant(ctx, v) for v in self.variants]
+        cmd = self.engine._compose_variant_command(ctx, "list.txt", resolved)
+        self.engine._remove_files(ctx.temp_files)
+
+        self.assertEqual(cmd.count("-i"), 1)
+        graph = cmd[cmd.index("-filter_complex") + 1]
+        self.assertIn("[0:v]split=3[vb0][vb1][vb2]", graph)
+        self.assertEqual(graph.count("scale=1280:720"), 2)
+        self.assertEqual(graph.count("subtitles="), 3)
+        for variant in self.variants:
+            self.assertIn(variant["output_path"], cmd)
+        self.assertEqual(cmd.count("-c:v"), 3)
+
+    def test_shared_audio_mix_is_split_per_output(self):
+        tts = os.path.join(self.temp_dir, "tts.mp3")
+        open(tts, "wb").close()
+        self.engine.audio_tracks = [{"path": tts}]
+        ctx = self.engine._prepare_render(self.clips, self.variants[0]["output_path"])
+        resolved = [self.engine._resolve_variant(ctx, v) for v in self.variants[:2]]
+        cmd = self.engine._compose_variant_command(ctx, "list.txt", resolved)
+        self.engine._remove_files(ctx.temp_files)
+
+        graph = cmd[cmd.index("-filter_complex") + 1]
+        self.assertIn("asplit=2[ab0][ab1]", graph)
+        self.assertEqual(cmd.count(tts), 1)
+
+    @unittest.skipIf(sys.platform.startswith("win"), "uses a shebang script as ffmpeg")
+    def test_batch_render_writes_all_variants(self):
+        finished = []
+        self.engine.render_finished.connect(lambda ok, msg: finished.append((ok, msg)))
+        self.engine.render_variants(self.clips, self.variants, {}, subtitles=self.engine.subtitles)
+        deadline = time.time() + 10
+        while not finished and time.time() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.02)
+
+        self.assertEqual(finished, [(True, "Rendered 3 variants successfully!")])
+        for variant in self.variants:
+            self.assertTrue(os.path.exists(variant["output_path"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,7 +9,9 @@ from PyQt6.QtWidgets import QApplication
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.core.state import state_manager
 from src.ui.panels.media_pool import MediaPool
+from src.ui.threads import IngestionThread
 
 
 app = QApplication.instance() or QApplication(sys.argv)
@@ -101,6 +103,33 @@ class TestMediaPoolStockImport(unittest.TestCase):
         self.assertFalse(pool.cancel_stock_btn.isEnabled())
         self.assertIn("Cancelling", pool.stock_status_label.text())
 
+    def test_multi_file_import_is_added_in_one_batch(self):
+        assets_backup = state_manager.state["media_pool"]["assets"]
+        state_manager.state["media_pool"]["assets"] = {}
+        self.addCleanup(state_manager.state["media_pool"].__setitem__, "assets", assets_backup)
+        paths = [f"/tmp/import_{i}.mp4" for i in range(3)]
+
+        def probe_file(path):
+            return {"id": path, "name": os.path.basename(path), "target_url": path, "metadata": {}}
+
+        pool = MediaPool()
+        single, batches = [], []
+        state_manager.media_imported.connect(single.append)
+        state_manager.media_batch_imported.connect(batches.append)
+        try:
+            with patch.dict(os.environ, {"HOME": self.temp_home}):
+                thread = IngestionThread(paths)
+            thread.assets_processed.connect(pool.handle_processed_assets)
+            with patch.object(thread.ingestion, "probe_file", side_effect=probe_file):
+                thread.run()
+        finally:
+            state_manager.media_imported.disconnect(single.append)
+            state_manager.media_batch_imported.disconnect(batches.append)
+
+        self.assertEqual(single, [])
+        self.assertEqual([[asset["id"] for asset in batch] for batch in batches], [paths])
+        self.assertEqual(pool.asset_list.count(), 3)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.export.renderer import RenderEngine
+from src.core.media_probe import MediaProbeCache, media_probe_cache, summarize_probe
+
+FFPROBE_JSON = {
+    "format": {"duration": "12.5"},
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "width": 720, "height": 1280,
+         "r_frame_rate": "30000/1001", "pix_fmt": "yuv420p", "profile": "High", "level": 31},
+        {"codec_type": "audio", "codec_name": "aac"},
+    ],
+}
+
+
+class TestMediaProbeCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "clip.mp4")
+        with open(self.path, "wb") as f:
+            f.write(b"not really a video")
+        self.cache = MediaProbeCache(ffprobe_path=os.path.join(self.temp_dir, "missing-ffprobe"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_summarize_probe(self):
+        info = summarize_probe(FFPROBE_JSON)
+        self.assertAlmostEqual(info["duration"], 12.5)
+        self.assertTrue(info["has_audio"])
+        self.assertEqual((info["video"]["width"], info["video"]["height"]), (720, 1280))
+        self.assertAlmostEqual(info["video"]["fps"], 29.97, places=2)
+        self.assertEqual((info["video"]["profile"], info["video"]["level"]), ("High", 31))
+
+    def test_seeded_entry_needs_no_probe(self):
+        self.cache.put(self.path, summarize_probe(FFPROBE_JSON))
+        self.assertTrue(self.cache.has_audio(self.path))
+        self.assertEqual(self.cache.video_info(self.path)["codec"], "h264")
+        self.assertEqual(self.cache.probes, 0)
+
+    def test_changed_file_is_reprobed(self):
+        self.cache.put(self.path, summarize_probe(FFPROBE_JSON))
+        with open(self.path, "ab") as f:
+            f.write(b"more bytes")
+        self.assertIsNone(self.cache.get(self.path))
+        self.assertEqual(self.cache.probes, 1)
+
+    def test_failed_probe_is_remembered_until_change(self):
+        self.assertIsNone(self.cache.get(self.path))
+        self.assertIsNone(self.cache.get(self.path))
+        self.assertEqual(self.cache.probes, 1)
+        self.cache.invalidate(self.path)
+        self.cache.get(self.path)
+        self.assertEqual(self.cache.probes, 2)
+
+
+class TestRendererUsesProbeCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.engine = RenderEngine()
+        self.engine.stickers, self.engine.subtitles, self.engine.audio_tracks = [], [], []
+        self.talking = os.path.join(self.temp_dir, "talking.mp4")
+        self.silent = os.path.join(self.temp_dir, "silent.mp4")
+        for path in (self.talking, self.silent):
+            open(path, "wb").close()
+        media_probe_cache.put(self.talking, summarize_probe(FFPROBE_JSON))
+        silent_json = dict(FFPROBE_JSON, streams=FFPROBE_JSON["streams"][:1])
+        media_probe_cache.put(self.silent, summarize_probe(silent_json))
+
+    def tearDown(self):
+        media_probe_cache.invalidate(self.talking)
+        media_probe_cache.invalidate(self.silent)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_export_setup_reads_cached_stream_facts(self):
+        self.engine.settings.update({"resolution": "original", "fps": 30, "speed": 1.0})
+        probes_before = media_probe_cache.probes
+        clips = [
+            {"path": self.silent, "start": 0.0, "duration": 2.0},
+            {"path": self.talking, "start": 2.0, "duration": 3.0},
+        ]
+        ctx = self.engine._prepare_render(clips, os.path.join(self.temp_dir, "out.mp4"))
+        self.assertEqual((ctx.width, ctx.height), (720, 1280))
+        self.assertEqual(ctx.piece_audio, [False, True])
+        self.assertEqual(media_probe_cache.probes, probes_before)
+
+    def test_silent_clip_is_padded_instead_of_shifting_audio(self):
+        self.engine.settings.update({"resolution": "1280x720", "fps": 30, "speed": 1.0})
+        clips = [
+            {"path": self.silent, "start": 0.0, "duration": 2.0},
+            {"path": self.talking, "start": 2.0, "in_point": 1.0, "duration": 3.0},
+        ]
+        cmd, _, _ = self.engine._build_ffmpeg_command(clips, os.path.join(self.temp_dir, "out.mp4"))
+        graph = cmd[cmd.index("-filter_complex") + 1]
+        self.assertIn("anullsrc=r=48000:cl=stereo,atrim=duration=2.000000[sa0]", graph)
+        self.assertIn("[sa0][sa1]concat=n=2:v=0:a=1[srca]", graph)
+        self.assertEqual(cmd[cmd.index("-map", cmd.index("-filter_complex")) + 3], "[srca]")
+        # Per-clip audio inputs come before output options
+        self.assertLess(cmd.index(self.talking), cmd.index("-r"))
+
+
+if __name__ == "__main__":
+    unittest.main()
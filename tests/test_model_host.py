@@ -0,0 +1,106 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai.model_host import MB, ModelHost
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.name = name
+        self.active = 0
+        self.max_active = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def infer(self, value):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.threads.add(threading.current_thread().name)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+        return f"{self.name}:{value}"
+
+
+class TestModelHost(unittest.TestCase):
+    def setUp(self):
+        self.host = ModelHost(budget_bytes=1000 * MB)
+        self.loaded = []
+
+    def _register(self, name, size_mb=400):
+        def load():
+            self.loaded.append(name)
+            return FakeModel(name)
+        return self.host.register(name, load, size_mb * MB)
+
+    def test_loads_once_and_proxies_calls(self):
+        model = self._register("whisper:small")
+        self.assertEqual(self.loaded, [])
+        self.assertEqual(model.infer(1), "whisper:small:1")
+        self.assertEqual(model.infer(2), "whisper:small:2")
+        self.assertEqual(self.loaded, ["whisper:small"])
+        # Registering again keeps the loaded model
+        self._register("whisper:small").infer(3)
+        self.assertEqual(self.host.loads, 1)
+
+    def test_requests_are_serialized_on_one_worker(self):
+        model = self._register("easyocr:ch_tra+en")
+        threads = [threading.Thread(target=model.infer, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        fake = self.host.run(model.key, lambda m: m)
+        self.assertEqual(fake.max_active, 1)
+        self.assertEqual(len(fake.threads), 1)
+        self.assertTrue(next(iter(fake.threads)).startswith("model-easyocr"))
+
+    def test_lru_eviction_within_budget(self):
+        a = self._register("a")
+        b = self._register("b")
+        c = self._register("c")
+        a.infer(0)
+        b.infer(0)
+        a.infer(1)  # b is now least recently used
+        c.infer(0)
+        self.assertEqual(self.host.resident(), ["a", "c"])
+        self.assertEqual(self.host.resident_bytes(), 800 * MB)
+        self.assertEqual(self.host.evictions, 1)
+
+        b.infer(1)
+        self.assertEqual(self.loaded, ["a", "b", "c", "b"])
+
+    def test_busy_model_is_not_evicted(self):
+        a = self._register("a", 800)
+        b = self._register("b", 800)
+        release = threading.Event()
+        busy = self.host.submit(a.key, lambda m: release.wait(5))
+        time.sleep(0.05)
+        b.infer(0)
+        self.assertEqual(sorted(self.host.resident()), ["a", "b"])
+        release.set()
+        busy.result()
+        self.assertTrue(self.host.unload("a"))
+        self.assertEqual(self.host.resident(), ["b"])
+
+    def test_warm_and_load_errors(self):
+        self.host.warm(self._register("a").key).result()
+        self.assertEqual(self.host.resident(), ["a"])
+
+        def broken():
+            raise ImportError("no backend")
+        self.host.register("broken", broken, MB)
+        with self.assertRaises(ImportError):
+            self.host.load("broken")
+        self.assertNotIn("broken", self.host.resident())
+
+
+if __name__ == "__main__":
+    unittest.main()
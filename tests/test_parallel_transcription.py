@@ -0,0 +1,134 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import wave
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai.parallel_transcription import ParallelTranscriber, stitch
+from src.core.ai.vad import SAMPLE_RATE, SpeechChunk, detect_speech, plan_chunks, read_pcm16
+
+
+def _track(*parts):
+    """int16 PCM from (seconds, is_speech) parts: noise bursts over a quiet floor."""
+    rng = np.random.default_rng(0)
+    pieces = []
+    for seconds, speech in parts:
+        count = int(seconds * SAMPLE_RATE)
+        amplitude = 8000 if speech else 30
+        pieces.append(rng.normal(0, amplitude, count))
+    return np.clip(np.concatenate(pieces), -32768, 32767).astype(np.int16)
+
+
+class FakeModel:
+    """Whisper stand-in: one segment per second of audio it is given."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        seconds = len(audio) / SAMPLE_RATE
+        self.calls.append(seconds)
+        return {"segments": [
+            {"start": float(i), "end": float(min(i + 1, seconds)), "text": f" s{len(self.calls)}.{i} "}
+            for i in range(int(np.ceil(seconds)))
+        ]}
+
+
+class TestVad(unittest.TestCase):
+    def test_detects_speech_and_skips_silence(self):
+        pcm = _track((2, False), (3, True), (4, False), (2, True), (1, False))
+        regions = detect_speech(pcm)
+        self.assertEqual(len(regions), 2)
+        (a_start, a_end), (b_start, b_end) = regions
+        self.assertAlmostEqual(a_start, 1.8, delta=0.1)
+        self.assertAlmostEqual(a_end, 5.2, delta=0.1)
+        self.assertAlmostEqual(b_start, 8.8, delta=0.1)
+        self.assertAlmostEqual(b_end, 11.2, delta=0.1)
+
+    def test_short_pauses_are_bridged(self):
+        pcm = _track((1, False), (2, True), (0.2, False), (2, True), (1, False))
+        self.assertEqual(len(detect_speech(pcm)), 1)
+
+    def test_silence_has_no_speech(self):
+        self.assertEqual(detect_speech(_track((5, False))), [])
+
+    def test_plan_chunks_bounds_audio(self):
+        regions = [(0.0, 20.0), (30.0, 50.0), (60.0, 200.0)]
+        chunks = plan_chunks(regions, 45.0)
+        self.assertTrue(all(chunk.duration <= 45.0 + 1e-9 for chunk in chunks))
+        self.assertAlmostEqual(sum(chunk.duration for chunk in chunks), 180.0)
+        self.assertEqual(chunks[0].pieces, [(0.0, 20.0), (30.0, 50.0)])
+        self.assertEqual([chunk.index for chunk in chunks], list(range(len(chunks))))
+
+    def test_to_source_skips_removed_silence(self):
+        chunk = SpeechChunk(0, [(10.0, 12.0), (20.0, 23.0)])
+        self.assertEqual(chunk.to_source(1.0), 11.0)
+        self.assertEqual(chunk.to_source(2.0), 20.0)
+        self.assertEqual(chunk.to_source(2.0, is_end=True), 12.0)
+        self.assertEqual(chunk.to_source(4.5), 22.5)
+        self.assertEqual(chunk.to_source(99.0), 23.0)
+
+    def test_stitch(self):
+        chunk = SpeechChunk(0, [(10.0, 12.0), (20.0, 23.0)])
+        stitched = stitch(chunk, [
+            {"start": 0.5, "end": 2.0, "text": " a "},
+            {"start": 2.5, "end": 9.0, "text": "b"},
+            {"start": 3.0, "end": 3.5, "text": "  "},
+        ])
+        self.assertEqual(stitched, [
+            {"start": 10.5, "end": 12.0, "text": "a"},
+            {"start": 20.5, "end": 23.0, "text": "b"},
+        ])
+
+
+class TestParallelTranscriber(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write_wav(self, pcm, rate=SAMPLE_RATE):
+        path = os.path.join(self.temp_dir, "audio.wav")
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(pcm.tobytes())
+        return path
+
+    def test_read_pcm16_rejects_other_formats(self):
+        pcm = _track((1, True))
+        self.assertEqual(len(read_pcm16(self._write_wav(pcm))), SAMPLE_RATE)
+        self.assertIsNone(read_pcm16(self._write_wav(pcm, rate=44100)))
+        self.assertIsNone(read_pcm16(os.path.join(self.temp_dir, "missing.wav")))
+
+    def test_short_input_runs_in_process_on_speech_only(self):
+        pcm = _track((3, False), (2, True), (5, False), (3, True), (2, False))
+        model = FakeModel()
+        segments = ParallelTranscriber(workers=4).transcribe(
+            self._write_wav(pcm), "small", {"task": "transcribe"}, model
+        )
+        # One chunk holding both regions; the silence is never decoded
+        self.assertEqual(len(model.calls), 1)
+        self.assertLess(model.calls[0], 6.0)
+        starts = [seg["start"] for seg in segments]
+        self.assertEqual(starts, sorted(starts))
+        self.assertAlmostEqual(segments[0]["start"], 2.8, delta=0.1)
+        self.assertTrue(any(seg["start"] >= 10.0 for seg in segments))
+        self.assertTrue(all(seg["end"] <= 13.3 for seg in segments))
+
+    def test_non_pcm_file_is_left_to_caller(self):
+        path = os.path.join(self.temp_dir, "audio.mp3")
+        with open(path, "wb") as f:
+            f.write(b"not audio")
+        self.assertIsNone(ParallelTranscriber().transcribe(path, "small", {}, FakeModel()))
+
+
+if __name__ == "__main__":
+    unittest.main()
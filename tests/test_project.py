@@ -0,0 +1,116 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.project import MANIFEST_FILE, ProjectStore
+from src.core.timeline.clip import Clip
+from src.core.timeline.sticker import StickerClip
+from src.core.timeline.track import MagneticTrack, Track
+
+
+class TestProjectStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = ProjectStore(autosave_dir=os.path.join(self.temp_dir, "autosave"))
+        self.path = os.path.join(self.temp_dir, "demo")
+
+        self.main_track = MagneticTrack("Main Track")
+        self.main_track.add_clip(Clip("/tmp/a.mp4", "a.mp4", duration=5.0))
+        self.main_track.add_clip(Clip("/tmp/b.mp4", "b.mp4", duration=3.0, in_point=1.0))
+
+        self.subtitle_track = Track("Subtitles")
+        for i in range(2000):
+            self.subtitle_track.clips.append(
+                Clip("text_generated", f"line {i}", duration=1.5, start_time=i * 1.5,
+                     clip_type="text", text_content=f"line {i}")
+            )
+        self.tracks = [self.main_track, self.subtitle_track]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        assets = [{"id": "asset-1", "target_url": "/tmp/a.mp4", "metadata": {"duration": 5.0}}]
+        stickers = [StickerClip(name="Smile", sticker_type="emoji", content="😀", scale=1.5)]
+        result = self.store.save(self.path, self.tracks, {"name": "Demo", "resolution": (1920, 1080)}, assets, stickers)
+
+        document = self.store.load(result.path)
+        self.assertEqual(document.project["name"], "Demo")
+        self.assertEqual([t.name for t in document.tracks], ["Main Track", "Subtitles"])
+        self.assertIsInstance(document.tracks[0], MagneticTrack)
+        self.assertEqual(document.tracks[0].id, self.main_track.id)
+        self.assertAlmostEqual(document.tracks[0].clips[1].in_point, 1.0)
+        self.assertAlmostEqual(document.tracks[0].clips[1].start_time, 5.0)
+        self.assertEqual(len(document.tracks[1].clips), 2000)
+        self.assertEqual(document.tracks[1].clips[10].text_content, "line 10")
+        self.assertEqual(document.stickers[0].scale, 1.5)
+        self.assertEqual(document.asset_count, 1)
+
+        loaded_assets = self.store.load_media_pool(result.path)
+        self.assertEqual(loaded_assets[0]["id"], "asset-1")
+        self.assertEqual(loaded_assets[0]["status"], "missing")
+
+    def test_delta_save_rewrites_only_changed_tracks(self):
+        first = self.store.save(self.path, self.tracks)
+        self.assertIn(f"tracks/{self.subtitle_track.id}.json", first.written)
+
+        self.main_track.clips[0].name = "renamed.mp4"
+        second = self.store.save(self.path, self.tracks)
+        self.assertEqual(second.written, [f"tracks/{self.main_track.id}.json"])
+        self.assertIn(f"tracks/{self.subtitle_track.id}.json", second.skipped)
+
+    def test_load_primes_delta_state(self):
+        self.store.save(self.path, self.tracks)
+        other = ProjectStore(autosave_dir=self.store.autosave_dir)
+        document = other.load(self.path)
+
+        result = other.save(document.path, document.tracks)
+        self.assertEqual(result.written, [])
+
+    def test_removed_track_file_is_deleted(self):
+        self.store.save(self.path, self.tracks)
+        result = self.store.save(self.path, [self.main_track])
+        track_file = f"tracks/{self.subtitle_track.id}.json"
+        self.assertIn(track_file, result.removed)
+        self.assertFalse(os.path.exists(os.path.join(result.path, track_file)))
+
+    def test_hydrate_media_pool_in_background(self):
+        assets = [{"id": "asset-1", "target_url": self.path, "metadata": {}}]
+        result = self.store.save(self.path, self.tracks, assets=assets)
+        received = []
+        thread = self.store.hydrate_media_pool(result.path, received.extend)
+        thread.join(timeout=5)
+        self.assertEqual([a["id"] for a in received], ["asset-1"])
+
+    def test_autosave_does_not_change_current_project(self):
+        self.store.autosave(self.tracks, {"name": "Demo"})
+        self.assertIsNone(self.store.current_path)
+        self.assertTrue(os.listdir(self.store.autosave_dir))
+
+    def test_autosave_in_background(self):
+        release = threading.Event()
+        autosave = self.store.autosave
+
+        def slow_autosave(*args):
+            release.wait(5)
+            return autosave(*args)
+
+        with patch.object(self.store, "autosave", side_effect=slow_autosave):
+            thread = self.store.autosave_in_background(self.tracks, {"name": "Demo"})
+            # One autosave at a time: the next round is skipped while this one runs
+            self.assertIsNone(self.store.autosave_in_background(self.tracks, {"name": "Demo"}))
+            release.set()
+            thread.join(timeout=5)
+        path = self.store.autosave_path("Demo")
+        self.assertTrue(os.path.exists(os.path.join(path, MANIFEST_FILE)))
+        self.assertIsNone(self.store.current_path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.queue_manager import QueueManager, TaskStatus, TaskType
+from src.core.render_supervisor import RenderCancelled, RenderSupervisor, render_supervisor
+
+SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+QUICK = [sys.executable, "-c", "pass"]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not condition():
+        time.sleep(0.02)
+    return condition()
+
+
+class TestRenderSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.supervisor = RenderSupervisor(capacity=4, default_nice=0)
+
+    def run_in_thread(self, job_id, cmd, threads, results):
+        def target():
+            try:
+                with self.supervisor.process(cmd, threads, job_id) as process:
+                    process.wait()
+                results.append(process.returncode)
+            except RenderCancelled:
+                results.append("cancelled")
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def test_thread_budget_serializes_oversubscribed_jobs(self):
+        first = self.supervisor.start_job("first")
+        second = self.supervisor.start_job("second")
+        results = []
+        self.run_in_thread(first, SLEEP, 3, results)
+        self.assertTrue(wait_for(lambda: self.supervisor.threads_in_use == 3))
+
+        waiting = self.run_in_thread(second, QUICK, 2, results)
+        time.sleep(0.3)
+        # 3 + 2 exceeds capacity 4, so the second process has not started
+        self.assertEqual(results, [])
+        self.assertTrue(self.supervisor.cancel(first))
+        waiting.join(timeout=10)
+        self.assertEqual(results[-1], 0)
+        self.assertTrue(wait_for(lambda: self.supervisor.threads_in_use == 0))
+
+    def test_cancel_stops_processes_and_refuses_new_ones(self):
+        job_id = self.supervisor.start_job("export")
+        results = []
+        thread = self.run_in_thread(job_id, SLEEP, 1, results)
+        self.assertTrue(wait_for(lambda: self.supervisor.active_jobs()[0]["processes"] == 1))
+        self.supervisor.cancel(job_id)
+        thread.join(timeout=10)
+        self.assertNotEqual(results[0], 0)
+        with self.assertRaises(RenderCancelled):
+            with self.supervisor.process(QUICK, 1, job_id):
+                pass
+
+    @unittest.skipUnless(hasattr(os, "setpriority"), "needs POSIX niceness")
+    def test_processes_are_reniced(self):
+        self.supervisor.default_nice = 7
+        with self.supervisor.job("export"):
+            with self.supervisor.process(SLEEP, 1) as process:
+                niceness = os.getpriority(os.PRIO_PROCESS, process.pid)
+                process.kill()
+        self.assertGreaterEqual(niceness, 7)
+
+    def test_timeout_cancels_job(self):
+        results = []
+        job_id = self.supervisor.start_job("export", timeout=0.3)
+        thread = self.run_in_thread(job_id, SLEEP, 1, results)
+        thread.join(timeout=10)
+        self.assertTrue(self.supervisor.is_cancelled(job_id))
+        self.assertNotEqual(results[0], 0)
+
+    @unittest.skipIf(sys.platform.startswith("win"), "needs SIGSTOP")
+    def test_pause_holds_new_processes(self):
+        job_id = self.supervisor.start_job("export")
+        self.assertTrue(self.supervisor.pause(job_id))
+        results = []
+        thread = self.run_in_thread(job_id, QUICK, 1, results)
+        time.sleep(0.3)
+        self.assertEqual(results, [])
+        self.supervisor.resume(job_id)
+        thread.join(timeout=10)
+        self.assertEqual(results, [0])
+
+    def test_pause_without_sigstop_leaves_job_running(self):
+        job_id = self.supervisor.start_job("export")
+        with mock.patch("src.core.render_supervisor.signal", spec=[]):
+            self.assertFalse(self.supervisor.pause(job_id))
+        self.assertFalse(next(job for job in self.supervisor.active_jobs() if job["id"] == job_id)["paused"])
+        results = []
+        thread = self.run_in_thread(job_id, QUICK, 1, results)
+        thread.join(timeout=10)
+        self.assertEqual(results, [0])
+
+
+@unittest.skipIf(sys.platform.startswith("win"), "uses a shebang script as ffmpeg")
+class TestSharedThreadBudget(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.supervisor = RenderSupervisor(capacity=4, default_nice=0)
+        # Stand-in ffmpeg: takes a second, then writes the output file
+        self.ffmpeg = os.path.join(self.temp_dir, "ffmpeg")
+        with open(self.ffmpeg, "w") as f:
+            f.write(f"#!{sys.executable}\nimport sys, time\ntime.sleep(1)\nopen(sys.argv[-1], 'wb').close()\n")
+        os.chmod(self.ffmpeg, os.stat(self.ffmpeg).st_mode | stat.S_IEXEC)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _remove_subtitles(self, name, results):
+        from src.core.ai.subtitle_remover import SubtitleRemoverService
+        service = SubtitleRemoverService()
+        service._gpu_encoder = {"encoder": "libx264", "preset": [], "extra": []}
+        output = os.path.join(self.temp_dir, f"{name}.mp4")
+        results.append(service.remove_subtitles_ffmpeg(os.path.join(self.temp_dir, "in.mp4"), output))
+
+    def test_subtitle_removals_and_an_export_run_side_by_side(self):
+        self.assertEqual(self.supervisor.shared_budget(), 2)
+        results = []
+        with mock.patch("src.core.ai.subtitle_remover.render_supervisor", self.supervisor), \
+                mock.patch("src.core.ai.subtitle_remover.get_ffmpeg_path", return_value=self.ffmpeg):
+            started = time.monotonic()
+            threads = [threading.Thread(target=self._remove_subtitles, args=(name, results)) for name in ("a", "b")]
+            for thread in threads:
+                thread.start()
+            # Each removal holds half the machine, so both run at once
+            self.assertTrue(wait_for(lambda: self.supervisor.threads_in_use == 4))
+            for thread in threads:
+                thread.join(timeout=10)
+        self.assertEqual(results, [True, True])
+        self.assertLess(time.monotonic() - started, 1.9)
+
+        # An export started next to a running job takes a share too
+        from src.core.encoders import DEFAULT_CPU_PROFILE
+        from src.core.export.renderer import RenderEngine
+        engine = RenderEngine()
+        engine.supervisor = self.supervisor
+        self.assertEqual(engine._thread_limit(DEFAULT_CPU_PROFILE), 4)
+        job_id = self.supervisor.start_job("removal")
+        with self.supervisor.process(SLEEP, self.supervisor.shared_budget(), job_id):
+            self.assertEqual(engine._thread_limit(DEFAULT_CPU_PROFILE), 2)
+            self.supervisor.cancel(job_id)
+        self.supervisor.finish_job(job_id)
+
+
+class TestQueueCancelRunningTask(unittest.TestCase):
+    def setUp(self):
+        self.queue = QueueManager(max_workers=1)
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_cancel_running_task_stops_its_ffmpeg(self):
+        started = threading.Event()
+
+        def handle_remove_sub(data, progress_callback):
+            with render_supervisor.process(SLEEP, 1, stdout=subprocess.DEVNULL) as process:
+                started.set()
+                process.wait()
+            if process.returncode != 0:
+                raise Exception("Failed to process video")
+
+        self.queue.register_handler(TaskType.REMOVE_SUB, handle_remove_sub)
+        task = self.queue.add_task(TaskType.REMOVE_SUB, "remove", {})
+        self.assertTrue(started.wait(5))
+        self.assertTrue(self.queue.cancel_task(task.id))
+        self.assertTrue(wait_for(lambda: not render_supervisor.active_jobs()))
+        self.assertEqual(task.status, TaskStatus.CANCELLED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import unittest
+from PyQt6.QtCore import QCoreApplication
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.export.renderer import RenderEngine
+from src.core.export.segment_cache import SegmentCache, segment_key
+from src.core.export.segments import SegmentPiece, plan_stable_segments
+
+FAKE_FFMPEG = """#!{python}
+import sys
+output = sys.argv[-1]
+with open(output, "w") as f:
+    f.write(" ".join(sys.argv[1:]))
+sys.stdout.write("out_time_us=1000000\\nprogress=end\\n")
+"""
+
+
+def piece(path, in_point, out_point):
+    return SegmentPiece({"path": path}, in_point, out_point)
+
+
+def boundaries(segments):
+    return [tuple((p.path, p.in_point, p.out_point) for p in s.pieces) for s in segments]
+
+
+class TestStableSegments(unittest.TestCase):
+    def test_editing_one_clip_keeps_other_segments(self):
+        pieces = [piece(f"{i}.mp4", 0.0, 3.0) for i in range(40)]
+        before = boundaries(plan_stable_segments(pieces, target_seconds=10.0))
+        pieces[20] = piece("20.mp4", 0.0, 1.5)
+        after = boundaries(plan_stable_segments(pieces, target_seconds=10.0))
+        changed = set(after) - set(before)
+        self.assertLessEqual(len(changed), 2)
+        self.assertGreater(len(after), 4)
+
+    def test_long_clip_is_cut_on_a_source_grid(self):
+        segments = plan_stable_segments([piece("long.mp4", 3.0, 47.0)], target_seconds=10.0)
+        self.assertTrue(all(s.split for s in segments))
+        self.assertEqual([(s.pieces[0].in_point, s.pieces[0].out_point) for s in segments],
+                         [(3.0, 10.0), (10.0, 20.0), (20.0, 30.0), (30.0, 40.0), (40.0, 47.0)])
+        self.assertEqual([s.start for s in segments], [0.0, 7.0, 17.0, 27.0, 37.0])
+
+
+class TestSegmentCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.temp_dir, "src.mp4")
+        with open(self.source, "wb") as f:
+            f.write(b"source")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_key_tracks_source_and_render_settings(self):
+        key = segment_key([(self.source, 0.0, 5.0)], {"encoder": ["libx264"]})
+        self.assertEqual(key, segment_key([(self.source, 0.0, 5.0)], {"encoder": ["libx264"]}))
+        self.assertNotEqual(key, segment_key([(self.source, 0.0, 5.5)], {"encoder": ["libx264"]}))
+        self.assertNotEqual(key, segment_key([(self.source, 0.0, 5.0)], {"encoder": ["h264_nvenc"]}))
+        with open(self.source, "ab") as f:
+            f.write(b"edited")
+        self.assertNotEqual(key, segment_key([(self.source, 0.0, 5.0)], {"encoder": ["libx264"]}))
+        self.assertIsNone(segment_key([(os.path.join(self.temp_dir, "gone.mp4"), 0.0, 1.0)], {}))
+
+    def test_lru_eviction_keeps_recently_used(self):
+        cache = SegmentCache(os.path.join(self.temp_dir, "cache"), max_bytes=250)
+        part = os.path.join(self.temp_dir, "part.mp4")
+        with open(part, "wb") as f:
+            f.write(b"x" * 100)
+        cache.put("a", part)
+        cache.put("b", part)
+        # Make "a" the most recently used before a third entry forces eviction
+        os.utime(cache.get("b", ".mp4"), ns=(0, 1))
+        self.assertIsNotNone(cache.get("a", ".mp4"))
+        cache.put("c", part)
+        self.assertIsNotNone(cache.get("a", ".mp4"))
+        self.assertIsNone(cache.get("b", ".mp4"))
+        self.assertLessEqual(cache.size(), 250)
+
+
+@unittest.skipIf(sys.platform.startswith("win"), "uses a shebang script as ffmpeg")
+class TestCachedReexport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        if not QCoreApplication.instance():
+            self.app = QCoreApplication(sys.argv)
+        self.engine = RenderEngine()
+        self.engine.ffmpeg_path = os.path.join(self.temp_dir, "ffmpeg")
+        with open(self.engine.ffmpeg_path, "w") as f:
+            f.write(FAKE_FFMPEG.format(python=sys.executable))
+        os.chmod(self.engine.ffmpeg_path, os.stat(self.engine.ffmpeg_path).st_mode | stat.S_IEXEC)
+        self.engine.segment_cache = SegmentCache(os.path.join(self.temp_dir, "segments"))
+        self.settings = {"resolution": "1280x720", "fps": 30, "encoder": "cpu", "parallel_export": True,
+                         "segment_cache": True}
+
+        self.clips = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir, f"clip{i}.mp4")
+            open(path, "wb").close()
+            self.clips.append({"path": path, "start": i * 30.0, "duration": 30.0})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def render(self, subtitles=None):
+        finished = []
+        self.engine.render_finished.connect(lambda ok, msg: finished.append(ok))
+        output_path = os.path.join(self.temp_dir, "out.mp4")
+        self.engine.render_timeline(self.clips, output_path, self.settings, subtitles=subtitles)
+        deadline = time.time() + 10
+        while not finished and time.time() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.02)
+        self.engine.render_finished.disconnect()
+        self.assertEqual(finished, [True])
+
+    def test_reexport_only_encodes_changed_segments(self):
+        self.render()
+        cache = self.engine.segment_cache
+        # Each 30s clip is cut at source time 20s
+        self.assertEqual((cache.hits, cache.misses), (0, 6))
+        self.render()
+        self.assertEqual(cache.hits, 6)
+        # A subtitle early in the second clip invalidates only that segment
+        self.render(subtitles=[{"start_time": 40.0, "duration": 2.0, "text_content": "hi"}])
+        self.assertEqual((cache.hits, cache.misses), (11, 7))
+
+    def test_cache_is_opt_in_and_does_not_force_chunking(self):
+        self.engine.settings = {}
+        self.assertFalse(self.engine._use_segment_cache())
+        self.engine.settings = {"segment_cache": True}
+        self.assertTrue(self.engine._use_segment_cache())
+        self.assertFalse(self.engine._use_chunked_render(90.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
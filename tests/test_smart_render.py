@@ -0,0 +1,123 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from dataclasses import replace
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.export.renderer import RenderEngine
+from src.core.export.smart_render import SmartRenderPlanner
+from src.core.media_probe import media_probe_cache
+
+H264_1080 = {
+    "duration": 60.0,
+    "has_audio": True,
+    "video": {"codec": "h264", "profile": "High", "level": 40, "width": 1920, "height": 1080, "fps": 30.0,
+              "pix_fmt": "yuv420p"},
+}
+HEVC_1080 = {**H264_1080, "video": {**H264_1080["video"], "codec": "hevc"}}
+MAIN_1080 = {**H264_1080, "video": {**H264_1080["video"], "profile": "Main"}}
+
+
+class TestSmartRenderPlanner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.engine = RenderEngine()
+        self.engine.settings.update({"resolution": "1920x1080", "fps": 30, "speed": 1.0, "encoder": "cpu", "segment_cache": False})
+        self.engine.stickers, self.engine.subtitles, self.engine.audio_tracks = [], [], []
+        self.paths = {}
+        for name in ("a", "b"):
+            self.paths[name] = os.path.join(self.temp_dir, f"{name}.mp4")
+            open(self.paths[name], "wb").close()
+        self.probes = {self.paths["a"]: H264_1080, self.paths["b"]: H264_1080}
+        self.planner = SmartRenderPlanner(
+            probe=self.probes.get,
+            # Source GOP of 2 seconds
+            keyframes=lambda path, start, end: [t * 2.0 for t in range(31) if start <= t * 2.0 <= end],
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def context(self, clips):
+        return self.engine._prepare_render(clips, os.path.join(self.temp_dir, "out.mp4"))
+
+    def test_trim_copies_whole_gops_and_encodes_cut_points(self):
+        ctx = self.context([{"path": self.paths["a"], "in_point": 1.0, "out_point": 9.5}])
+        units = self.planner.plan(ctx)
+        self.assertEqual(
+            [(u.kind, u.in_point, u.out_point, u.reason) for u in units],
+            [("encode", 1.0, 2.0, "head"), ("copy", 2.0, 8.0, ""), ("encode", 8.0, 9.5, "tail")],
+        )
+        self.assertEqual([u.start for u in units], [0.0, 1.0, 7.0])
+
+    def test_keyframe_aligned_trim_is_copied_entirely(self):
+        ctx = self.context([{"path": self.paths["a"], "in_point": 4.0, "out_point": 10.0}])
+        units = self.planner.plan(ctx)
+        self.assertEqual([(u.kind, u.in_point, u.out_point) for u in units], [("copy", 4.0, 10.0)])
+
+    def test_modified_clips_are_encoded(self):
+        self.probes[self.paths["b"]] = HEVC_1080
+        self.engine.subtitles = [{"start_time": 1.0, "duration": 1.0, "text_content": "hi"}]
+        ctx = self.context([
+            {"path": self.paths["a"], "start": 0.0, "duration": 4.0},
+            {"path": self.paths["b"], "start": 4.0, "duration": 4.0},
+            {"path": self.paths["a"], "start": 8.0, "in_point": 10.0, "duration": 4.0},
+        ])
+        units = self.planner.plan(ctx)
+        self.assertEqual([(u.kind, u.reason) for u in units],
+                         [("encode", "subtitles"), ("encode", "codec"), ("copy", "")])
+
+    def test_copied_clips_share_one_stream_format(self):
+        self.probes[self.paths["b"]] = MAIN_1080
+        ctx = self.context([
+            {"path": self.paths["a"], "start": 0.0, "duration": 4.0},
+            {"path": self.paths["b"], "start": 4.0, "duration": 4.0},
+        ])
+        units = self.planner.plan(ctx)
+        self.assertEqual([(u.kind, u.reason) for u in units], [("copy", ""), ("encode", "stream")])
+
+    def test_hardware_encoder_disables_smart_render(self):
+        ctx = self.context([{"path": self.paths["a"], "duration": 10.0}])
+        ctx.encoder = replace(ctx.encoder, name="nvenc", encoder="h264_nvenc", hardware=True)
+        self.assertIsNone(self.planner.plan(ctx))
+
+    def test_smart_render_is_opt_in(self):
+        ctx = self.context([{"path": self.paths["a"], "duration": 10.0}])
+        self.assertIsNone(self.engine._plan_smart_render(ctx))
+
+    def test_pixel_changes_disable_smart_render(self):
+        self.engine.settings["speed"] = 1.5
+        ctx = self.context([{"path": self.paths["a"], "duration": 10.0}])
+        self.assertIsNone(self.planner.plan(ctx))
+
+    def test_scaled_output_is_not_copied(self):
+        self.engine.settings["resolution"] = "1280x720"
+        ctx = self.context([{"path": self.paths["a"], "duration": 10.0}])
+        self.assertIsNone(self.planner.plan(ctx))
+
+    def test_smart_jobs_copy_and_encode_matching_streams(self):
+        media_probe_cache.put(self.paths["a"], H264_1080)
+        self.addCleanup(media_probe_cache.invalidate, self.paths["a"])
+        ctx = self.context([{"path": self.paths["a"], "in_point": 1.0, "out_point": 9.5}])
+        units = self.planner.plan(ctx)
+        work_dir = os.path.join(self.temp_dir, "work")
+        os.makedirs(work_dir)
+        jobs, _, join_cmd = self.engine._build_smart_jobs(ctx, units, os.path.join(self.temp_dir, "out.mp4"), work_dir)
+
+        head, copy, tail = (cmd for cmd, _ in jobs)
+        self.assertEqual(copy[copy.index("-c") + 1], "copy")
+        self.assertLess(copy.index("-ss"), copy.index("-i"))
+        self.assertEqual(head[head.index("-s") + 1], "1920x1080")
+        self.assertEqual(head[head.index("-c:v") + 1], "libx264")
+        self.assertEqual(tail[tail.index("-profile:v") + 1], "high")
+        self.assertEqual(tail[tail.index("-level:v") + 1], "4.0")
+        self.assertEqual(tail[tail.index("-t") + 1], "1.500000")
+        self.assertEqual(join_cmd[join_cmd.index("-c") + 1], "copy")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -32,6 +32,56 @@ class TestStateManager(unittest.TestCase):
         found = state_manager.find_asset_by_path("/tmp/missing.mp4")
         self.assertIsNone(found)
 
+    def test_find_asset_by_normalized_path(self):
+        state_manager.add_asset({"id": "asset-2", "target_url": "/tmp/media/clip.mp4"})
+        self.assertEqual(state_manager.find_asset_by_path("/tmp/media/../media/clip.mp4")["id"], "asset-2")
+
+    def test_indexes_follow_remove(self):
+        state_manager.add_asset({"id": "asset-3", "target_url": "/tmp/a.mp4"})
+
+        removed = []
+        state_manager.media_removed.connect(removed.append)
+        try:
+            state_manager.remove_asset("asset-3")
+            state_manager.remove_asset("asset-3")
+        finally:
+            state_manager.media_removed.disconnect(removed.append)
+        self.assertEqual([asset["id"] for asset in removed], ["asset-3"])
+        self.assertIsNone(state_manager.find_asset_by_path("/tmp/a.mp4"))
+
+    def test_add_assets_emits_single_batch(self):
+        single, batches = [], []
+        state_manager.media_imported.connect(single.append)
+        state_manager.media_batch_imported.connect(batches.append)
+        try:
+            state_manager.add_assets([
+                {"id": f"bulk-{i}", "target_url": f"/tmp/bulk_{i}.mp4"} for i in range(50)
+            ])
+        finally:
+            state_manager.media_imported.disconnect(single.append)
+            state_manager.media_batch_imported.disconnect(batches.append)
+
+        self.assertEqual(single, [])
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(len(batches[0]), 50)
+        self.assertEqual(state_manager.find_asset_by_path("/tmp/bulk_49.mp4")["id"], "bulk-49")
+
+    def test_clear_assets_empties_pool_and_indexes(self):
+        state_manager.add_assets([
+            {"id": "old-1", "target_url": "/tmp/old_1.mp4"},
+            {"id": "old-2", "target_url": "/tmp/old_2.mp4"},
+        ])
+        cleared = []
+        state_manager.media_cleared.connect(cleared.append)
+        try:
+            state_manager.clear_assets()
+            state_manager.clear_assets()
+        finally:
+            state_manager.media_cleared.disconnect(cleared.append)
+        self.assertEqual([[asset["id"] for asset in batch] for batch in cleared], [["old-1", "old-2"]])
+        self.assertEqual(state_manager.get_assets(), [])
+        self.assertIsNone(state_manager.find_asset_by_path("/tmp/old_1.mp4"))
+
 
 if __name__ == "__main__":
     unittest.main()
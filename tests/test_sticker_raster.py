@@ -0,0 +1,106 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.export.renderer import RenderEngine
+from src.core.export.sticker_raster import StickerLayer, StickerRasterCache
+
+
+class TestStickerRasterCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = StickerRasterCache(cache_dir=os.path.join(self.temp_dir, "stickers"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_identical_stickers_are_rasterized_once(self):
+        stickers = [{"content": "😀", "scale": 1.0, "x": x, "y": 0} for x in (-300, 0, 300)]
+        stickers.append({"content": "😀", "scale": 2.0, "x": 0, "y": 200})
+        self.cache.build_layers(stickers, 1080, 1920)
+        self.assertEqual(self.cache.rasterized, 2)
+
+        # A fresh process finds the rasters on disk
+        other = StickerRasterCache(cache_dir=self.cache.cache_dir)
+        other.build_layers(stickers, 1080, 1920)
+        self.assertEqual(other.rasterized, 0)
+
+    def test_stickers_sharing_a_window_become_one_layer(self):
+        stickers = [
+            {"content": "😀", "x": -100, "y": 0, "start_time": 2.0, "duration": 3.0},
+            {"content": "🔥", "x": 100, "y": 0, "start_time": 2.0, "duration": 3.0},
+            {"content": "⭐", "x": 0, "y": 0, "start_time": 8.0, "duration": 1.0},
+            {"content": "✅", "x": 0, "y": 300},
+        ]
+        layers = self.cache.build_layers(stickers, 1080, 1920)
+        self.assertEqual([(l.start, l.end) for l in layers], [(0.0, None), (2.0, 5.0), (8.0, 9.0)])
+        shared = layers[1]
+        # Bounding box of both 200px stickers, 200px apart
+        self.assertEqual((shared.x, shared.y), (340, 860))
+        from PIL import Image
+        with Image.open(shared.path) as image:
+            self.assertEqual(image.size, (400, 200))
+
+    def test_cache_is_size_capped_and_keeps_the_current_export(self):
+        self.cache.max_bytes = 1
+        first = self.cache.build_layers([{"content": "😀"}], 1080, 1920)
+        self.assertTrue(os.path.exists(first[0].path))
+        second = self.cache.build_layers([{"content": "🔥"}], 1080, 1920)
+        # Over the cap: the earlier raster goes, the one being exported stays
+        self.assertFalse(os.path.exists(first[0].path))
+        self.assertTrue(os.path.exists(second[0].path))
+
+        # An evicted raster still held in memory is written back when reused
+        again = self.cache.build_layers([{"content": "😀"}], 1080, 1920)
+        self.assertEqual(again[0].path, first[0].path)
+        self.assertTrue(os.path.exists(again[0].path))
+        self.assertEqual(os.listdir(self.cache.cache_dir), [os.path.basename(first[0].path)])
+        self.assertEqual(self.cache.rasterized, 2)
+
+
+class TestStickerOverlayGating(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.clip = os.path.join(self.temp_dir, "a.mp4")
+        open(self.clip, "wb").close()
+        self.engine = RenderEngine()
+        self.engine.settings.update({"resolution": "1080x1920", "fps": 30, "speed": 1.0})
+        self.engine.subtitles, self.engine.audio_tracks = [], []
+        self.engine.stickers = []
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def graph_for(self, ctx, time_range=None):
+        cmd = self.engine._compose_command(ctx, "list.txt", "out.mp4", time_range=time_range)
+        return cmd[cmd.index("-filter_complex") + 1] if "-filter_complex" in cmd else ""
+
+    def test_overlays_are_time_gated_per_part(self):
+        ctx = self.engine._prepare_render([{"path": self.clip, "duration": 60.0}], os.path.join(self.temp_dir, "o.mp4"))
+        ctx.sticker_layers = [
+            StickerLayer("always.png", 0, 0),
+            StickerLayer("timed.png", 10, 20, 35.0, 40.0),
+        ]
+        self.assertIn("overlay=10:20:enable='between(t,35.000,40.000)'", self.graph_for(ctx))
+
+        # A chunk starting at 30s sees the window in its own time base
+        self.assertIn("enable='between(t,5.000,10.000)'", self.graph_for(ctx, (30.0, 45.0)))
+        # A chunk outside the window gets no input or overlay for it
+        graph = self.graph_for(ctx, (0.0, 15.0))
+        self.assertEqual(graph.count("overlay="), 1)
+        self.assertNotIn("enable", graph)
+
+    def test_speed_scales_overlay_window(self):
+        self.engine.settings["speed"] = 2.0
+        ctx = self.engine._prepare_render([{"path": self.clip, "duration": 60.0}], os.path.join(self.temp_dir, "o.mp4"))
+        ctx.sticker_layers = [StickerLayer("late.png", 0, 0, 10.0, None)]
+        self.assertIn("enable='gte(t,5.000)'", self.graph_for(ctx))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import sys
+import unittest
+from unittest import mock
+from PyQt6.QtWidgets import QApplication, QMessageBox
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai.transcription import transcription_service
+from src.core.ai.translation_engine import INTERACTIVE_RETRY_SECONDS, RateLimitError
+from src.core.ai.tts import VoiceoverTrack, tts_service
+from src.core.queue_manager import queue_manager, QueueTask, TaskType, TaskStatus
+from src.core.timeline.clip import Clip
+from src.ui.panels.timeline import Timeline
+
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def segment(start: float, text: str) -> dict:
+    return {"start": start, "end": start + 1.0, "text": text}
+
+
+class TestStreamedTranscription(unittest.TestCase):
+    def setUp(self):
+        self.panel = Timeline()
+        self.panel.timeline_widget.main_track.add_clip(Clip("/tmp/video.mp4", "video", duration=60.0))
+        handlers = {}
+        with mock.patch.object(queue_manager, "register_handler",
+                               side_effect=lambda task_type, handler: handlers.__setitem__(task_type, handler)):
+            self.panel._register_transcription_handler()
+        self.handle = handlers[TaskType.TRANSCRIBE]
+
+    def tearDown(self):
+        queue_manager.task_updated.disconnect(self.panel._on_queue_task_updated)
+
+    def run_transcription(self, *batches, fail=None, translate_to=None):
+        def stream(*args, **kwargs):
+            yield from batches
+            if fail is not None:
+                raise fail
+
+        data = {"video_path": "/tmp/video.mp4", "translate_to": translate_to, "timeline_ref": self.panel}
+        method = "iter_transcribe_and_translate" if translate_to else "iter_transcribe"
+        with mock.patch.object(transcription_service, method, side_effect=stream) as transcribe, \
+                mock.patch.object(self.panel, "_on_queue_transcription_complete"):
+            self.handle(data, lambda progress: None)
+        return transcribe
+
+    def subtitle_texts(self):
+        track = next(t for t in self.panel.timeline_widget.tracks if t.name == "Subtitles")
+        return [clip.text_content for clip in track.clips]
+
+    def test_rerun_after_failure_replaces_the_partial_track(self):
+        with self.assertRaises(RuntimeError):
+            self.run_transcription([segment(0, "stale 1")], [segment(1, "stale 2")],
+                                   fail=RuntimeError("whisper crashed"))
+        self.assertEqual(self.subtitle_texts(), ["stale 1", "stale 2"])
+
+        self.run_transcription([segment(0, "fresh 1")], [segment(1, "fresh 2")])
+        self.assertEqual(self.subtitle_texts(), ["fresh 1", "fresh 2"])
+
+    def test_rate_limit_offers_a_fallback_provider(self):
+        self.panel.start_transcription = mock.Mock()
+        self.panel._current_language, self.panel._current_translate_to = None, "vi"
+        transcribe = self.run_transcription([segment(0, "xin chào")], translate_to="vi",
+                                            fail=RateLimitError("Gemini Pro"))
+        self.assertEqual(transcribe.call_args.kwargs["retry"].max_seconds, INTERACTIVE_RETRY_SECONDS)
+        self.assertEqual(self.subtitle_texts(), ["xin chào"])
+
+        with mock.patch.object(QMessageBox, "question", return_value=QMessageBox.StandardButton.Yes) as question, \
+                mock.patch("src.core.ai.translation.translation_service.set_provider") as set_provider:
+            app.processEvents()
+        self.assertIn("Gemini Pro", question.call_args.args[2])
+        set_provider.assert_called_once_with("google")
+        self.panel.start_transcription.assert_called_once_with(None, "vi")
+
+    def test_failed_transcription_task_stops_streaming(self):
+        self.panel._on_transcription_batch([segment(0, "partial")])
+        self.assertTrue(self.panel._streaming_subtitles)
+
+        queue_manager.task_updated.emit(QueueTask(task_type=TaskType.EXPORT, status=TaskStatus.FAILED))
+        self.assertTrue(self.panel._streaming_subtitles)
+        queue_manager.task_updated.emit(QueueTask(task_type=TaskType.TRANSCRIBE, status=TaskStatus.FAILED))
+        self.assertFalse(self.panel._streaming_subtitles)
+
+
+
+class TestSubtitleVoiceover(unittest.TestCase):
+    def setUp(self):
+        self.panel = Timeline()
+        self.panel.timeline_widget.main_track.add_clip(Clip("/tmp/video.mp4", "video", duration=60.0))
+        self.panel.timeline_widget.add_subtitle_track([segment(2.0, "xin chào"), segment(5.0, "tạm biệt")])
+
+    def test_lines_matching_the_subtitles_keep_their_timing(self):
+        self.assertEqual(self.panel._subtitle_segments("hello\ngoodbye"), [
+            {"start": 2.0, "end": 3.0, "text": "hello"},
+            {"start": 5.0, "end": 6.0, "text": "goodbye"},
+        ])
+        self.assertEqual(self.panel._subtitle_segments("one rewritten paragraph"), [])
+
+    def test_voiceover_lands_on_the_voiceover_track(self):
+        handlers = {}
+        with mock.patch.object(queue_manager, "register_handler",
+                               side_effect=lambda task_type, handler: handlers.__setitem__(task_type, handler)), \
+                mock.patch.object(queue_manager, "add_task") as add_task, \
+                mock.patch.object(QMessageBox, "information"):
+            self.panel.start_voiceover(self.panel._subtitle_segments("xin chào\ntạm biệt"), "vi-VN-HoaiMyNeural")
+        task_type, _, data = add_task.call_args.args
+        self.assertEqual(data["duration"], 60.0)
+
+        voiceover = VoiceoverTrack(path=data["output_path"], duration=60.0, segments=2)
+        with mock.patch.object(tts_service, "generate_voiceover", return_value=voiceover) as generate, \
+                mock.patch.object(tts_service, "generate_speech") as speech:
+            handlers[task_type](data, lambda progress: None)
+        generate.assert_called_once_with(data["segments"], data["output_path"],
+                                         voice="vi-VN-HoaiMyNeural", duration=60.0)
+        speech.assert_not_called()
+
+        with mock.patch.object(QMessageBox, "information"):
+            app.processEvents()
+        track = next(t for t in self.panel.timeline_widget.tracks if t.name == "AI Voiceover")
+        self.assertEqual([(clip.asset_id, clip.duration) for clip in track.clips], [(data["output_path"], 60.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
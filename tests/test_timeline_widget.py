@@ -0,0 +1,101 @@
+import os
+import sys
+import unittest
+from PyQt6.QtWidgets import QApplication, QWidget
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.timeline.clip import Clip
+from src.core.timeline.interval_index import ClipIntervalIndex
+from src.core.timeline.track import Track
+from src.ui.timeline.clip_widget import ClipLayerCache
+from src.ui.timeline.timeline_widget import TimelineWidget
+
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+def make_subtitle_track(count: int) -> Track:
+    track = Track("Subtitles")
+    for i in range(count):
+        track.clips.append(
+            Clip("text_generated", f"line {i}", duration=1.0, start_time=i * 1.5,
+                 clip_type="text", text_content=f"line {i}")
+        )
+    return track
+
+
+class TestClipIntervalIndex(unittest.TestCase):
+    def test_query_returns_only_overlapping_clips(self):
+        index = ClipIntervalIndex(make_subtitle_track(2000).clips)
+        visible = index.query(30.0, 45.0)
+        self.assertEqual(visible[0].name, "line 20")
+        self.assertEqual(visible[-1].name, "line 29")
+        self.assertAlmostEqual(index.end_time, 1999 * 1.5 + 1.0)
+
+    def test_min_length_extends_short_clips(self):
+        index = ClipIntervalIndex([Clip("a", "short", duration=0.1, start_time=10.0)])
+        self.assertEqual(index.query(10.5, 11.0), [])
+        self.assertEqual(len(index.query(10.5, 11.0, min_length=1.0)), 1)
+        self.assertIsNotNone(index.clip_at(10.9, min_length=1.0))
+        self.assertIsNone(index.clip_at(10.9))
+
+
+class TestVirtualizedTimeline(unittest.TestCase):
+    def setUp(self):
+        self.timeline = TimelineWidget()
+        self.timeline.tracks.append(make_subtitle_track(2000))
+        self.timeline.refresh_tracks()
+
+    def test_no_widget_per_clip(self):
+        canvas = self.timeline._track_widgets[1].content_area
+        self.assertEqual(len(canvas.index), 2000)
+        # Only the "Hidden" label lives inside the canvas
+        self.assertLessEqual(len(canvas.findChildren(QWidget)), 1)
+
+    def test_zoom_rescales_without_rebuilding_index(self):
+        canvas = self.timeline._track_widgets[1].content_area
+        index_before = canvas.index.clips
+        self.timeline.set_zoom(80)
+        self.assertIs(canvas.index.clips, index_before)
+        self.assertEqual(canvas.pixels_per_second, 80)
+        self.assertGreaterEqual(canvas.minimumWidth(), int(canvas.index.end_time * 80))
+
+    def test_hit_testing_maps_click_to_clip(self):
+        canvas = self.timeline._track_widgets[1].content_area
+        clip = canvas.clip_at(15.2 * canvas.pixels_per_second)
+        self.assertEqual(clip.name, "line 10")
+
+
+class TestClipLayerCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ClipLayerCache()
+        self.clip = Clip("/tmp/a.mp4", "a.mp4", duration=2.0)
+
+    def test_repaint_reuses_layer(self):
+        first = self.cache.get_layer(self.clip, 120, 80, False)
+        second = self.cache.get_layer(self.clip, 120, 80, False)
+        self.assertIs(first, second)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_key_changes_invalidate(self):
+        base = self.cache.get_layer(self.clip, 120, 80, False)
+        self.assertIsNot(self.cache.get_layer(self.clip, 120, 80, True), base)
+        self.assertIsNot(self.cache.get_layer(self.clip, 240, 80, False), base)
+        self.clip.name = "renamed.mp4"
+        self.assertIsNot(self.cache.get_layer(self.clip, 120, 80, False), base)
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_budget_evicts_least_recently_used(self):
+        cache = ClipLayerCache(budget_bytes=130 * 80 * 4 * 2)
+        for width in (120, 121, 122):
+            cache.get_layer(self.clip, width, 80, False)
+        self.assertEqual(len(cache), 2)
+
+    def test_oversized_clips_are_not_cached(self):
+        self.assertIsNone(self.cache.get_layer(self.clip, ClipLayerCache.MAX_LAYER_WIDTH + 1, 80, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
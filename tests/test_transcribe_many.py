@@ -0,0 +1,99 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+import wave
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai import transcription
+from src.core.ai.audio_loader import DecodedAudio
+from src.core.ai.transcript_cache import TranscriptCache
+from src.core.ai.transcription import TranscriptionService
+
+
+class RecordingAudio(DecodedAudio):
+    """DecodedAudio that records which thread decoded it."""
+    loads = []
+
+    @property
+    def pcm(self):
+        if not self._loaded:
+            RecordingAudio.loads.append((os.path.basename(self.path), threading.current_thread().name))
+        return DecodedAudio.pcm.fget(self)
+
+
+class LengthModel:
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, **options):
+        self.calls += 1
+        return {"segments": [{"start": 0.0, "end": len(audio) / 16000, "text": f" file {self.calls} "}]}
+
+
+class TestTranscribeMany(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self._global_cache = transcription.transcript_cache
+        transcription.transcript_cache = TranscriptCache(os.path.join(self.temp_dir, "cache"))
+        transcription.DecodedAudio = RecordingAudio
+        RecordingAudio.loads = []
+
+        self.paths = []
+        for i, seconds in enumerate((1, 2, 3)):
+            path = os.path.join(self.temp_dir, f"clip{i}.wav")
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(16000)
+                wav.writeframes((np.arange(16000 * seconds) % 100 + i).astype("<i2").tobytes())
+            self.paths.append(path)
+
+        self.service = TranscriptionService()
+        self.service.backend = "whisper"
+        self.service.chunked = False
+        self.service.model = LengthModel()
+
+    def tearDown(self):
+        transcription.transcript_cache = self._global_cache
+        transcription.DecodedAudio = DecodedAudio
+        shutil.rmtree(self.temp_dir)
+
+    def test_batch_results_and_rtf(self):
+        missing = os.path.join(self.temp_dir, "missing.mp4")
+        seen = []
+        batch = self.service.transcribe_many(self.paths + [missing], on_file=lambda i, r: seen.append(i))
+
+        self.assertEqual(seen, [0, 1, 2, 3])
+        self.assertEqual([f.path for f in batch.files], self.paths + [missing])
+        self.assertEqual([f.segments[0]["end"] for f in batch.files[:3]], [1.0, 2.0, 3.0])
+        self.assertEqual([f.audio_seconds for f in batch.files], [1.0, 2.0, 3.0, None])
+        self.assertEqual(batch.files[3].segments, [])
+        self.assertEqual(batch.audio_seconds, 6.0)
+        self.assertIsNotNone(batch.files[0].rtf)
+        self.assertAlmostEqual(batch.rtf, batch.elapsed / 6.0)
+        self.assertEqual(self.service.model.calls, 3)
+
+        # Audio is decoded on the prefetch thread, not the model's caller
+        self.assertEqual([name for name, _ in RecordingAudio.loads], ["clip0.wav", "clip1.wav", "clip2.wav"])
+        self.assertTrue(all(thread.startswith("audio-prefetch") for _, thread in RecordingAudio.loads))
+
+    def test_second_batch_is_served_from_cache_without_decoding(self):
+        first = self.service.transcribe_many(self.paths)
+        RecordingAudio.loads = []
+        second = self.service.transcribe_many(self.paths)
+
+        self.assertEqual([f.segments for f in second.files], [f.segments for f in first.files])
+        self.assertEqual(second.cached, 3)
+        self.assertEqual([f.rtf for f in second.files], [None, None, None])
+        self.assertEqual(RecordingAudio.loads, [])
+        self.assertEqual(self.service.model.calls, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
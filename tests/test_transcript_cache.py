@@ -0,0 +1,119 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import wave
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai import transcription
+from src.core.ai.transcript_cache import TranscriptCache, pcm_fingerprint
+from src.core.ai.transcription import TranscriptionService
+
+
+def _write_wav(path, frames, rate=16000):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return path
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, **options):
+        self.calls += 1
+        return {"segments": [{"start": 0.0, "end": 1.0, "text": " hello "}]}
+
+
+class TestTranscriptCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = TranscriptCache(os.path.join(self.temp_dir, "cache"))
+        self._global_cache = transcription.transcript_cache
+        transcription.transcript_cache = self.cache
+
+    def tearDown(self):
+        transcription.transcript_cache = self._global_cache
+        shutil.rmtree(self.temp_dir)
+
+    def test_fingerprint_follows_audio_not_file(self):
+        frames = bytes(range(256)) * 64
+        a = _write_wav(os.path.join(self.temp_dir, "a.wav"), frames)
+        b = _write_wav(os.path.join(self.temp_dir, "b.wav"), frames)
+        c = _write_wav(os.path.join(self.temp_dir, "c.wav"), frames[::-1])
+        d = _write_wav(os.path.join(self.temp_dir, "d.wav"), frames, rate=8000)
+        self.assertEqual(pcm_fingerprint(a), pcm_fingerprint(b))
+        self.assertNotEqual(pcm_fingerprint(a), pcm_fingerprint(c))
+        self.assertNotEqual(pcm_fingerprint(a), pcm_fingerprint(d))
+        self.assertIsNone(pcm_fingerprint(os.path.join(self.temp_dir, "missing.wav")))
+
+    def test_non_wav_is_hashed_by_content(self):
+        path = os.path.join(self.temp_dir, "audio.mp3")
+        with open(path, "wb") as f:
+            f.write(b"ID3 not really audio")
+        self.assertEqual(len(self.cache.fingerprint(path)), 64)
+
+    def test_key_covers_settings(self):
+        base = self.cache.key("f" * 64, "whisper", None, {"model": "small"})
+        self.assertEqual(base, self.cache.key("f" * 64, "whisper", "auto", {"model": "small"}))
+        self.assertNotEqual(base, self.cache.key("f" * 64, "whisper", "en", {"model": "small"}))
+        self.assertNotEqual(base, self.cache.key("f" * 64, "whisper", None, {"model": "base"}))
+        self.assertNotEqual(base, self.cache.key("f" * 64, "mlx", None, {"model": "small"}))
+        self.assertIsNone(self.cache.key(None, "whisper", None, {}))
+
+    def test_round_trip(self):
+        segments = [{"start": 0.0, "end": 1.5, "text": "xin chào"}]
+        self.cache.put("k" * 64, segments)
+        self.assertEqual(self.cache.get("k" * 64), segments)
+        self.assertIsNone(self.cache.get("x" * 64))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_local_transcription_hits_cache(self):
+        path = _write_wav(os.path.join(self.temp_dir, "clip.wav"), b"\x01\x00" * 16000)
+        service = TranscriptionService()
+        service.backend = "whisper"
+        service.model = CountingModel()
+        service.chunked = False
+
+        first = service.transcribe(path)
+        second = service.transcribe(path)
+        self.assertEqual(first, [{"start": 0.0, "end": 1.0, "text": "hello"}])
+        self.assertEqual(second, first)
+        self.assertEqual(service.model.calls, 1)
+
+        service.transcribe(path, language="en")
+        self.assertEqual(service.model.calls, 2)
+
+    def test_openai_results_cached_and_failures_not(self):
+        path = _write_wav(os.path.join(self.temp_dir, "clip.wav"), b"\x02\x00" * 16000)
+        service = TranscriptionService()
+        service.set_openai_api_key("test-key")
+        service.set_use_openai_api(True)
+        responses = [[], [{"start": 0.0, "end": 1.0, "text": "remote"}]]
+        calls = []
+
+        def fake_openai(file_path, language=None):
+            calls.append(file_path)
+            return responses.pop(0)
+
+        service._transcribe_openai = fake_openai
+        service._preprocess_audio_for_openai = lambda file_path: file_path
+        service.backend = "whisper"
+        service.model = CountingModel()
+        service.chunked = False
+
+        # API failure falls back to local; the empty API result is not cached
+        self.assertEqual(service.transcribe(path)[0]["text"], "hello")
+        self.assertEqual(service.transcribe(path)[0]["text"], "remote")
+        self.assertEqual(service.transcribe(path)[0]["text"], "remote")
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
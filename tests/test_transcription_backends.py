@@ -0,0 +1,94 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai import transcription
+from src.core.ai.audio_loader import DecodedAudio
+from src.core.ai.model_host import MB, model_host
+from src.core.ai.transcript_cache import TranscriptCache
+from src.core.ai.transcription import BACKENDS, FasterWhisperBackend, TranscriptionService
+
+
+class FakeFasterWhisper:
+    """faster-whisper stand-in: a lazy segment generator plus info."""
+
+    def __init__(self, count):
+        self.count = count
+        self.kwargs = None
+
+    def transcribe(self, audio, **kwargs):
+        self.kwargs = kwargs
+
+        def segments():
+            for i in range(self.count):
+                yield SimpleNamespace(start=float(i), end=i + 0.5, text=f" seg {i} ")
+        return segments(), SimpleNamespace(language="en")
+
+
+class TestTranscriptionBackends(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self._global_cache = transcription.transcript_cache
+        transcription.transcript_cache = TranscriptCache(os.path.join(self.temp_dir, "cache"))
+        self.service = TranscriptionService()
+        self.service.model_name = "test-fake"
+
+    def tearDown(self):
+        transcription.transcript_cache = self._global_cache
+        shutil.rmtree(self.temp_dir)
+
+    def test_set_backend(self):
+        self.service.set_backend("Faster-Whisper")
+        self.assertEqual(self.service.backend, "faster-whisper")
+        with self.assertRaises(ValueError):
+            self.service.set_backend("nope")
+
+    def test_unavailable_backend_falls_back_to_auto(self):
+        self.service.backend = "mlx"
+        backend = self.service._local_backend()
+        self.assertIn(backend.name, ("faster-whisper", "whisper"))
+        self.assertTrue(backend.available(self.service))
+
+    def test_cache_options_differ_per_backend(self):
+        whisper = BACKENDS["whisper"].cache_options(self.service)
+        faster = BACKENDS["faster-whisper"].cache_options(self.service)
+        self.assertEqual(faster["compute_type"], "int8")
+        self.assertNotEqual(whisper, faster)
+
+    def test_faster_whisper_streams_batches_on_host(self):
+        fake = FakeFasterWhisper(20)
+        self.service.compute_type = "int8-test"
+        model_host.register("faster-whisper:test-fake:int8-test", lambda: fake, MB)
+
+        audio = DecodedAudio(os.path.join(self.temp_dir, "missing.mp4"))
+        batches = list(FasterWhisperBackend().iter_segments(self.service, audio, "en"))
+        self.assertEqual([len(batch) for batch in batches], [8, 8, 4])
+        self.assertEqual(batches[0][0], {"start": 0.0, "end": 0.5, "text": "seg 0"})
+        self.assertEqual(fake.kwargs["language"], "en")
+        self.assertTrue(fake.kwargs["vad_filter"])
+
+    def test_faster_whisper_through_service(self):
+        path = os.path.join(self.temp_dir, "clip.mp3")
+        with open(path, "wb") as f:
+            f.write(b"not decoded in this test")
+        fake = FakeFasterWhisper(3)
+        self.service.compute_type = "int8-service"
+        model_host.register("faster-whisper:test-fake:int8-service", lambda: fake, MB)
+        original = FasterWhisperBackend.available
+        FasterWhisperBackend.available = lambda backend, service: True
+        try:
+            self.service.backend = "faster-whisper"
+            segments = self.service.transcribe(path)
+        finally:
+            FasterWhisperBackend.available = original
+        self.assertEqual([seg["text"] for seg in segments], ["seg 0", "seg 1", "seg 2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
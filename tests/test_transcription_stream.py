@@ -0,0 +1,146 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+import wave
+from concurrent.futures import Future
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai import transcription
+from src.core.ai.parallel_transcription import parallel_transcriber
+from src.core.ai.transcript_cache import TranscriptCache
+from src.core.ai.transcription import TranscriptionService
+from src.core.ai.translation import translation_service
+from src.core.ai.translation_batching import TokenBatcher, estimate_tokens
+from src.core.ai.translation_engine import RateLimitError, RetryPolicy
+from src.core.ai.vad import SAMPLE_RATE
+
+
+def submitted(translate_batch, delays=()):
+    """submit_batch() stand-in; the nth future resolves after delays[n] seconds."""
+    count = []
+
+    def submit_batch(texts, target_lang, source_lang="auto", retry=None):
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(translate_batch(texts, target_lang, source_lang, retry))
+            except Exception as e:
+                future.set_exception(e)
+
+        delay = delays[len(count)] if len(count) < len(delays) else 0
+        count.append(1)
+        if delay:
+            threading.Timer(delay, run).start()
+        else:
+            run()
+        return future
+
+    return submit_batch
+
+
+class ChunkModel:
+    """Whisper stand-in: one segment per call covering the whole chunk."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, **options):
+        self.calls += 1
+        return {"segments": [{"start": 0.0, "end": len(audio) / SAMPLE_RATE, "text": f"line {self.calls}"}]}
+
+
+class TestTranscriptionStream(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self._global_cache = transcription.transcript_cache
+        transcription.transcript_cache = TranscriptCache(os.path.join(self.temp_dir, "cache"))
+        self._chunk_seconds = parallel_transcriber.chunk_seconds
+        parallel_transcriber.chunk_seconds = 2.5
+        self._submit_batch = translation_service.submit_batch
+        self._batcher = translation_service.batcher
+
+        # Four speech bursts of 2 s between stretches of near-silence
+        rng = np.random.default_rng(1)
+        parts = []
+        for _ in range(4):
+            parts.append(rng.normal(0, 30, SAMPLE_RATE * 2))
+            parts.append(rng.normal(0, 8000, SAMPLE_RATE * 2))
+        parts.append(rng.normal(0, 30, SAMPLE_RATE))
+        pcm = np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+        self.path = os.path.join(self.temp_dir, "speech.wav")
+        with wave.open(self.path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(pcm.tobytes())
+
+        self.service = TranscriptionService()
+        self.service.backend = "whisper"
+        self.service.model = ChunkModel()
+
+    def tearDown(self):
+        transcription.transcript_cache = self._global_cache
+        parallel_transcriber.chunk_seconds = self._chunk_seconds
+        translation_service.submit_batch = self._submit_batch
+        translation_service.batcher = self._batcher
+        shutil.rmtree(self.temp_dir)
+
+    def test_segments_stream_per_chunk(self):
+        batches = list(self.service.iter_transcribe(self.path))
+        self.assertEqual(len(batches), 4)
+        starts = [seg["start"] for batch in batches for seg in batch]
+        self.assertEqual(starts, sorted(starts))
+        self.assertAlmostEqual(starts[1], 5.8, delta=0.1)
+
+        # Complete runs are cached and come back as one batch
+        cached = list(self.service.iter_transcribe(self.path))
+        self.assertEqual(cached, [[seg for batch in batches for seg in batch]])
+        self.assertEqual(self.service.model.calls, 4)
+
+    def test_abandoned_stream_is_not_cached(self):
+        stream = self.service.iter_transcribe(self.path)
+        next(stream)
+        stream.close()
+        self.assertEqual(len(self.service.transcribe(self.path)), 4)
+        self.assertEqual(self.service.model.calls, 5)
+
+    def test_translation_is_pipelined_in_order(self):
+        requested = []
+
+        def translate_batch(texts, target_lang, source_lang="auto", retry=None):
+            requested.append(list(texts))
+            return [text.upper() for text in texts]
+
+        # The first batch finishes last; results still come back in order
+        translation_service.submit_batch = submitted(translate_batch, delays=(0.2,))
+        # Room for two of these short lines per request
+        translation_service.batcher = lambda: TokenBatcher(2 * estimate_tokens("line 1"))
+        batches = list(self.service.iter_transcribe_and_translate(self.path, "en"))
+        self.assertEqual(sorted(requested), [["line 1", "line 2"], ["line 3", "line 4"]])
+        texts = [seg["text"] for batch in batches for seg in batch]
+        self.assertEqual(texts, ["LINE 1", "LINE 2", "LINE 3", "LINE 4"])
+
+    def test_rate_limit_reaches_the_caller_with_its_retry_policy(self):
+        policies = []
+
+        def translate_batch(texts, target_lang, source_lang="auto", retry=None):
+            policies.append(retry)
+            raise RateLimitError("Gemini Pro")
+
+        translation_service.submit_batch = submitted(translate_batch)
+        retry = RetryPolicy(max_seconds=1.0)
+        with self.assertRaises(RateLimitError):
+            self.service.transcribe_and_translate(self.path, "en", retry=retry)
+        self.assertTrue(policies)
+        self.assertTrue(all(policy is retry for policy in policies))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai.translation import OpenAIProvider, RateLimitError, TranslationService
+from src.core.ai.translation_engine import TranslationEngine
+from src.core.ai.translation_batching import (
+    AimdConcurrency,
+    ProviderLimits,
+    TokenBatcher,
+    estimate_tokens,
+    plan_batches,
+)
+
+
+class LimitedProvider:
+    """Provider that records request sizes and concurrency, failing with 429 on demand."""
+    limits = ProviderLimits(batch_tokens=40, max_lines=5, initial_concurrency=2, max_concurrency=3)
+
+    def __init__(self, rate_limits=0):
+        self.requests = []
+        self.rate_limits = rate_limits
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def get_name(self):
+        return "Limited"
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        return text
+
+    def translate_batch(self, texts, target_lang, source_lang="auto"):
+        with self._lock:
+            if self.rate_limits:
+                self.rate_limits -= 1
+                raise RateLimitError("Limited")
+            self.requests.append(list(texts))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        return [t.upper() for t in texts]
+
+
+class TestTranslationBatching(unittest.TestCase):
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens(""), 4)
+        self.assertEqual(estimate_tokens("hello world!"), 3 + 4)
+        self.assertEqual(estimate_tokens("你好世界"), 4 + 4)
+        self.assertGreater(estimate_tokens("你好" * 10), estimate_tokens("hi" * 10))
+
+    def test_limits_budget(self):
+        self.assertEqual(OpenAIProvider.limits.input_budget, 1500)
+        small_output = ProviderLimits(max_output_tokens=1256, output_ratio=2.0, batch_tokens=5000)
+        self.assertEqual(small_output.input_budget, 500)
+        self.assertEqual(small_output.output_tokens(["x" * 4000]), 1256)
+        reasoning = ProviderLimits(reasoning_tokens=1000, output_ratio=2.0)
+        self.assertEqual(reasoning.output_tokens(["abcd"]), 1000 + 256 + 10)
+
+    def test_plan_batches_respects_budget_and_order(self):
+        texts = ["a" * 80, "b" * 8, "c" * 8, "d" * 200, "e", "f", "g", "h", "i", "j"]
+        limits = ProviderLimits(batch_tokens=20, max_lines=4)
+        batches = plan_batches(texts, limits)
+        self.assertEqual([i for batch in batches for i in batch], list(range(len(texts))))
+        self.assertEqual(batches[:3], [[0], [1, 2], [3]])  # Oversized lines go alone
+        self.assertEqual(batches[3:], [[4, 5, 6, 7], [8, 9]])
+        for batch in batches:
+            if len(batch) > 1:
+                self.assertLessEqual(sum(estimate_tokens(texts[i]) for i in batch), 20)
+
+        batcher = TokenBatcher(10)
+        self.assertIsNone(batcher.flush())
+        self.assertIsNone(batcher.add("x", "x"))
+        self.assertEqual(batcher.add("y", "y" * 20), ["x"])
+        self.assertEqual(batcher.flush(), ["y"])
+
+    def test_aimd_increase_and_decrease(self):
+        limiter = AimdConcurrency(initial=2, maximum=4, cooldown=0.1)
+        for _ in range(6):
+            self.assertEqual(limiter.try_acquire(), 0.0)
+            limiter.release(latency=0.1, tokens=100)
+        self.assertGreater(limiter.limit, 3.0)
+        self.assertLessEqual(limiter.limit, 4.0)
+
+        before = limiter.limit
+        self.assertEqual(limiter.try_acquire(), 0.0)
+        limiter.release(rate_limited=True)
+        self.assertAlmostEqual(limiter.limit, before / 2)
+        wait = limiter.try_acquire()  # Paused for the cooldown
+        self.assertGreater(wait, 0.08)
+        time.sleep(wait)
+        self.assertEqual(limiter.try_acquire(), 0.0)
+        limiter.release(latency=0.1, tokens=100)
+
+    def test_aimd_backs_off_on_slow_responses(self):
+        limiter = AimdConcurrency(initial=4, maximum=8)
+        limiter.try_acquire()
+        limiter.release(latency=0.1, tokens=100)
+        before = limiter.limit
+        # Far slower per token than the best seen so far
+        limiter.try_acquire()
+        limiter.release(latency=5.0, tokens=100)
+        self.assertAlmostEqual(limiter.limit, before / 2)
+        # Slower but normal for a bigger request
+        limiter.try_acquire()
+        limiter.release(latency=1.0, tokens=1000)
+        self.assertGreater(limiter.limit, before / 2)
+
+    def test_aimd_caps_requests_in_flight(self):
+        limiter = AimdConcurrency(initial=2, maximum=2)
+        self.assertEqual(limiter.try_acquire(), 0.0)
+        self.assertEqual(limiter.try_acquire(), 0.0)
+        self.assertIsNone(limiter.try_acquire())
+        limiter.release(latency=0.02, tokens=10)
+        self.assertEqual(limiter.try_acquire(), 0.0)
+        self.assertEqual(limiter.state(), (2.0, 2))
+
+
+class TestServiceBatching(unittest.TestCase):
+    def setUp(self):
+        self.service = TranslationService()
+        self.service.memory = None
+        self.service.engine = TranslationEngine(retry_base=0.01, retry_max=0.02, max_retry_seconds=0.3)
+
+    def tearDown(self):
+        self.service.engine.shutdown()
+
+    def _use(self, provider):
+        self.service.providers["limited"] = provider
+        self.service.current_provider = "limited"
+
+    def test_large_batch_is_split_into_concurrent_requests(self):
+        provider = LimitedProvider()
+        self._use(provider)
+        texts = [f"line number {i}" for i in range(23)]
+        result = self.service.translate_batch(texts, "vi")
+        self.assertEqual(result, [t.upper() for t in texts])
+        self.assertGreater(len(provider.requests), 4)
+        self.assertTrue(all(len(request) <= 5 for request in provider.requests))
+        self.assertLessEqual(provider.max_active, 3)
+
+    def test_submitted_batches_share_the_provider_limit(self):
+        provider = LimitedProvider()
+        self._use(provider)
+        futures = [self.service.submit_batch([f"batch {i} line {j}" for j in range(5)], "vi") for i in range(6)]
+        self.assertEqual(futures[3].result(timeout=5), [f"BATCH 3 LINE {j}" for j in range(5)])
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(len(provider.requests), 6)
+        self.assertLessEqual(provider.max_active, 3)
+
+    def test_rate_limits_are_retried(self):
+        provider = LimitedProvider(rate_limits=2)
+        self._use(provider)
+        limiter = self.service.engine.throttle("limited", provider.limits).concurrency
+        limiter.base_cooldown = limiter._cooldown = 0.01
+        self.assertEqual(self.service.translate_batch(["hi"], "vi"), ["HI"])
+        self.assertEqual(limiter.rate_limited, 2)
+        self.assertEqual(self.service.engine.retries, 2)
+        # Halved twice (floor 1), then one slot back for the success
+        self.assertEqual(limiter.limit, 2.0)
+
+        self._use(LimitedProvider(rate_limits=1000))
+        limiter.max_cooldown = limiter._cooldown = 0.01
+        with self.assertRaises(RateLimitError):
+            self.service.translate_batch(["hi"], "vi")
+
+
+if __name__ == "__main__":
+    unittest.main()
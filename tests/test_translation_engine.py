@@ -0,0 +1,205 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai.translation import GoogleTranslateProvider
+from src.core.ai.translation_batching import ProviderLimits
+from src.core.ai.translation_engine import RateLimitError, RetryPolicy, TokenBucket, TranslationEngine
+
+
+class EchoProvider:
+    """Batch provider tagging lines, optionally rate limiting the first calls."""
+
+    def __init__(self, limits, rate_limits=0, delay=0.0):
+        self.limits = limits
+        self.rate_limits = rate_limits
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def translate_batch(self, texts, target_lang, source_lang="auto"):
+        with self._lock:
+            self.calls.append(time.monotonic())
+            if self.rate_limits:
+                self.rate_limits -= 1
+                raise RateLimitError("Echo")
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return [f"{target_lang}:{t}" for t in texts]
+
+
+class FakeTranslator:
+    """Stands in for deep_translator.GoogleTranslator."""
+
+    def __init__(self, source, target, reply=None, error=None):
+        self.source = source
+        self.target = target
+        self.reply = reply
+        self.error = error
+        self.queries = []
+
+    def translate(self, text):
+        self.queries.append(text)
+        if self.error:
+            raise self.error
+        if self.reply is not None:
+            return self.reply(text)
+        return "\n".join(f"[{line}]" for line in text.split("\n"))
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(rate_per_minute=600, capacity=5)  # 10 per second
+        self.assertEqual([bucket.reserve(1) for _ in range(5)], [0.0] * 5)
+        self.assertAlmostEqual(bucket.reserve(1), 0.1, delta=0.02)
+        self.assertAlmostEqual(bucket.reserve(1), 0.2, delta=0.02)
+        time.sleep(0.35)  # Pays off the two in debt, then one more refills
+        self.assertEqual(bucket.reserve(1), 0.0)
+
+    def test_oversized_reservation_is_capped(self):
+        bucket = TokenBucket(rate_per_minute=60, capacity=10)
+        self.assertEqual(bucket.reserve(1000), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1), 1.0, delta=0.05)
+
+
+class TestTranslationEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = TranslationEngine(threads=8, retry_base=0.01, retry_max=0.02, max_retry_seconds=0.3)
+
+    def tearDown(self):
+        self.engine.shutdown()
+
+    def test_thousands_of_lines_come_back_in_order(self):
+        limits = ProviderLimits(
+            batch_tokens=100, max_lines=20, requests_per_minute=100000,
+            tokens_per_minute=10 ** 8, initial_concurrency=4, max_concurrency=6,
+        )
+        provider = EchoProvider(limits, delay=0.005)
+        texts = [f"line {i}" for i in range(3000)]
+        result = self.engine.translate("echo", provider, texts, "vi")
+        self.assertEqual(result, [f"vi:{t}" for t in texts])
+        self.assertEqual(self.engine.requests, len(provider.calls))
+        self.assertGreater(provider.max_active, 1)
+        self.assertLessEqual(provider.max_active, 6)
+
+    def test_rate_limits_retry_with_backoff(self):
+        limits = ProviderLimits(requests_per_minute=100000, tokens_per_minute=10 ** 8)
+        provider = EchoProvider(limits, rate_limits=3)
+        throttle = self.engine.throttle("echo", limits)
+        throttle.concurrency.base_cooldown = throttle.concurrency._cooldown = 0.01
+        throttle.concurrency.max_cooldown = 0.01
+        self.assertEqual(self.engine.translate("echo", provider, ["a", "b"], "vi"), ["vi:a", "vi:b"])
+        self.assertEqual(self.engine.retries, 3)
+        self.assertEqual(throttle.concurrency.rate_limited, 3)
+
+        provider.rate_limits = 10 ** 6
+        with self.assertRaises(RateLimitError):
+            self.engine.translate("echo", provider, ["c"], "vi")
+
+    def test_retry_policy_sets_budget_and_reports_retries(self):
+        limits = ProviderLimits(requests_per_minute=100000, tokens_per_minute=10 ** 8)
+        provider = EchoProvider(limits, rate_limits=10 ** 6)
+        throttle = self.engine.throttle("echo", limits)
+        throttle.concurrency.base_cooldown = throttle.concurrency._cooldown = 0.01
+        throttle.concurrency.max_cooldown = 0.01
+        retries = []
+        retry = RetryPolicy(max_seconds=0.05, on_retry=lambda *args: retries.append(args))
+        started = time.monotonic()
+        with self.assertRaises(RateLimitError):
+            self.engine.translate("echo", provider, ["a"], "vi", retry=retry)
+        self.assertLess(time.monotonic() - started, 0.3)
+        self.assertTrue(retries)
+        self.assertEqual([args[:2] for args in retries], [("Echo", i + 1) for i in range(len(retries))])
+
+    def test_requests_per_minute_paces_calls(self):
+        # Bucket of 2 requests refilling at 20 per second
+        limits = ProviderLimits(
+            batch_tokens=4, max_lines=1, requests_per_minute=1200,
+            tokens_per_minute=10 ** 8, initial_concurrency=4, max_concurrency=4,
+        )
+        throttle = self.engine.throttle("paced", limits)
+        throttle.requests = TokenBucket(1200, capacity=2)
+        provider = EchoProvider(limits)
+        started = time.monotonic()
+        self.engine.translate("paced", provider, ["a", "b", "c", "d", "e", "f"], "vi")
+        # Two go at once, the other four wait 50ms apiece
+        self.assertGreaterEqual(time.monotonic() - started, 0.18)
+        self.assertEqual(len(provider.calls), 6)
+
+    def test_translate_async_runs_on_callers_loop(self):
+        limits = ProviderLimits(requests_per_minute=100000, tokens_per_minute=10 ** 8)
+        provider = EchoProvider(limits)
+        result = asyncio.run(self.engine.translate_async("echo", provider, ["x", "y"], "en"))
+        self.assertEqual(result, ["en:x", "en:y"])
+        self.assertEqual(asyncio.run(self.engine.translate_async("echo", provider, [], "en")), [])
+
+
+class TestGoogleJoinedBatch(unittest.TestCase):
+    def setUp(self):
+        self.provider = GoogleTranslateProvider()
+        self.translators = {}
+
+    def _patch(self, **kwargs):
+        def translator(source, target):
+            key = (source, target)
+            if key not in self.translators:
+                self.translators[key] = FakeTranslator(source, target, **kwargs)
+            return self.translators[key]
+        return patch.object(self.provider, "_translator", side_effect=translator)
+
+    def test_batch_is_one_request(self):
+        with self._patch():
+            result = self.provider.translate_batch(["你好", "谢谢", "再见"], "vi")
+        self.assertEqual(result, ["[你好]", "[谢谢]", "[再见]"])
+        self.assertEqual(list(self.translators), [("zh-CN", "vi")])
+        self.assertEqual(self.translators[("zh-CN", "vi")].queries, ["你好\n谢谢\n再见"])
+
+    def test_mixed_scripts_use_auto_detection(self):
+        with self._patch():
+            self.provider.translate_batch(["你好", "hello"], "vi")
+        self.assertEqual(list(self.translators), [("auto", "vi")])
+
+    def test_line_mismatch_falls_back_to_single_lines(self):
+        with self._patch(reply=lambda text: text.replace("\n", " ") + "!"):
+            result = self.provider.translate_batch(["one", "two"], "vi")
+        self.assertEqual(result, ["one!", "two!"])
+        self.assertEqual(self.translators[("auto", "vi")].queries, ["one\ntwo", "one", "two"])
+
+    def test_rate_limit_raises(self):
+        with self._patch(error=Exception("429 Too Many Requests")):
+            with self.assertRaises(RateLimitError):
+                self.provider.translate_batch(["one", "two"], "vi")
+
+    def test_untranslated_lines_are_retried_as_chinese(self):
+        # Only the zh-TW translator knows these lines
+        def translator(source, target):
+            key = (source, target)
+            if key not in self.translators:
+                reply = (lambda text: f"<{text}>") if source == "zh-TW" else (lambda text: text)
+                self.translators[key] = FakeTranslator(source, target, reply=reply)
+            return self.translators[key]
+
+        with patch.object(self.provider, "_translator", side_effect=translator):
+            self.assertEqual(self.provider.translate_batch(["〇〇", "ー"], "vi"), ["<〇〇>", "<ー>"])
+            self.assertEqual(self.provider.translate_batch(["〇〇\nー"], "vi"), ["<〇〇\nー>"])
+            self.assertEqual(self.provider.translate("ー", "vi"), "<ー>")
+
+    def test_other_errors_keep_source_lines(self):
+        with self._patch(error=ValueError("boom")):
+            self.assertEqual(self.provider.translate_batch(["one", "two"], "vi"), ["one", "two"])
+
+
+if __name__ == "__main__":
+    unittest.main()
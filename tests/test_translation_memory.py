@@ -0,0 +1,99 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai.translation import TranslationService
+from src.core.ai.translation_memory import TranslationMemory, normalize_text
+
+
+class FakeProvider:
+    """Batch provider that upper-cases lines and records what it was sent."""
+
+    def __init__(self, fail=()):
+        self.sent = []
+        self.fail = set(fail)
+
+    def get_name(self):
+        return "Fake"
+
+    def translate(self, text, target_lang, source_lang="auto"):
+        return self.translate_batch([text], target_lang, source_lang)[0]
+
+    def translate_batch(self, texts, target_lang, source_lang="auto"):
+        self.sent.append(list(texts))
+        # Failed lines come back untranslated, like the real providers
+        return [t if t in self.fail else f"{target_lang}:{t.upper()}" for t in texts]
+
+
+class TestTranslationMemory(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "tm.sqlite3")
+        self.memory = TranslationMemory(self.db_path)
+        self.service = TranslationService()
+        self.service.memory = self.memory
+        self.provider = FakeProvider(fail={"broken"})
+        self.service.providers["fake"] = self.provider
+        self.service.current_provider = "fake"
+
+    def tearDown(self):
+        self.memory.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("  hello \n  world\t"), "hello world")
+        self.assertEqual(normalize_text("cafe\u0301"), "caf\u00e9")
+        self.assertEqual(normalize_text(None), "")
+
+    def test_batch_is_deduplicated_before_sending(self):
+        texts = ["hi", "ok", "hi ", "", "  ok", "bye"]
+        result = self.service.translate_batch(texts, "vi")
+        self.assertEqual(self.provider.sent, [["hi", "ok", "bye"]])
+        self.assertEqual(result, ["vi:HI", "vi:OK", "vi:HI", "", "vi:OK", "vi:BYE"])
+        self.assertEqual(self.service.deduplicated, 2)
+
+    def test_memory_serves_repeats_across_batches_and_sessions(self):
+        self.service.translate_batch(["intro line", "broken", "a"], "vi")
+        self.assertEqual(self.service.translate_batch(["a", "intro  line"], "vi"), ["vi:A", "vi:INTRO LINE"])
+        self.assertEqual(len(self.provider.sent), 1)
+        self.assertEqual((self.memory.hits, self.memory.misses), (2, 3))
+        self.assertAlmostEqual(self.memory.hit_rate, 0.4)
+
+        # Untranslated (failed) lines are retried, not remembered
+        self.service.translate_batch(["broken"], "vi")
+        self.assertEqual(self.provider.sent[-1], ["broken"])
+
+        reopened = TranslationMemory(self.db_path)
+        self.assertEqual(reopened.lookup("fake", "auto", "vi", ["a", "broken"]), {"a": "vi:A"})
+        self.assertEqual(reopened.count(), 2)
+        reopened.close()
+
+    def test_keys_include_provider_and_languages(self):
+        self.service.translate_batch(["hello"], "vi")
+        self.service.translate_batch(["hello"], "en")
+        self.service.translate_batch(["hello"], "vi", source_lang="zh")
+        self.service.providers["other"] = self.provider
+        self.service.current_provider = "other"
+        self.service.translate_batch(["hello"], "vi")
+        self.assertEqual(len(self.provider.sent), 4)
+
+    def test_single_translate_uses_memory(self):
+        self.assertEqual(self.service.translate(" again ", "vi"), "vi:AGAIN")
+        self.assertEqual(self.service.translate_batch(["again"], "vi"), ["vi:AGAIN"])
+        self.assertEqual(self.service.translate("again", "vi"), "vi:AGAIN")
+        self.assertEqual(len(self.provider.sent), 1)
+
+    def test_memory_can_be_disabled(self):
+        self.service.memory = None
+        self.service.translate_batch(["x", "x"], "vi")
+        self.service.translate_batch(["x"], "vi")
+        self.assertEqual(self.provider.sent, [["x", "x"], ["x"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import unittest
+import wave
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.ai import tts as tts_module
+from src.core.ai.tts import TTSService, fit_tempo, segment_slots, speech_key
+
+# ffmpeg stand-in: the "MP3" holds its own length ("SECONDS=1.5"); it streams
+# that much audio (a constant 1000) at the requested rate, shortened by atempo
+FAKE_FFMPEG = """#!{python}
+import sys
+args = sys.argv[1:]
+with open(args[args.index("-i") + 1]) as f:
+    seconds = float(f.read().split("=")[1])
+tempo = 1.0
+if "-af" in args:
+    tempo = float(args[args.index("-af") + 1].split("=")[1])
+rate = int(args[args.index("-ar") + 1])
+count = int(seconds / tempo * rate)
+sys.stdout.buffer.write((1000).to_bytes(2, "little", signed=True) * count)
+"""
+
+RATE = tts_module.TTS_SAMPLE_RATE
+
+
+class FakeSynthesizer:
+    """Replaces edge-tts: each character of text speaks for 0.1s."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, text, voice, rate, pitch):
+        self.calls.append((text, voice, rate, pitch))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        if text in self.fail:
+            raise RuntimeError("no audio")
+        return f"SECONDS={len(text) * 0.1:.3f}".encode()
+
+
+def _read_wav(path):
+    with wave.open(path, "rb") as wav:
+        return wav.getframerate(), np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+
+
+class TestTTSHelpers(unittest.TestCase):
+    def test_segment_slots(self):
+        segments = [
+            {"start": 4.0, "end": 5.0, "text": "c"},
+            {"start": 0.0, "end": 1.0, "text": "a"},
+            {"start": 2.0, "end": 2.5, "text": "b"},
+        ]
+        self.assertEqual(segment_slots(segments), [(4.0, float("inf")), (0.0, 2.0), (2.0, 4.0)])
+        self.assertEqual(segment_slots(segments, duration=6.0)[0], (4.0, 6.0))
+        self.assertEqual(segment_slots([]), [])
+
+    def test_fit_tempo(self):
+        self.assertEqual(fit_tempo(1.0, 2.0), 1.0)
+        self.assertAlmostEqual(fit_tempo(3.0, 2.0), 1.5)
+        self.assertEqual(fit_tempo(10.0, 2.0), tts_module.MAX_TEMPO)
+        self.assertEqual(fit_tempo(1.0, float("inf")), 1.0)
+
+    def test_speech_key(self):
+        key = speech_key("xin chào", "vi-VN-HoaiMyNeural", "+0%", "+0Hz")
+        self.assertEqual(key, speech_key("xin chào", "vi-VN-HoaiMyNeural", "+0%", "+0Hz"))
+        self.assertNotEqual(key, speech_key("xin chào", "vi-VN-HoaiMyNeural", "+10%", "+0Hz"))
+        self.assertNotEqual(key, speech_key("xin chào", "vi-VN-NamMinhNeural", "+0%", "+0Hz"))
+        self.assertNotEqual(key, speech_key("xin chào", "vi-VN-HoaiMyNeural", "+0%", "+5Hz"))
+
+
+class TestTTSPipeline(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.service = TTSService(cache_dir=os.path.join(self.temp_dir, "tts"), max_concurrency=3)
+        self.service.ffmpeg_path = os.path.join(self.temp_dir, "ffmpeg")
+        with open(self.service.ffmpeg_path, "w") as f:
+            f.write(FAKE_FFMPEG.format(python=sys.executable))
+        os.chmod(self.service.ffmpeg_path, os.stat(self.service.ffmpeg_path).st_mode | stat.S_IXUSR)
+        self.synth = FakeSynthesizer(fail={"broken"})
+        self.service._synthesize = self.synth
+
+    def tearDown(self):
+        self.service.shutdown()
+        shutil.rmtree(self.temp_dir)
+
+    def test_voiceover_is_aligned_and_stretched(self):
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "abcde"},         # 0.5s in a 1.0s slot
+            {"start": 1.0, "end": 1.5, "text": "abcdefghij"},    # 1.0s in 0.5s: 2x
+            {"start": 1.5, "end": 2.0, "text": "abcdefghijkl"},  # 1.2s in 0.5s: cut
+            {"start": 2.0, "end": 3.0, "text": "   "},
+            {"start": 3.0, "end": 4.0, "text": "broken"},
+        ]
+        output = os.path.join(self.temp_dir, "out", "voiceover.wav")
+        track = self.service.generate_voiceover(segments, output, duration=5.0)
+        rate, samples = _read_wav(output)
+        self.assertEqual(rate, RATE)
+        self.assertEqual(len(samples), 5 * RATE)
+        self.assertAlmostEqual(track.duration, 5.0)
+        self.assertEqual((track.segments, track.cached, track.stretched, track.truncated, track.failed),
+                         (5, 0, 2, 1, 1))
+
+        self.assertTrue((samples[:int(0.5 * RATE)] == 1000).all())
+        self.assertTrue((samples[int(0.5 * RATE):RATE] == 0).all())
+        self.assertTrue((samples[RATE:int(1.5 * RATE) - 10] == 1000).all())
+        # The cut line fades out and the track is silent from 2s
+        self.assertLess(samples[2 * RATE - 1], 100)
+        self.assertTrue((samples[2 * RATE:] == 0).all())
+
+    def test_segments_are_synthesized_concurrently_with_bound(self):
+        segments = [{"start": i * 2.0, "end": i * 2.0 + 1, "text": f"line {i}"} for i in range(12)]
+        self.service.generate_voiceover(segments, os.path.join(self.temp_dir, "a.wav"), voice="en-US-GuyNeural")
+        self.assertEqual(len(self.synth.calls), 12)
+        self.assertEqual(self.synth.max_active, 3)
+        self.assertTrue(all(call[1] == "en-US-GuyNeural" for call in self.synth.calls))
+
+    def test_clips_are_cached(self):
+        segments = [{"start": 0.0, "end": 1.0, "text": "hello"}, {"start": 1.0, "end": 2.0, "text": "again"}]
+        self.service.generate_voiceover(segments, os.path.join(self.temp_dir, "a.wav"))
+        track = self.service.generate_voiceover(segments, os.path.join(self.temp_dir, "b.wav"))
+        self.assertEqual(len(self.synth.calls), 2)
+        self.assertEqual(track.cached, 2)
+
+        # A different rate is a different clip
+        self.service.generate_voiceover(segments[:1], os.path.join(self.temp_dir, "c.wav"), rate="+10%")
+        self.assertEqual(len(self.synth.calls), 3)
+
+        output = self.service.generate_speech("hello", os.path.join(self.temp_dir, "speech.mp3"))
+        self.assertEqual(len(self.synth.calls), 3)
+        with open(output, "rb") as f:
+            self.assertEqual(f.read(), b"SECONDS=0.500")
+
+    def test_clips_are_kept_until_the_voiceover_is_written(self):
+        # Room for one clip only: each new clip would evict the others
+        self.service.cache.max_bytes = 20
+        segments = [{"start": i * 2.0, "end": i * 2.0 + 1, "text": f"line {i}"} for i in range(6)]
+        track = self.service.generate_voiceover(segments, os.path.join(self.temp_dir, "a.wav"))
+        self.assertEqual(track.failed, 0)
+        rate, samples = _read_wav(os.path.join(self.temp_dir, "a.wav"))
+        for i in range(6):
+            self.assertEqual(samples[i * 2 * RATE], 1000)
+        # Released afterwards, so the cache shrinks back on the next store
+        self.service.generate_speech("after", os.path.join(self.temp_dir, "b.mp3"))
+        self.assertEqual(len(os.listdir(self.service.cache.cache_dir)), 1)
+
+    def test_generate_speech_raises_on_failure(self):
+        with self.assertRaises(RuntimeError):
+            self.service.generate_speech("broken", os.path.join(self.temp_dir, "x.mp3"))
+
+
+class TestVoiceList(unittest.TestCase):
+    VOICES = [{"ShortName": "vi-VN-HoaiMyNeural", "Locale": "vi-VN"},
+              {"ShortName": "en-US-GuyNeural", "Locale": "en-US"}]
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.fetches = 0
+        self.fail = False
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _service(self):
+        service = TTSService(cache_dir=self.temp_dir)
+
+        async def list_voices():
+            self.fetches += 1
+            if self.fail:
+                raise ConnectionError("offline")
+            return self.VOICES
+
+        service._list_voices = list_voices
+        self.addCleanup(service.shutdown)
+        return service
+
+    def test_voice_list_is_cached_with_ttl(self):
+        service = self._service()
+        self.assertEqual(service.get_available_voices("vi"), self.VOICES[:1])
+        self.assertEqual(service.get_available_voices(), self.VOICES)
+        self.assertEqual(self.fetches, 1)
+
+        # A new session reads the saved list
+        self.assertEqual(self._service().get_available_voices("en"), self.VOICES[1:])
+        self.assertEqual(self.fetches, 1)
+
+        service.get_available_voices(refresh=True)
+        self.assertEqual(self.fetches, 2)
+
+    def test_expired_list_is_refetched_and_kept_when_offline(self):
+        path = os.path.join(self.temp_dir, "voices.json")
+        with open(path, "w") as f:
+            json.dump({"fetched_at": time.time() - tts_module.VOICE_LIST_TTL - 1, "voices": self.VOICES[:1]}, f)
+        self.fail = True
+        service = self._service()
+        self.assertEqual(service.get_available_voices(), self.VOICES[:1])
+        self.assertEqual(self.fetches, 1)
+
+        self.fail = False
+        self.assertEqual(service.get_available_voices(), self.VOICES)
+        self.assertEqual(self.fetches, 2)
+
+    def test_no_list_and_offline_raises(self):
+        self.fail = True
+        with self.assertRaises(ConnectionError):
+            self._service().get_available_voices()
+
+
+if __name__ == "__main__":
+    unittest.main()